@@ -8,7 +8,7 @@ from typing import List, Set, Type, Tuple, Optional
 import yaml
 
 from bauh.api.abstract.context import ApplicationContext
-from bauh.api.abstract.disk import DiskCacheLoader
+from bauh.api.abstract.disk import DiskCacheLoader, DiskCacheStore, DiskCacheStoreFactory
 from bauh.api.abstract.handler import ProcessWatcher, TaskManager
 from bauh.api.abstract.model import SoftwarePackage, PackageUpdate, PackageHistory, PackageSuggestion, \
     CustomSoftwareAction
@@ -134,8 +134,22 @@ class SoftwareManager(ABC):
         :param pkg:
         :return:
         """
-        if pkg.supports_disk_cache() and os.path.exists(pkg.get_disk_cache_path()):
-            shutil.rmtree(pkg.get_disk_cache_path())
+        if pkg.supports_disk_cache():
+            store = self.get_disk_cache_store(pkg)
+
+            if store:
+                store.delete(DiskCacheStoreFactory.get_key(pkg))
+
+            if os.path.exists(pkg.get_disk_cache_path()):
+                shutil.rmtree(pkg.get_disk_cache_path())
+
+    def get_disk_cache_store(self, pkg: SoftwarePackage) -> Optional[DiskCacheStore]:
+        """
+        :param pkg:
+        :return: the single-file store where the package data is cached (if enabled and supported by the package)
+        """
+        if self.context and self.context.disk_cache_store_factory:
+            return self.context.disk_cache_store_factory.for_package(pkg)
 
     def get_upgrade_requirements(self, pkgs: List[SoftwarePackage], root_password: str, watcher: ProcessWatcher) -> UpgradeRequirements:
         """
@@ -243,10 +257,13 @@ class SoftwareManager(ABC):
         :return:
         """
         if not only_icon:
-            Path(pkg.get_disk_cache_path()).mkdir(parents=True, exist_ok=True)
             data = pkg.get_data_to_cache()
+            store = self.get_disk_cache_store(pkg) if data else None
 
-            if data:
+            if store:
+                store.put(DiskCacheStoreFactory.get_key(pkg), data)
+            elif data:
+                Path(pkg.get_disk_cache_path()).mkdir(parents=True, exist_ok=True)
                 disk_path = pkg.get_disk_data_path()
                 ext = disk_path.split('.')[-1]
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Type
+from typing import Type, Dict, Optional, Set
 
 from bauh.api.abstract.cache import MemoryCache
 from bauh.api.abstract.model import SoftwarePackage
@@ -40,3 +40,87 @@ class DiskCacheLoaderFactory(ABC):
         :return:
         """
         pass
+
+
+class DiskCacheStore(ABC):
+    """
+    A single-file store holding the cached data of all installed packages of a given gem
+    (instead of one data file per package).
+    """
+
+    @abstractmethod
+    def load(self) -> Dict[str, dict]:
+        """
+        :return: all the cached data stored mapped by package key (retrieved through a single read)
+        """
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def keys(self) -> Set[str]:
+        pass
+
+    @abstractmethod
+    def put(self, key: str, data: dict):
+        """
+        atomically adds or replaces the cached data of a given package
+        :param key:
+        :param data:
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def put_several(self, data: Dict[str, dict]):
+        """
+        same as 'put', but for several packages within the same transaction
+        :param data:
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        pass
+
+    @abstractmethod
+    def compact(self):
+        """
+        reclaims the space left by deleted / replaced entries
+        :return:
+        """
+        pass
+
+
+class DiskCacheStoreFactory(ABC):
+
+    @abstractmethod
+    def get(self, file_path: str, legacy_dir: Optional[str] = None) -> DiskCacheStore:
+        """
+        :param file_path: the store file path
+        :param legacy_dir: a directory holding one sub-directory with a data file per package. If informed, its data will be migrated to the store when it is created.
+        :return: a shared store instance for the given file path
+        """
+        pass
+
+    @abstractmethod
+    def for_package(self, pkg: SoftwarePackage) -> Optional[DiskCacheStore]:
+        """
+        :param pkg:
+        :return: the store associated with the package type or None if the package does not support it
+        """
+        pass
+
+    @staticmethod
+    def get_key(pkg: SoftwarePackage) -> Optional[str]:
+        """
+        :param pkg:
+        :return: the key that identifies the package data within a store
+        """
+        cache_path = pkg.get_disk_cache_path()
+
+        if cache_path:
+            return cache_path.rstrip('/').split('/')[-1]
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from bauh.api.constants import CACHE_PATH
 
@@ -161,6 +161,12 @@ class SoftwarePackage(ABC):
         if path:
             return '{}/data.json'.format(path)
 
+    def get_disk_cache_store_path(self) -> Optional[str]:
+        """
+        :return: the single-file store path where the package data can be cached instead of 'get_disk_data_path'. None if not supported.
+        """
+        return None
+
     @abstractmethod
     def get_data_to_cache(self) -> dict:
         """
@@ -5,20 +5,48 @@ from typing import Optional
 
 import requests
 import yaml
+from requests.adapters import BaseAdapter
 
-from bauh.commons import system
+from bauh.commons import system, trace
+
+_adapter = None  # transport mounted on the new sessions instead of the default one (see bauh.commons.replay)
+
+
+def set_adapter(adapter: Optional[BaseAdapter]):
+    """
+    Defines the transport adapter of the sessions created after the call
+    :param adapter: if not defined, the default requests transport is used
+    """
+    global _adapter
+    _adapter = adapter
+
+
+def new_session() -> requests.Session:
+    session = requests.Session()
+
+    if _adapter:
+        session.mount('http://', _adapter)
+        session.mount('https://', _adapter)
+
+    return session
 
 
 class HttpClient:
 
     def __init__(self, logger: logging.Logger, max_attempts: int = 2, timeout: int = 30, sleep: float = 0.5):
         self.max_attempts = max_attempts
-        self.session = requests.Session()
+        self.session = new_session()
         self.timeout = timeout
         self.sleep = sleep
         self.logger = logger
 
     def get(self, url: str, params: dict = None, headers: dict = None, allow_redirects: bool = True, ignore_ssl: bool = False, single_call: bool = False, session: bool = True) -> Optional[requests.Response]:
+        with trace.span('http.get', 'http', url=url) as span:
+            res = self._get(url, params, headers, allow_redirects, ignore_ssl, single_call, session)
+            span.set('status', res.status_code if res is not None else None)
+            return res
+
+    def _get(self, url: str, params: dict, headers: dict, allow_redirects: bool, ignore_ssl: bool, single_call: bool, session: bool) -> Optional[requests.Response]:
         cur_attempts = 1
 
         while cur_attempts <= self.max_attempts:
@@ -39,7 +67,8 @@ class HttpClient:
                 if session:
                     res = self.session.get(url, **args)
                 else:
-                    res = requests.get(url, **args)
+                    with new_session() as single_session:
+                        res = single_session.get(url, **args)
 
                 if res.status_code == 200:
                     return res
@@ -70,10 +99,13 @@ class HttpClient:
 
     def get_content_length_in_bytes(self, url: str, session: bool = True) -> int:
         params = {'url': url, 'allow_redirects': True, 'stream': True}
-        if session:
-            res = self.session.get(**params)
-        else:
-            res = requests.get(**params)
+
+        with trace.span('http.content_length', 'http', url=url):
+            if session:
+                res = self.session.get(**params)
+            else:
+                with new_session() as single_session:
+                    res = single_session.get(**params)
 
         if res.status_code == 200:
             size = res.headers.get('Content-Length')
@@ -92,10 +124,12 @@ class HttpClient:
 
     def exists(self, url: str, session: bool = True, timeout: int = 5) -> bool:
         params = {'url': url, 'allow_redirects': True, 'verify': False, 'timeout': timeout}
-        if session:
-            res = self.session.head(**params)
-        else:
-            res = self.session.get(**params)
+
+        with trace.span('http.exists', 'http', url=url):
+            if session:
+                res = self.session.head(**params)
+            else:
+                res = self.session.get(**params)
 
         return res.status_code in (200, 403)
         return False
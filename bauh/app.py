@@ -7,6 +7,7 @@ import urllib3
 from PyQt5.QtCore import QCoreApplication, Qt
 
 from bauh import __app_name__, app_args
+from bauh.commons import trace
 from bauh.view.core import config
 from bauh.view.util import logs
 
@@ -22,6 +23,9 @@ def main(tray: bool = False):
 
     logger = logs.new_logger(__app_name__, bool(args.logs))
 
+    if args.trace:
+        trace.enable()
+
     app_config = config.read_config(update_file=True)
 
     if bool(app_config['ui']['auto_scale']):
@@ -48,7 +52,12 @@ def main(tray: bool = False):
         app, widget = new_manage_panel(args, app_config, logger)
 
     widget.show()
-    sys.exit(app.exec_())
+    code = app.exec_()
+
+    if args.trace and trace.save(args.trace):
+        logger.info("Trace written to '{}'".format(args.trace))
+
+    sys.exit(code)
 
 
 def tray():
@@ -1,4 +1,7 @@
+import logging
 import os
+import sys
+from argparse import Namespace
 
 import urllib3
 
@@ -7,37 +10,32 @@ from bauh.api.abstract.context import ApplicationContext
 from bauh.api.http import HttpClient
 from bauh.cli import __app_name__, cli_args
 from bauh.cli.controller import CLIManager
-from bauh.context import generate_i18n, DEFAULT_I18N_KEY
-from bauh.view.core import config, gems
+from bauh.commons import trace, replay
+from bauh.view.core import config, gems, service
 from bauh.view.core.controller import GenericSoftwareManager
 from bauh.view.core.downloader import AdaptableFileDownloader
 from bauh.view.util import logs, util, resource
 from bauh.view.util.cache import DefaultMemoryCacheFactory
-from bauh.view.util.disk import DefaultDiskCacheLoaderFactory
+from bauh.view.util.disk import DefaultDiskCacheLoaderFactory, DefaultDiskCacheStoreFactory
+from bauh.view.util.translation import generate_i18n, DEFAULT_I18N_KEY
 
 
-def main():
-    if not os.getenv('PYTHONUNBUFFERED'):
-        os.environ['PYTHONUNBUFFERED'] = '1'
-
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-    args = cli_args.read()
-    logger = logs.new_logger(__app_name__, False)
-
-    app_config = config.read_config(update_file=True)
+def new_manager(app_config: dict, logger: logging.Logger) -> GenericSoftwareManager:
     http_client = HttpClient(logger)
 
-    i18n = generate_i18n(app_config, resource.get_path('locale'))
+    i18n = generate_i18n(app_config, resource.get_path('locale'), gems=True)
 
     cache_factory = DefaultMemoryCacheFactory(expiration_time=0)
 
+    cache_store_factory = DefaultDiskCacheStoreFactory(logger) if bool(app_config['disk']['cache_store']) else None
+
     context = ApplicationContext(i18n=i18n,
                                  http_client=http_client,
                                  download_icons=bool(app_config['download']['icons']),
                                  app_root_dir=ROOT_DIR,
                                  cache_factory=cache_factory,
-                                 disk_loader_factory=DefaultDiskCacheLoaderFactory(logger),
+                                 disk_loader_factory=DefaultDiskCacheLoaderFactory(logger, cache_store_factory),
+                                 disk_cache_store_factory=cache_store_factory,
                                  logger=logger,
                                  distro=util.get_distro(),
                                  file_downloader=AdaptableFileDownloader(logger, bool(app_config['download']['multithreaded']),
@@ -46,10 +44,53 @@ def main():
 
     managers = gems.load_managers(context=context, locale=i18n.current_key, config=app_config, default_locale=DEFAULT_I18N_KEY)
 
-    cli = CLIManager(GenericSoftwareManager(managers, context=context, config=app_config))
+    return GenericSoftwareManager(managers, context=context, config=app_config)
+
+
+def main():
+    if not os.getenv('PYTHONUNBUFFERED'):
+        os.environ['PYTHONUNBUFFERED'] = '1'
+
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    args = cli_args.read()
+    logger = logs.new_logger(__app_name__, False)
+
+    if args.trace:
+        trace.enable()
+
+    if args.record:
+        replay.enable(replay.RECORD, args.record)
+    elif args.replay:
+        replay.enable(replay.REPLAY, args.replay, latency=args.replay_latency)
+
+    try:
+        run(args, logger)
+    finally:
+        if args.trace and trace.save(args.trace):
+            logger.info("Trace written to '{}'".format(args.trace))
+
+
+def run(args: Namespace, logger: logging.Logger):
+    if args.command == 'updates' and not args.gems:
+        updates = service.list_updates(logger)  # attaching to the service when it is running
+
+        if updates is not None:
+            CLIManager(None).list_updates(args.format, updates)
+            return
+
+    app_config = config.read_config(update_file=True)
+    manager = new_manager(app_config, logger)
 
     if args.command == 'updates':
-        cli.list_updates(args.format)
+        CLIManager(manager).list_updates(args.format, gems=args.gems, jobs=args.jobs)
+    elif args.command == 'installed':
+        CLIManager(manager).list_installed(args.format, gems=args.gems, jobs=args.jobs)
+    elif args.command == 'search':
+        if not CLIManager(manager).search(args.words, args.format, gems=args.gems, jobs=args.jobs):
+            sys.exit(1)
+    elif args.command == 'service':
+        service.serve(service.UpdatesService(manager=manager, logger=logger, ttl=args.ttl), logger)
 
 
 if __name__ == '__main__':
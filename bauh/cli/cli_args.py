@@ -1,15 +1,47 @@
 import argparse
-from argparse import Namespace
+from argparse import Namespace, ArgumentParser
+from typing import Set
 
 from bauh import __app_name__, __version__
+from bauh.cli.controller import DEFAULT_JOBS
+from bauh.view.core import service
+
+
+def read_gems(value: str) -> Set[str]:
+    return {g.strip().lower() for g in value.split(',') if g.strip()}
+
+
+def add_read_arguments(parser: ArgumentParser):
+    parser.add_argument('-f', '--format', help="Command output format. 'ndjson' prints each package as soon as its type is read. Default: %(default)s",
+                        choices=['text', 'json', 'ndjson'], default='text')
+    parser.add_argument('-g', '--gems', help='Comma separated list of the package types (gems) to read from (e.g: arch,flatpak). Default: all enabled',
+                        type=read_gems)
+    parser.add_argument('-j', '--jobs', help='Max number of package types read at the same time. Default: %(default)s', type=int, default=DEFAULT_JOBS)
 
 
 def read() -> Namespace:
     parser = argparse.ArgumentParser(prog='{}-cli'.format(__app_name__), description="CLI for Linux software management")
     parser.add_argument('-v', '--version', action='version', version='%(prog)s {}'.format(__version__))
+    parser.add_argument('--trace', metavar='FILE', help='Record the time spent by the operations and write it to FILE as a Chrome/Perfetto trace (JSON)')
+
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument('--record', metavar='DIR', help='Record the outputs of the commands and HTTP requests executed to DIR')
+    fixtures.add_argument('--replay', metavar='DIR', help='Serve the outputs recorded at DIR instead of executing the commands and HTTP requests')
+    parser.add_argument('--replay-latency', metavar='SECONDS', type=float, default=0,
+                        help='Seconds each replayed command or HTTP request takes. Default: %(default)s')
 
     sub_parsers = parser.add_subparsers(dest='command', help='commands')
     updates_parser = sub_parsers.add_parser('updates', help='List available software updates')
-    updates_parser.add_argument('-f', '--format', help='Command output format. Default: %(default)s', choices=['text', 'json'], default='text')
+    add_read_arguments(updates_parser)
+
+    installed_parser = sub_parsers.add_parser('installed', help='List installed software')
+    add_read_arguments(installed_parser)
+
+    search_parser = sub_parsers.add_parser('search', help='Search for software')
+    search_parser.add_argument('words', help='Words to search for')
+    add_read_arguments(search_parser)
+
+    service_parser = sub_parsers.add_parser('service', help='Keep running and serve the available updates and installed software through a local socket')
+    service_parser.add_argument('--ttl', help='Seconds the data of each gem is cached. Default: %(default)s', type=int, default=service.DEFAULT_TTL)
 
     return parser.parse_args()
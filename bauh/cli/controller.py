@@ -1,30 +1,141 @@
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from typing import Optional, List, Set, Callable
 
+from bauh.api.abstract.controller import SoftwareManager
+from bauh.api.abstract.model import PackageUpdate, SoftwarePackage
 from bauh.cli import __app_name__
-from bauh.view.core.controller import GenericSoftwareManager
+from bauh.commons import internet
+from bauh.view.core.controller import GenericSoftwareManager, RE_IS_URL
+from bauh.view.core.gems import get_gem_name, get_manager_class
+
+DEFAULT_JOBS = 4
 
 
 class CLIManager:
 
-    def __init__(self, manager: GenericSoftwareManager):
+    def __init__(self, manager: Optional[GenericSoftwareManager]):
         self.manager = manager
+        self._output_lock = Lock()
 
     def _print(self, msg: str):
         print('[{}] {}'.format(__app_name__, msg))
 
-    def list_updates(self, output_format: str):
-        updates = self.manager.list_updates()
+    def _print_ndjson(self, objs: List[dict]):
+        if objs:
+            with self._output_lock:  # the gems results are printed from different threads
+                sys.stdout.write(''.join(json.dumps(o) + '\n' for o in objs))
+                sys.stdout.flush()
+
+    @staticmethod
+    def _to_dict(pkg: SoftwarePackage, gem: str) -> dict:
+        return {'id': pkg.id, 'name': pkg.name, 'version': pkg.version, 'latest_version': pkg.latest_version,
+                'type': pkg.get_type(), 'gem': gem, 'installed': pkg.installed, 'update': pkg.update}
+
+    def _get_managers(self, gems: Optional[Set[str]]) -> List[SoftwareManager]:
+        return [m for m in self.manager.get_working_managers() if not gems or get_gem_name(m) in gems]
+
+    def _read_gems(self, reader: Callable[[SoftwareManager], List[dict]], output_format: str,
+                   gems: Optional[Set[str]], jobs: int) -> List[dict]:
+        """
+        Reads the data of every working gem concurrently.
+        :param reader: returns the data of a given manager
+        :return: all data read following the managers order. Nothing is returned for the 'ndjson' format
+        since the data of each gem is printed as soon as it is read.
+        """
+        managers = self._get_managers(gems)
+
+        if not managers:
+            return []
+
+        res = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(managers)))) as pool:
+            futures = {pool.submit(reader, man): man for man in managers}
 
-        json_output = output_format == 'json'
+            for future in as_completed(futures):
+                man = futures[future]
 
-        if not updates and not json_output:
-            self._print('No updates available')
+                try:
+                    data = future.result()
+                except:
+                    self.manager.logger.exception('Could not read data from {}'.format(get_manager_class(man).__name__))
+                    continue
+
+                if output_format == 'ndjson':
+                    self._print_ndjson(data)
+                else:
+                    res[man] = data
+
+        return [o for man in managers if man in res for o in res[man]]
+
+    def _print_packages(self, packages: List[dict], output_format: str, empty_msg: str, found_msg: str):
+        if output_format == 'ndjson':
             return
 
-        if not json_output:
-            self._print('There are {} updates available:\n'.format(len(updates)))
+        if output_format == 'json':
+            print(json.dumps(packages))
+        elif not packages:
+            self._print(empty_msg)
+        else:
+            self._print(found_msg.format(len(packages)) + '\n')
+
+            for idx, p in enumerate(packages):
+                print('{}. Name: {}\tVersion: {}\tType: {}'.format(idx + 1, p['name'], p['version'], p['type']))
 
-            for idx, u in enumerate(updates):
-                print('{}. Name: {}\tVersion: {}\tType: {}'.format(idx+1, u.name, u.version, u.type))
+    def list_updates(self, output_format: str, updates: Optional[List[PackageUpdate]] = None,
+                     gems: Optional[Set[str]] = None, jobs: int = DEFAULT_JOBS):
+        """
+        :param output_format:
+        :param updates: updates already retrieved (e.g: from the service). Otherwise the manager is used.
+        :param gems: the gems to read the updates from. All if not defined.
+        :param jobs: the max number of gems read at the same time
+        """
+        if updates is not None:
+            update_dicts = [u.__dict__ for u in updates]
+
+            if output_format == 'ndjson':
+                self._print_ndjson(update_dicts)
         else:
-            print(json.dumps([u.__dict__ for u in updates]))
+            net_available = internet.is_available()
+
+            def read(man: SoftwareManager) -> List[dict]:
+                man_updates = man.list_updates(internet_available=net_available)
+                return [u.__dict__ for u in man_updates] if man_updates else []
+
+            update_dicts = self._read_gems(read, output_format, gems, jobs)
+
+        self._print_packages(update_dicts, output_format, 'No updates available', 'There are {} updates available:')
+
+    def list_installed(self, output_format: str, gems: Optional[Set[str]] = None, jobs: int = DEFAULT_JOBS):
+        net_available = internet.is_available()
+
+        def read(man: SoftwareManager) -> List[dict]:
+            res = man.read_installed(disk_loader=None, limit=-1, only_apps=False, pkg_types=None,
+                                     internet_available=net_available)
+            gem = get_gem_name(man)
+            return [self._to_dict(p, gem) for p in res.installed] if res and res.installed else []
+
+        installed = self._read_gems(read, output_format, gems, jobs)
+        self._print_packages(installed, output_format, 'No software installed', 'There are {} packages installed:')
+
+    def search(self, words: str, output_format: str, gems: Optional[Set[str]] = None, jobs: int = DEFAULT_JOBS) -> bool:
+        """
+        :return: False if the search could not be performed (no internet connection)
+        """
+        if not internet.is_available():
+            self._print('No internet connection available')
+            return False
+
+        norm_words = words.strip().lower()
+        is_url = bool(RE_IS_URL.match(norm_words))
+
+        def read(man: SoftwareManager) -> List[dict]:
+            res = man.search(words=norm_words, disk_loader=None, limit=-1, is_url=is_url)
+            gem = get_gem_name(man)
+            return [self._to_dict(p, gem) for p in (*res.installed, *res.new)] if res else []
+
+        found = self._read_gems(read, output_format, gems, jobs)
+        self._print_packages(found, output_format, 'Nothing found', '{} packages found:')
+        return True
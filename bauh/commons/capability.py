@@ -0,0 +1,122 @@
+import os
+from threading import Lock
+from typing import Optional, Tuple, Callable, Any
+
+from bauh.commons import system
+
+
+class CapabilitySnapshot:
+    """
+    Resolves which system tools are available without forking processes (e.g: 'which').
+    Results are cached and invalidated when the PATH directories or the resolved binaries change.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = Lock()
+        self._path_signature = None
+        self._tools = {}  # tool -> (binary path, binary signature)
+        self._tools_data = {}  # (tool, key) -> (binary signature, value)
+
+    def _get_path(self) -> str:
+        return self.path if self.path is not None else system.PATH
+
+    @staticmethod
+    def _stat_signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+            return stat.st_ino, stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def _gen_path_signature(self) -> Tuple[Tuple[str, Optional[Tuple[int, int, int]]], ...]:
+        # directories mtime change whenever a binary is added, removed or replaced (renamed) inside them
+        return tuple((d, self._stat_signature(d)) for d in self._get_path().split(':') if d)
+
+    def _check_path(self):
+        path_signature = self._gen_path_signature()
+
+        if path_signature != self._path_signature:
+            self._path_signature = path_signature
+            self._tools.clear()
+            self._tools_data.clear()
+
+    def _resolve(self, tool: str) -> Tuple[Optional[str], Optional[Tuple[int, int, int]]]:
+        cached = self._tools.get(tool)
+
+        if cached is not None:
+            if cached[0] is None or self._stat_signature(cached[0]) == cached[1]:
+                return cached
+
+        binary = system.get_backend().which(tool, self._get_path())
+        cached = (binary, self._stat_signature(binary) if binary else None)
+        self._tools[tool] = cached
+        return cached
+
+    def which(self, tool: str) -> Optional[str]:
+        """
+        :param tool:
+        :return: the tool binary path or None if it is not available
+        """
+        with self._lock:
+            self._check_path()
+            return self._resolve(tool)[0]
+
+    def is_available(self, tool: str) -> bool:
+        return bool(self.which(tool))
+
+    def get_tool_data(self, tool: str, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Caches data derived from a given tool binary (e.g: its version) while it does not change.
+        :param tool:
+        :param key: data identifier
+        :param loader: called to retrieve the data when there is nothing cached
+        :return: the cached or loaded data. None if the tool is not available.
+        """
+        with self._lock:
+            self._check_path()
+            binary, signature = self._resolve(tool)
+
+            if not binary:
+                return None
+
+            cached = self._tools_data.get((tool, key))
+
+            if cached and cached[0] == signature:
+                return cached[1]
+
+        value = loader()
+
+        with self._lock:
+            self._tools_data[(tool, key)] = (signature, value)
+
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._path_signature = None
+            self._tools.clear()
+            self._tools_data.clear()
+
+
+_snapshot = CapabilitySnapshot()
+
+
+def get_snapshot() -> CapabilitySnapshot:
+    return _snapshot
+
+
+def which(tool: str) -> Optional[str]:
+    return _snapshot.which(tool)
+
+
+def is_available(tool: str) -> bool:
+    return _snapshot.is_available(tool)
+
+
+def get_tool_data(tool: str, key: str, loader: Callable[[], Any]) -> Any:
+    return _snapshot.get_tool_data(tool, key, loader)
+
+
+def invalidate():
+    _snapshot.invalidate()
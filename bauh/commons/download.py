@@ -0,0 +1,60 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from bauh.api.http import HttpClient
+
+
+def write_file(file_path: str, content: bytes):
+    """
+    Writes the content to a temporary file before replacing the final one, so readers never see a partial file
+    """
+    Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+    temp_path = '{}.tmp'.format(file_path)
+
+    with open(temp_path, 'wb+') as f:
+        f.write(content)
+
+    os.replace(temp_path, file_path)
+
+
+def download_if_modified(http_client: HttpClient, url: str, file_path: str, conditional: bool = True) -> Optional[int]:
+    """
+    Downloads the file only if it changed since the last download (If-None-Match / If-Modified-Since).
+    The response validators are kept at '{file_path}.json'. Files ending with '.gz' are decompressed.
+    :param conditional: if the cached validators should be sent
+    :return: the response status (304 if not modified) or None if the server could not be reached
+    """
+    headers, validators_path = {}, '{}.json'.format(file_path)
+
+    if conditional and os.path.exists(file_path) and os.path.exists(validators_path):
+        try:
+            with open(validators_path) as f:
+                validators = json.loads(f.read())
+        except (OSError, ValueError):
+            validators = {}
+
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    res = http_client.get(url, headers=headers, single_call=True)
+
+    if res is None:
+        return
+
+    if res.status_code == 200:
+        content = res.content
+
+        if url.endswith('.gz'):
+            content = gzip.decompress(content)
+
+        write_file(file_path, content)
+        write_file(validators_path, json.dumps({'etag': res.headers.get('ETag'),
+                                                'last_modified': res.headers.get('Last-Modified')}).encode())
+
+    return res.status_code
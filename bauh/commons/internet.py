@@ -1,12 +1,11 @@
-import http.client as http_client
+from bauh.api import http
 
 
 def is_available() -> bool:
-    conn = http_client.HTTPConnection("www.google.com", timeout=5)
     try:
-        conn.request("HEAD", "/")
-        conn.close()
+        with http.new_session() as session:  # through the session, so the check can be recorded / replayed
+            session.head('http://www.google.com', timeout=5, allow_redirects=False)
+
         return True
     except:
-        conn.close()
         return False
@@ -0,0 +1,208 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Event
+from typing import Callable, Optional, Set, Dict, List
+
+from bauh.commons import trace
+from bauh.commons.system import process_lane, BACKGROUND
+
+POOL_SIZE = 8
+_pool = None
+_pool_lock = Lock()
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """
+    :return: the pool shared by all prepare tasks
+    """
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='prepare')
+
+    return _pool
+
+
+def is_file_fresh(file_path: str, max_age: float) -> bool:
+    """
+    :param max_age: seconds
+    :return: if the file exists and was modified less than 'max_age' seconds ago
+    """
+    try:
+        return time.time() - os.path.getmtime(file_path) < max_age
+    except OSError:
+        return False
+
+
+class PrepareTask:
+
+    def __init__(self, id_: str, run: Callable[[], None], depends_on: Optional[Set[str]] = None,
+                 is_fresh: Optional[Callable[[], bool]] = None, register: Optional[Callable[[], None]] = None):
+        """
+        :param id_: an unique identifier for the task
+        :param run: executes the task
+        :param depends_on: ids of the tasks that must finish before this one starts. Tasks not added to the graph are ignored.
+        :param is_fresh: if it returns True, the task is skipped (e.g: an index downloaded less than 1 hour ago)
+        :param register: called when the graph starts if the task will run, before any task is queued (e.g: to register it in the TaskManager)
+        """
+        self.id = id_
+        self.run = run
+        self.depends_on = depends_on if depends_on else set()
+        self.is_fresh = is_fresh
+        self.register = register
+
+
+class PrepareGraph:
+    """
+    Runs prepare tasks on the shared pool as soon as the tasks they depend on finish.
+    The fresh tasks are skipped entirely and do not hold back the ones depending on them.
+    """
+
+    def __init__(self, logger: logging.Logger, pool: Optional[ThreadPoolExecutor] = None):
+        self.logger = logger
+        self.pool = pool
+        self._tasks = {}  # id -> task
+        self._pending = {}  # id -> ids of the tasks it is still waiting for
+        self._finished = {}  # id -> Event
+        self._skipped = set()
+        self._timings = {}
+        self._lock = Lock()
+
+    def add(self, task: PrepareTask):
+        if task.id in self._tasks:
+            raise ValueError("Task '{}' already added".format(task.id))
+
+        self._tasks[task.id] = task
+        self._finished[task.id] = Event()
+
+    def _check_cycles(self):
+        deps = {t.id: {d for d in t.depends_on if d in self._tasks} for t in self._tasks.values()}
+
+        while deps:
+            ready = {i for i, d in deps.items() if not d}
+
+            if not ready:
+                raise ValueError('Cyclic dependencies between the tasks: {}'.format(', '.join(sorted(deps))))
+
+            deps = {i: d.difference(ready) for i, d in deps.items() if i not in ready}
+
+    def start(self) -> Set[str]:
+        """
+        Checks the tasks freshness, registers the ones that will run and starts the ones not depending on others.
+        It does not wait for them to finish.
+        :return: the ids of the tasks that will run
+        """
+        self._check_cycles()
+
+        to_run = []
+        for task in self._tasks.values():  # in the order they were added, so a freshness check can rely on the previous ones
+            fresh = False
+
+            if task.is_fresh:
+                try:
+                    fresh = task.is_fresh()
+                except:
+                    self.logger.exception("Could not check if the task '{}' is fresh".format(task.id))
+
+            if fresh:
+                self.logger.info("Task '{}' skipped: it is fresh".format(task.id))
+                self._skipped.add(task.id)
+                self._finished[task.id].set()
+            else:
+                to_run.append(task.id)
+
+        for task_id in to_run:  # so the tasks waiting for others or for a pool worker are already known
+            if self._tasks[task_id].register:
+                try:
+                    self._tasks[task_id].register()
+                except:
+                    self.logger.exception("Could not register the task '{}'".format(task_id))
+
+        with self._lock:
+            for task_id in to_run:
+                self._pending[task_id] = {d for d in self._tasks[task_id].depends_on if d in self._tasks and d not in self._skipped}
+
+            ready = self._pop_ready()
+
+        for task_id in ready:
+            self._submit(task_id)
+
+        return set(to_run)
+
+    def will_run(self, task_id: str) -> bool:
+        """
+        :return: if the task was added and is not fresh. Only reliable for tasks added before the caller.
+        """
+        return task_id in self._tasks and task_id not in self._skipped
+
+    def _pop_ready(self) -> List[str]:
+        ready = [i for i, deps in self._pending.items() if not deps]
+
+        for task_id in ready:
+            del self._pending[task_id]
+
+        return ready
+
+    def _submit(self, task_id: str):
+        (self.pool if self.pool else get_pool()).submit(self._run, task_id)
+
+    @process_lane(BACKGROUND)
+    def _run(self, task_id: str):
+        ti = time.time()
+
+        try:
+            with trace.span(task_id, 'prepare'):
+                self._tasks[task_id].run()
+        except:
+            self.logger.exception("Prepare task '{}' failed".format(task_id))
+
+        elapsed = time.time() - ti
+        self.logger.info("Prepare task '{}' took {:.2f} seconds".format(task_id, elapsed))
+
+        with self._lock:
+            self._timings[task_id] = elapsed
+
+            for deps in self._pending.values():
+                deps.discard(task_id)
+
+            ready = self._pop_ready()
+
+        self._finished[task_id].set()
+
+        for ready_id in ready:
+            self._submit(ready_id)
+
+    def is_running(self, task_id: str) -> bool:
+        """
+        :return: if the task was added and has not finished (or been skipped) yet
+        """
+        return task_id in self._finished and not self._finished[task_id].is_set()
+
+    def wait(self, task_id: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        :param task_id: the task to wait for. All if not defined.
+        :return: if the task(s) finished before the timeout
+        """
+        if task_id is not None:
+            return self._finished[task_id].wait(timeout) if task_id in self._finished else True
+
+        limit = time.time() + timeout if timeout is not None else None
+        for event in self._finished.values():
+            if not event.wait(max(0.0, limit - time.time()) if limit is not None else None):
+                return False
+
+        return True
+
+    def get_skipped(self) -> Set[str]:
+        return {*self._skipped}
+
+    def get_timings(self) -> Dict[str, float]:
+        """
+        :return: the seconds each finished task took
+        """
+        with self._lock:
+            return {**self._timings}
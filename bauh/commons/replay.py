@@ -0,0 +1,365 @@
+"""
+Records the processes, tools and HTTP requests used by bauh into a fixtures directory, or replays them from it.
+It allows the managers to be measured end-to-end without the packaging tools or the network. Usage:
+    replay.enable(replay.RECORD, '/path/to/fixtures')  # on a machine with the tools and network available
+    replay.enable(replay.REPLAY, '/path/to/fixtures', latency=0.01)  # anywhere
+
+It must be enabled before the HttpClient instances are created. The input of piped processes, interactive processes
+(stdin=PIPE) and the files read directly by the gems are not recorded.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import time
+from io import BytesIO
+from pathlib import Path
+from subprocess import PIPE
+from threading import Lock
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter, BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from bauh.api import http
+from bauh.commons import system, capability
+from bauh.commons.system import ProcessBackend
+
+RECORD, REPLAY = 'record', 'replay'
+PROCESS, TOOL, HTTP = 'process', 'tool', 'http'
+KEY_ENV_VARS = ('LANG', 'LC_ALL', 'LANGUAGE')  # environment variables changing the processes output
+KEY_HTTP_HEADERS = ('Accept', 'If-Modified-Since', 'If-None-Match', 'Range')  # headers changing the responses
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureNotFoundError(Exception):
+
+    def __init__(self, kind: str, request: dict):
+        super(FixtureNotFoundError, self).__init__('No {} recorded for {}'.format(kind, request))
+        self.kind = kind
+        self.request = request
+
+
+class FixtureStore:
+    """
+    Every request (command, tool or URL) is stored as a JSON file named after its hash. A file keeps all the responses
+    recorded for the request, which are replayed in the same order (the last one is repeated).
+    """
+
+    def __init__(self, fixtures_dir: str, strict: bool = False):
+        """
+        :param strict: if a request not recorded raises a FixtureNotFoundError while replaying
+        """
+        self.fixtures_dir = fixtures_dir
+        self.strict = strict
+        self.misses = []  # (kind, request) not recorded
+        self._lock = Lock()
+        self._fixtures = {}  # (kind, key) -> fixture
+        self._served = {}  # (kind, key) -> number of responses served
+
+    @staticmethod
+    def _gen_key(request: dict) -> str:
+        return hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    def _get_path(self, kind: str, key: str) -> str:
+        return '{}/{}/{}.json'.format(self.fixtures_dir, kind, key)
+
+    def _read(self, kind: str, key: str) -> Optional[dict]:
+        fixture = self._fixtures.get((kind, key))
+
+        if fixture is None:
+            try:
+                with open(self._get_path(kind, key)) as f:
+                    fixture = json.load(f)
+            except FileNotFoundError:
+                return None
+
+            self._fixtures[(kind, key)] = fixture
+
+        return fixture
+
+    def add(self, kind: str, request: dict, response: dict):
+        key = self._gen_key(request)
+
+        with self._lock:
+            fixture = self._fixtures.get((kind, key))
+
+            if fixture is None:  # responses recorded by previous sessions are replaced
+                fixture = {'request': request, 'responses': []}
+                self._fixtures[(kind, key)] = fixture
+
+            fixture['responses'].append(response)
+            file_path = self._get_path(kind, key)
+            Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+
+            with open(file_path, 'w+') as f:
+                json.dump(fixture, f, indent=2, sort_keys=True)
+
+    def next(self, kind: str, request: dict) -> Optional[dict]:
+        """
+        :return: the next response recorded for the request or None
+        """
+        key = self._gen_key(request)
+
+        with self._lock:
+            fixture = self._read(kind, key)
+
+            if not fixture or not fixture['responses']:
+                self.misses.append((kind, request))
+                logger.warning('No {} recorded for {}'.format(kind, request))
+
+                if self.strict:
+                    raise FixtureNotFoundError(kind, request)
+
+                return None
+
+            served = self._served.get((kind, key), 0)
+            self._served[(kind, key)] = served + 1
+            return fixture['responses'][min(served, len(fixture['responses']) - 1)]
+
+
+def _encode(output: Optional[bytes]) -> Optional[str]:
+    return output.decode(errors='surrogateescape') if output is not None else None
+
+
+def _decode(output: Optional[str]) -> Optional[bytes]:
+    return output.encode(errors='surrogateescape') if output is not None else None
+
+
+def _is_secret(args) -> bool:
+    # the root password is piped through 'echo', so these processes are never recorded
+    return not isinstance(args, str) and bool(args) and args[0] == 'echo'
+
+
+def _map_process_request(args, kwargs: dict) -> dict:
+    env = kwargs.get('env') or {}
+    return {'cmd': args if isinstance(args, str) else [*args],
+            'cwd': str(kwargs.get('cwd') or '.'),
+            'env': {var: env[var] for var in KEY_ENV_VARS if var in env}}
+
+
+class ReplayedProcess:
+    """
+    Mimics the subprocess.Popen interface used by bauh for a process that has already finished
+    """
+
+    def __init__(self, args, returncode: int, stdout: Optional[bytes], stderr: Optional[bytes]):
+        self.args = args
+        self.pid = 0
+        self.returncode = returncode
+        self.stdin = None
+        self.stdout = BytesIO(stdout) if stdout is not None else None
+        self.stderr = BytesIO(stderr) if stderr is not None else None
+
+    def poll(self) -> int:
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        return self.returncode
+
+    def communicate(self, input=None, timeout: Optional[float] = None) -> Tuple[Optional[bytes], Optional[bytes]]:
+        return (self.stdout.read() if self.stdout else None,
+                self.stderr.read() if self.stderr else None)
+
+    def send_signal(self, signal: int):
+        pass
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
+
+    def __enter__(self) -> "ReplayedProcess":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class RecordingProcessBackend(ProcessBackend):
+    """
+    Executes the processes and records their outputs. The processes started through 'popen' run to completion
+    before being returned, so their output is not streamed while recording.
+    """
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+
+    def run(self, args, **kwargs) -> subprocess.CompletedProcess:
+        res = super(RecordingProcessBackend, self).run(args, **kwargs)
+
+        if not _is_secret(args):
+            self.store.add(PROCESS, _map_process_request(args, kwargs),
+                           {'code': res.returncode, 'stdout': _encode(res.stdout), 'stderr': _encode(res.stderr)})
+
+        return res
+
+    def popen(self, args, **kwargs):
+        if kwargs.get('stdin') == PIPE or _is_secret(args):  # the input written by the caller cannot be recorded
+            return super(RecordingProcessBackend, self).popen(args, **kwargs)
+
+        proc = super(RecordingProcessBackend, self).popen(args, **kwargs)
+        stdout, stderr = proc.communicate()
+        self.store.add(PROCESS, _map_process_request(args, kwargs),
+                       {'code': proc.returncode, 'stdout': _encode(stdout), 'stderr': _encode(stderr)})
+        return ReplayedProcess(args, proc.returncode, stdout, stderr)
+
+    def which(self, tool: str, path: Optional[str] = None) -> Optional[str]:
+        binary = super(RecordingProcessBackend, self).which(tool, path)
+        self.store.add(TOOL, {'tool': tool}, {'path': binary})
+        return binary
+
+
+class ReplayingProcessBackend(ProcessBackend):
+    """
+    Serves the recorded outputs instead of executing the processes. The ones not recorded finish with
+    the code 127 (command not found).
+    """
+
+    def __init__(self, store: FixtureStore, latency: float = 0):
+        """
+        :param latency: seconds each process takes
+        """
+        self.store = store
+        self.latency = latency
+
+    def _replay(self, args, kwargs: dict) -> Tuple[int, Optional[bytes], Optional[bytes]]:
+        if _is_secret(args):
+            return 0, b'', b''
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        res = self.store.next(PROCESS, _map_process_request(args, kwargs))
+
+        if res is None:
+            return 127, b'', '{}: not recorded\n'.format(args).encode()
+
+        return res['code'], _decode(res['stdout']), _decode(res['stderr'])
+
+    def run(self, args, **kwargs) -> subprocess.CompletedProcess:
+        code, stdout, stderr = self._replay(args, kwargs)
+        return subprocess.CompletedProcess(args, code,
+                                           stdout if kwargs.get('stdout') == PIPE else None,
+                                           stderr if kwargs.get('stderr') == PIPE else None)
+
+    def popen(self, args, **kwargs) -> ReplayedProcess:
+        code, stdout, stderr = self._replay(args, kwargs)
+        return ReplayedProcess(args, code,
+                               stdout if kwargs.get('stdout') == PIPE else None,
+                               stderr if kwargs.get('stderr') == PIPE else None)
+
+    def which(self, tool: str, path: Optional[str] = None) -> Optional[str]:
+        res = self.store.next(TOOL, {'tool': tool})
+        return res['path'] if res else None
+
+
+def _map_http_request(request: requests.PreparedRequest) -> dict:
+    return {'method': request.method,
+            'url': request.url,
+            'headers': {h: request.headers[h] for h in KEY_HTTP_HEADERS if h in request.headers}}
+
+
+class RecordingHttpAdapter(HTTPAdapter):
+
+    def __init__(self, store: FixtureStore):
+        super(RecordingHttpAdapter, self).__init__()
+        self.store = store
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        try:
+            res = super(RecordingHttpAdapter, self).send(request, **kwargs)
+        except requests.exceptions.ConnectionError:
+            self.store.add(HTTP, _map_http_request(request), {'error': 'connection'})
+            raise
+
+        content = res.content  # the whole body is read (even when streamed) to be recorded
+
+        try:
+            body = {'text': content.decode()}
+        except UnicodeDecodeError:
+            body = {'base64': base64.b64encode(content).decode()}
+
+        # the content is recorded already decoded
+        headers = {k: v for k, v in res.headers.items() if k.lower() not in ('content-encoding', 'transfer-encoding')}
+        self.store.add(HTTP, _map_http_request(request), {'status': res.status_code, 'reason': res.reason,
+                                                          'headers': headers, **body})
+        return res
+
+    def close(self):
+        pass  # shared by all sessions
+
+
+class ReplayingHttpAdapter(BaseAdapter):
+    """
+    Serves the recorded responses. The requests not recorded (or that could not connect while recording)
+    fail as if there was no connection.
+    """
+
+    def __init__(self, store: FixtureStore, latency: float = 0):
+        """
+        :param latency: seconds each request takes
+        """
+        super(ReplayingHttpAdapter, self).__init__()
+        self.store = store
+        self.latency = latency
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        recorded = self.store.next(HTTP, _map_http_request(request))
+
+        if recorded is None:
+            raise requests.exceptions.ConnectionError("'{}' not recorded".format(request.url), request=request)
+
+        if recorded.get('error'):
+            raise requests.exceptions.ConnectionError("'{}' could not be reached while recording".format(request.url), request=request)
+
+        res = requests.Response()
+        res.status_code = recorded['status']
+        res.reason = recorded.get('reason')
+        res.headers = CaseInsensitiveDict(recorded['headers'])
+        res.encoding = get_encoding_from_headers(res.headers)
+        res._content = recorded['text'].encode() if 'text' in recorded else base64.b64decode(recorded['base64'])
+        res.url = request.url
+        res.request = request
+        return res
+
+    def close(self):
+        pass
+
+
+def enable(mode: str, fixtures_dir: str, latency: float = 0, strict: bool = False) -> FixtureStore:
+    """
+    :param mode: RECORD or REPLAY
+    :param fixtures_dir:
+    :param latency: seconds each replayed process and request takes
+    :param strict: if a request not recorded raises a FixtureNotFoundError while replaying
+    :return: the store used
+    """
+    store = FixtureStore(fixtures_dir, strict)
+
+    if mode == RECORD:
+        system.set_backend(RecordingProcessBackend(store))
+        http.set_adapter(RecordingHttpAdapter(store))
+    elif mode == REPLAY:
+        system.set_backend(ReplayingProcessBackend(store, latency))
+        http.set_adapter(ReplayingHttpAdapter(store, latency))
+    else:
+        raise ValueError("Invalid mode '{}'".format(mode))
+
+    capability.invalidate()
+    return store
+
+
+def disable():
+    system.set_backend(None)
+    http.set_adapter(None)
+    capability.invalidate()
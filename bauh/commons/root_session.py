@@ -0,0 +1,226 @@
+import secrets
+import shlex
+import subprocess
+from subprocess import PIPE
+from threading import Lock, Timer
+from typing import List, Optional, Tuple, Callable
+
+from bauh.commons import system, trace
+from bauh.commons.system import OutputBuffer, gen_env, USE_GLOBAL_INTERPRETER, DEFAULT_LANG
+
+AUTH_TIMEOUT = 15  # seconds to wait for the helper to authenticate
+SUDO_RESET_CMD = ['sudo', '-k']  # invalidates the cached credentials, so 'SUDO_AUTH_CMD' always checks the password
+SUDO_AUTH_CMD = ['sudo', '-S', '-p', '', '-v']  # not combined with '-k': 'sudo -k -v' would not cache the credentials validated
+SUDO_HELPER_CMD = ['sudo', '-n', 'sh']  # uses the credentials validated by 'SUDO_AUTH_CMD' (never reads a password)
+
+
+class RootSession:
+    """
+    A root shell authenticated once (through sudo) that executes the commands sent over its private stdin pipe.
+    It allows several root operations of a transaction to run without forking and authenticating sudo every time.
+    The password is only sent to the authentication command ('sudo -v'), never to the shell.
+    Usage:
+        with RootSession(root_password) as session:
+            if session.is_open():
+                code, output = session.run(['mkdir', '-p', '/var/cache/bauh'])
+    """
+
+    def __init__(self, root_password: Optional[str], helper_cmd: Optional[List[str]] = None,
+                 auth_cmd: Optional[List[str]] = None, reset_cmd: Optional[List[str]] = None, auth_timeout: float = AUTH_TIMEOUT,
+                 global_interpreter: bool = USE_GLOBAL_INTERPRETER, lang: str = DEFAULT_LANG):
+        """
+        :param root_password: if not defined, the commands are executed with the current user privileges
+        :param helper_cmd: the command starting the helper shell. Default: 'sudo -n sh' if a password is defined.
+        :param auth_cmd: the command reading the password from its stdin before the helper starts. Default: 'sudo -S -v'.
+        :param reset_cmd: the command executed before 'auth_cmd' to invalidate previous authentications. Default: 'sudo -k'.
+        :param auth_timeout: seconds to wait for the authentication and the helper to be ready
+        """
+        self.root_password = root_password
+        self.helper_cmd = helper_cmd if helper_cmd else (SUDO_HELPER_CMD if root_password is not None else ['sh'])
+        self.auth_cmd = auth_cmd if auth_cmd else (SUDO_AUTH_CMD if root_password is not None else None)
+        self.reset_cmd = reset_cmd if reset_cmd else (SUDO_RESET_CMD if root_password is not None and not auth_cmd else None)
+        self.auth_timeout = auth_timeout
+        self.global_interpreter = global_interpreter
+        self.lang = lang
+        self._proc = None
+        self._token = None
+        self._lock = Lock()
+
+    def _authenticate(self) -> bool:
+        if self.auth_cmd is None or self.root_password is None:
+            return True
+
+        env = gen_env(self.global_interpreter, self.lang)
+
+        # a wrong password makes sudo read the next lines as new attempts: the input ends after the password, so it fails
+        try:
+            if self.reset_cmd:
+                system.EXECUTOR.run(lambda: system.get_backend().run(self.reset_cmd, stdin=subprocess.DEVNULL,
+                                                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                                                     env=env, timeout=self.auth_timeout))
+
+            res = system.EXECUTOR.run(lambda: system.get_backend().run(self.auth_cmd, input='{}\n'.format(self.root_password).encode(),
+                                                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                                                        env=env, timeout=self.auth_timeout))
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+
+        return res.returncode == 0
+
+    def open(self) -> bool:
+        """
+        Authenticates, starts the helper and waits for it to answer
+        :return: if the helper is ready to receive commands
+        """
+        with self._lock:
+            if self._proc:
+                return True
+
+            with trace.span('root_session.open', 'process', cmd=self.helper_cmd) as span:
+                self._token = '__bauh_{}__'.format(secrets.token_hex(8))  # marks the end of each command output
+
+                if not self._authenticate():
+                    span.set('authenticated', False)
+                    return False
+
+                try:
+                    self._proc = system.EXECUTOR.spawn(lambda: system.get_backend().popen(self.helper_cmd, stdin=PIPE, stdout=PIPE,
+                                                                                         stderr=subprocess.DEVNULL,
+                                                                                         env=gen_env(self.global_interpreter, self.lang)))
+                except OSError:
+                    self._proc = None
+                    span.set('authenticated', False)
+                    return False
+
+                # the helper is only expected to hang if something unexpected reads its input, so it is killed after a while
+                timer = Timer(self.auth_timeout, self._proc.kill)
+                timer.daemon = True
+                timer.start()
+
+                try:
+                    authenticated = self._wait_ready()
+                finally:
+                    timer.cancel()
+
+                span.set('authenticated', authenticated)
+
+                if not authenticated:
+                    self._terminate()
+
+                return authenticated
+
+    def _wait_ready(self) -> bool:
+        """
+        :return: if the helper answered the 'ready' marker (when 'sudo -n' cannot run the shell, its output just ends)
+        """
+        marker = '{}ready'.format(self._token)
+
+        if not self._write("printf '%s\\n' {}\n".format(marker)):
+            return False
+
+        try:
+            line = self._proc.stdout.readline()
+        except (OSError, ValueError, AttributeError):
+            return False
+
+        return line.decode().strip() == marker
+
+    def is_open(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _gen_script(self, cmd: List[str], cwd: Optional[str]) -> str:
+        # the commands do not read the session pipe and their errors are returned as output
+        exec_cmd = 'exec {}'.format(' '.join(shlex.quote(c) for c in cmd))
+        exec_cmd = 'cd {} && {}'.format(shlex.quote(cwd), exec_cmd) if cwd else exec_cmd
+        return "({}) </dev/null 2>&1; printf '\\n%s %d\\n' {} \"$?\"\n".format(exec_cmd, self._token)
+
+    def _write(self, text: str) -> bool:
+        try:
+            self._proc.stdin.write(text.encode())
+            self._proc.stdin.flush()
+            return True
+        except (OSError, ValueError, AttributeError):  # AttributeError: replayed processes have no input
+            return False
+
+    def _read_output(self, output: Optional[OutputBuffer], output_handler: Optional[Callable[[str], None]]) -> Optional[int]:
+        """
+        :return: the command exit code or None if the helper stopped
+        """
+        previous = None  # a line is only handled when it is known not to be the line break added by the script
+
+        for o in self._proc.stdout:
+            line = o.decode()
+
+            if line.startswith(self._token):
+                if previous is not None and previous != '\n':
+                    self._handle_line(previous[:-1], output, output_handler)
+
+                return int(line.split(' ')[1])
+
+            if previous is not None:
+                self._handle_line(previous, output, output_handler)
+
+            previous = line
+
+        return None
+
+    @staticmethod
+    def _handle_line(line: str, output: Optional[OutputBuffer], output_handler: Optional[Callable[[str], None]]):
+        if output is not None:
+            output.write(line)
+
+        if output_handler:
+            line = line.strip()
+
+            if line:
+                output_handler(line)
+
+    def run(self, cmd: List[str], cwd: Optional[str] = None, output_handler: Optional[Callable[[str], None]] = None) -> Tuple[Optional[int], str]:
+        """
+        Executes a command through the helper
+        :param cmd:
+        :param cwd:
+        :param output_handler: receives every output line as soon as it is read
+        :return: the command exit code (None if the session is not open) and its output (stdout + stderr)
+        """
+        with self._lock:
+            if not self.is_open():
+                return None, ''
+
+            with trace.span('root_session.run', 'process', cmd=cmd) as span:
+                output = OutputBuffer()
+
+                try:
+                    code = self._read_output(output, output_handler) if self._write(self._gen_script(cmd, cwd)) else None
+                finally:
+                    output.close()
+
+                span.set('code', code)
+                return code, output.getvalue()
+
+    def _terminate(self):
+        try:
+            self._proc.stdin.close()
+        except (OSError, AttributeError):
+            pass
+
+        try:
+            self._proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+        self._proc = None
+
+    def close(self):
+        with self._lock:
+            if self._proc:
+                self._write('exit\n')
+                self._terminate()
+
+    def __enter__(self) -> "RootSession":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,132 @@
+import socket
+import time
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from bauh.commons import system
+
+DEFAULT_TTL = 30  # seconds
+ACTIVE, ENABLED = 'active', 'enabled'
+
+
+def probe_unix_socket(path: str) -> Callable[[], Optional[bool]]:
+    """
+    :return: a probe telling if a socket unit is active by connecting to its socket
+    """
+    def _probe() -> Optional[bool]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            sock.settimeout(1)
+            sock.connect(path)
+            return True
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+        except OSError:  # e.g: no permission. Only 'systemctl' can tell.
+            return
+        finally:
+            sock.close()
+
+    return _probe
+
+
+class ServiceTracker:
+    """
+    Tracks the state of systemd units without forking 'systemctl' for every check. The states are cached for 'ttl' seconds,
+    and the active state of the units with a registered probe (e.g: connecting to a socket) is read without forking.
+    """
+
+    def __init__(self, ttl: Optional[float] = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.clock = clock
+        self._lock = Lock()
+        self._states = {}  # (state, unit) -> (read at, value)
+        self._probes = {}  # unit -> probe returning if it is active (or None if not known)
+
+    def set_ttl(self, ttl: Optional[float]):
+        """
+        :param ttl: seconds. A null value means the default.
+        """
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+
+    def register_probe(self, unit: str, probe: Callable[[], Optional[bool]]):
+        with self._lock:
+            self._probes[unit] = probe
+            self._states.pop((ACTIVE, unit), None)
+
+    def _get_cached(self, state: str, names: tuple) -> Dict[str, bool]:
+        min_time = self.clock() - self.ttl
+
+        with self._lock:
+            return {n: self._states[(state, n)][1] for n in names
+                    if (state, n) in self._states and self._states[(state, n)][0] >= min_time}
+
+    def _cache(self, state: str, values: Dict[str, bool]):
+        now = self.clock()
+
+        with self._lock:
+            for name, value in values.items():
+                self._states[(state, name)] = (now, value)
+
+    def is_active(self, *names: str) -> Dict[str, bool]:
+        cached = self._get_cached(ACTIVE, names)
+        read, not_probed = {}, []
+
+        for name in names:
+            if name not in cached:
+                probe = self._probes.get(name)
+                value = probe() if probe else None
+
+                if value is None:
+                    not_probed.append(name)
+                else:
+                    read[name] = value
+
+        if not_probed:
+            read.update(system.check_active_services(*not_probed))  # a single fork for all units not probed
+
+        self._cache(ACTIVE, read)
+        return {**cached, **read}
+
+    def is_enabled(self, *names: str) -> Dict[str, bool]:
+        cached = self._get_cached(ENABLED, names)
+        missing = [n for n in names if n not in cached]
+        read = system.check_enabled_services(*missing) if missing else {}
+
+        self._cache(ENABLED, read)
+        return {**cached, **read}
+
+    def invalidate(self, *names: str):
+        """
+        :param names: the units whose states changed. All if not defined.
+        """
+        with self._lock:
+            if names:
+                for name in names:
+                    self._states.pop((ACTIVE, name), None)
+                    self._states.pop((ENABLED, name), None)
+            else:
+                self._states.clear()
+
+
+_tracker = ServiceTracker()
+
+
+def get_tracker() -> ServiceTracker:
+    return _tracker
+
+
+def is_active(*names: str) -> Dict[str, bool]:
+    return _tracker.is_active(*names)
+
+
+def is_enabled(*names: str) -> Dict[str, bool]:
+    return _tracker.is_enabled(*names)
+
+
+def register_probe(unit: str, probe: Callable[[], Optional[bool]]):
+    _tracker.register_probe(unit, probe)
+
+
+def invalidate(*names: str):
+    _tracker.invalidate(*names)
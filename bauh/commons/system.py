@@ -1,13 +1,23 @@
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
 from io import StringIO
+from pathlib import Path
 from subprocess import PIPE
-from typing import List, Tuple, Set, Dict
+from threading import Condition, Thread
+from typing import List, Tuple, Set, Dict, Callable, Optional, Hashable
 
 # default environment variables for subprocesses.
 from bauh.api.abstract.handler import ProcessWatcher
+from bauh.api.constants import TEMP_DIR
+from bauh.commons import trace
 
 PY_VERSION = "{}.{}".format(sys.version_info.major, sys.version_info.minor)
 GLOBAL_PY_LIBS = '/usr/lib/python{}'.format(PY_VERSION)
@@ -24,6 +34,14 @@ USE_GLOBAL_INTERPRETER = bool(os.getenv('VIRTUAL_ENV'))
 
 SIZE_MULTIPLIERS = ((0.001, 'Kb'), (0.000001, 'Mb'), (0.000000001, 'Gb'), (0.000000000001, 'Tb'))
 
+INTERACTIVE, BACKGROUND = 0, 1  # process lanes
+DEFAULT_MAX_PROCESSES = max(4, (os.cpu_count() or 1) * 2)
+MAX_PROCESS_WAIT = 10  # seconds a process waits for a free slot before being started anyway
+OUTPUT_BUFFER_SIZE = 1024 * 1024  # characters of a process output kept in memory
+MAX_OUTPUT_FILES = 5  # full logs of truncated outputs kept on disk (the oldest ones are removed)
+OUTPUT_NOTIFY_INTERVAL = 0.1  # min seconds between two output notifications sent to a watcher
+OUTPUT_NOTIFY_SIZE = 64 * 1024  # characters waiting to be sent to a watcher regardless the interval
+
 
 def gen_env(global_interpreter: bool, lang: str = DEFAULT_LANG, extra_paths: Set[str] = None) -> dict:
     custom_env = dict(os.environ)
@@ -42,6 +60,195 @@ def gen_env(global_interpreter: bool, lang: str = DEFAULT_LANG, extra_paths: Set
     return custom_env
 
 
+def _get_traceable_cmd(cmd: List[str]) -> List[str]:
+    # the root password is piped through 'echo', so its arguments are never recorded
+    return cmd[0:1] if cmd and cmd[0] == 'echo' else cmd
+
+
+_lane = threading.local()
+
+
+@contextmanager
+def process_lane(lane: int):
+    """
+    Defines the lane of the processes started by the current thread. It can also be used as a decorator.
+    Usage: with process_lane(BACKGROUND): ...
+    """
+    previous = getattr(_lane, 'value', None)
+    _lane.value = lane
+
+    try:
+        yield
+    finally:
+        _lane.value = previous
+
+
+def get_process_lane() -> int:
+    lane = getattr(_lane, 'value', None)
+    return lane if lane is not None else INTERACTIVE
+
+
+class ProcessExecutor:
+    """
+    Limits the number of processes running at the same time. When the limit is reached, the processes
+    of the interactive lane are started before the ones of the background lane (e.g: prepare tasks).
+    A process that cannot be started after 'max_wait' seconds is started anyway, so piped processes
+    waiting on each other never lock.
+    """
+
+    def __init__(self, max_running: int = DEFAULT_MAX_PROCESSES, max_wait: float = MAX_PROCESS_WAIT):
+        self.max_running = max_running
+        self.max_wait = max_wait
+        self._cond = Condition()
+        self._running = 0
+        self._waiting = [0, 0]  # per lane
+        self._in_flight = {}  # dedup key -> Future
+        self._metrics = {'started': [0, 0], 'deduplicated': 0, 'overflowed': 0, 'peak': 0, 'wait_time': 0.0}
+
+    def set_max_running(self, max_running: Optional[int]):
+        with self._cond:
+            self.max_running = max_running if max_running and max_running > 0 else DEFAULT_MAX_PROCESSES
+            self._cond.notify_all()
+
+    def _can_start(self, lane: int) -> bool:
+        return self._running < self.max_running and (lane == INTERACTIVE or not self._waiting[INTERACTIVE])
+
+    def _acquire(self, lane: int):
+        start = time.monotonic()
+
+        with self._cond:
+            self._waiting[lane] += 1
+
+            try:
+                while not self._can_start(lane):
+                    remaining = self.max_wait - (time.monotonic() - start)
+
+                    if remaining <= 0:
+                        self._metrics['overflowed'] += 1
+                        break
+
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting[lane] -= 1
+
+            self._running += 1
+            self._metrics['started'][lane] += 1
+            self._metrics['peak'] = max(self._metrics['peak'], self._running)
+            self._metrics['wait_time'] += time.monotonic() - start
+
+    def _release(self):
+        with self._cond:
+            self._running -= 1
+            self._cond.notify_all()
+
+    def run(self, func: Callable, key: Optional[Hashable] = None, lane: Optional[int] = None):
+        """
+        Executes a function starting a process and waiting for it to finish
+        :param key: identifies a read-only command. Calls with the same key running at the same time share the same result.
+        :param lane: INTERACTIVE or BACKGROUND. Default: the current thread lane
+        :return: the function result
+        """
+        if key is not None:
+            with self._cond:
+                call = self._in_flight.get(key)
+
+                if call:
+                    self._metrics['deduplicated'] += 1
+                else:
+                    self._in_flight[key] = Future()
+
+            if call:
+                return call.result()
+
+        try:
+            self._acquire(get_process_lane() if lane is None else lane)
+
+            try:
+                res = func()
+            finally:
+                self._release()
+        except BaseException as e:
+            if key is not None:
+                self._finish(key).set_exception(e)
+            raise
+
+        if key is not None:
+            self._finish(key).set_result(res)
+
+        return res
+
+    def _finish(self, key: Hashable) -> Future:
+        with self._cond:
+            return self._in_flight.pop(key)
+
+    def spawn(self, func: Callable[[], subprocess.Popen], lane: Optional[int] = None) -> subprocess.Popen:
+        """
+        Starts a process through a given function. Its slot is only released when it finishes.
+        :param lane: INTERACTIVE or BACKGROUND. Default: the current thread lane
+        """
+        self._acquire(get_process_lane() if lane is None else lane)
+
+        try:
+            proc = func()
+        except BaseException:
+            self._release()
+            raise
+
+        Thread(target=self._release_on_exit, args=(proc,), daemon=True).start()
+        return proc
+
+    def _release_on_exit(self, proc: subprocess.Popen):
+        try:
+            proc.wait()
+        finally:
+            self._release()
+
+    def get_metrics(self) -> dict:
+        with self._cond:
+            return {'running': self._running,
+                    'max_running': self.max_running,
+                    'started': {'interactive': self._metrics['started'][INTERACTIVE],
+                                'background': self._metrics['started'][BACKGROUND]},
+                    'deduplicated': self._metrics['deduplicated'],
+                    'overflowed': self._metrics['overflowed'],
+                    'peak': self._metrics['peak'],
+                    'wait_time': round(self._metrics['wait_time'], 3)}
+
+
+EXECUTOR = ProcessExecutor()  # every process started by the helpers below goes through it
+
+
+class ProcessBackend:
+    """
+    Creates the processes started by the helpers of this module and resolves the available tools.
+    It can be replaced through 'set_backend' (e.g: to record or replay the processes outputs. See bauh.commons.replay).
+    """
+
+    def run(self, args, **kwargs) -> subprocess.CompletedProcess:
+        return subprocess.run(args, **kwargs)
+
+    def popen(self, args, **kwargs) -> subprocess.Popen:
+        return subprocess.Popen(args, **kwargs)
+
+    def which(self, tool: str, path: Optional[str] = None) -> Optional[str]:
+        return shutil.which(tool, path=path)
+
+
+_backend = ProcessBackend()
+
+
+def get_backend() -> ProcessBackend:
+    return _backend
+
+
+def set_backend(backend: Optional[ProcessBackend]):
+    """
+    :param backend: if not defined, the default backend is restored
+    """
+    global _backend
+    _backend = backend if backend else ProcessBackend()
+
+
 class SystemProcess:
 
     """
@@ -61,6 +268,82 @@ class SystemProcess:
         self.subproc.wait()
 
 
+class OutputBuffer:
+    """
+    Keeps the last 'max_size' characters of a process output in memory. When it fills, the whole output
+    is also written to a temporary file, so the complete log is still available without being held in memory.
+    Only the latest 'max_files' of these files are kept.
+    """
+
+    def __init__(self, max_size: int = OUTPUT_BUFFER_SIZE, temp_dir: str = TEMP_DIR, max_files: int = MAX_OUTPUT_FILES):
+        self.max_size = max_size
+        self.temp_dir = temp_dir
+        self.max_files = max_files
+        self.file_path = None  # defined when the output is spilled to the disk
+        self._chunks = deque()
+        self._size = 0
+        self._file = None
+        self._truncated = False
+
+    def write(self, text: str):
+        if self._file:
+            self._file.write(text)
+
+        self._chunks.append(text)
+        self._size += len(text)
+
+        if self._size > self.max_size:
+            if not self._truncated:
+                self._truncated = True
+                self._spill()
+
+            while self._size > self.max_size and len(self._chunks) > 1:
+                self._size -= len(self._chunks.popleft())
+
+    def _spill(self):
+        try:
+            Path(self.temp_dir).mkdir(parents=True, exist_ok=True)
+            fd, self.file_path = tempfile.mkstemp(prefix='output_', suffix='.log', dir=self.temp_dir)
+            self._file = os.fdopen(fd, 'w')
+            self._file.write(''.join(self._chunks))
+        except OSError:  # only the last characters will be available
+            self.file_path, self._file = None, None
+            return
+
+        self._remove_old_files()
+
+    def _remove_old_files(self):
+        try:
+            files = [f.path for f in os.scandir(self.temp_dir) if f.name.startswith('output_') and f.name.endswith('.log')]
+            files.sort(key=lambda f: os.path.getmtime(f) if os.path.exists(f) else 0, reverse=True)
+        except OSError:
+            return
+
+        for file_path in files[self.max_files:]:
+            if file_path != self.file_path:
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+
+    def is_truncated(self) -> bool:
+        """
+        :return: if only the last characters are kept. The full output is available at 'file_path' (if it could be written).
+        """
+        return self._truncated
+
+    def getvalue(self) -> str:
+        """
+        :return: the whole output or only its last characters if it was truncated
+        """
+        return ''.join(self._chunks)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
 class SimpleProcess:
 
     def __init__(self, cmd: List[str], cwd: str = '.', expected_code: int = 0,
@@ -97,7 +380,8 @@ class SimpleProcess:
         if stdin:
             args['stdin'] = stdin
 
-        return subprocess.Popen(args=[' '.join(cmd)] if self.shell else cmd, **args)
+        with trace.span('spawn', 'process', cmd=_get_traceable_cmd(cmd)):
+            return EXECUTOR.spawn(lambda: _backend.popen(args=[' '.join(cmd)] if self.shell else cmd, **args))
 
 
 class ProcessHandler:
@@ -106,14 +390,54 @@ class ProcessHandler:
     It handles a process execution and notifies a specified watcher.
     """
 
-    def __init__(self, watcher: ProcessWatcher = None):
+    def __init__(self, watcher: ProcessWatcher = None, notify_interval: float = OUTPUT_NOTIFY_INTERVAL):
         self.watcher = watcher
+        self.notify_interval = notify_interval
+        self._pending = []  # output lines waiting to be sent to the watcher
+        self._pending_size = 0
+        self._last_notification = 0
+        self._output_lock = threading.Lock()
+        self._flush_timer = None
 
     def _notify_watcher(self, msg: str):
         if self.watcher:
             self.watcher.print(msg)
 
+    def _notify_output(self, line: str):
+        """
+        Sends the output lines to the watcher in batches, so the UI is not flooded by processes printing a lot
+        """
+        if self.watcher:
+            with self._output_lock:
+                self._pending.append(line)
+                self._pending_size += len(line)
+                flush = self._pending_size >= OUTPUT_NOTIFY_SIZE or time.monotonic() - self._last_notification >= self.notify_interval
+
+                if not flush and not self._flush_timer:  # so the pending lines are sent even if the process goes quiet
+                    self._flush_timer = threading.Timer(self.notify_interval, self._flush_output)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+
+            if flush:
+                self._flush_output()
+
+    def _flush_output(self):
+        with self._output_lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            if self._pending:
+                self._notify_watcher('\n'.join(self._pending))
+                self._pending.clear()
+                self._pending_size = 0
+                self._last_notification = time.monotonic()
+
     def handle(self, process: SystemProcess, error_output: StringIO = None, output_handler=None) -> bool:
+        with trace.span('handle', 'process', cmd=process.subproc.args):
+            return self._handle(process, error_output, output_handler)
+
+    def _handle(self, process: SystemProcess, error_output: StringIO = None, output_handler=None) -> bool:
         self._notify_watcher(' '.join(process.subproc.args) + '\n')
 
         already_succeeded = False
@@ -165,54 +489,77 @@ class ProcessHandler:
         return process.subproc.returncode is None or process.subproc.returncode == 0
 
     def handle_simple(self, proc: SimpleProcess, output_handler=None, notify_watcher: bool = True) -> Tuple[bool, str]:
+        with trace.span('handle_simple', 'process', cmd=proc.instance.args) as span:
+            success, output = self._handle_simple(proc, output_handler, notify_watcher)
+            span.set('code', proc.instance.returncode)
+            return success, output
+
+    def _handle_simple(self, proc: SimpleProcess, output_handler=None, notify_watcher: bool = True) -> Tuple[bool, str]:
         if notify_watcher:
             self._notify_watcher((proc.instance.args if isinstance(proc.instance.args, str) else ' '.join(proc.instance.args)) + '\n')
 
-        output = StringIO()
-        for o in proc.instance.stdout:
-            if o:
-                line = o.decode()
+        # the phrases are searched line by line, so the full output does not need to be kept
+        success_found, wrong_error_found, error_found = False, False, False
+        output = OutputBuffer()
 
-                output.write(line)
+        try:
+            for o in proc.instance.stdout:
+                if o:
+                    line = o.decode()
 
-                line = line.strip()
+                    output.write(line)
 
-                if line:
-                    if output_handler:
-                        output_handler(line)
+                    if proc.success_phrases and not success_found:
+                        success_found = any(p in line for p in proc.success_phrases)
+
+                    if proc.wrong_error_phrases and not wrong_error_found:
+                        wrong_error_found = any(p in line for p in proc.wrong_error_phrases)
+
+                    if proc.error_phrases and not error_found:
+                        error_found = any(p in line for p in proc.error_phrases)
+
+                    line = line.strip()
+
+                    if line:
+                        if output_handler:
+                            output_handler(line)
+
+                        if notify_watcher:
+                            self._notify_output(line)
+        finally:
+            self._flush_output()
+            output.close()
 
-                    if notify_watcher:
-                        self._notify_watcher(line)
+        if notify_watcher and output.is_truncated():
+            self._notify_watcher('[output truncated. Full log: {}]'.format(output.file_path))
 
         proc.instance.wait()
-        output.seek(0)
 
-        success = proc.instance.returncode == proc.expected_code
-        string_output = output.read()
+        success = proc.instance.returncode == proc.expected_code or success_found or wrong_error_found
 
-        if proc.success_phrases:
-            for phrase in proc.success_phrases:
-                if phrase in string_output:
-                    success = True
-                    break
+        if success and error_found:
+            success = False
 
-        if not success and proc.wrong_error_phrases:
-            for phrase in proc.wrong_error_phrases:
-                if phrase in string_output:
-                    success = True
-                    break
+        return success, output.getvalue()
 
-        if success and proc.error_phrases:
-            for phrase in proc.error_phrases:
-                if phrase in string_output:
-                    success = False
-                    break
+    def handle_session(self, session, cmd: List[str], cwd: Optional[str] = None, expected_code: int = 0) -> Tuple[bool, str]:
+        """
+        Executes a command through an open RootSession notifying the watcher
+        :return: if the command succeeded and its output
+        """
+        self._notify_watcher(' '.join(cmd) + '\n')
 
-        return success, string_output
+        try:
+            code, output = session.run(cmd, cwd=cwd, output_handler=self._notify_output)
+        finally:
+            self._flush_output()
+
+        return code == expected_code, output
 
 
 def run_cmd(cmd: str, expected_code: int = 0, ignore_return_code: bool = False, print_error: bool = True,
-            cwd: str = '.', global_interpreter: bool = USE_GLOBAL_INTERPRETER, extra_paths: Set[str] = None) -> str:
+            cwd: str = '.', global_interpreter: bool = USE_GLOBAL_INTERPRETER, extra_paths: Set[str] = None,
+            dedup: bool = False) -> str:
     """
     runs a given command and returns its default output
     :param cmd:
@@ -220,6 +567,7 @@ def run_cmd(cmd: str, expected_code: int = 0, ignore_return_code: bool = False,
     :param ignore_return_code:
     :param print_error:
     :param global_interpreter
+    :param dedup: if the command is read-only and can share the output of an identical command already running
     :return:
     """
     args = {
@@ -232,8 +580,18 @@ def run_cmd(cmd: str, expected_code: int = 0, ignore_return_code: bool = False,
     if not print_error:
         args["stderr"] = subprocess.DEVNULL
 
-    res = subprocess.run(cmd, **args)
-    return res.stdout.decode() if ignore_return_code or res.returncode == expected_code else None
+    key = ('run_cmd', cmd, cwd, print_error, global_interpreter, frozenset(extra_paths) if extra_paths else None) if dedup else None
+
+    with trace.span('run_cmd', 'process', cmd=cmd) as span:
+        code, output = EXECUTOR.run(lambda: _run_shell(cmd, args), key=key)
+        span.set('code', code)
+
+    return output if ignore_return_code or code == expected_code else None
+
+
+def _run_shell(cmd: str, args: dict) -> Tuple[int, str]:
+    res = _backend.run(cmd, **args)
+    return res.returncode, res.stdout.decode()
 
 
 def new_subprocess(cmd: List[str], cwd: str = '.', shell: bool = False, stdin = None,
@@ -250,7 +608,8 @@ def new_subprocess(cmd: List[str], cwd: str = '.', shell: bool = False, stdin =
     if input:
         args['stdin'] = stdin
 
-    return subprocess.Popen(cmd, **args)
+    with trace.span('spawn', 'process', cmd=_get_traceable_cmd(cmd)):
+        return EXECUTOR.spawn(lambda: _backend.popen(cmd, **args))
 
 
 def new_root_subprocess(cmd: List[str], root_password: str, cwd: str = '.',
@@ -264,7 +623,10 @@ def new_root_subprocess(cmd: List[str], root_password: str, cwd: str = '.',
 
     final_cmd.extend(cmd)
 
-    return subprocess.Popen(final_cmd, stdin=pwdin, stdout=PIPE, stderr=PIPE, cwd=cwd, env=gen_env(global_interpreter, lang, extra_paths))
+    env = gen_env(global_interpreter, lang, extra_paths)
+
+    with trace.span('spawn', 'process', cmd=final_cmd):
+        return EXECUTOR.spawn(lambda: _backend.popen(final_cmd, stdin=pwdin, stdout=PIPE, stderr=PIPE, cwd=cwd, env=env))
 
 
 def notify_user(msg: str, app_name: str, icon_path: str):
@@ -297,13 +659,24 @@ def get_human_size_str(size) -> str:
     return str(int_size)
 
 
-def run(cmd: List[str], success_code: int = 0) -> Tuple[bool, str]:
-    p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    return p.returncode == success_code, p.stdout.decode()
+def run(cmd: List[str], success_code: int = 0, dedup: bool = False) -> Tuple[bool, str]:
+    """
+    :param dedup: if the command is read-only and can share the output of an identical command already running
+    """
+    with trace.span('run', 'process', cmd=cmd) as span:
+        code, output = EXECUTOR.run(lambda: _run(cmd), key=('run', tuple(cmd)) if dedup else None)
+        span.set('code', code)
+
+    return code == success_code, output
+
+
+def _run(cmd: List[str]) -> Tuple[int, str]:
+    p = _backend.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return p.returncode, p.stdout.decode()
 
 
 def check_active_services(*names: str) -> Dict[str, bool]:
-    output = run_cmd('systemctl is-active {}'.format(' '.join(names)), print_error=False)
+    output = run_cmd('systemctl is-active {}'.format(' '.join(names)), print_error=False, dedup=True)
 
     if not output:
         return {n: False for n in names}
@@ -313,7 +686,7 @@ def check_active_services(*names: str) -> Dict[str, bool]:
 
 
 def check_enabled_services(*names: str) -> Dict[str, bool]:
-    output = run_cmd('systemctl is-enabled {}'.format(' '.join(names)), print_error=False)
+    output = run_cmd('systemctl is-enabled {}'.format(' '.join(names)), print_error=False, dedup=True)
 
     if not output:
         return {n: False for n in names}
@@ -323,5 +696,13 @@ def check_enabled_services(*names: str) -> Dict[str, bool]:
 
 
 def execute(cmd: str, shell: bool = False) -> Tuple[int, str]:
-    p = subprocess.run(args=cmd.split(' ') if not shell else [cmd], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=shell)
+    with trace.span('execute', 'process', cmd=cmd) as span:
+        code, output = EXECUTOR.run(lambda: _execute(cmd, shell))
+        span.set('code', code)
+
+    return code, output
+
+
+def _execute(cmd: str, shell: bool) -> Tuple[int, str]:
+    p = _backend.run(args=cmd.split(' ') if not shell else [cmd], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=shell)
     return p.returncode, p.stdout.decode()
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+from threading import Lock
+from typing import Optional, Callable, List
+
+
+class Tracer:
+    """
+    Records spans as Chrome trace 'complete' events (also supported by Perfetto).
+    Nested spans are inferred by the viewers from the timestamps of each thread.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._events = []
+        self._threads = {}  # thread id -> name
+        self._lock = Lock()
+        self._origin = time.perf_counter()
+
+    def now(self) -> float:
+        """
+        :return: microseconds since the tracer was created
+        """
+        return (time.perf_counter() - self._origin) * 1000000
+
+    def add(self, name: str, category: str, start: float, end: float, attrs: Optional[dict]):
+        thread = threading.current_thread()
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': start, 'dur': end - start,
+                 'pid': self.pid, 'tid': thread.ident}
+
+        if attrs:
+            event['args'] = attrs
+
+        with self._lock:
+            self._events.append(event)
+            self._threads[thread.ident] = thread.name
+
+    def get_events(self) -> List[dict]:
+        with self._lock:
+            meta = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                    for tid, name in self._threads.items()]
+            return [*meta, *self._events]
+
+    def save(self, file_path: str):
+        with open(file_path, 'w+') as f:
+            f.write(json.dumps({'traceEvents': self.get_events(), 'displayTimeUnit': 'ms'}, default=str))
+
+
+class Span:
+
+    def __init__(self, tracer: Tracer, name: str, category: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self._start = None
+
+    def set(self, key: str, value: object):
+        self.attrs[key] = value
+
+    def __enter__(self) -> "Span":
+        self._start = self.tracer.now()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type:
+            self.attrs['error'] = exc_type.__name__
+
+        self.tracer.add(self.name, self.category, self._start, self.tracer.now(), self.attrs)
+
+
+class _DisabledSpan:
+
+    def set(self, key: str, value: object):
+        pass
+
+    def __enter__(self) -> "_DisabledSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+DISABLED_SPAN = _DisabledSpan()
+_tracer = None  # tracing is disabled while it is not defined
+
+
+def enable() -> Tracer:
+    global _tracer
+
+    if _tracer is None:
+        _tracer = Tracer()
+
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, category: str = 'bauh', **attrs):
+    """
+    Usage: with span('pacman.search', words=words) as s: ... s.set('results', len(res))
+    :return: a context manager recording the elapsed time of its block. It does nothing if tracing is disabled.
+    """
+    if _tracer is None:
+        return DISABLED_SPAN
+
+    return Span(_tracer, name, category, attrs)
+
+
+def traced(name: Optional[str] = None, category: str = 'bauh') -> Callable:
+    """
+    Decorator recording every call of a function as a span
+    :param name: span name. Default: the function qualified name
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name if name else func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+
+            with Span(_tracer, span_name, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def wrap(func: Callable, name: str, category: str = 'bauh') -> Callable:
+    """
+    :return: the function recording its calls as spans when tracing is enabled
+    """
+    return traced(name, category)(func)
+
+
+def save(file_path: str) -> bool:
+    """
+    Writes the recorded spans as a Chrome/Perfetto trace file
+    :return: if tracing is enabled
+    """
+    if _tracer is None:
+        return False
+
+    _tracer.save(file_path)
+    return True
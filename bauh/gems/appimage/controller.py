@@ -24,7 +24,7 @@ from bauh.api.abstract.model import SoftwarePackage, PackageHistory, PackageUpda
     SuggestionPriority, CustomSoftwareAction
 from bauh.api.abstract.view import MessageType, ViewComponent, FormComponent, InputOption, SingleSelectComponent, \
     SelectViewType, TextInputComponent, PanelComponent, FileChooserComponent, ViewObserver
-from bauh.commons import resource
+from bauh.commons import resource, capability
 from bauh.commons.config import save_config
 from bauh.commons.html import bold
 from bauh.commons.system import SystemProcess, new_subprocess, ProcessHandler, run_cmd, SimpleProcess
@@ -574,8 +574,7 @@ class AppImageManager(SoftwareManager):
         self.enabled = enabled
 
     def _is_sqlite3_available(self):
-        res = run_cmd('which sqlite3')
-        return res and not res.strip().startswith('which ')
+        return capability.is_available('sqlite3')
 
     def can_work(self) -> bool:
         return self._is_sqlite3_available() and self.file_downloader.can_work()
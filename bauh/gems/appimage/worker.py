@@ -13,6 +13,7 @@ import requests
 from bauh.api.abstract.handler import TaskManager, ProcessWatcher
 from bauh.api.http import HttpClient
 from bauh.commons import internet
+from bauh.commons.system import process_lane, BACKGROUND
 from bauh.gems.appimage import LOCAL_PATH, get_icon_path, INSTALLATION_PATH, SYMLINKS_DIR, util
 from bauh.gems.appimage.model import AppImage
 from bauh.view.util.translation import I18n
@@ -99,6 +100,7 @@ class DatabaseUpdater(Thread):
             self.logger.warning('Could not download the database file {}'.format(self.URL_DB))
             self._finish_task()
 
+    @process_lane(BACKGROUND)
     def run(self):
         while True:
             self.download_databases()
@@ -170,6 +172,7 @@ class SymlinksVerifier(Thread):
                 if watcher:
                     watcher.print('[error] {}'.format(msg))
 
+    @process_lane(BACKGROUND)
     def run(self):
         self.taskman.register_task(self.task_id, self.i18n['appimage.task.symlink_check'], get_icon_path())
 
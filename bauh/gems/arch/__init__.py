@@ -7,6 +7,7 @@ from bauh.commons import resource
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 BUILD_DIR = '{}/arch'.format(TEMP_DIR)
 ARCH_CACHE_PATH = CACHE_PATH + '/arch'
+ARCH_CACHE_STORE_FILE = ARCH_CACHE_PATH + '/installed.db'
 CATEGORIES_FILE_PATH = ARCH_CACHE_PATH + '/categories.txt'
 URL_CATEGORIES_FILE = 'https://raw.githubusercontent.com/vinifmor/bauh-files/master/arch/categories.txt'
 URL_GPG_SERVERS = 'https://raw.githubusercontent.com/vinifmor/bauh-files/master/arch/gpgservers.txt'
@@ -17,7 +17,7 @@ import requests
 
 from bauh.api.abstract.controller import SearchResult, SoftwareManager, ApplicationContext, UpgradeRequirements, \
     TransactionResult
-from bauh.api.abstract.disk import DiskCacheLoader
+from bauh.api.abstract.disk import DiskCacheLoader, DiskCacheStore
 from bauh.api.abstract.handler import ProcessWatcher, TaskManager
 from bauh.api.abstract.model import PackageUpdate, PackageHistory, SoftwarePackage, PackageSuggestion, PackageStatus, \
     SuggestionPriority, CustomSoftwareAction
@@ -25,16 +25,18 @@ from bauh.api.abstract.view import MessageType, FormComponent, InputOption, Sing
     ViewComponent, PanelComponent, MultipleSelectComponent, TextInputComponent, TextInputType, \
     FileChooserComponent, TextComponent
 from bauh.api.constants import TEMP_DIR
-from bauh.commons import user, internet, system
+from bauh.commons import user, internet, system, capability, services
 from bauh.commons.category import CategoriesDownloader
 from bauh.commons.config import save_config
 from bauh.commons.html import bold
+from bauh.commons.prepare import PrepareGraph, PrepareTask, is_file_fresh
+from bauh.commons.root_session import RootSession
 from bauh.commons.system import SystemProcess, ProcessHandler, new_subprocess, run_cmd, SimpleProcess
 from bauh.commons.view_utils import new_select
 from bauh.gems.arch import aur, pacman, makepkg, message, confirmation, disk, git, \
     gpg, URL_CATEGORIES_FILE, CATEGORIES_FILE_PATH, CUSTOM_MAKEPKG_FILE, SUGGESTIONS_FILE, \
-    CONFIG_FILE, get_icon_path, database, mirrors, sorting, cpu_manager, ARCH_CACHE_PATH, UPDATES_IGNORED_FILE, \
-    CONFIG_DIR, EDITABLE_PKGBUILDS_FILE, URL_GPG_SERVERS, BUILD_DIR
+    CONFIG_FILE, get_icon_path, database, mirrors, sorting, cpu_manager, ARCH_CACHE_PATH, UPDATES_IGNORED_FILE, AUR_INDEX_FILE, \
+    CONFIG_DIR, EDITABLE_PKGBUILDS_FILE, URL_GPG_SERVERS, BUILD_DIR, ARCH_CACHE_STORE_FILE
 from bauh.gems.arch.aur import AURClient
 from bauh.gems.arch.config import read_config, get_build_dir
 from bauh.gems.arch.dependencies import DependenciesAnalyser
@@ -52,6 +54,13 @@ URL_GIT = 'https://aur.archlinux.org/{}.git'
 URL_PKG_DOWNLOAD = 'https://aur.archlinux.org/cgit/aur.git/snapshot/{}.tar.gz'
 URL_SRC_INFO = 'https://aur.archlinux.org/cgit/aur.git/plain/.SRCINFO?h='
 
+TASK_DISK_CACHE = 'arch.disk_cache'
+TASK_MAKEPKG = 'arch.makepkg'
+TASK_CATEGORIES = 'arch.categories'
+TASK_AUR_INDEX = 'arch.aur_index'
+TASK_MIRRORS = 'arch.mirrors'
+TASK_SYNC_DATABASES = 'arch.sync_databases'
+
 RE_SPLIT_VERSION = re.compile(r'([=><]+)')
 
 SOURCE_FIELDS = ('source', 'source_x86_64')
@@ -234,7 +243,7 @@ class ArchManager(SoftwareManager):
                                                 refresh=False,
                                                 manager=self),
         }
-        self.index_aur = None
+        self.prepare_graph = None
         self.re_file_conflict = re.compile(r'[\w\d\-_.]+:')
         self.disk_cache_updater = disk_cache_updater
 
@@ -388,8 +397,8 @@ class ArchManager(SoftwareManager):
                 self._upgrade_search_result(pkgdata, aur_installed, downgrade_enabled, res, disk_loader)
 
         else:  # if there are no results from the API (it could be because there were too many), tries the names index:
-            if self.index_aur:
-                self.index_aur.join()
+            if self.prepare_graph:
+                self.prepare_graph.wait(TASK_AUR_INDEX)
 
             aur_index = self.aur_client.read_local_index()
             if aur_index:
@@ -541,6 +550,10 @@ class ArchManager(SoftwareManager):
             self.logger.info("Waiting for disk cache to be ready")
             self.disk_cache_updater.join()
             self.logger.info("Disk cache ready")
+        elif self.prepare_graph and self.prepare_graph.is_running(TASK_DISK_CACHE):
+            self.logger.info("Waiting for disk cache to be ready")
+            self.prepare_graph.wait(TASK_DISK_CACHE)
+            self.logger.info("Disk cache ready")
 
     def read_installed(self, disk_loader: DiskCacheLoader, limit: int = -1, only_apps: bool = False, pkg_types: Set[Type[SoftwarePackage]] = None, internet_available: bool = None, names: Iterable[str] = None, wait_disk_cache: bool = True) -> SearchResult:
         self.aur_client.clean_caches()
@@ -554,8 +567,8 @@ class ArchManager(SoftwareManager):
             repo_pkgs = installed['signed']
 
         if installed['not_signed']:
-            if self.index_aur:
-                self.index_aur.join()
+            if self.prepare_graph:
+                self.prepare_graph.wait(TASK_AUR_INDEX)
 
             aur_index = self.aur_client.read_index()
 
@@ -749,9 +762,18 @@ class ArchManager(SoftwareManager):
             return self._downgrade_repo_pkg(context)
 
     def clean_cache_for(self, pkg: ArchPackage):
+        store = self.get_disk_cache_store()
+
+        if store:
+            store.delete(pkg.name)
+
         if os.path.exists(pkg.get_disk_cache_path()):
             shutil.rmtree(pkg.get_disk_cache_path())
 
+    def get_disk_cache_store(self, pkg: Optional[ArchPackage] = None) -> Optional[DiskCacheStore]:
+        if self.context.disk_cache_store_factory:
+            return self.context.disk_cache_store_factory.get(ARCH_CACHE_STORE_FILE, '{}/installed'.format(ARCH_CACHE_PATH))
+
     def _check_action_allowed(self, pkg: ArchPackage, watcher: ProcessWatcher) -> bool:
         if user.is_root() and pkg.repository == 'aur':
             watcher.show_message(title=self.i18n['arch.install.aur.root_error.title'],
@@ -937,7 +959,7 @@ class ArchManager(SoftwareManager):
                                                 maintainer=repo,
                                                 categories=self.categories.get(name))
 
-                disk.write_several(pkgs=pkg_map, overwrite=True, maintainer=None)
+                disk.write_several(pkgs=pkg_map, overwrite=True, maintainer=None, store=self.get_disk_cache_store())
                 return True
             elif 'conflicting files' in upgrade_output:
                 if not handler.watcher.request_confirmation(title=self.i18n['warning'].capitalize(),
@@ -1113,9 +1135,13 @@ class ArchManager(SoftwareManager):
         status_handler.join()
 
         installed = pacman.list_installed_names()
+        store = self.get_disk_cache_store()
 
         for p in pkgs:
             if p not in installed:
+                if store:
+                    store.delete(p)
+
                 cache_path = ArchPackage.disk_cache_path(p)
                 if os.path.exists(cache_path):
                     shutil.rmtree(cache_path)
@@ -1603,7 +1629,7 @@ class ArchManager(SoftwareManager):
             if installed:
                 pkg_map = {d[0]: ArchPackage(name=d[0], repository=d[1], maintainer=d[1],
                                              categories=self.categories.get(d[0])) for d in repo_deps}
-                disk.write_several(pkg_map, overwrite=True, maintainer=None)
+                disk.write_several(pkg_map, overwrite=True, maintainer=None, store=self.get_disk_cache_store())
                 progress += len(repo_deps) * progress_increment
                 self._update_progress(context, progress)
             else:
@@ -1746,10 +1772,11 @@ class ArchManager(SoftwareManager):
         context.watcher.change_substatus(self.i18n['arch.building.package'].format(bold(context.name)))
         optimize = bool(context.config['optimize']) and cpu_manager.supports_performance_mode() and not cpu_manager.all_in_performance()
 
-        cpu_optimized = False
+        cpu_optimized, root_session = False, None
         if optimize:
             self.logger.info("Setting cpus to performance mode")
-            cpu_manager.set_mode('performance', context.root_password)
+            root_session = RootSession(context.root_password)  # authenticated once for both mode changes
+            cpu_manager.set_mode('performance', context.root_password, root_session)
             cpu_optimized = True
 
         try:
@@ -1760,7 +1787,8 @@ class ArchManager(SoftwareManager):
         finally:
             if cpu_optimized:
                 self.logger.info("Setting cpus to powersave mode")
-                cpu_manager.set_mode('powersave', context.root_password)
+                cpu_manager.set_mode('powersave', context.root_password, root_session)
+                root_session.close()
 
         self._update_progress(context, 65)
 
@@ -2200,7 +2228,7 @@ class ArchManager(SoftwareManager):
                                                     maintainer=dep[1] if dep[1] != 'aur' else (aur_data[dep[0]].get('Maintainer') if aur_data else None),
                                                     categories=self.categories.get(context.name))
 
-            disk.write_several(pkgs=cache_map, maintainer=None, overwrite=True)
+            disk.write_several(pkgs=cache_map, maintainer=None, overwrite=True, store=self.get_disk_cache_store())
 
             context.watcher.change_substatus('')
             self._update_progress(context, 100)
@@ -2349,7 +2377,11 @@ class ArchManager(SoftwareManager):
             pkg.name = install_context.name  # changes the package name in case the PKGBUILD was edited
 
 
-            if os.path.exists(pkg.get_disk_data_path()):
+            store = self.get_disk_cache_store()
+
+            if store:
+                pkg.fill_cached_data(store.get(pkg.name))
+            elif os.path.exists(pkg.get_disk_data_path()):
                 with open(pkg.get_disk_data_path()) as f:
                     data = f.read()
                     if data:
@@ -2426,8 +2458,7 @@ class ArchManager(SoftwareManager):
         return res
 
     def _is_wget_available(self):
-        res = run_cmd('which wget')
-        return res and not res.strip().startswith('which ')
+        return capability.is_available('wget')
 
     def is_enabled(self) -> bool:
         return self.enabled
@@ -2462,8 +2493,10 @@ class ArchManager(SoftwareManager):
 
         return action != 'search'
 
-    def _start_category_task(self, task_man: TaskManager):
+    def _register_category_task(self, task_man: TaskManager):
         task_man.register_task('arch_aur_cats', self.i18n['task.download_categories'].format('Arch'), get_icon_path())
+
+    def _start_category_task(self, task_man: TaskManager):
         task_man.update_progress('arch_aur_cats', 50, None)
 
     def _finish_category_task(self, task_man: TaskManager):
@@ -2472,41 +2505,51 @@ class ArchManager(SoftwareManager):
 
     def prepare(self, task_manager: TaskManager, root_password: str, internet_available: bool):
         arch_config = read_config(update_file=True)
+        graph = PrepareGraph(self.logger)
 
         if arch_config['aur'] or arch_config['repositories']:
-            self.disk_cache_updater = ArchDiskCacheUpdater(task_man=task_manager,
-                                                           arch_config=arch_config,
-                                                           i18n=self.i18n,
-                                                           logger=self.context.logger,
-                                                           controller=self,
-                                                           internet_available=internet_available)
-            self.disk_cache_updater.start()
+            disk_cache_updater = ArchDiskCacheUpdater(task_man=task_manager,
+                                                      arch_config=arch_config,
+                                                      i18n=self.i18n,
+                                                      logger=self.context.logger,
+                                                      controller=self,
+                                                      internet_available=internet_available)
+            graph.add(PrepareTask(TASK_DISK_CACHE, disk_cache_updater.run, register=disk_cache_updater.register))
 
         if arch_config['aur']:
-            ArchCompilationOptimizer(arch_config, self.i18n, self.context.logger, task_manager).start()
+            optimizer = ArchCompilationOptimizer(arch_config, self.i18n, self.context.logger, task_manager)
+            graph.add(PrepareTask(TASK_MAKEPKG, optimizer.run, register=optimizer.register))
 
-        CategoriesDownloader(id_='Arch', http_client=self.context.http_client, logger=self.context.logger,
-                             manager=self, url_categories_file=URL_CATEGORIES_FILE, disk_cache_dir=ARCH_CACHE_PATH,
-                             categories_path=CATEGORIES_FILE_PATH,
-                             before=lambda: self._start_category_task(task_manager),
-                             after=lambda: self._finish_category_task(task_manager)).start()
+        graph.add(PrepareTask(TASK_CATEGORIES, CategoriesDownloader(id_='Arch', http_client=self.context.http_client, logger=self.context.logger,
+                                                                    manager=self, url_categories_file=URL_CATEGORIES_FILE, disk_cache_dir=ARCH_CACHE_PATH,
+                                                                    categories_path=CATEGORIES_FILE_PATH,
+                                                                    before=lambda: self._start_category_task(task_manager),
+                                                                    after=lambda: self._finish_category_task(task_manager)).run,
+                              register=lambda: self._register_category_task(task_manager)))
 
         if arch_config['aur'] and internet_available:
-            self.index_aur = AURIndexUpdater(self.context)
-            self.index_aur.start()
+            idx_exp = arch_config['aur_idx_exp']
+            graph.add(PrepareTask(TASK_AUR_INDEX, AURIndexUpdater(self.context).run,
+                                  is_fresh=lambda: idx_exp is not None and idx_exp > 0 and is_file_fresh(AUR_INDEX_FILE, idx_exp * 60 * 60)))
 
-        refresh_mirrors = None
         if internet_available and arch_config['repositories'] and arch_config['refresh_mirrors_startup'] \
-                and pacman.is_mirrors_available() and mirrors.should_sync(self.logger):
-
+                and pacman.is_mirrors_available():
             refresh_mirrors = RefreshMirrors(taskman=task_manager, i18n=self.i18n,
                                              root_password=root_password, logger=self.logger,
                                              sort_limit=arch_config['mirrors_sort_limit'])
-            refresh_mirrors.start()
+            graph.add(PrepareTask(TASK_MIRRORS, refresh_mirrors.run, register=refresh_mirrors.register,
+                                  is_fresh=lambda: not mirrors.should_sync(self.logger)))
 
-        if internet_available and (refresh_mirrors or (arch_config['sync_databases_startup'] and database.should_sync(arch_config, None, self.logger))):
-            SyncDatabases(taskman=task_manager, root_password=root_password, i18n=self.i18n,
-                          logger=self.logger, refresh_mirrors=refresh_mirrors).start()
+        if internet_available:
+            # the databases are always synchronized after the mirrors are refreshed
+            sync_databases = SyncDatabases(taskman=task_manager, root_password=root_password, i18n=self.i18n, logger=self.logger)
+            graph.add(PrepareTask(TASK_SYNC_DATABASES, sync_databases.run,
+                                  depends_on={TASK_MIRRORS},
+                                  register=lambda: sync_databases.register(waiting_mirrors=graph.will_run(TASK_MIRRORS)),
+                                  is_fresh=lambda: not graph.will_run(TASK_MIRRORS) and not (arch_config['sync_databases_startup'] and database.should_sync(arch_config, None, self.logger))))
+
+        self.prepare_graph = graph
+        graph.start()
 
     def list_updates(self, internet_available: bool) -> List[PackageUpdate]:
         installed = self.read_installed(disk_loader=None, internet_available=internet_available).installed
@@ -2897,16 +2940,17 @@ class ArchManager(SoftwareManager):
                                         deny_label=self.i18n['cancel'].capitalize()):
 
             handler = ProcessHandler(watcher)
-            rm = SimpleProcess(cmd=['rm', '-rf', cache_dir], root_password=root_password)
-            success, _ = handler.handle_simple(rm)
+
+            with RootSession(root_password) as root_session:
+                success = handler.handle_session(root_session, ['rm', '-rf', cache_dir])[0]
+
+                if success:
+                    handler.handle_session(root_session, ['mkdir', '-p', cache_dir])
 
             if success:
                 watcher.show_message(title=self.i18n['arch.custom_action.clean_cache'].capitalize(),
                                      body=self.i18n['arch.custom_action.clean_cache.success'],
                                      type_=MessageType.INFO)
-
-                mkcache = SimpleProcess(cmd=['mkdir', '-p', cache_dir], root_password=root_password)
-                handler.handle_simple(mkcache)
                 return True
             else:
                 watcher.show_message(title=self.i18n['arch.custom_action.clean_cache'].capitalize(),
@@ -3021,13 +3065,13 @@ class ArchManager(SoftwareManager):
     def setup_snapd(self, root_password: str, watcher: ProcessWatcher) -> bool:
         # checking services
         missing_items = []
-        for serv, active in system.check_enabled_services('snapd.service', 'snapd.socket').items():
+        for serv, active in services.is_enabled('snapd.service', 'snapd.socket').items():
             if not active:
                 missing_items.append(InputOption(label=self.i18n['snap.custom_action.setup_snapd.service_disabled'].format("'{}'".format(serv)),
                                                  value='enable:{}'.format(serv),
                                                  read_only=True))
 
-        for serv, active in system.check_active_services('snapd.service', 'snapd.socket').items():
+        for serv, active in services.is_active('snapd.service', 'snapd.socket').items():
             if not active:
                 missing_items.append(InputOption(label=self.i18n['snap.custom_action.setup_snapd.service_inactive'].format("'{}'".format(serv)),
                                                  value='start:{}'.format(serv),
@@ -3085,6 +3129,9 @@ class ArchManager(SoftwareManager):
 
                         success, output = handler.handle_simple(proc)
 
+                        if action[0] in ('enable', 'start'):
+                            services.invalidate(action[1])
+
                         if not success:
                             watcher.show_message(title=self.i18n['error'].capitalize(),
                                                  body=output,
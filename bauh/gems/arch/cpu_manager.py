@@ -1,8 +1,9 @@
 import multiprocessing
 import os
 import traceback
+from typing import Optional
 
-from bauh.commons.system import new_root_subprocess
+from bauh.commons.root_session import RootSession
 
 
 def supports_performance_mode():
@@ -18,21 +19,31 @@ def all_in_performance() -> bool:
     return False
 
 
-def set_mode(mode: str, root_password: str):
+def set_mode(mode: str, root_password: str, session: Optional[RootSession] = None):
+    """
+    :param mode:
+    :param root_password:
+    :param session: an open root session. If not defined, a new one is opened just to change the mode of all cpus.
+    """
     new_gov_file = '/tmp/bauh_scaling_governor'
     with open(new_gov_file, 'w+') as f:
         f.write(mode)
 
-    for i in range(multiprocessing.cpu_count()):
+    cur_session = session if session else RootSession(root_password)
+
+    try:
+        if cur_session.open():
+            for i in range(multiprocessing.cpu_count()):
+                gov_file = '/sys/devices/system/cpu/cpu{}/cpufreq/scaling_governor'.format(i)
+                cur_session.run(['cp', new_gov_file, gov_file])
+    except:
+        traceback.print_exc()
+    finally:
+        if not session:
+            cur_session.close()
+
+    if os.path.exists(new_gov_file):
         try:
-            gov_file = '/sys/devices/system/cpu/cpu{}/cpufreq/scaling_governor'.format(i)
-            replace = new_root_subprocess(['cp', new_gov_file, gov_file], root_password=root_password)
-            replace.wait()
+            os.remove(new_gov_file)
         except:
             traceback.print_exc()
-
-        if os.path.exists(new_gov_file):
-            try:
-                os.remove(new_gov_file)
-            except:
-                traceback.print_exc()
@@ -4,6 +4,7 @@ import re
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Callable
 
+from bauh.api.abstract.disk import DiskCacheStore
 from bauh.gems.arch import pacman
 from bauh.gems.arch.model import ArchPackage
 
@@ -11,38 +12,43 @@ RE_DESKTOP_ENTRY = re.compile(r'[\n^](Exec|Icon|NoDisplay)\s*=\s*(.+)')
 RE_CLEAN_NAME = re.compile(r'[+*?%]')
 
 
-def write_several(pkgs: Dict[str, ArchPackage], overwrite: bool = True, maintainer: str = None, after_desktop_files:  Optional[Callable] = None, after_written: Optional[Callable[[str], None]] = None) -> int:
+def write_several(pkgs: Dict[str, ArchPackage], overwrite: bool = True, maintainer: str = None, after_desktop_files:  Optional[Callable] = None, after_written: Optional[Callable[[str], None]] = None, store: Optional[DiskCacheStore] = None) -> int:
     if overwrite:
         to_cache = {p.name for p in pkgs.values()}
+    elif store:
+        cached = store.keys()
+        to_cache = {p.name for p in pkgs.values() if p.name not in cached}
     else:
         to_cache = {p.name for p in pkgs.values() if not os.path.exists(p.get_disk_cache_path())}
 
     desktop_files = pacman.map_desktop_files(*to_cache)
+    buffer = {} if store else None  # the data is written to the store within a single transaction
 
     if after_desktop_files:
         after_desktop_files()
 
     if not desktop_files:
         for pkgname in to_cache:
-            write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written)
-
-        return len(to_cache)
+            write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written, buffer=buffer)
     else:
         for pkgname in to_cache:
             pkgfiles = desktop_files.get(pkgname)
 
             if not pkgfiles:
-                write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written)
+                write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written, buffer=buffer)
             else:
                 desktop_entry = find_best_desktop_entry(pkgname, pkgfiles)
 
                 if desktop_entry:
-                    write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written,
+                    write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written, buffer=buffer,
                           desktop_file=desktop_entry[0], command=desktop_entry[1], icon=desktop_entry[2])
                 else:
-                    write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written)
+                    write(pkg=pkgs[pkgname], maintainer=maintainer, after_written=after_written, buffer=buffer)
+
+    if buffer:
+        store.put_several(buffer)
 
-        return len(to_cache)
+    return len(to_cache)
 
 
 def find_best_desktop_entry(pkgname: str, desktop_files: List[str]) -> Optional[Tuple[str, str, str]]:
@@ -109,7 +115,8 @@ def read_desktop_exec_and_icon(pkgname: str, desktop_file: str) -> Optional[Tupl
 
 
 def write(pkg: ArchPackage, desktop_file: Optional[str] = None, command: Optional[str] = None,
-          icon: Optional[str] = None, maintainer: Optional[str] = None, after_written: Optional[callable] = None):
+          icon: Optional[str] = None, maintainer: Optional[str] = None, after_written: Optional[callable] = None,
+          store: Optional[DiskCacheStore] = None, buffer: Optional[Dict[str, dict]] = None):
     pkg.desktop_entry = desktop_file
     pkg.command = command
     pkg.icon_path = icon
@@ -117,12 +124,17 @@ def write(pkg: ArchPackage, desktop_file: Optional[str] = None, command: Optiona
     if maintainer and not pkg.maintainer:
         pkg.maintainer = maintainer
 
-    Path(pkg.get_disk_cache_path()).mkdir(parents=True, exist_ok=True)
-
     data = pkg.get_data_to_cache()
 
-    with open(pkg.get_disk_data_path(), 'w+') as f:
-        f.write(json.dumps(data))
+    if buffer is not None:
+        buffer[pkg.name] = data
+    elif store:
+        store.put(pkg.name, data)
+    else:
+        Path(pkg.get_disk_cache_path()).mkdir(parents=True, exist_ok=True)
+
+        with open(pkg.get_disk_data_path(), 'w+') as f:
+            f.write(json.dumps(data))
 
     if after_written:
         after_written(pkg.name)
@@ -3,7 +3,7 @@ from typing import List, Set
 
 from bauh.api.abstract.model import SoftwarePackage, CustomSoftwareAction
 from bauh.commons import resource
-from bauh.gems.arch import ROOT_DIR, ARCH_CACHE_PATH
+from bauh.gems.arch import ROOT_DIR, ARCH_CACHE_PATH, ARCH_CACHE_STORE_FILE
 from bauh.view.util.translation import I18n
 
 CACHED_ATTRS = {'command', 'icon_path', 'repository', 'maintainer', 'desktop_entry', 'categories'}
@@ -102,6 +102,9 @@ class ArchPackage(SoftwarePackage):
         if self.name:
             return self.disk_cache_path(self.name)
 
+    def get_disk_cache_store_path(self) -> str:
+        return ARCH_CACHE_STORE_FILE
+
     def get_data_to_cache(self) -> dict:
         cache = {}
 
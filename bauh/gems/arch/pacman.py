@@ -6,7 +6,7 @@ from typing import List, Set, Tuple, Dict, Iterable, Optional
 
 from colorama import Fore
 
-from bauh.commons import system
+from bauh.commons import system, capability
 from bauh.commons.system import run_cmd, new_subprocess, new_root_subprocess, SystemProcess, SimpleProcess
 from bauh.commons.util import size_to_byte
 from bauh.gems.arch.exceptions import PackageNotFoundException, PackageInHoldException
@@ -26,8 +26,7 @@ RE_DESKTOP_FILES = re.compile(r'\n?([\w\-_]+)\s+(/usr/share/.+\.desktop)')
 
 
 def is_available() -> bool:
-    res = run_cmd('which pacman', print_error=False)
-    return res and not res.strip().startswith('which ')
+    return capability.is_available('pacman')
 
 
 def get_repositories(pkgs: Iterable[str]) -> dict:
@@ -56,11 +55,11 @@ def get_repositories(pkgs: Iterable[str]) -> dict:
 
 
 def is_available_in_repositories(pkg_name: str) -> bool:
-    return bool(run_cmd('pacman -Ss ' + pkg_name))
+    return bool(run_cmd('pacman -Ss ' + pkg_name, dedup=True))
 
 
 def get_info(pkg_name, remote: bool = False) -> str:
-    return run_cmd('pacman -{}i {}'.format('Q' if not remote else 'S', pkg_name), print_error=False)
+    return run_cmd('pacman -{}i {}'.format('Q' if not remote else 'S', pkg_name), print_error=False, dedup=True)
 
 
 def get_info_list(pkg_name: str, remote: bool = False) -> List[tuple]:
@@ -91,7 +90,7 @@ def get_info_dict(pkg_name: str, remote: bool = False) -> dict:
 
 
 def check_installed(pkg: str) -> bool:
-    res = run_cmd('pacman -Qq ' + pkg, print_error=False)
+    res = run_cmd('pacman -Qq ' + pkg, print_error=False, dedup=True)
     return bool(res)
 
 
@@ -379,7 +378,7 @@ def map_repositories(pkgnames: Iterable[str] = None) -> Dict[str, str]:
 
 
 def list_repository_updates() -> Dict[str, str]:
-    output = run_cmd('pacman -Qu')
+    output = run_cmd('pacman -Qu', dedup=True)
     res = {}
     if output:
         for line in output.split('\n'):
@@ -460,8 +459,7 @@ def get_databases() -> Set[str]:
 
 
 def can_refresh_mirrors() -> bool:
-    output = run_cmd('which pacman-mirrors', print_error=False)
-    return True if output else False
+    return capability.is_available('pacman-mirrors')
 
 
 def refresh_mirrors(root_password: str) -> SimpleProcess:
@@ -494,7 +492,7 @@ def get_current_mirror_countries() -> List[str]:
 
 
 def is_mirrors_available() -> bool:
-    return bool(run_cmd('which pacman-mirrors', print_error=False))
+    return capability.is_available('pacman-mirrors')
 
 
 def map_update_sizes(pkgs: List[str]) -> Dict[str, int]:  # bytes:
@@ -950,7 +948,7 @@ def map_required_by(names: Iterable[str] = None, remote: bool = False) -> Dict[s
                         latest_name, required = None, None
 
                 elif latest_name and required is not None:
-                    required.update(required.update((d for d in l.strip().split(' ') if d)))
+                    required.update((d for d in l.strip().split(' ') if d))
         return res
     elif names:
         return {n: set() for n in names}
@@ -1100,7 +1098,7 @@ def list_unnecessary_deps(pkgs: Iterable[str], all_provided: Dict[str, Set[str]]
 
 
 def list_installed_names() -> Set[str]:
-    output = run_cmd('pacman -Qq', print_error=False)
+    output = run_cmd('pacman -Qq', print_error=False, dedup=True)
     return {name.strip() for name in output.split('\n') if name} if output else set()
 
 
@@ -1132,7 +1130,7 @@ def get_packages_to_sync_first() -> Set[str]:
 
 
 def is_snapd_installed() -> bool:
-    return bool(run_cmd('pacman -Qq snapd', print_error=False))
+    return bool(run_cmd('pacman -Qq snapd', print_error=False, dedup=True))
 
 
 def list_hard_requirements(name: str, logger: Optional[logging.Logger] = None) -> Optional[Set[str]]:
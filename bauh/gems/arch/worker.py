@@ -11,8 +11,9 @@ import requests
 
 from bauh.api.abstract.context import ApplicationContext
 from bauh.api.abstract.handler import TaskManager
+from bauh.commons import capability
 from bauh.commons.html import bold
-from bauh.commons.system import run_cmd, new_root_subprocess, ProcessHandler
+from bauh.commons.system import new_root_subprocess, ProcessHandler, process_lane, BACKGROUND
 from bauh.gems.arch import pacman, disk, CUSTOM_MAKEPKG_FILE, CONFIG_DIR, AUR_INDEX_FILE, get_icon_path, database, \
     mirrors, ARCH_CACHE_PATH, BUILD_DIR
 from bauh.gems.arch.aur import URL_INDEX
@@ -34,6 +35,7 @@ class AURIndexUpdater(Thread):
         self.i18n = context.i18n
         self.logger = context.logger
 
+    @process_lane(BACKGROUND)
     def run(self):
         self.logger.info('Pre-indexing AUR packages')
         try:
@@ -90,24 +92,32 @@ class ArchDiskCacheUpdater(Thread):
     def _notify_reading_files(self):
         self._update_progress(50, self.i18n['arch.task.disk_cache.indexing'])
 
+    def register(self):
+        if any([self.aur, self.repositories]):
+            self.task_man.register_task(self.task_id, self.i18n['arch.task.disk_cache'], get_icon_path())
+
+    @process_lane(BACKGROUND)
     def run(self):
         if not any([self.aur, self.repositories]):
             return
 
         ti = time.time()
-        self.task_man.register_task(self.task_id, self.i18n['arch.task.disk_cache'], get_icon_path())
 
         self.logger.info("Checking already cached package data")
 
         self._update_progress(1, self.i18n['arch.task.disk_cache.checking'])
-        cache_dirs = [fpath for fpath in glob.glob('{}/*'.format(self.installed_cache_dir)) if os.path.isdir(fpath)]
+        store = self.controller.get_disk_cache_store()
+
+        if store:
+            cached_pkgs = store.keys()
+        else:
+            cached_pkgs = {fpath.split('/')[-1] for fpath in glob.glob('{}/*'.format(self.installed_cache_dir)) if os.path.isdir(fpath)}
 
         not_cached_names = None
 
         self._update_progress(15, self.i18n['arch.task.disk_cache.checking'])
-        if cache_dirs:  # if there are cache data
+        if cached_pkgs:  # if there are cache data
             installed_names = pacman.list_installed_names()
-            cached_pkgs = {cache_dir.split('/')[-1] for cache_dir in cache_dirs}
 
             not_cached_names = installed_names.difference(cached_pkgs)
             self._update_progress(20, self.i18n['arch.task.disk_cache.checking'])
@@ -131,14 +141,15 @@ class ArchDiskCacheUpdater(Thread):
 
         saved = 0
 
-        pkgs = {p.name: p for p in installed if ((self.aur and p.repository == 'aur') or (self.repositories and p.repository != 'aur')) and not os.path.exists(p.get_disk_cache_path())}
+        pkgs = {p.name: p for p in installed if ((self.aur and p.repository == 'aur') or (self.repositories and p.repository != 'aur')) and
+                (p.name not in cached_pkgs if store else not os.path.exists(p.get_disk_cache_path()))}
         self.to_index = len(pkgs)
 
         # overwrite == True because the verification already happened
         self._update_progress(40, self.i18n['arch.task.disk_cache.reading_files'])
         saved += disk.write_several(pkgs=pkgs,
                                     after_desktop_files=self._notify_reading_files,
-                                    after_written=self.update_indexed, overwrite=True)
+                                    after_written=self.update_indexed, overwrite=True, store=store)
         self.task_man.update_progress(self.task_id, 100, None)
         self.task_man.finish_task(self.task_id)
 
@@ -162,7 +173,7 @@ class ArchCompilationOptimizer(Thread):
         self.optimizations = bool(arch_config['optimize'])
 
     def _is_ccache_installed(self) -> bool:
-        return bool(run_cmd('which ccache', print_error=False))
+        return capability.is_available('ccache')
 
     def _update_progress(self, progress: float, substatus: str = None):
         if self.task_man:
@@ -285,6 +296,11 @@ class ArchCompilationOptimizer(Thread):
             self.logger.info("Optimizations took {0:.2f} seconds".format(tf - ti))
             self.logger.info('Finished')
 
+    def register(self):
+        if self.task_man and self.optimizations:
+            self.task_man.register_task(self.task_id, self.i18n['arch.task.optimizing'].format(bold('makepkg.conf')), get_icon_path())
+
+    @process_lane(BACKGROUND)
     def run(self):
         if not self.optimizations:
             self.logger.info("Arch packages compilation optimizations are disabled")
@@ -295,9 +311,6 @@ class ArchCompilationOptimizer(Thread):
 
             self.logger.info('Finished')
         else:
-            if self.task_man:
-                self.task_man.register_task(self.task_id, self.i18n['arch.task.optimizing'].format(bold('makepkg.conf')), get_icon_path())
-
             self.optimize()
 
 
@@ -315,8 +328,11 @@ class RefreshMirrors(Thread):
     def _notify_output(self, output: str):
         self.taskman.update_output(self.task_id, output)
 
-    def run(self):
+    def register(self):
         self.taskman.register_task(self.task_id, self.i18n['arch.task.mirrors'], get_icon_path())
+
+    @process_lane(BACKGROUND)
+    def run(self):
         self.logger.info("Refreshing mirrors")
 
         handler = ProcessHandler()
@@ -348,24 +364,27 @@ class RefreshMirrors(Thread):
 
 class SyncDatabases(Thread):
 
-    def __init__(self, taskman: TaskManager, root_password: str, i18n: I18n, logger: logging.Logger, refresh_mirrors: RefreshMirrors = None):
+    def __init__(self, taskman: TaskManager, root_password: str, i18n: I18n, logger: logging.Logger):
         super(SyncDatabases, self).__init__(daemon=True)
         self.task_man = taskman
         self.i18n = i18n
         self.taskman = taskman
         self.task_id = "arch_dbsync"
         self.root_password = root_password
-        self.refresh_mirrors = refresh_mirrors
         self.logger = logger
 
-    def run(self) -> None:
-        self.logger.info("Synchronizing databases")
+    def register(self, waiting_mirrors: bool = False):
+        """
+        :param waiting_mirrors: if the databases will only be synchronized after the mirrors are refreshed
+        """
         self.taskman.register_task(self.task_id, self.i18n['arch.sync_databases.substatus'], get_icon_path())
 
-        if self.refresh_mirrors and self.refresh_mirrors.is_alive():
+        if waiting_mirrors:
             self.taskman.update_progress(self.task_id, 0, self.i18n['arch.task.sync_databases.waiting'].format('"{}"'.format(self.i18n['arch.task.mirrors'])))
-            self.refresh_mirrors.join()
 
+    @process_lane(BACKGROUND)
+    def run(self) -> None:
+        self.logger.info("Synchronizing databases")
         progress = 10
         dbs = pacman.get_databases()
         self.taskman.update_progress(self.task_id, progress, None)
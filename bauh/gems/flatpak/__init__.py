@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 
-from bauh.api.constants import CONFIG_PATH
+from bauh.api.constants import CONFIG_PATH, CACHE_PATH
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 SUGGESTIONS_FILE = 'https://raw.githubusercontent.com/vinifmor/bauh-files/master/flatpak/suggestions.txt'
@@ -9,3 +9,7 @@ CONFIG_FILE = '{}/flatpak.yml'.format(CONFIG_PATH)
 CONFIG_DIR = '{}/flatpak'.format(CONFIG_PATH)
 UPDATES_IGNORED_FILE = '{}/updates_ignored.txt'.format(CONFIG_DIR)
 EXPORTS_PATH = '{}/.local/share/flatpak/exports/share'.format(str(Path.home()))
+FLATPAK_CACHE_PATH = '{}/flatpak'.format(CACHE_PATH)
+APPSTREAM_INDEX_FILE = '{}/appstream.db'.format(FLATPAK_CACHE_PATH)
+INSTALLATION_PATHS = {'system': os.getenv('FLATPAK_SYSTEM_DIR', '/var/lib/flatpak'),
+                      'user': os.getenv('FLATPAK_USER_DIR', '{}/.local/share/flatpak'.format(str(Path.home())))}
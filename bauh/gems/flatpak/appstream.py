@@ -0,0 +1,348 @@
+"""
+Flatpak keeps the appstream data (name, summary, description, icons, releases...) of every configured remote at
+'<installation>/appstream/<remote>/<arch>/active/appstream.xml.gz'. This module streams those files once into an
+indexed SQLite store keyed by application id, so the metadata of the packages is available without one Flathub API
+request per application. A file is only parsed again after it changes (the remote's appstream is updated by flatpak).
+"""
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Generator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from bauh.commons import trace
+from bauh.gems.flatpak import INSTALLATION_PATHS
+
+SCHEMA_VERSION = 2
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+APPSTREAM_FILES = ('appstream.xml.gz', 'appstream.xml')  # by preference
+INSERT_BATCH_SIZE = 500
+RE_TERM_SEPARATOR = re.compile(r'[\W_]+')
+# how relevant a term found in each field is for the search ranking (exact matches count twice as much as prefix matches)
+TERM_WEIGHTS = (('name', 8), ('id', 4), ('keywords', 3), ('summary', 2))
+EXACT_ID_SCORE = 100  # searching for the application id
+
+
+def find_appstream_files(installation_paths: Dict[str, str] = INSTALLATION_PATHS) -> Dict[str, Tuple[str, str, str]]:
+    """
+    :return: the appstream file of each remote and architecture found -> (installation, remote, arch)
+    """
+    res = {}
+    for installation, install_path in installation_paths.items():
+        for arch_dir in sorted(glob.glob('{}/appstream/*/*/active'.format(install_path))):
+            for file_name in APPSTREAM_FILES:
+                file_path = '{}/{}'.format(arch_dir, file_name)
+
+                if os.path.isfile(file_path):
+                    arch_path = os.path.dirname(arch_dir)
+                    res[file_path] = (installation, os.path.basename(os.path.dirname(arch_path)), os.path.basename(arch_path))
+                    break
+
+    return res
+
+
+def _gen_signature(file_path: str) -> str:
+    # 'active' is a link to the directory of the deployed appstream commit
+    stat = os.stat(file_path)
+    return '{}:{}:{}'.format(os.path.realpath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def split_terms(text: Optional[str]) -> List[str]:
+    return [t for t in RE_TERM_SEPARATOR.split(text.lower()) if t] if text else []
+
+
+def map_terms(data: dict) -> Dict[str, int]:
+    """
+    :return: the searchable terms of an application and their weights
+    """
+    fields = {'name': split_terms(data.get('name')),
+              'id': split_terms(data['id']),
+              'keywords': [t for k in data.get('keywords') or () for t in split_terms(k)],
+              'summary': split_terms(data.get('summary'))}
+    terms = {}
+
+    for field, weight in TERM_WEIGHTS:
+        for term in fields[field]:
+            if terms.get(term, 0) < weight:
+                terms[term] = weight
+
+    return terms
+
+
+def find_text(elem: ElementTree.Element, path: str) -> Optional[str]:
+    """
+    :return: the text of the first untranslated element found
+    """
+    for child in elem.iterfind(path):
+        if XML_LANG not in child.attrib and child.text:
+            return child.text.strip()
+
+
+def _map_description(elem: ElementTree.Element) -> Optional[str]:
+    parts = []
+    for child in elem:
+        if XML_LANG in child.attrib:
+            continue
+
+        for translated in [li for li in child if XML_LANG in li.attrib]:  # list items
+            child.remove(translated)
+
+        child.tail = None
+        parts.append(ElementTree.tostring(child, encoding='unicode').strip())
+
+    return ''.join(parts) if parts else None
+
+
+def _map_icon(component: ElementTree.Element, appstream_dir: str) -> Optional[str]:
+    remote, cached = None, None  # (size, url)
+
+    for icon in component.iterfind('icon'):
+        if not icon.text:
+            continue
+
+        size = int(icon.get('width') or 64)
+        if icon.get('type') == 'remote':
+            if not remote or size > remote[0]:
+                remote = (size, icon.text.strip())
+        elif icon.get('type') == 'cached':
+            if not cached or size > cached[0]:
+                cached = (size, 'file://{}/icons/{}x{}/{}'.format(appstream_dir, size, size, icon.text.strip()))
+
+    if remote:
+        return remote[1]
+
+    if cached:
+        return cached[1]
+
+
+def map_component(component: ElementTree.Element, appstream_dir: str) -> Optional[dict]:
+    """
+    :return: the component data in the same format used by the manager or None if it is not a Flatpak bundle
+    """
+    ref = find_text(component, 'bundle')
+
+    if not ref or component.find('bundle').get('type', 'flatpak') != 'flatpak':
+        return
+
+    ref_split = ref.split('/')
+
+    if len(ref_split) < 2:
+        return
+
+    release = component.find('releases/release')
+    description = component.find('description')
+
+    return {'id': ref_split[1],
+            'name': find_text(component, 'name'),
+            'summary': find_text(component, 'summary'),
+            'description': _map_description(description) if description is not None else None,
+            'version': release.get('version') if release is not None else None,
+            'icon_url': _map_icon(component, appstream_dir),
+            'categories': [c.text.strip() for c in component.iterfind('categories/category') if c.text],
+            'keywords': [k.text.strip() for k in component.iterfind('keywords/keyword') if k.text and XML_LANG not in k.attrib],
+            'runtime': ref_split[0] == 'runtime',
+            'branch': ref_split[3] if len(ref_split) > 3 else None,
+            'license': find_text(component, 'project_license'),
+            'developer': find_text(component, 'developer_name'),
+            'homepage': find_text(component, "url[@type='homepage']")}
+
+
+def read_components(file_path: str) -> Generator[dict, None, None]:
+    """
+    Streams the components of an appstream file (compressed or not) without loading the whole document
+    """
+    appstream_dir = os.path.dirname(file_path)
+    with (gzip.open(file_path) if file_path.endswith('.gz') else open(file_path, 'rb')) as f:
+        root = None
+        for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+            if root is None:
+                root = elem
+            elif event == 'end' and elem.tag == 'component':
+                data = map_component(elem, appstream_dir)
+
+                if data:
+                    yield data
+
+                root.clear()  # the already read components are released
+
+
+class AppstreamIndex:
+
+    def __init__(self, file_path: str, logger: logging.Logger, installation_paths: Dict[str, str] = INSTALLATION_PATHS):
+        self.file_path = file_path
+        self.logger = logger
+        self.installation_paths = installation_paths
+        self.lock = Lock()
+        self._connection = None
+
+    def _open(self):
+        if self._connection:
+            return
+
+        Path(os.path.dirname(self.file_path)).mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.file_path, check_same_thread=False)
+
+        if self._connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            with self._connection:
+                self._connection.execute('DROP TABLE IF EXISTS sources')
+                self._connection.execute('DROP TABLE IF EXISTS apps')
+                self._connection.execute('DROP TABLE IF EXISTS terms')
+                self._connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, signature TEXT NOT NULL, '
+                                     'installation TEXT NOT NULL, remote TEXT NOT NULL, arch TEXT NOT NULL)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS apps (source TEXT NOT NULL, id TEXT NOT NULL, '
+                                     'remote TEXT NOT NULL, data TEXT NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS apps_id ON apps (id)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS apps_source ON apps (source)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS terms (source TEXT NOT NULL, term TEXT NOT NULL, '
+                                     'app INTEGER NOT NULL, weight INTEGER NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS terms_term ON terms (term)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS terms_source ON terms (source)')
+
+    def _index(self, file_path: str, signature: str, installation: str, remote: str, arch: str):
+        with trace.span('appstream.index', 'flatpak', file=file_path):
+            with self._connection:
+                self._connection.execute('DELETE FROM terms WHERE source = ?', (file_path,))
+                self._connection.execute('DELETE FROM apps WHERE source = ?', (file_path,))
+
+                terms = []
+                for data in read_components(file_path):
+                    app = self._connection.execute('INSERT INTO apps (source, id, remote, data) VALUES (?, ?, ?, ?)',
+                                                   (file_path, data['id'], remote, json.dumps(data))).lastrowid
+                    terms.extend((file_path, term, app, weight) for term, weight in map_terms(data).items())
+
+                    if len(terms) >= INSERT_BATCH_SIZE:
+                        self._connection.executemany('INSERT INTO terms (source, term, app, weight) VALUES (?, ?, ?, ?)', terms)
+                        terms.clear()
+
+                if terms:
+                    self._connection.executemany('INSERT INTO terms (source, term, app, weight) VALUES (?, ?, ?, ?)', terms)
+
+                self._connection.execute('INSERT OR REPLACE INTO sources (path, signature, installation, remote, arch) '
+                                         'VALUES (?, ?, ?, ?, ?)', (file_path, signature, installation, remote, arch))
+
+    def refresh(self) -> bool:
+        """
+        Indexes the new and changed appstream files and removes the data of the ones not available anymore
+        :return: if the index changed
+        """
+        with self.lock:
+            self._open()
+            stored = {path: sig for path, sig in self._connection.execute('SELECT path, signature FROM sources')}
+            changed = False
+
+            for file_path, (installation, remote, arch) in find_appstream_files(self.installation_paths).items():
+                try:
+                    signature = _gen_signature(file_path)
+
+                    if stored.pop(file_path, None) != signature:
+                        self.logger.info("Indexing the appstream data of the remote '{}' ({}): {}".format(remote, installation, file_path))
+                        self._index(file_path, signature, installation, remote, arch)
+                        changed = True
+                except (OSError, ElementTree.ParseError, sqlite3.Error):
+                    self.logger.warning("Could not index the appstream file '{}'".format(file_path))
+
+            if stored:  # remotes removed
+                with self._connection:
+                    self._connection.executemany('DELETE FROM terms WHERE source = ?', ((p,) for p in stored))
+                    self._connection.executemany('DELETE FROM apps WHERE source = ?', ((p,) for p in stored))
+                    self._connection.executemany('DELETE FROM sources WHERE path = ?', ((p,) for p in stored))
+
+                changed = True
+
+            return changed
+
+    def get(self, app_id: str, remote: Optional[str] = None) -> Optional[dict]:
+        """
+        :param remote: preferred remote when the application is available in several ones
+        :return: the application data with its 'remote' and 'arch'
+        """
+        try:
+            with self.lock:
+                self._open()
+                row = self._connection.execute('SELECT a.remote, s.arch, a.data FROM apps a JOIN sources s ON s.path = a.source '
+                                               'WHERE a.id = ? ORDER BY a.remote = ? DESC LIMIT 1', (app_id, remote)).fetchone()
+        except sqlite3.Error:
+            self.logger.warning("Could not read the appstream data of '{}' from '{}'".format(app_id, self.file_path))
+            return
+
+        if row:
+            data = json.loads(row[2])
+            data['remote'], data['arch'] = row[0], row[1]
+            return data
+
+    def has_data(self, installation: Optional[str] = None) -> bool:
+        """
+        :param installation: only checks the remotes of the installation ('user' or 'system')
+        """
+        with self.lock:
+            self._open()
+            return bool(self._connection.execute('SELECT 1 FROM apps a JOIN sources s ON s.path = a.source '
+                                                 'WHERE ? IS NULL OR s.installation = ? LIMIT 1',
+                                                 (installation, installation)).fetchone())
+
+    def search(self, words: str, installation: Optional[str] = None, limit: int = -1) -> List[dict]:
+        """
+        Finds the applications having terms starting with every word informed (id, name, keywords and summary).
+        The results are sorted by relevance: exact terms before prefixes and ids/names before summaries.
+        :param installation: only searches the remotes of the installation ('user' or 'system')
+        :return: the applications data with their 'remote' and 'arch'. The same id is returned once (the best match).
+        """
+        query_terms = set(split_terms(words))
+
+        if not query_terms:
+            return []
+
+        with self.lock:
+            self._open()
+            scores = None  # app -> score
+            for term in query_terms:
+                term_scores = {}
+                for app, weight, exact in self._connection.execute('SELECT t.app, t.weight, t.term = ? FROM terms t JOIN sources s ON s.path = t.source '
+                                                                   'WHERE t.term >= ? AND t.term < ? AND (? IS NULL OR s.installation = ?)',
+                                                                   (term, term, term + '\uffff', installation, installation)):
+                    score = weight * 2 if exact else weight
+                    if term_scores.get(app, 0) < score:
+                        term_scores[app] = score
+
+                if scores is None:
+                    scores = term_scores
+                else:  # every word must match
+                    scores = {app: score + term_scores[app] for app, score in scores.items() if app in term_scores}
+
+                if not scores:
+                    return []
+
+            ids = [*scores]
+            rows = []
+            for idx in range(0, len(ids), INSERT_BATCH_SIZE):
+                chunk = ids[idx:idx + INSERT_BATCH_SIZE]
+                rows.extend(self._connection.execute('SELECT a.rowid, a.remote, s.arch, a.data FROM apps a JOIN sources s ON s.path = a.source '
+                                                     'WHERE a.rowid IN ({})'.format(','.join('?' * len(chunk))), chunk))
+
+        query_id = words.strip().lower()
+        found = {}  # id -> (score, data)
+        for app, remote, arch, data in rows:
+            data = json.loads(data)
+            score = scores[app] + (EXACT_ID_SCORE if data['id'].lower() == query_id else 0)
+
+            if data['id'] not in found or found[data['id']][0] < score:
+                data['remote'], data['arch'] = remote, arch
+                found[data['id']] = (score, data)
+
+        res = [d for _, d in sorted(found.values(), key=lambda f: (-f[0], (f[1].get('name') or f[1]['id']).lower()))]
+        return res[:limit] if limit > 0 else res
+
+    def close(self):
+        with self.lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
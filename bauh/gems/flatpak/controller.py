@@ -1,11 +1,12 @@
 import os
 import re
+import sqlite3
 import traceback
 from datetime import datetime
 from math import floor
 from pathlib import Path
 from threading import Thread
-from typing import List, Set, Type, Tuple, Optional
+from typing import List, Set, Type, Tuple, Optional, Iterable
 
 from bauh.api.abstract.controller import SearchResult, SoftwareManager, ApplicationContext, UpgradeRequirements, \
     UpgradeRequirement, TransactionResult
@@ -19,10 +20,14 @@ from bauh.commons import user, internet
 from bauh.commons.config import save_config
 from bauh.commons.html import strip_html, bold
 from bauh.commons.system import ProcessHandler
-from bauh.gems.flatpak import flatpak, SUGGESTIONS_FILE, CONFIG_FILE, UPDATES_IGNORED_FILE, CONFIG_DIR, EXPORTS_PATH
+from bauh.gems.flatpak import flatpak, installation, SUGGESTIONS_FILE, CONFIG_FILE, UPDATES_IGNORED_FILE, CONFIG_DIR, EXPORTS_PATH, \
+    APPSTREAM_INDEX_FILE
+from bauh.gems.flatpak.appstream import AppstreamIndex
 from bauh.gems.flatpak.config import read_config
+from bauh.gems.flatpak.history import HistoryCache
 from bauh.gems.flatpak.constants import FLATHUB_API_URL
 from bauh.gems.flatpak.model import FlatpakApplication
+from bauh.gems.flatpak.summary import SummaryCache
 from bauh.gems.flatpak.worker import FlatpakAsyncDataLoader, FlatpakUpdateLoader
 
 DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
@@ -41,6 +46,10 @@ class FlatpakManager(SoftwareManager):
         self.http_client = context.http_client
         self.suggestions_cache = context.cache_factory.new()
         self.logger = context.logger
+        self.appstream = AppstreamIndex(APPSTREAM_INDEX_FILE, context.logger)
+        self.summaries = SummaryCache(context.http_client, context.logger)
+        self.history = HistoryCache(context.logger)
+        self._installed_info = {}  # (installation, id, branch) -> 'flatpak info' fields read during the session
 
     def get_managed_types(self) -> Set["type"]:
         return {FlatpakApplication}
@@ -54,7 +63,13 @@ class FlatpakManager(SoftwareManager):
         expired_data = api_data and api_data.get('expires_at') and api_data['expires_at'] <= datetime.utcnow()
 
         if not api_data or expired_data:
-            if not app.runtime:
+            appstream_data = self.appstream.get(app.id, app.origin) if not app.runtime else None
+
+            if appstream_data:
+                FlatpakAsyncDataLoader.fill(app, appstream_data, self.category_cache)
+                self.api_cache.add(app.id, app.get_data_to_cache())
+                app.status = PackageStatus.READY
+            elif not app.runtime:
                 if disk_loader:
                     disk_loader.fill(app)  # preloading cached disk data
 
@@ -81,6 +96,40 @@ class FlatpakManager(SoftwareManager):
 
         return remote_level
 
+    @staticmethod
+    def _map_appstream_app(data: dict) -> dict:
+        return {'name': data.get('name') or data['id'],
+                'description': data.get('summary'),
+                'id': data['id'],
+                'version': data.get('version'),
+                'latest_version': data.get('version'),
+                'branch': data.get('branch'),
+                'origin': data['remote'],
+                'runtime': data.get('runtime', False),
+                'arch': data.get('arch'),
+                'ref': None}  # unknown at this moment
+
+    def _has_appstream_data(self, installation: str) -> bool:
+        self._refresh_appstream()
+
+        try:
+            return self.appstream.has_data(installation)
+        except sqlite3.Error:
+            self.logger.error("Could not read the appstream index '{}'".format(self.appstream.file_path))
+            traceback.print_exc()
+            return False
+
+    def _search_index(self, words: str, installation: str, limit: int = -1) -> Optional[List[dict]]:
+        """
+        :return: the applications found on the appstream index or None if there is no appstream data for the installation
+        """
+        if self._has_appstream_data(installation):
+            try:
+                return [self._map_appstream_app(d) for d in self.appstream.search(words, installation, limit)]
+            except sqlite3.Error:
+                self.logger.error("Could not search for '{}' on the appstream index '{}'".format(words, self.appstream.file_path))
+                traceback.print_exc()
+
     def search(self, words: str, disk_loader: DiskCacheLoader, limit: int = -1, is_url: bool = False) -> SearchResult:
         if is_url:
             return SearchResult([], [], 0)
@@ -88,7 +137,10 @@ class FlatpakManager(SoftwareManager):
         remote_level = self._get_search_remote()
 
         res = SearchResult([], [], 0)
-        apps_found = flatpak.search(flatpak.get_version(), words, remote_level)
+        apps_found = self._search_index(words, remote_level, limit)
+
+        if apps_found is None:
+            apps_found = flatpak.search(flatpak.get_version(), words, remote_level)
 
         if apps_found:
             already_read = set()
@@ -109,28 +161,42 @@ class FlatpakManager(SoftwareManager):
         res.total = len(res.installed) + len(res.new)
         return res
 
-    def _add_updates(self, version: str, output: list):
-        output.append(flatpak.list_updates_as_str(version))
+    def _map_updates_by_summary(self, installed: List[dict], internet_available: bool) -> Optional[Set[str]]:
+        """
+        :return: the installed refs with updates as '{installation}/{ref}' or None if the remotes summaries are not available
+        """
+        if internet_available and not self.summaries.refresh_all(installed):
+            return
 
-    def read_installed(self, disk_loader: DiskCacheLoader, limit: int = -1, only_apps: bool = False, pkg_types: Set[Type[SoftwarePackage]] = None, internet_available: bool = None) -> SearchResult:
-        version = flatpak.get_version()
+        return self.summaries.map_updates(installed)
 
-        updates = []
+    def _refresh_appstream(self):
+        try:
+            self.appstream.refresh()
+        except:
+            self.logger.error("Could not refresh the appstream index '{}'".format(self.appstream.file_path))
+            traceback.print_exc()
 
-        if internet_available:
-            thread_updates = Thread(target=self._add_updates, args=(version, updates))
-            thread_updates.start()
-        else:
-            thread_updates = None
+    def _list_installed(self, version: str) -> List[dict]:
+        try:
+            return installation.list_installed()
+        except OSError:
+            self.logger.warning("Could not read the Flatpak installation directories. Listing the installed refs through 'flatpak list'")
+            traceback.print_exc()
+            return flatpak.list_installed(version)
+
+    def read_installed(self, disk_loader: DiskCacheLoader, limit: int = -1, only_apps: bool = False, pkg_types: Set[Type[SoftwarePackage]] = None, internet_available: bool = None) -> SearchResult:
+        version = flatpak.get_version()
+        self._refresh_appstream()
 
-        installed = flatpak.list_installed(version)
+        installed = self._list_installed(version)
         models = []
 
         if installed:
-            update_map = None
-            if thread_updates:
-                thread_updates.join()
-                update_map = updates[0]
+            updates = self._map_updates_by_summary(installed, internet_available)
+
+            # the updates are only read from the 'flatpak update' output if the summaries are not available
+            update_map = flatpak.list_updates_as_str(version) if updates is None and internet_available else None
 
             for app_json in installed:
                 model = self._map_to_model(app_json=app_json, installed=True,
@@ -138,7 +204,9 @@ class FlatpakManager(SoftwareManager):
                 model.update = None
                 models.append(model)
 
-                if update_map and (update_map['full'] or update_map['partial']):
+                if updates is not None:
+                    model.update = '{}/{}'.format(app_json['installation'], app_json['ref']) in updates
+                elif update_map and (update_map['full'] or update_map['partial']):
                     if version >= '1.4.0':
                         update_id = '{}/{}/{}'.format(app_json['id'], app_json['branch'], app_json['installation'])
 
@@ -190,6 +258,11 @@ class FlatpakManager(SoftwareManager):
                                                                              commit,
                                                                              pkg.installation,
                                                                              root_password))
+        self._forget_installed_info((pkg,))
+
+        if success:
+            pkg.commit = commit
+
         watcher.change_progress(100)
         return success
 
@@ -197,35 +270,68 @@ class FlatpakManager(SoftwareManager):
         super(FlatpakManager, self).clean_cache_for(pkg)
         self.api_cache.delete(pkg.id)
 
+    def _upgrade_transaction(self, pkgs: List[FlatpakApplication], installation: str, watcher: ProcessWatcher,
+                             related: bool = False, deps: bool = False, refs: Optional[List[str]] = None) -> bool:
+        """
+        Upgrades several packages of the same installation through a single 'flatpak update' process
+        :param refs: refs to update. Default: the refs of 'pkgs'
+        """
+        pkgs_by_id = {}
+        for pkg in pkgs:
+            pkgs_by_id.setdefault(pkg.id, pkg)
+
+        def _notify_ref(id_: str, position: int, total: int):
+            pkg = pkgs_by_id.get(id_)
+            label = '{} ({})'.format(pkg.name, pkg.version) if pkg else id_
+            watcher.change_status("{} {}{}...".format(self.i18n['manage_window.status.upgrading'], label,
+                                                      ' [{}/{}]'.format(position, total) if total > 1 else ''))
+            watcher.change_substatus('')
+
+        parser = flatpak.TransactionOutputParser(on_ref=_notify_ref,
+                                                 on_percent=lambda p: watcher.change_substatus('{}%'.format(p)))
+
+        if len(pkgs) == 1:
+            _notify_ref(pkgs[0].id, 1, 1)
+
+        try:
+            res, _ = ProcessHandler(watcher).handle_simple(flatpak.update(app_refs=refs if refs else [p.ref for p in pkgs],
+                                                                          installation=installation,
+                                                                          related=related,
+                                                                          deps=deps),
+                                                           output_handler=parser.handle)
+            watcher.change_substatus('')
+
+            if not res:
+                self.logger.warning("Could not upgrade {}".format(', '.join("'{}'".format(p.id) for p in pkgs)))
+
+            return res
+        except:
+            watcher.change_substatus('')
+            self.logger.error("An error occurred while upgrading {}".format(', '.join("'{}'".format(p.id) for p in pkgs)))
+            traceback.print_exc()
+            return False
+
     def upgrade(self, requirements: UpgradeRequirements, root_password: str, watcher: ProcessWatcher) -> bool:
         flatpak_version = flatpak.get_version()
 
         if not self._make_exports_dir(watcher):
             return False
 
+        transactions, partials = {}, []  # installation -> packages upgraded together
         for req in requirements.to_upgrade:
-            watcher.change_status("{} {} ({})...".format(self.i18n['manage_window.status.upgrading'], req.pkg.name, req.pkg.version))
-            related, deps = False, False
-            ref = req.pkg.ref
+            if req.pkg.partial and flatpak_version < '1.5':  # only upgradable through their base refs
+                partials.append(req.pkg)
+            else:
+                transactions.setdefault(req.pkg.installation, []).append(req.pkg)
 
-            if req.pkg.partial and flatpak_version < '1.5':
-                related, deps = True, True
-                ref = req.pkg.base_ref
+        self._forget_installed_info(req.pkg for req in requirements.to_upgrade)
 
-            try:
-                res, _ = ProcessHandler(watcher).handle_simple(flatpak.update(app_ref=ref,
-                                                                              installation=req.pkg.installation,
-                                                                              related=related,
-                                                                              deps=deps))
-
-                watcher.change_substatus('')
-                if not res:
-                    self.logger.warning("Could not upgrade '{}'".format(req.pkg.id))
-                    return False
-            except:
-                watcher.change_substatus('')
-                self.logger.error("An error occurred while upgrading '{}'".format(req.pkg.id))
-                traceback.print_exc()
+        for installation, pkgs in transactions.items():
+            if not self._upgrade_transaction(pkgs, installation, watcher):
+                return False
+
+        for pkg in partials:
+            if not self._upgrade_transaction([pkg], pkg.installation, watcher, related=True, deps=True, refs=[pkg.base_ref]):
                 return False
 
         watcher.change_substatus('')
@@ -237,6 +343,7 @@ class FlatpakManager(SoftwareManager):
             return TransactionResult.fail()
 
         uninstalled, _ = ProcessHandler(watcher).handle_simple(flatpak.uninstall(pkg.ref, pkg.installation))
+        self._forget_installed_info((pkg,))
 
         if uninstalled:
             if self.suggestions_cache:
@@ -247,11 +354,28 @@ class FlatpakManager(SoftwareManager):
 
         return TransactionResult.fail()
 
+    def _get_installed_info(self, id_: str, branch: str, installation: str) -> dict:
+        key = (installation, id_, branch)
+        info = self._installed_info.get(key)
+
+        if info is None:
+            info = flatpak.get_app_info_fields(id_, branch, installation)
+
+            if info:
+                self._installed_info[key] = info
+
+        return {**info}
+
+    def _forget_installed_info(self, pkgs: Iterable[FlatpakApplication]):
+        for pkg in pkgs:
+            for id_ in {pkg.id, pkg.base_id}:
+                self._installed_info.pop((pkg.installation, id_, pkg.branch), None)
+
     def get_info(self, app: FlatpakApplication) -> dict:
         if app.installed:
             version = flatpak.get_version()
             id_ = app.base_id if app.partial and version < '1.5' else app.id
-            app_info = flatpak.get_app_info_fields(id_, app.branch, app.installation)
+            app_info = self._get_installed_info(id_, app.branch, app.installation)
 
             if app.partial and version < '1.5':
                 app_info['id'] = app.id
@@ -296,8 +420,12 @@ class FlatpakManager(SoftwareManager):
                 return {}
 
     def get_history(self, pkg: FlatpakApplication) -> PackageHistory:
-        pkg.commit = flatpak.get_commit(pkg.id, pkg.branch, pkg.installation)
-        commits = flatpak.get_app_commits_data(pkg.ref, pkg.origin, pkg.installation)
+        if not pkg.commit:
+            pkg.commit = self._get_installed_info(pkg.id, pkg.branch, pkg.installation).get('commit')
+
+        latest = self.summaries.get_latest({'installation': pkg.installation, 'origin': pkg.origin, 'arch': pkg.arch,
+                                            'runtime': pkg.runtime, 'ref': pkg.ref})
+        commits = [{**c} for c in self.history.get_commits(pkg.installation, pkg.origin, pkg.ref, latest[0] if latest else None)]
 
         status_idx = 0
         commit_found = False
@@ -378,7 +506,7 @@ class FlatpakManager(SoftwareManager):
 
         # retrieving all installed so it will be possible to know the additional installed runtimes after the operation succeeds
         flatpak_version = flatpak.get_version()
-        installed = flatpak.list_installed(flatpak_version)
+        installed = self._list_installed(flatpak_version)
         installed_by_level = {'{}:{}:{}'.format(p['id'], p['name'], p['branch']) for p in installed if p['installation'] == pkg.installation} if installed else None
 
         if not self._make_exports_dir(handler.watcher):
@@ -419,7 +547,7 @@ class FlatpakManager(SoftwareManager):
 
         if installed:
             new_installed = [pkg]
-            current_installed = flatpak.list_installed(flatpak_version)
+            current_installed = self._list_installed(flatpak_version)
             current_installed_by_level = [p for p in current_installed if p['installation'] == pkg.installation] if current_installed else None
 
             if current_installed_by_level and (not installed_by_level or len(current_installed_by_level) > len(installed_by_level) + 1):
@@ -449,6 +577,7 @@ class FlatpakManager(SoftwareManager):
 
     def prepare(self, task_manager: TaskManager, root_password: str, internet_available: bool):
         Thread(target=read_config, args=(True,), daemon=True).start()
+        Thread(target=self._refresh_appstream, daemon=True).start()
 
     def list_updates(self, internet_available: bool) -> List[PackageUpdate]:
         updates = []
@@ -461,6 +590,13 @@ class FlatpakManager(SoftwareManager):
 
             for app in to_update:
                 if app.is_application():
+                    appstream_data = self.appstream.get(app.id, app.origin)
+
+                    if appstream_data and appstream_data.get('version'):
+                        app.version = appstream_data['version']
+                        app.latest_version = app.version
+                        continue
+
                     loader = FlatpakUpdateLoader(app=app, http_client=self.context.http_client)
                     loader.start()
                     loaders.append(loader)
@@ -493,6 +629,7 @@ class FlatpakManager(SoftwareManager):
             self.logger.info("Mapping suggestions")
             remote_level = self._get_search_remote()
             installed = {i.id for i in self.read_installed(disk_loader=None).installed} if filter_installed else None
+            indexed = self._has_appstream_data(remote_level)
 
             for line in file.text.split('\n'):
                 if line:
@@ -510,7 +647,11 @@ class FlatpakManager(SoftwareManager):
                         if cached_sug:
                             res.append(cached_sug)
                         else:
-                            app_json = flatpak.search(cli_version, appid, remote_level, app_id=True)
+                            if indexed:
+                                appstream_data = self.appstream.get(appid)
+                                app_json = [self._map_appstream_app(appstream_data)] if appstream_data else None
+                            else:
+                                app_json = flatpak.search(cli_version, appid, remote_level, app_id=True)
 
                             if app_json:
                                 model = PackageSuggestion(self._map_to_model(app_json[0], False, None), priority)
@@ -583,10 +724,15 @@ class FlatpakManager(SoftwareManager):
     def get_upgrade_requirements(self, pkgs: List[FlatpakApplication], root_password: str, watcher: ProcessWatcher) -> UpgradeRequirements:
         flatpak_version = flatpak.get_version()
 
-        user_pkgs, system_pkgs = [], []
+        user_pkgs, system_pkgs = [], []  # download sizes not published in the summaries
 
         for pkg in pkgs:
-            if pkg.installation == 'user':
+            latest = self.summaries.get_latest({'installation': pkg.installation, 'origin': pkg.origin, 'arch': pkg.arch,
+                                                'runtime': pkg.runtime, 'ref': pkg.ref})
+
+            if latest and latest[1] is not None:
+                pkg.size = latest[1]
+            elif pkg.installation == 'user':
                 user_pkgs.append(pkg)
             else:
                 system_pkgs.append(pkg)
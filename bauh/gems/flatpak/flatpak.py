@@ -3,15 +3,20 @@ import re
 import subprocess
 import traceback
 from datetime import datetime
-from typing import List, Dict, Set, Iterable, Optional
+from typing import List, Dict, Set, Iterable, Optional, Callable, Generator
 
 from bauh.api.exception import NoInternetException
+from bauh.commons import capability
 from bauh.commons.system import new_subprocess, run_cmd, SimpleProcess, ProcessHandler
 from bauh.commons.util import size_to_byte
 from bauh.gems.flatpak import EXPORTS_PATH
 
 RE_SEVERAL_SPACES = re.compile(r'\s+')
-RE_COMMIT = re.compile(r'(Latest commit|Commit)\s*:\s*(.+)')
+RE_TRANSACTION_OP = re.compile(r'^(\d+)\.\s+(?:\[.\]\s+)?([\w.\-]+)\s')  # table lines: ' 1. [ ] org.gnome.Platform  3.36  u  flathub'
+RE_TRANSACTION_STEP = re.compile(r'^(?:Updating|Installing)\s+(\d+)/(\d+)')  # flatpak >= 1.5: 'Updating 1/2…'
+RE_TRANSACTION_REF = re.compile(r'^(?:Updating|Installing):?\s+(?:(?:app|runtime)/)?([\w.\-]+)/')  # flatpak < 1.5: 'Updating: org.gimp.GIMP/x86_64/stable from flathub'
+RE_TRANSACTION_PERCENT = re.compile(r'(\d{1,3})%')
+RE_LOG_FIELD = re.compile(r'^\s*(Commit|Subject|Date)\s*:\s(.+)')
 
 
 def get_app_info_fields(app_id: str, branch: str, installation: str, fields: List[str] = [], check_runtime: bool = False):
@@ -61,15 +66,18 @@ def get_fields(app_id: str, branch: str, fields: List[str]) -> List[str]:
 
 
 def is_installed():
-    version = get_version()
-    return False if version is None else True
+    return capability.is_available('flatpak')
 
 
-def get_version():
+def _read_version() -> Optional[str]:
     res = run_cmd('{} --version'.format('flatpak'), print_error=False)
     return res.split(' ')[1].strip() if res else None
 
 
+def get_version():
+    return capability.get_tool_data('flatpak', 'version', _read_version)
+
+
 def get_app_info(app_id: str, branch: str, installation: str):
     try:
         return run_cmd('{} info {} {}'.format('flatpak', app_id, branch, '--{}'.format(installation)))
@@ -78,15 +86,6 @@ def get_app_info(app_id: str, branch: str, installation: str):
         return ''
 
 
-def get_commit(app_id: str, branch: str, installation: str) -> Optional[str]:
-    info = run_cmd('flatpak info {} {} --{}'.format(app_id, branch, installation))
-
-    if info:
-        commits = RE_COMMIT.findall(info)
-        if commits:
-            return commits[0][1].strip()
-
-
 def list_installed(version: str) -> List[dict]:
 
     apps = []
@@ -154,8 +153,11 @@ def list_installed(version: str) -> List[dict]:
     return apps
 
 
-def update(app_ref: str, installation: str, related: bool = False, deps: bool = False) -> SimpleProcess:
-    cmd = ['flatpak', 'update', '-y', app_ref, '--{}'.format(installation)]
+def update(app_refs: List[str], installation: str, related: bool = False, deps: bool = False) -> SimpleProcess:
+    """
+    :param app_refs: refs upgraded in a single transaction
+    """
+    cmd = ['flatpak', 'update', '-y', *app_refs, '--{}'.format(installation)]
 
     if not related:
         cmd.append('--no-related')
@@ -166,6 +168,62 @@ def update(app_ref: str, installation: str, related: bool = False, deps: bool =
     return SimpleProcess(cmd=cmd, extra_paths={EXPORTS_PATH}, shell=True)
 
 
+class TransactionOutputParser:
+    """
+    Follows the output of a 'flatpak update' transaction with several refs and notifies which one is being handled
+    """
+
+    def __init__(self, on_ref: Callable[[str, int, int], None], on_percent: Optional[Callable[[int], None]] = None):
+        """
+        :param on_ref: called with the id being handled, its position and the number of operations (0 if unknown)
+        :param on_percent: called with the download percentage of the current operation
+        """
+        self.on_ref = on_ref
+        self.on_percent = on_percent
+        self.ops = {}  # position -> id
+        self.current = None
+        self._last_percent = None
+
+    def _set_current(self, id_: str, position: int, total: int):
+        if id_ != self.current:
+            self.current = id_
+            self._last_percent = None
+            self.on_ref(id_, position, total)
+
+    def handle(self, line: str):
+        op = RE_TRANSACTION_OP.match(line)
+
+        if op:
+            self.ops[int(op.group(1))] = op.group(2)
+            return
+
+        step = RE_TRANSACTION_STEP.match(line)
+
+        if step:
+            position = int(step.group(1))
+            id_ = self.ops.get(position)
+
+            if id_:
+                self._set_current(id_, position, int(step.group(2)))
+        else:
+            ref = RE_TRANSACTION_REF.match(line)
+
+            if ref and ref.group(1) != self.current:  # the old versions do not print the operations table
+                position = len(self.ops) + 1
+                self.ops[position] = ref.group(1)
+                self._set_current(ref.group(1), position, 0)
+
+        if self.on_percent and self.current:
+            percents = RE_TRANSACTION_PERCENT.findall(line)
+
+            if percents:
+                percent = int(percents[-1])
+
+                if percent != self._last_percent:
+                    self._last_percent = percent
+                    self.on_percent(percent)
+
+
 def uninstall(app_ref: str, installation: str) -> SimpleProcess:
     return SimpleProcess(cmd=['flatpak', 'uninstall', app_ref, '-y', '--{}'.format(installation)],
                          extra_paths={EXPORTS_PATH},
@@ -245,30 +303,49 @@ def get_app_commits(app_ref: str, origin: str, installation: str, handler: Proce
         raise NoInternetException()
 
 
-def get_app_commits_data(app_ref: str, origin: str, installation: str) -> List[dict]:
-    log = run_cmd('{} remote-info --log {} {} --{}'.format('flatpak', origin, app_ref, installation))
+def map_commits(lines: Iterable[str], stop_at: Optional[str] = None) -> Generator[dict, None, None]:
+    """
+    Maps the 'flatpak remote-info --log' output lines to commits (newest first)
+    :param stop_at: the commit at which the mapping stops (included)
+    """
+    commit = {}
+    for line in lines:
+        field = RE_LOG_FIELD.match(line)
 
-    if not log:
-        raise NoInternetException()
+        if field:
+            attr = field.group(1).lower()
+            commit[attr] = field.group(2).strip()
 
-    res = re.findall(r'(Commit|Subject|Date):\s(.+)', log)
+            if attr == 'date':
+                commit[attr] = datetime.strptime(commit[attr], '%Y-%m-%d %H:%M:%S +0000')
 
-    commits = []
+            if len(commit) == 3:
+                yield commit
 
-    commit = {}
+                if stop_at and commit['commit'] == stop_at:
+                    return
 
-    for idx, data in enumerate(res):
-        attr = data[0].strip().lower()
-        commit[attr] = data[1].strip()
+                commit = {}
 
-        if attr == 'date':
-            commit[attr] = datetime.strptime(commit[attr], '%Y-%m-%d %H:%M:%S +0000')
 
-        if (idx + 1) % 3 == 0:
-            commits.append(commit)
-            commit = {}
+def read_app_commits(app_ref: str, origin: str, installation: str, stop_at: Optional[str] = None) -> Optional[List[dict]]:
+    """
+    Reads the commits log of the remote ref. The log is fetched from the newest commit to the oldest one, so the
+    process is finished as soon as 'stop_at' is read (avoiding to fetch the older commits).
+    :param stop_at: a known commit. It is returned as the last element when found
+    :return: the commits (newest first) or None if the log could not be read
+    """
+    proc = new_subprocess(['flatpak', 'remote-info', '--log', origin, app_ref, '--{}'.format(installation)])
+
+    try:
+        commits = list(map_commits((l.decode() for l in proc.stdout), stop_at))
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+        proc.wait()
 
-    return commits
+    return commits if commits else None
 
 
 def search(version: str, word: str, installation: str, app_id: bool = False) -> List[dict]:
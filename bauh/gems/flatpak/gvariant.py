@@ -0,0 +1,175 @@
+"""
+A minimal reader of serialized GVariant data (https://developer.gnome.org/glib/stable/gvariant-format-2.pdf),
+enough to read the OSTree files used by Flatpak (e.g: summaries). Maybe types are not supported.
+"""
+import struct
+from typing import Any, List, Optional, Tuple
+
+FIXED_SIZES = {'b': 1, 'y': 1, 'n': 2, 'q': 2, 'i': 4, 'u': 4, 'h': 4, 'x': 8, 't': 8, 'd': 8}
+SIGNED = {'n', 'i', 'x'}
+STRINGS = {'s', 'o', 'g'}
+
+
+def parse_type(signature: str, idx: int = 0) -> Tuple[Any, int]:
+    """
+    :return: the type tree of the first complete type found at 'idx' and the index after it
+    """
+    char = signature[idx]
+
+    if char in FIXED_SIZES or char in STRINGS or char == 'v':
+        return char, idx + 1
+
+    if char == 'a':
+        elem, end = parse_type(signature, idx + 1)
+        return ('a', elem), end
+
+    if char in ('(', '{'):
+        members, end = [], idx + 1
+
+        while signature[end] not in (')', '}'):
+            member, end = parse_type(signature, end)
+            members.append(member)
+
+        return (char, members), end + 1
+
+    raise ValueError("Unsupported GVariant type '{}' in '{}'".format(char, signature))
+
+
+def _alignment(type_) -> int:
+    if isinstance(type_, str):
+        if type_ == 'v':
+            return 8
+
+        return FIXED_SIZES.get(type_, 1)
+
+    if type_[0] == 'a':
+        return _alignment(type_[1])
+
+    return max((_alignment(m) for m in type_[1]), default=1)
+
+
+def _fixed_size(type_) -> Optional[int]:
+    if isinstance(type_, str):
+        return FIXED_SIZES.get(type_)
+
+    if type_[0] == 'a':
+        return
+
+    size = 0
+    for member in type_[1]:
+        member_size = _fixed_size(member)
+
+        if member_size is None:
+            return
+
+        size = _align(size, _alignment(member)) + member_size
+
+    return _align(size, _alignment(type_)) if size else 1  # an empty tuple has 1 byte
+
+
+def _align(pos: int, alignment: int) -> int:
+    return pos + (-pos % alignment)
+
+
+def _offset_size(container_size: int) -> int:
+    if container_size <= 0xff:
+        return 1
+    elif container_size <= 0xffff:
+        return 2
+    elif container_size <= 0xffffffff:
+        return 4
+
+    return 8
+
+
+def _read_offset(data: bytes, pos: int, size: int) -> int:
+    return int.from_bytes(data[pos:pos + size], 'little')  # the framing offsets are always little-endian
+
+
+class Reader:
+
+    def __init__(self, byteorder: str = 'little'):
+        """
+        :param byteorder: of the numbers. OSTree stores them as big-endian.
+        """
+        self.byteorder = byteorder
+
+    def read(self, type_, data: bytes) -> Any:
+        """
+        :param type_: a signature (e.g: 'a{sv}') or a type tree returned by 'parse_type'
+        """
+        if isinstance(type_, str) and len(type_) > 1:
+            type_ = parse_type(type_)[0]
+
+        if isinstance(type_, str):
+            return self._read_basic(type_, data)
+
+        if type_[0] == 'a':
+            return self._read_array(type_[1], data)
+
+        members = self._read_members(type_[1], data)
+        return tuple(members) if type_[0] == '(' else members
+
+    def _read_basic(self, type_: str, data: bytes) -> Any:
+        if type_ in STRINGS:
+            return data[:-1].decode() if data else ''
+
+        if type_ == 'v':
+            sep = data.rfind(b'\0')
+            return self.read(data[sep + 1:].decode(), data[:sep])
+
+        if type_ == 'b':
+            return data[:1] == b'\x01'
+
+        if type_ == 'd':
+            return struct.unpack('>d' if self.byteorder == 'big' else '<d', data[:8])[0]
+
+        return int.from_bytes(data[:FIXED_SIZES[type_]], self.byteorder, signed=type_ in SIGNED)
+
+    def _read_array(self, elem, data: bytes) -> Any:
+        elem_size = _fixed_size(elem)
+
+        if elem == 'y':
+            return bytes(data)
+
+        if elem_size is not None:
+            items = [self.read(elem, data[pos:pos + elem_size]) for pos in range(0, len(data) - elem_size + 1, elem_size)]
+        elif not data:
+            items = []
+        else:
+            offset_size = _offset_size(len(data))
+            offsets_start = _read_offset(data, len(data) - offset_size, offset_size)
+            items, pos = [], 0
+
+            for offset_pos in range(offsets_start, len(data), offset_size):
+                end = _read_offset(data, offset_pos, offset_size)
+                pos = _align(pos, _alignment(elem))
+                items.append(self.read(elem, data[pos:end]))
+                pos = end
+
+        if not isinstance(elem, str) and elem[0] == '{':
+            return dict(items)
+
+        return items
+
+    def _read_members(self, members: list, data: bytes) -> List[Any]:
+        offset_size = _offset_size(len(data))
+        frame_end, pos = len(data), 0
+        res = []
+
+        for idx, member in enumerate(members):
+            pos = _align(pos, _alignment(member))
+            member_size = _fixed_size(member)
+
+            if member_size is not None:
+                end = pos + member_size
+            elif idx == len(members) - 1:
+                end = frame_end
+            else:
+                frame_end -= offset_size
+                end = _read_offset(data, frame_end, offset_size)
+
+            res.append(self.read(member, data[pos:end]))
+            pos = end
+
+        return res
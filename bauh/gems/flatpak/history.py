@@ -0,0 +1,90 @@
+"""
+Caches the commits log of the remote refs at 'HISTORY_DIR' (one JSON file per ref). The published commits never change,
+so only the commits newer than the cached head are fetched when the remote publishes something new.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from bauh.api.exception import NoInternetException
+from bauh.gems.flatpak import flatpak, FLATPAK_CACHE_PATH
+
+HISTORY_DIR = '{}/history'.format(FLATPAK_CACHE_PATH)
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class HistoryCache:
+
+    def __init__(self, logger: logging.Logger, cache_dir: str = HISTORY_DIR):
+        self.logger = logger
+        self.cache_dir = cache_dir
+
+    def _get_file_path(self, installation: str, origin: str, ref: str) -> str:
+        return '{}/{}/{}/{}.json'.format(self.cache_dir, installation, origin, ref)
+
+    def read(self, installation: str, origin: str, ref: str) -> Optional[List[dict]]:
+        """
+        :return: the cached commits (newest first) or None if not cached
+        """
+        file_path = self._get_file_path(installation, origin, ref)
+
+        if not os.path.exists(file_path):
+            return
+
+        try:
+            with open(file_path) as f:
+                commits = json.loads(f.read())
+
+            for commit in commits:
+                commit['date'] = datetime.strptime(commit['date'], DATE_FORMAT)
+
+            return commits
+        except (OSError, ValueError, KeyError, TypeError):
+            self.logger.warning("Could not read the cached history file '{}'".format(file_path))
+
+    def write(self, installation: str, origin: str, ref: str, commits: List[dict]):
+        file_path = self._get_file_path(installation, origin, ref)
+
+        try:
+            Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+            temp_path = '{}.tmp'.format(file_path)
+
+            with open(temp_path, 'w+') as f:
+                f.write(json.dumps([{**c, 'date': c['date'].strftime(DATE_FORMAT)} for c in commits]))
+
+            os.replace(temp_path, file_path)
+        except OSError:
+            self.logger.warning("Could not write the history file '{}'".format(file_path))
+
+    def get_commits(self, installation: str, origin: str, ref: str, latest_commit: Optional[str] = None) -> List[dict]:
+        """
+        :param latest_commit: the latest commit published by the remote (if known). The log is not fetched when it is the cached head.
+        :return: the commits of the remote ref (newest first)
+        """
+        cached = self.read(installation, origin, ref)
+        head = cached[0]['commit'] if cached else None
+
+        if head and head == latest_commit:
+            return cached
+
+        new_commits = flatpak.read_app_commits(ref, origin, installation, stop_at=head)
+
+        if not new_commits:
+            if cached:
+                self.logger.warning("Could not read the commits log of '{}'. Returning the cached one".format(ref))
+                return cached
+
+            raise NoInternetException()
+
+        if head and new_commits[-1]['commit'] == head:
+            commits = [*new_commits[:-1], *cached]
+        else:  # not found or nothing cached
+            commits = new_commits
+
+        if all(c['commit'] != '(null)' for c in commits):  # old Flatpak versions may not inform the latest commit
+            self.write(installation, origin, ref, commits)
+
+        return commits
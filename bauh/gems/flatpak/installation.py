@@ -0,0 +1,100 @@
+"""
+Reads the refs deployed on the Flatpak installations directly from their directories, instead of parsing the
+'flatpak list' output (which changes between versions). Every deployed ref has the layout:
+    <installation>/<app|runtime>/<id>/<arch>/<branch>/active -> <commit>
+        metadata
+        deploy  (GVariant starting with the origin and the commit as NUL-terminated strings)
+        files/share/app-info/xmls/<id>.xml.gz or files/share/metainfo/<id>.*.xml  (appdata)
+"""
+import gzip
+import os
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+from bauh.gems.flatpak import INSTALLATION_PATHS
+from bauh.gems.flatpak.appstream import find_text
+
+APPDATA_FILES = ('files/share/app-info/xmls/{id}.xml.gz', 'files/share/metainfo/{id}.metainfo.xml',
+                 'files/share/metainfo/{id}.appdata.xml', 'files/share/appdata/{id}.appdata.xml')
+
+
+def read_origin(deploy_dir: str) -> Optional[str]:
+    with open('{}/deploy'.format(deploy_dir), 'rb') as f:
+        origin = f.read().split(b'\0', 1)[0]
+
+    return origin.decode() if origin else None
+
+
+def read_appdata(deploy_dir: str, id_: str) -> Optional[dict]:
+    """
+    :return: the name, summary and latest release version declared by the ref or None if it has no appdata
+    """
+    for file_pattern in APPDATA_FILES:
+        file_path = '{}/{}'.format(deploy_dir, file_pattern.format(id=id_))
+
+        if not os.path.isfile(file_path):
+            continue
+
+        try:
+            with (gzip.open(file_path) if file_path.endswith('.gz') else open(file_path, 'rb')) as f:
+                root = ElementTree.parse(f).getroot()
+        except (OSError, ElementTree.ParseError):
+            continue
+
+        component = root if root.tag == 'component' else root.find('component')
+
+        if component is not None:
+            release = component.find('releases/release')
+            return {'name': find_text(component, 'name'),
+                    'summary': find_text(component, 'summary'),
+                    'version': release.get('version') if release is not None else None}
+
+
+def read_ref(installation: str, kind: str, id_: str, arch: str, branch: str, deploy_dir: str) -> dict:
+    """
+    :return: the ref data in the same format returned by 'flatpak.list_installed'
+    """
+    runtime = kind == 'runtime'
+    appdata = read_appdata(deploy_dir, id_) or {}
+
+    return {'id': id_,
+            'name': appdata.get('name') or id_.split('.')[-1],
+            'ref': '{}/{}/{}'.format(id_, arch, branch),
+            'arch': arch,
+            'branch': branch,
+            'description': appdata.get('summary'),
+            'origin': read_origin(deploy_dir),
+            'runtime': runtime,
+            'installation': installation,
+            'version': appdata.get('version') or (branch if runtime else None),
+            'commit': os.path.basename(os.readlink(deploy_dir)) if os.path.islink(deploy_dir) else None}
+
+
+def list_installed(installation_paths: Dict[str, str] = INSTALLATION_PATHS) -> List[dict]:
+    """
+    :return: the deployed refs of every installation
+    """
+    res = []
+    for installation, install_path in installation_paths.items():
+        for kind in ('app', 'runtime'):
+            kind_dir = '{}/{}'.format(install_path, kind)
+
+            if not os.path.isdir(kind_dir):
+                continue
+
+            for id_ in sorted(os.listdir(kind_dir)):
+                id_dir = '{}/{}'.format(kind_dir, id_)
+
+                for arch in sorted(os.listdir(id_dir)):
+                    arch_dir = '{}/{}'.format(id_dir, arch)
+
+                    if arch == 'current' or not os.path.isdir(arch_dir):  # 'current' links to the default branch
+                        continue
+
+                    for branch in sorted(os.listdir(arch_dir)):
+                        deploy_dir = '{}/{}/active'.format(arch_dir, branch)
+
+                        if os.path.isfile('{}/metadata'.format(deploy_dir)):
+                            res.append(read_ref(installation, kind, id_, arch, branch, deploy_dir))
+
+    return res
@@ -54,6 +54,9 @@ class FlatpakApplication(SoftwarePackage):
     def get_disk_cache_path(self):
         return super(FlatpakApplication, self).get_disk_cache_path() + '/installed/' + self.id
 
+    def get_disk_cache_store_path(self) -> str:
+        return super(FlatpakApplication, self).get_disk_cache_path() + '/installed.db'
+
     def get_data_to_cache(self):
         return {
             'description': self.description,
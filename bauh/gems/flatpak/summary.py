@@ -0,0 +1,231 @@
+"""
+Detects the Flatpak updates comparing the commit deployed of each ref with the latest commit published in the
+OSTree summary of its remote. The summaries are cached at 'SUMMARIES_DIR' and refreshed through conditional requests,
+so the network is only used when a remote publishes something new. Two formats are supported:
+    - indexed summaries (flatpak >= 1.9 repositories, like Flathub): 'summary.idx' pointing to one
+      subsummary per architecture at 'summaries/<checksum>.gz'
+    - a single 'summary' file
+"""
+import configparser
+import logging
+import os
+import re
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bauh.api.http import HttpClient
+from bauh.commons import trace
+from bauh.commons.download import download_if_modified, write_file
+from bauh.gems.flatpak import INSTALLATION_PATHS, FLATPAK_CACHE_PATH
+from bauh.gems.flatpak.gvariant import Reader
+
+SUMMARIES_DIR = '{}/summaries'.format(FLATPAK_CACHE_PATH)
+SUMMARY_TYPE = '(a(s(taya{sv}))a{sv})'
+SUMMARY_INDEX_TYPE = '(a{s(ayaaya{sv})}a{sv})'
+RE_REMOTE_SECTION = re.compile(r'^remote "(.+)"$')
+
+OSTREE_READER = Reader(byteorder='big')  # OSTree and Flatpak store the numbers as big-endian
+
+
+def read_remotes(install_path: str) -> Dict[str, str]:
+    """
+    :return: the URL of each enabled remote configured for the installation
+    """
+    config = configparser.ConfigParser(interpolation=None, strict=False)
+    config.read('{}/repo/config'.format(install_path))
+
+    res = {}
+    for section in config.sections():
+        remote = RE_REMOTE_SECTION.match(section)
+
+        if remote and config[section].get('url') and config[section].get('xa.disable', 'false') != 'true':
+            res[remote.group(1)] = config[section]['url'].rstrip('/')
+
+    return res
+
+
+def parse_summary(data: bytes) -> Dict[str, Tuple[str, Optional[int]]]:
+    """
+    :return: the latest commit and download size (if known) of each ref (e.g: 'app/org.gimp.GIMP/x86_64/stable')
+    """
+    refs, metadata = OSTREE_READER.read(SUMMARY_TYPE, data)
+    cache = metadata.get('xa.cache') or {}  # single summaries: ref -> (installed size, download size, metadata)
+
+    res = {}
+    for ref, (_, checksum, ref_metadata) in refs:
+        ref_data = ref_metadata.get('xa.data') or cache.get(ref)  # subsummaries: (installed size, download size, metadata)
+        res[ref] = (checksum.hex(), ref_data[1] if ref_data else None)
+
+    return res
+
+
+def parse_summary_index(data: bytes) -> Dict[str, str]:
+    """
+    :return: the checksum of the subsummary available for each architecture
+    """
+    subsummaries, _ = OSTREE_READER.read(SUMMARY_INDEX_TYPE, data)
+    return {name: checksum.hex() for name, (checksum, _, __) in subsummaries.items()}
+
+
+def _read_file(file_path: str) -> bytes:
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+class SummaryCache:
+
+    def __init__(self, http_client: HttpClient, logger: logging.Logger, cache_dir: str = SUMMARIES_DIR,
+                 installation_paths: Dict[str, str] = INSTALLATION_PATHS):
+        self.http_client = http_client
+        self.logger = logger
+        self.cache_dir = cache_dir
+        self.installation_paths = installation_paths
+        self._parsed = {}  # file path -> (modification time, refs)
+        self._lock = Lock()
+
+    def _get_remote_dir(self, installation: str, remote: str) -> str:
+        return '{}/{}/{}'.format(self.cache_dir, installation, remote)
+
+    def refresh(self, installation: str, remote: str, url: str, arches: Iterable[str]) -> bool:
+        """
+        :return: if a summary of the remote is available for all the informed architectures
+        """
+        remote_dir = self._get_remote_dir(installation, remote)
+
+        with trace.span('summary.refresh', 'flatpak', remote=remote):
+            index_status = download_if_modified(self.http_client, '{}/summary.idx'.format(url), '{}/summary.idx'.format(remote_dir))
+
+            if index_status in (200, 304):
+                index = parse_summary_index(_read_file('{}/summary.idx'.format(remote_dir)))
+                available = True
+
+                for arch in arches:
+                    checksum = index.get(arch)
+
+                    if not checksum:
+                        available = False
+                        continue
+
+                    sub_path = '{}/{}.sub'.format(remote_dir, arch)
+
+                    # the subsummaries are immutable (named after their checksum)
+                    if self._read_checksum(sub_path) != checksum:
+                        if download_if_modified(self.http_client, '{}/summaries/{}.gz'.format(url, checksum), sub_path,
+                                                conditional=False) != 200:
+                            available = False
+                            continue
+
+                        write_file('{}.checksum'.format(sub_path), checksum.encode())
+
+                return available
+
+            if index_status == 404:  # not indexed
+                for file_name in ('summary.idx', 'summary.idx.json'):
+                    if os.path.exists('{}/{}'.format(remote_dir, file_name)):
+                        os.remove('{}/{}'.format(remote_dir, file_name))
+
+                return download_if_modified(self.http_client, '{}/summary'.format(url), '{}/summary'.format(remote_dir)) in (200, 304)
+
+            return False
+
+    @staticmethod
+    def _read_checksum(sub_path: str) -> Optional[str]:
+        try:
+            return _read_file('{}.checksum'.format(sub_path)).decode().strip() if os.path.exists(sub_path) else None
+        except OSError:
+            return
+
+    def _parse(self, file_path: str) -> Optional[Dict[str, Tuple[str, Optional[int]]]]:
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        with self._lock:
+            parsed = self._parsed.get(file_path)
+
+            if parsed and parsed[0] == mtime:
+                return parsed[1]
+
+        try:
+            with trace.span('summary.parse', 'flatpak', file=file_path):
+                refs = parse_summary(_read_file(file_path))
+        except (OSError, ValueError, IndexError, TypeError):
+            self.logger.warning("Could not read the Flatpak summary '{}'".format(file_path))
+            return
+
+        with self._lock:
+            self._parsed[file_path] = (mtime, refs)
+
+        return refs
+
+    def read(self, installation: str, remote: str, arch: str) -> Optional[Dict[str, Tuple[str, Optional[int]]]]:
+        """
+        :return: the refs published by the remote for the architecture (from the cached summaries) or None if not cached
+        """
+        remote_dir = self._get_remote_dir(installation, remote)
+
+        if os.path.exists('{}/summary.idx'.format(remote_dir)):
+            return self._parse('{}/{}.sub'.format(remote_dir, arch))
+
+        return self._parse('{}/summary'.format(remote_dir))
+
+    def refresh_all(self, installed: List[dict]) -> bool:
+        """
+        Refreshes the summaries of the remotes used by the installed refs
+        :return: if the summaries of all remotes are available
+        """
+        arches = {}  # (installation, remote) -> architectures
+        for ref in installed:
+            arches.setdefault((ref['installation'], ref['origin']), set()).add(ref['arch'])
+
+        urls = {installation: read_remotes(path) for installation, path in self.installation_paths.items()}
+
+        available = True
+        for (installation, remote), remote_arches in arches.items():
+            url = urls.get(installation, {}).get(remote)
+
+            if not url or not url.startswith('http'):  # e.g: OCI remotes
+                self.logger.warning("Summary of the Flatpak remote '{}' ({}) not supported: {}".format(remote, installation, url))
+                available = False
+            else:
+                try:
+                    refreshed = self.refresh(installation, remote, url, remote_arches)
+                except Exception:
+                    self.logger.exception("Unexpected error while refreshing the summary of the Flatpak remote '{}' ({})".format(remote, installation))
+                    refreshed = False
+
+                if not refreshed:
+                    self.logger.warning("Could not refresh the summary of the Flatpak remote '{}' ({})".format(remote, installation))
+                    available = False
+
+        return available
+
+    def get_latest(self, ref: dict) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        :param ref: an installed ref (as returned by 'installation.list_installed')
+        :return: the latest commit and download size of the ref or None if it is not known
+        """
+        refs = self.read(ref['installation'], ref['origin'], ref['arch'])
+
+        if refs is not None:
+            return refs.get('{}/{}'.format('runtime' if ref['runtime'] else 'app', ref['ref']))
+
+    def map_updates(self, installed: List[dict]) -> Optional[Set[str]]:
+        """
+        :return: the refs with updates as '{installation}/{ref}' or None if the commits deployed or the summaries are not known
+        """
+        res = set()
+        for ref in installed:
+            if not ref.get('commit') or not ref.get('origin'):
+                return
+
+            if self.read(ref['installation'], ref['origin'], ref['arch']) is None:
+                return
+
+            latest = self.get_latest(ref)
+
+            if latest and latest[0] != ref['commit']:
+                res.add('{}/{}'.format(ref['installation'], ref['ref']))
+
+        return res
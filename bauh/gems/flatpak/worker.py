@@ -11,6 +11,23 @@ from bauh.gems.flatpak.constants import FLATHUB_API_URL, FLATHUB_URL
 from bauh.gems.flatpak.model import FlatpakApplication
 
 
+def map_api_data(data: dict) -> dict:
+    """
+    Maps the application data returned by the Flathub API to the format of the appstream index
+    """
+    icon_url = data.get('iconMobileUrl')
+
+    if icon_url and icon_url.startswith('/'):
+        icon_url = FLATHUB_URL + icon_url
+
+    return {'name': data.get('name'),
+            'summary': data.get('summary'),
+            'description': data.get('description'),
+            'version': data.get('currentReleaseVersion'),
+            'icon_url': icon_url,
+            'categories': [c['name'] for c in data['categories']] if data.get('categories') else None}
+
+
 class FlatpakAsyncDataLoader(Thread):
 
     def __init__(self, app: FlatpakApplication, manager: SoftwareManager, context: ApplicationContext, api_cache: MemoryCache, category_cache: MemoryCache):
@@ -37,6 +54,38 @@ class FlatpakAsyncDataLoader(Thread):
         word.seek(0)
         return word.read()
 
+    @classmethod
+    def fill(cls, app: FlatpakApplication, data: dict, category_cache: MemoryCache):
+        """
+        :param data: the application metadata from the appstream index or mapped from the Flathub API ('map_api_data')
+        """
+        if not app.version:
+            app.version = data.get('version')
+
+        if not app.name:
+            app.name = data.get('name')
+
+        app.description = data.get('description') or data.get('summary')
+        app.icon_url = data.get('icon_url')
+        app.latest_version = data.get('version') or app.version
+
+        # the installed version is kept: the app may be filled before its update state is known
+        if not app.installed and app.latest_version:
+            app.version = app.latest_version
+
+        if data.get('categories'):
+            cats = []
+            for c in data['categories']:
+                cached = category_cache.get(c)
+
+                if not cached:
+                    cached = cls.format_category(c)
+                    category_cache.add_non_existing(c, cached)
+
+                cats.append(cached)
+
+            app.categories = cats
+
     def run(self):
         if self.app:
             self.app.status = PackageStatus.LOADING_DATA
@@ -50,37 +99,7 @@ class FlatpakAsyncDataLoader(Thread):
                     if not data:
                         self.logger.warning("No data returned for id {} ({})".format(self.app.id, self.app.name))
                     else:
-                        if not self.app.version:
-                            self.app.version = data.get('version')
-
-                        if not self.app.name:
-                            self.app.name = data.get('name')
-
-                        self.app.description = data.get('description', data.get('summary', None))
-                        self.app.icon_url = data.get('iconMobileUrl', None)
-                        self.app.latest_version = data.get('currentReleaseVersion', self.app.version)
-
-                        if self.app.latest_version and (not self.app.version or not self.app.update):
-                            self.app.version = self.app.latest_version
-
-                        if not self.app.installed and self.app.latest_version:
-                            self.app.version = self.app.latest_version
-
-                        if self.app.icon_url and self.app.icon_url.startswith('/'):
-                            self.app.icon_url = FLATHUB_URL + self.app.icon_url
-
-                        if data.get('categories'):
-                            cats = []
-                            for c in data['categories']:
-                                cached = self.category_cache.get(c['name'])
-
-                                if not cached:
-                                    cached = self.format_category(c['name'])
-                                    self.category_cache.add_non_existing(c['name'], cached)
-
-                                cats.append(cached)
-
-                            self.app.categories = cats
+                        self.fill(self.app, map_api_data(data), self.category_cache)
 
                         loaded_data = self.app.get_data_to_cache()
 
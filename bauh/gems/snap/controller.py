@@ -1,6 +1,6 @@
 import re
-import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from threading import Thread
 from typing import List, Set, Type, Optional, Tuple
 
@@ -24,6 +24,7 @@ from bauh.gems.snap import snap, URL_CATEGORIES_FILE, SNAP_CACHE_PATH, CATEGORIE
 from bauh.gems.snap.config import read_config
 from bauh.gems.snap.model import SnapApplication
 from bauh.gems.snap.snapd import SnapdClient
+from bauh.gems.snap.suggestions import SuggestionsCache, MAX_STORE_LOOKUPS
 
 RE_AVAILABLE_CHANNELS = re.compile(re.compile(r'(\w+)\s+(snap install.+)'))
 
@@ -42,6 +43,8 @@ class SnapManager(SoftwareManager):
         self.categories = {}
         self.suggestions_cache = context.cache_factory.new()
         self.info_path = None
+        self.snapd_client = SnapdClient(self.logger)
+        self.suggestions = SuggestionsCache(context.http_client, context.logger)
         self.custom_actions = [
             CustomSoftwareAction(i18n_status_key='snap.action.refresh.status',
                                  i18n_label_key='snap.action.refresh.label',
@@ -77,8 +80,7 @@ class SnapManager(SoftwareManager):
         if is_url or (not snap.is_installed() and not snapd.is_running()):
             return SearchResult([], [], 0)
 
-        snapd_client = SnapdClient(self.logger)
-        apps_found = snapd_client.query(words)
+        apps_found = self.snapd_client.query(words)
 
         res = SearchResult([], [], 0)
 
@@ -102,12 +104,12 @@ class SnapManager(SoftwareManager):
 
     def read_installed(self, disk_loader: DiskCacheLoader, limit: int = -1, only_apps: bool = False, pkg_types: Set[Type[SoftwarePackage]] = None, internet_available: bool = None) -> SearchResult:
         if snap.is_installed() and snapd.is_running():
-            snapd_client = SnapdClient(self.logger)
-            app_names = {a['snap'] for a in snapd_client.list_only_apps()}
+            snaps, apps = self.snapd_client.list_snaps_and_apps()
+            app_names = {a['snap'] for a in apps}
             installed = [self._map_to_app(app_json=appjson,
                                           installed=True,
                                           disk_loader=disk_loader,
-                                          is_application=app_names and appjson['name'] in app_names) for appjson in snapd_client.list_all_snaps()]
+                                          is_application=app_names and appjson['name'] in app_names) for appjson in snaps]
             return SearchResult(installed, None, len(installed))
         else:
             return SearchResult([], None, 0)
@@ -120,7 +122,9 @@ class SnapManager(SoftwareManager):
             watcher.print("'snapd' seems not to be running")
             return False
 
-        return ProcessHandler(watcher).handle_simple(snap.downgrade_and_stream(pkg.name, root_password))[0]
+        success = ProcessHandler(watcher).handle_simple(snap.downgrade_and_stream(pkg.name, root_password))[0]
+        self.snapd_client.invalidate()
+        return success
 
     def upgrade(self, requirements: UpgradeRequirements, root_password: str, watcher: ProcessWatcher) -> SystemProcess:
         raise Exception("'upgrade' is not supported by {}".format(SnapManager.__class__.__name__))
@@ -128,6 +132,7 @@ class SnapManager(SoftwareManager):
     def uninstall(self, pkg: SnapApplication, root_password: str, watcher: ProcessWatcher, disk_loader: DiskCacheLoader) -> TransactionResult:
         if snap.is_installed() and snapd.is_running():
             uninstalled = ProcessHandler(watcher).handle_simple(snap.uninstall_and_stream(pkg.name, root_password))[0]
+            self.snapd_client.invalidate()
 
             if uninstalled:
                 if self.suggestions_cache:
@@ -160,7 +165,7 @@ class SnapManager(SoftwareManager):
         }
 
         if pkg.installed:
-            commands = [*{c['name'] for c in SnapdClient(self.logger).list_commands(pkg.name)}]
+            commands = [*{c['name'] for c in self.snapd_client.list_commands(pkg.name)}]
             commands.sort()
             info['commands'] = commands
 
@@ -184,13 +189,11 @@ class SnapManager(SoftwareManager):
             watcher.print("'snapd' seems not to be running")
             return TransactionResult.fail()
 
-        installed_names = {s['name'] for s in SnapdClient(self.logger).list_all_snaps()}
-
-        client = SnapdClient(self.logger)
+        installed_names = {s['name'] for s in self.snapd_client.list_all_snaps()}
         snap_config = read_config()
 
         try:
-            channel = self._request_channel_installation(pkg=pkg, snap_config=snap_config, snapd_client=client, watcher=watcher)
+            channel = self._request_channel_installation(pkg=pkg, snap_config=snap_config, snapd_client=self.snapd_client, watcher=watcher)
             pkg.channel = channel
         except:
             watcher.print('Aborted by user')
@@ -200,6 +203,7 @@ class SnapManager(SoftwareManager):
                                                                                     confinement=pkg.confinement,
                                                                                     root_password=root_password,
                                                                                     channel=channel))
+        self.snapd_client.invalidate()
 
         if 'error:' in output:
             res = False
@@ -219,6 +223,7 @@ class SnapManager(SoftwareManager):
                                                     deny_label=self.i18n['cancel']):
                         self.logger.info("Installing '{}' with the custom command '{}'".format(pkg.name, channel_select.value))
                         res = ProcessHandler(watcher).handle(SystemProcess(new_root_subprocess(channel_select.value.value.split(' '), root_password=root_password)))
+                        self.snapd_client.invalidate()
                         return self._gen_installation_response(success=res, pkg=pkg,
                                                                installed=installed_names, disk_loader=disk_loader)
                 else:
@@ -258,7 +263,9 @@ class SnapManager(SoftwareManager):
         return action not in ('search', 'prepare')
 
     def refresh(self, pkg: SnapApplication, root_password: str, watcher: ProcessWatcher) -> bool:
-        return ProcessHandler(watcher).handle_simple(snap.refresh_and_stream(pkg.name, root_password))[0]
+        success = ProcessHandler(watcher).handle_simple(snap.refresh_and_stream(pkg.name, root_password))[0]
+        self.snapd_client.invalidate()
+        return success
 
     def change_channel(self, pkg: SnapApplication, root_password: str, watcher: ProcessWatcher) -> bool:
         if not internet.is_available():
@@ -267,7 +274,7 @@ class SnapManager(SoftwareManager):
         try:
             channel = self._request_channel_installation(pkg=pkg,
                                                          snap_config=None,
-                                                         snapd_client=SnapdClient(self.logger),
+                                                         snapd_client=self.snapd_client,
                                                          watcher=watcher,
                                                          exclude_current=True)
 
@@ -276,9 +283,11 @@ class SnapManager(SoftwareManager):
                                      body=self.i18n['snap.action.channel.error.no_channel'])
                 return False
 
-            return ProcessHandler(watcher).handle_simple(snap.refresh_and_stream(app_name=pkg.name,
-                                                                                 root_password=root_password,
-                                                                                 channel=channel))[0]
+            success = ProcessHandler(watcher).handle_simple(snap.refresh_and_stream(app_name=pkg.name,
+                                                                                    root_password=root_password,
+                                                                                    channel=channel))[0]
+            self.snapd_client.invalidate()
+            return success
         except:
             return False
 
@@ -319,21 +328,22 @@ class SnapManager(SoftwareManager):
                     self.logger.warning('It seems Snap API is not available. Search output: {}'.format(output))
                     return [self.i18n['snap.notifications.api.unavailable'].format(bold('Snaps'), bold('Snap'))]
 
-    def _fill_suggestion(self, name: str, priority: SuggestionPriority, snapd_client: SnapdClient, out: List[PackageSuggestion]):
-        res = snapd_client.find_by_name(name)
+    def _find_suggestion(self, name: str) -> Optional[dict]:
+        try:
+            res = self.snapd_client.find_by_name(name)
+        except:
+            self.logger.warning("Could not retrieve suggestion '{}'".format(name))
+            traceback.print_exc()
+            return
 
         if res:
             if len(res) == 1:
-                app_json = res[0]
-            else:
-                jsons_found = [p for p in res if p['name'] == name]
-                app_json = jsons_found[0] if jsons_found else None
+                return res[0]
 
-            if app_json:
-                sug = PackageSuggestion(self._map_to_app(app_json, False), priority)
-                self.suggestions_cache.add(name, sug)
-                out.append(sug)
-                return
+            jsons_found = [p for p in res if p['name'] == name]
+
+            if jsons_found:
+                return jsons_found[0]
 
         self.logger.warning("Could not retrieve suggestion '{}'".format(name))
 
@@ -370,49 +380,54 @@ class SnapManager(SoftwareManager):
         res = []
 
         if snapd.is_running():
-            self.logger.info('Downloading suggestions file {}'.format(SUGGESTIONS_FILE))
-            file = self.http_client.get(SUGGESTIONS_FILE)
+            suggestions = self.suggestions.read_suggestions()
 
-            if not file or not file.text:
+            if not suggestions:
                 self.logger.warning("No suggestion found in {}".format(SUGGESTIONS_FILE))
                 return res
-            else:
-                self.logger.info('Mapping suggestions')
-
-                suggestions, threads = [], []
-                snapd_client = SnapdClient(self.logger)
-                installed = {s['name'].lower() for s in snapd_client.list_all_snaps()}
-
-                for l in file.text.split('\n'):
-                    if l:
-                        if limit <= 0 or len(suggestions) < limit:
-                            sug = l.strip().split('=')
-                            name = sug[1]
-
-                            if not installed or name not in installed:
-                                cached_sug = self.suggestions_cache.get(name)
-
-                                if cached_sug:
-                                    res.append(cached_sug)
-                                else:
-                                    t = Thread(target=self._fill_suggestion, args=(name, SuggestionPriority(int(sug[0])), snapd_client, res))
-                                    t.start()
-                                    threads.append(t)
-                                    time.sleep(0.001)  # to avoid being blocked
-                        else:
-                            break
 
-                for t in threads:
-                    t.join()
+            self.logger.info('Mapping suggestions')
+            installed = {s['name'].lower() for s in self.snapd_client.list_all_snaps()}
+            suggestions = [s for s in suggestions if s[1] not in installed]
+
+            if limit > 0:
+                suggestions = suggestions[0:limit]
+
+            to_find = []
+            for priority, name in suggestions:
+                cached_sug = self.suggestions_cache.get(name)
+
+                if cached_sug:
+                    res.append(cached_sug)
+                else:
+                    to_find.append((priority, name))
+
+            if to_find:
+                found = self.suggestions.get_data(n for _, n in to_find)
+                missing = [n for _, n in to_find if n not in found]
+
+                if missing:
+                    with ThreadPoolExecutor(max_workers=MAX_STORE_LOOKUPS) as pool:
+                        new_data = {n: d for n, d in zip(missing, pool.map(self._find_suggestion, missing)) if d}
+
+                    self.suggestions.add_data(new_data)
+                    found.update(new_data)
+
+                for priority, name in to_find:
+                    if name in found:
+                        sug = PackageSuggestion(self._map_to_app(found[name], False), SuggestionPriority(priority))
+                        self.suggestions_cache.add(name, sug)
+                        res.append(sug)
+
+            res.sort(key=lambda s: s.priority.value, reverse=True)
 
-                res.sort(key=lambda s: s.priority.value, reverse=True)
         return res
 
     def is_default_enabled(self) -> bool:
         return True
 
     def launch(self, pkg: SnapApplication):
-        commands = SnapdClient(self.logger).list_commands(pkg.name)
+        commands = self.snapd_client.list_commands(pkg.name)
 
         if commands:
             if len(commands) == 1:
@@ -72,6 +72,9 @@ class SnapApplication(SoftwarePackage):
     def get_disk_cache_path(self):
         return super(SnapApplication, self).get_disk_cache_path() + '/installed/' + self.name
 
+    def get_disk_cache_store_path(self) -> str:
+        return super(SnapApplication, self).get_disk_cache_path() + '/installed.db'
+
     def is_trustable(self) -> bool:
         return self.verified_publisher
 
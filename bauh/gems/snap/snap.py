@@ -3,13 +3,14 @@ import subprocess
 from io import StringIO
 from typing import Tuple, Optional
 
-from bauh.commons.system import run_cmd, SimpleProcess
+from bauh.commons import capability
+from bauh.commons.system import SimpleProcess
 
 BASE_CMD = 'snap'
 
 
 def is_installed() -> bool:
-    return bool(run_cmd('which {}'.format(BASE_CMD), print_error=False))
+    return capability.is_available(BASE_CMD)
 
 
 def uninstall_and_stream(app_name: str, root_password: str) -> SimpleProcess:
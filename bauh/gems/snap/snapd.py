@@ -1,16 +1,19 @@
 import socket
 import traceback
 from logging import Logger
-from typing import Optional, List
+from threading import Lock, Thread
+from typing import Optional, List, Tuple
 
 from requests import Session
 from requests.adapters import HTTPAdapter
 from urllib3.connection import HTTPConnection
 from urllib3.connectionpool import HTTPConnectionPool
 
-from bauh.commons.system import run_cmd
+from bauh.commons import services
 
 URL_BASE = 'http://snapd/v2'
+SOCKET_PATH = '/run/snapd.socket'
+POOL_MAX_SIZE = 4
 
 
 class SnapdConnection(HTTPConnection):
@@ -19,12 +22,12 @@ class SnapdConnection(HTTPConnection):
 
     def connect(self):
         self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self.sock.connect("/run/snapd.socket")
+        self.sock.connect(SOCKET_PATH)
 
 
 class SnapdConnectionPool(HTTPConnectionPool):
-    def __init__(self):
-        super(SnapdConnectionPool, self).__init__('localhost')
+    def __init__(self, maxsize: int = 1):
+        super(SnapdConnectionPool, self).__init__('localhost', maxsize=maxsize)
 
     def _new_conn(self):
         return SnapdConnection()
@@ -32,15 +35,32 @@ class SnapdConnectionPool(HTTPConnectionPool):
 
 class SnapdAdapter(HTTPAdapter):
 
+    def __init__(self, pool_maxsize: int = POOL_MAX_SIZE):
+        super(SnapdAdapter, self).__init__()
+        self.snapd_pool = SnapdConnectionPool(maxsize=pool_maxsize)  # the connections are reused by all requests
+
     def get_connection(self, url, proxies=None):
-        return SnapdConnectionPool()
+        return self.snapd_pool
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self.snapd_pool
+
+    def close(self):
+        super(SnapdAdapter, self).close()
+        self.snapd_pool.close()
 
 
 class SnapdClient:
+    """
+    A long-lived client (one per manager): the connections to 'snapd.socket' are pooled and the installed snaps / apps
+    are cached until snapd registers a new change (e.g: install, refresh, auto-refresh) or 'invalidate' is called.
+    """
 
     def __init__(self, logger: Logger):
         self.logger = logger
         self.session = self._new_session()
+        self._cache = {}  # endpoint -> (last change id, result)
+        self._lock = Lock()
 
     def _new_session(self) -> Optional[Session]:
         try:
@@ -51,70 +71,119 @@ class SnapdClient:
             self.logger.error("Could not establish a connection to 'snapd.socker'")
             traceback.print_exc()
 
+    def _get_result(self, url: str, params: Optional[dict] = None) -> Optional[list]:
+        res = self.session.get(url, params=params)
+
+        if res.status_code == 200:
+            json_res = res.json()
+
+            if json_res['status-code'] == 200:
+                return json_res['result']
+
     def query(self, query: str) -> Optional[List[dict]]:
         final_query = query.strip()
 
         if final_query and self.session:
-            res = self.session.get(url='{}/find'.format(URL_BASE), params={'q': final_query})
-
-            if res.status_code == 200:
-                json_res = res.json()
-
-                if json_res['status-code'] == 200:
-                    return json_res['result']
+            return self._get_result('{}/find'.format(URL_BASE), params={'q': final_query})
 
     def find_by_name(self, name: str) -> Optional[List[dict]]:
         if name and self.session:
-            res = self.session.get('{}/find?name={}'.format(URL_BASE, name))
+            return self._get_result('{}/find?name={}'.format(URL_BASE, name))
+
+    def get_last_change_id(self) -> Optional[int]:
+        """
+        :return: the id of the last change registered by snapd or None if a change is still in progress (or unknown)
+        """
+        try:
+            changes = self._get_result('{}/changes'.format(URL_BASE), params={'select': 'all'})
+        except:
+            self.logger.warning("Could not read the changes registered by snapd")
+            traceback.print_exc()
+            return
 
-            if res.status_code == 200:
-                json_res = res.json()
+        if changes is not None and all(c.get('ready') for c in changes):
+            return max((int(c['id']) for c in changes), default=0)
 
-                if json_res['status-code'] == 200:
-                    return json_res['result']
+    def _list_cached(self, endpoint: str, change_id: Optional[int]) -> List[dict]:
+        if change_id is not None:
+            with self._lock:
+                cached = self._cache.get(endpoint)
 
-    def list_all_snaps(self) -> List[dict]:
-        if self.session:
-            res = self.session.get('{}/snaps'.format(URL_BASE))
+            if cached and cached[0] == change_id:
+                return cached[1]
+
+        res = self._get_result('{}/{}'.format(URL_BASE, endpoint))
 
-            if res.status_code == 200:
-                json_res = res.json()
+        if res is None:
+            return []
 
-                if json_res['status-code'] == 200:
-                    return json_res['result']
+        if change_id is not None:
+            with self._lock:
+                self._cache[endpoint] = (change_id, res)
+
+        return res
+
+    def list_all_snaps(self) -> List[dict]:
+        if self.session:
+            return self._list_cached('snaps', self.get_last_change_id())
 
         return []
 
     def list_only_apps(self) -> List[dict]:
         if self.session:
-            res = self.session.get('{}/apps'.format(URL_BASE))
+            return self._list_cached('apps', self.get_last_change_id())
 
-            if res.status_code == 200:
-                json_res = res.json()
-
-                if json_res['status-code'] == 200:
-                    return json_res['result']
         return []
 
+    def list_snaps_and_apps(self) -> Tuple[List[dict], List[dict]]:
+        """
+        :return: the installed snaps and apps (fetched concurrently)
+        """
+        if not self.session:
+            return [], []
+
+        change_id = self.get_last_change_id()
+        apps, errors = [], []
+
+        def _list_apps():
+            try:
+                apps.extend(self._list_cached('apps', change_id))
+            except Exception as e:
+                errors.append(e)
+
+        apps_thread = Thread(target=_list_apps, daemon=True)
+        apps_thread.start()
+
+        snaps = self._list_cached('snaps', change_id)
+        apps_thread.join()
+
+        if errors:
+            raise errors[0]
+
+        return snaps, apps
+
     def list_commands(self, name: str) -> List[dict]:
         if self.session:
-            res = self.session.get('{}/apps?names={}'.format(URL_BASE, name))
+            res = self._get_result('{}/apps?names={}'.format(URL_BASE, name))
 
-            if res.status_code == 200:
-                json_res = res.json()
+            if res:
+                return [r for r in res if r['snap'] == name]
 
-                if json_res['status-code'] == 200:
-                    return [r for r in json_res['result'] if r['snap'] == name]
         return []
 
+    def invalidate(self):
+        """
+        Clears the cached snaps and apps (should be called after the transactions)
+        """
+        with self._lock:
+            self._cache.clear()
+
 
 def is_running() -> bool:
-    status = run_cmd('systemctl is-active snapd.service snapd.socket', print_error=False)
-    if not status:
-        return False
-    else:
-        for status in status.split('\n'):
-            if status.strip().lower() == 'active':
-                return True
-
-        return False
+    if services.is_active('snapd.socket')['snapd.socket']:  # probed by connecting to the socket
+        return True
+
+    return services.is_active('snapd.service')['snapd.service']
+
+
+services.register_probe('snapd.socket', services.probe_unix_socket(SOCKET_PATH))
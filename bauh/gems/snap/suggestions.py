@@ -0,0 +1,110 @@
+"""
+Caches the Snap suggestions on disk: the suggestions file (refreshed through conditional requests) and the data
+returned by the store for each suggested snap (reused during 'SUGGESTIONS_TTL').
+"""
+import json
+import logging
+import os
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from requests import RequestException
+
+from bauh.api.http import HttpClient
+from bauh.commons.download import download_if_modified, write_file
+from bauh.gems.snap import SNAP_CACHE_PATH, SUGGESTIONS_FILE
+
+SUGGESTIONS_DIR = '{}/suggestions'.format(SNAP_CACHE_PATH)
+SUGGESTIONS_TTL = 60 * 60 * 24  # seconds
+MAX_STORE_LOOKUPS = 4  # snaps looked up at the same time (every lookup is forwarded by snapd to the store)
+
+
+def parse_suggestions(text: str) -> List[Tuple[int, str]]:
+    """
+    :param text: lines as 'priority=name'
+    :return: the priority and name of each suggestion
+    """
+    res = []
+    for line in text.split('\n'):
+        sug = line.strip().split('=')
+
+        if len(sug) == 2 and sug[0].isdigit() and sug[1]:
+            res.append((int(sug[0]), sug[1]))
+
+    return res
+
+
+class SuggestionsCache:
+
+    def __init__(self, http_client: HttpClient, logger: logging.Logger, cache_dir: str = SUGGESTIONS_DIR,
+                 ttl: int = SUGGESTIONS_TTL):
+        self.http_client = http_client
+        self.logger = logger
+        self.file_path = '{}/suggestions.txt'.format(cache_dir)
+        self.data_path = '{}/data.json'.format(cache_dir)
+        self.ttl = ttl
+        self._lock = Lock()
+
+    def read_suggestions(self) -> Optional[List[Tuple[int, str]]]:
+        """
+        Downloads the suggestions file if it changed and reads it (the cached file is read when offline)
+        :return: the priority and name of each suggestion or None if no file is available
+        """
+        try:
+            if download_if_modified(self.http_client, SUGGESTIONS_FILE, self.file_path) not in (200, 304):
+                self.logger.warning("Could not download the suggestions file {}".format(SUGGESTIONS_FILE))
+        except RequestException:
+            self.logger.warning("Could not download the suggestions file {}. Reading the cached one.".format(SUGGESTIONS_FILE))
+
+        if os.path.exists(self.file_path):
+            try:
+                with open(self.file_path) as f:
+                    return parse_suggestions(f.read())
+            except OSError:
+                self.logger.warning("Could not read the cached suggestions file '{}'".format(self.file_path))
+
+    def _read_data(self) -> Dict[str, dict]:
+        if os.path.exists(self.data_path):
+            try:
+                with open(self.data_path) as f:
+                    return json.loads(f.read())
+            except (OSError, ValueError):
+                self.logger.warning("Could not read the cached suggestions data '{}'".format(self.data_path))
+
+        return {}
+
+    def get_data(self, names: Iterable[str]) -> Dict[str, dict]:
+        """
+        :return: the store data of the suggested snaps cached for less than 'ttl' seconds
+        """
+        with self._lock:
+            cached = self._read_data()
+
+        min_time = time.time() - self.ttl
+        res = {}
+        for name in names:
+            data = cached.get(name)
+
+            if data and data.get('cached_at', 0) >= min_time:
+                res[name] = data['snap']
+
+        return res
+
+    def add_data(self, snaps: Dict[str, dict]):
+        """
+        :param snaps: store data by snap name
+        """
+        if not snaps:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            cached = self._read_data()
+            cached.update({name: {'cached_at': now, 'snap': snap} for name, snap in snaps.items()})
+
+            try:
+                write_file(self.data_path, json.dumps(cached).encode())
+            except OSError:
+                self.logger.warning("Could not write the suggestions data '{}'".format(self.data_path))
@@ -29,7 +29,8 @@ from bauh.api.constants import DESKTOP_ENTRIES_DIR
 from bauh.commons import resource
 from bauh.commons.config import save_config
 from bauh.commons.html import bold
-from bauh.commons.system import ProcessHandler, get_dir_size, get_human_size_str, SimpleProcess
+from bauh.commons.system import ProcessHandler, get_dir_size, get_human_size_str, SimpleProcess, process_lane, \
+    BACKGROUND
 from bauh.gems.web import INSTALLED_PATH, nativefier, DESKTOP_ENTRY_PATH_PATTERN, URL_FIX_PATTERN, ENV_PATH, UA_CHROME, \
     SEARCH_INDEX_FILE, SUGGESTIONS_CACHE_FILE, ROOT_DIR, CONFIG_FILE, TEMP_PATH, FIXES_PATH, ELECTRON_PATH
 from bauh.gems.web.config import read_config
@@ -801,6 +802,7 @@ class WebApplicationManager(SoftwareManager):
     def requires_root(self, action: str, pkg: SoftwarePackage):
         return False
 
+    @process_lane(BACKGROUND)
     def _update_env_settings(self, task_manager: TaskManager = None):
         self.env_settings = self.env_updater.read_settings(task_manager)
 
@@ -1,5 +1,6 @@
 from typing import List
 
+from bauh.commons import capability
 from bauh.commons.system import SimpleProcess, run_cmd
 from bauh.gems.web import NATIVEFIER_BIN_PATH, NODE_PATHS
 
@@ -14,8 +15,7 @@ def install(url: str, name: str, output_dir: str, electron_version: str, cwd: st
 
 
 def is_available() -> bool:
-    res = run_cmd('which nativefier', print_error=False)
-    return res and not res.strip().startswith('which ')
+    return capability.is_available('nativefier')
 
 
 def get_version() -> str:
@@ -7,7 +7,7 @@ from PyQt5.QtWidgets import QApplication, QWidget
 from bauh import ROOT_DIR, __app_name__
 from bauh.api.abstract.context import ApplicationContext
 from bauh.api.http import HttpClient
-from bauh.context import generate_i18n, DEFAULT_I18N_KEY, new_qt_application
+from bauh.context import new_qt_application
 from bauh.view.core import gems
 from bauh.view.core.controller import GenericSoftwareManager
 from bauh.view.core.downloader import AdaptableFileDownloader
@@ -16,11 +16,12 @@ from bauh.view.qt.settings import SettingsWindow
 from bauh.view.qt.window import ManageWindow
 from bauh.view.util import resource, util
 from bauh.view.util.cache import CacheCleaner, DefaultMemoryCacheFactory
-from bauh.view.util.disk import DefaultDiskCacheLoaderFactory
+from bauh.view.util.disk import DefaultDiskCacheLoaderFactory, DefaultDiskCacheStoreFactory
+from bauh.view.util.translation import generate_i18n, DEFAULT_I18N_KEY
 
 
 def new_manage_panel(app_args: Namespace, app_config: dict, logger: logging.Logger) -> Tuple[QApplication, QWidget]:
-    i18n = generate_i18n(app_config, resource.get_path('locale'))
+    i18n = generate_i18n(app_config, resource.get_path('locale'), gems=True)
 
     cache_cleaner = CacheCleaner()
 
@@ -29,12 +30,15 @@ def new_manage_panel(app_args: Namespace, app_config: dict, logger: logging.Logg
 
     http_client = HttpClient(logger)
 
+    cache_store_factory = DefaultDiskCacheStoreFactory(logger) if bool(app_config['disk']['cache_store']) else None
+
     context = ApplicationContext(i18n=i18n,
                                  http_client=http_client,
                                  download_icons=bool(app_config['download']['icons']),
                                  app_root_dir=ROOT_DIR,
                                  cache_factory=cache_factory,
-                                 disk_loader_factory=DefaultDiskCacheLoaderFactory(logger),
+                                 disk_loader_factory=DefaultDiskCacheLoaderFactory(logger, cache_store_factory),
+                                 disk_cache_store_factory=cache_store_factory,
                                  logger=logger,
                                  distro=util.get_distro(),
                                  file_downloader=AdaptableFileDownloader(logger, bool(app_config['download']['multithreaded']),
@@ -23,7 +23,9 @@ def read_config(update_file: bool = False) -> dict:
         },
         'system': {
           'notifications': True,
-          'single_dependency_checking': False
+          'single_dependency_checking': False,
+          'max_processes': None,
+          'services_ttl': None
         },
         'suggestions': {
             'enabled': True,
@@ -52,7 +54,8 @@ def read_config(update_file: bool = False) -> dict:
         'disk': {
             'trim': {
                 'after_upgrade': False
-            }
+            },
+            'cache_store': False
         },
         'backup': {
             'enabled': True,
@@ -2,9 +2,10 @@ import operator
 import re
 import time
 import traceback
+from functools import partial
 from subprocess import Popen, STDOUT
 from threading import Thread
-from typing import List, Set, Type, Tuple, Dict
+from typing import List, Set, Type, Tuple, Dict, Optional
 
 from bauh.api.abstract.controller import SoftwareManager, SearchResult, ApplicationContext, UpgradeRequirements, \
     UpgradeRequirement, TransactionResult
@@ -14,10 +15,11 @@ from bauh.api.abstract.model import SoftwarePackage, PackageUpdate, PackageHisto
     CustomSoftwareAction
 from bauh.api.abstract.view import ViewComponent, TabGroupComponent, MessageType
 from bauh.api.exception import NoInternetException
-from bauh.commons import internet
+from bauh.commons import internet, capability, trace, system, services
 from bauh.commons.html import bold
-from bauh.commons.system import run_cmd
+from bauh.commons.prepare import PrepareGraph, PrepareTask
 from bauh.view.core.config import read_config
+from bauh.view.core.gems import get_gem_name, get_manager_class
 from bauh.view.core.settings import GenericSettingsManager
 from bauh.view.core.update import check_for_update
 from bauh.view.util import resource
@@ -42,7 +44,7 @@ class GenericSoftwareManager(SoftwareManager):
                  settings_manager: GenericSettingsManager = None):
         super(GenericSoftwareManager, self).__init__(context=context)
         self.managers = managers
-        self.map = {t: m for m in self.managers for t in m.get_managed_types()}
+        self.map = None  # managed type -> manager. Only filled with enabled managers to not load the disabled ones
         self._available_cache = {} if config['system']['single_dependency_checking'] else None
         self.thread_prepare = None
         self.i18n = context.i18n
@@ -53,6 +55,8 @@ class GenericSoftwareManager(SoftwareManager):
         self.config = config
         self.settings_manager = settings_manager
         self.http_client = context.http_client
+        system.EXECUTOR.set_max_running(config['system'].get('max_processes'))
+        services.get_tracker().set_ttl(config['system'].get('services_ttl'))
         self.extra_actions = [CustomSoftwareAction(i18n_label_key='action.reset',
                                                    i18n_status_key='action.reset.status',
                                                    manager_method='reset',
@@ -69,12 +73,20 @@ class GenericSoftwareManager(SoftwareManager):
                                                            refresh=False): self.is_backups_action_available}
 
     def _is_timeshift_launcher_available(self) -> bool:
-        return bool(run_cmd('which timeshift-launcher', print_error=False))
+        return capability.is_available('timeshift-launcher')
 
     def is_backups_action_available(self, app_config: dict) -> bool:
         return bool(app_config['backup']['enabled']) and self._is_timeshift_launcher_available()
 
+    def _get_manager_for_type(self, pkg_type: Type[SoftwarePackage]) -> Optional[SoftwareManager]:
+        if self.map is None or pkg_type not in self.map:
+            self.map = {t: m for m in self.managers if m.is_enabled() for t in m.get_managed_types()}
+
+        return self.map.get(pkg_type)
+
     def reset_cache(self):
+        self.map = None
+
         if self._available_cache is not None:
             self._available_cache = {}
             self.working_managers.clear()
@@ -147,11 +159,12 @@ class GenericSoftwareManager(SoftwareManager):
             mti = time.time()
             apps_found = man.search(words=word, disk_loader=disk_loader, is_url=is_url)
             mtf = time.time()
-            self.logger.info(man.__class__.__name__ + " took {0:.2f} seconds".format(mtf - mti))
+            self.logger.info(get_manager_class(man).__name__ + " took {0:.2f} seconds".format(mtf - mti))
 
             res.installed.extend(apps_found.installed)
             res.new.extend(apps_found.new)
 
+    @trace.traced('core.search', 'core')
     def search(self, word: str, disk_loader: DiskCacheLoader = None, limit: int = -1, is_url: bool = False) -> SearchResult:
         ti = time.time()
         self._wait_to_be_ready()
@@ -203,6 +216,7 @@ class GenericSoftwareManager(SoftwareManager):
     def _get_package_lower_name(self, pkg: SoftwarePackage):
         return pkg.name.lower()
 
+    @trace.traced('core.read_installed', 'core')
     def read_installed(self, disk_loader: DiskCacheLoader = None, limit: int = -1, only_apps: bool = False, pkg_types: Set[Type[SoftwarePackage]] = None, internet_available: bool = None) -> SearchResult:
         ti = time.time()
         self._wait_to_be_ready()
@@ -222,7 +236,7 @@ class GenericSoftwareManager(SoftwareManager):
                     mti = time.time()
                     man_res = man.read_installed(disk_loader=disk_loader, pkg_types=None, internet_available=net_available)
                     mtf = time.time()
-                    self.logger.info(man.__class__.__name__ + " took {0:.2f} seconds".format(mtf - mti))
+                    self.logger.info(get_manager_class(man).__name__ + " took {0:.2f} seconds".format(mtf - mti))
 
                     res.installed.extend(man_res.installed)
                     res.total += man_res.total
@@ -230,7 +244,7 @@ class GenericSoftwareManager(SoftwareManager):
             man_already_used = []
 
             for t in pkg_types:
-                man = self.map.get(t)
+                man = self._get_manager_for_type(t)
                 if man and (man not in man_already_used) and self._can_work(man):
 
                     if not disk_loader:
@@ -240,7 +254,7 @@ class GenericSoftwareManager(SoftwareManager):
                     mti = time.time()
                     man_res = man.read_installed(disk_loader=disk_loader, pkg_types=None, internet_available=net_available)
                     mtf = time.time()
-                    self.logger.info(man.__class__.__name__ + " took {0:.2f} seconds".format(mtf - mti))
+                    self.logger.info(get_manager_class(man).__name__ + " took {0:.2f} seconds".format(mtf - mti))
 
                     res.installed.extend(man_res.installed)
                     res.total += man_res.total
@@ -263,6 +277,7 @@ class GenericSoftwareManager(SoftwareManager):
         self.logger.info('Took {0:.2f} seconds'.format(tf - ti))
         return res
 
+    @trace.traced('core.downgrade', 'core')
     def downgrade(self, app: SoftwarePackage, root_password: str, handler: ProcessWatcher) -> bool:
         man = self._get_manager_for(app)
 
@@ -281,6 +296,7 @@ class GenericSoftwareManager(SoftwareManager):
         if man:
             return man.clean_cache_for(app)
 
+    @trace.traced('core.upgrade', 'core')
     def upgrade(self, requirements: GenericUpgradeRequirements, root_password: str, handler: ProcessWatcher) -> bool:
         for man, man_reqs in requirements.sub_requirements.items():
             res = man.upgrade(man_reqs, root_password, handler)
@@ -306,6 +322,7 @@ class GenericSoftwareManager(SoftwareManager):
                 for p in res.removed:
                     self._fill_post_transaction_status(p, False)
 
+    @trace.traced('core.uninstall', 'core')
     def uninstall(self, pkg: SoftwarePackage, root_password: str, handler: ProcessWatcher, disk_loader: DiskCacheLoader = None) -> TransactionResult:
         man = self._get_manager_for(pkg)
 
@@ -327,6 +344,7 @@ class GenericSoftwareManager(SoftwareManager):
                 tf = time.time()
                 self.logger.info('Uninstallation of {}'.format(pkg) + 'took {0:.2f} minutes'.format((tf - ti) / 60))
 
+    @trace.traced('core.install', 'core')
     def install(self, app: SoftwarePackage, root_password: str, disk_loader: DiskCacheLoader, handler: ProcessWatcher) -> TransactionResult:
         man = self._get_manager_for(app)
 
@@ -348,12 +366,14 @@ class GenericSoftwareManager(SoftwareManager):
                 tf = time.time()
                 self.logger.info('Installation of {}'.format(app) + 'took {0:.2f} minutes'.format((tf - ti)/60))
 
+    @trace.traced('core.get_info', 'core')
     def get_info(self, app: SoftwarePackage):
         man = self._get_manager_for(app)
 
         if man:
             return man.get_info(app)
 
+    @trace.traced('core.get_history', 'core')
     def get_history(self, app: SoftwarePackage) -> PackageHistory:
         man = self._get_manager_for(app)
 
@@ -361,7 +381,7 @@ class GenericSoftwareManager(SoftwareManager):
             mti = time.time()
             history = man.get_history(app)
             mtf = time.time()
-            self.logger.info(man.__class__.__name__ + " took {0:.2f} seconds".format(mtf - mti))
+            self.logger.info(get_manager_class(man).__name__ + " took {0:.2f} seconds".format(mtf - mti))
             return history
 
     def get_managed_types(self) -> Set[Type[SoftwarePackage]]:
@@ -376,7 +396,7 @@ class GenericSoftwareManager(SoftwareManager):
         return True
 
     def _get_manager_for(self, app: SoftwarePackage) -> SoftwareManager:
-        man = self.map[app.__class__]
+        man = self._get_manager_for_type(app.__class__)
         return man if man and self._can_work(man) else None
 
     def cache_to_disk(self, pkg: SoftwarePackage, icon_bytes: bytes, only_icon: bool):
@@ -400,20 +420,29 @@ class GenericSoftwareManager(SoftwareManager):
             if man:
                 return man.requires_root(action, app)
 
+    @trace.traced('core.prepare', 'core')
+    @system.process_lane(system.BACKGROUND)
     def prepare(self, task_manager: TaskManager, root_password: str, internet_available: bool):
         if self.managers:
             internet_on = internet.is_available()
             taskman = task_manager if task_manager else TaskManager()  # empty task manager to prevent null pointers
+
+            graph = PrepareGraph(self.logger)  # the managers are prepared at the same time
             for man in self.managers:
                 if man not in self._already_prepared and self._can_work(man):
-                    man.prepare(taskman, root_password, internet_on)
+                    graph.add(PrepareTask(id_='{}.prepare'.format(get_gem_name(man)),
+                                          run=partial(man.prepare, taskman, root_password, internet_on)))
                     self._already_prepared.append(man)
 
+            graph.start()
+            graph.wait()
+
     def cache_available_managers(self):
         if self.managers:
             for man in self.managers:
                 self._can_work(man)
 
+    @trace.traced('core.list_updates', 'core')
     def list_updates(self, internet_available: bool = None) -> List[PackageUpdate]:
         self._wait_to_be_ready()
 
@@ -459,7 +488,7 @@ class GenericSoftwareManager(SoftwareManager):
             mti = time.time()
             man_sugs = man.list_suggestions(limit=limit, filter_installed=filter_installed)
             mtf = time.time()
-            self.logger.info(man.__class__.__name__ + ' took {0:.2f} seconds'.format(mtf - mti))
+            self.logger.info(get_manager_class(man).__name__ + ' took {0:.2f} seconds'.format(mtf - mti))
 
             if man_sugs:
                 if 0 < limit < len(man_sugs):
@@ -467,6 +496,7 @@ class GenericSoftwareManager(SoftwareManager):
 
                 suggestions.extend(man_sugs)
 
+    @trace.traced('core.list_suggestions', 'core')
     def list_suggestions(self, limit: int, filter_installed: bool) -> List[PackageSuggestion]:
         if bool(self.config['suggestions']['enabled']):
             if self.managers and internet.is_available():
@@ -547,6 +577,7 @@ class GenericSoftwareManager(SoftwareManager):
 
         return by_manager
 
+    @trace.traced('core.get_upgrade_requirements', 'core')
     def get_upgrade_requirements(self, pkgs: List[SoftwarePackage], root_password: str, watcher: ProcessWatcher) -> UpgradeRequirements:
         by_manager = self._map_pkgs_by_manager(pkgs)
         res = GenericUpgradeRequirements([], [], [], [], {})
@@ -556,7 +587,7 @@ class GenericSoftwareManager(SoftwareManager):
                 ti = time.time()
                 man_reqs = man.get_upgrade_requirements(pkgs, root_password, watcher)
                 tf = time.time()
-                self.logger.info(man.__class__.__name__ + " took {0:.2f} seconds".format(tf - ti))
+                self.logger.info(get_manager_class(man).__name__ + " took {0:.2f} seconds".format(tf - ti))
 
                 if not man_reqs:
                     return  # it means the process should be stopped
@@ -603,7 +634,7 @@ class GenericSoftwareManager(SoftwareManager):
                     working_managers.append(man)
 
             if working_managers:
-                working_managers.sort(key=lambda m: m.__class__.__name__)
+                working_managers.sort(key=lambda m: get_manager_class(m).__name__)
 
                 for man in working_managers:
                     man_actions = man.get_custom_actions()
@@ -625,8 +656,9 @@ class GenericSoftwareManager(SoftwareManager):
         ti = time.time()
         man.fill_sizes(pkgs)
         tf = time.time()
-        self.logger.info(man.__class__.__name__ + " took {0:.2f} seconds".format(tf - ti))
+        self.logger.info(get_manager_class(man).__name__ + " took {0:.2f} seconds".format(tf - ti))
 
+    @trace.traced('core.fill_sizes', 'core')
     def fill_sizes(self, pkgs: List[SoftwarePackage]):
         by_manager = self._map_pkgs_by_manager(pkgs, pkg_filters=[lambda p: p.size is None])
 
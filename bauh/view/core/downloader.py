@@ -10,8 +10,9 @@ from typing import Iterable, List
 from bauh.api.abstract.download import FileDownloader
 from bauh.api.abstract.handler import ProcessWatcher
 from bauh.api.http import HttpClient
+from bauh.commons import capability
 from bauh.commons.html import bold
-from bauh.commons.system import run_cmd, ProcessHandler, SimpleProcess, get_human_size_str
+from bauh.commons.system import ProcessHandler, SimpleProcess, get_human_size_str
 from bauh.view.util.translation import I18n
 
 RE_HAS_EXTENSION = re.compile(r'.+\.\w+$')
@@ -29,15 +30,15 @@ class AdaptableFileDownloader(FileDownloader):
 
     @staticmethod
     def is_aria2c_available() -> bool:
-        return bool(run_cmd('which aria2c', print_error=False))
+        return capability.is_available('aria2c')
 
     @staticmethod
     def is_axel_available() -> bool:
-        return bool(run_cmd('which axel', print_error=False))
+        return capability.is_available('axel')
 
     @staticmethod
     def is_wget_available() -> bool:
-        return bool(run_cmd('which wget', print_error=False))
+        return capability.is_available('wget')
 
     def _get_aria2c_process(self, url: str, output_path: str, cwd: str, root_password: str, threads: int) -> SimpleProcess:
         cmd = ['aria2c', url,
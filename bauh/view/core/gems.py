@@ -1,54 +1,253 @@
-import inspect
+import ast
+import importlib
+import json
+import logging
 import os
-import pkgutil
-from typing import List
+import sys
+import traceback
+from pathlib import Path
+from threading import RLock
+from typing import List, Optional, Dict, Set, Type
 
-from bauh import ROOT_DIR
+from bauh import ROOT_DIR, __version__
 from bauh.api.abstract.controller import SoftwareManager, ApplicationContext
+from bauh.api.abstract.model import SoftwarePackage
+from bauh.api.constants import CACHE_PATH
+from bauh.commons import trace
 from bauh.view.util import translation
 
+GEMS_DIR = ROOT_DIR + '/gems'
+MANIFEST_FILE = '{}/gems.json'.format(CACHE_PATH)
+BOOL_NODES = (ast.NameConstant,) if sys.version_info < (3, 8) else (ast.Constant,)  # booleans are parsed as 'NameConstant' before 3.8
 
-def find_manager(member):
-    if not isinstance(member, str):
-        if inspect.isclass(member) and inspect.getmro(member)[1].__name__ == 'SoftwareManager':
-            return member
-        elif inspect.ismodule(member):
-            for name, mod in inspect.getmembers(member):
-                manager_found = find_manager(mod)
-                if manager_found:
-                    return manager_found
 
+def get_gem_name(manager: SoftwareManager) -> str:
+    gem_name = getattr(manager, 'gem_name', None)
+    return gem_name if gem_name else manager.__module__.split('.')[-2]
 
-def load_managers(locale: str, context: ApplicationContext, config: dict, default_locale: str) -> List[SoftwareManager]:
-    managers = []
 
-    for f in os.scandir(ROOT_DIR + '/gems'):
+def get_manager_class(manager: SoftwareManager) -> Type[SoftwareManager]:
+    """
+    :return: the class of the manager, even if it is a proxy whose gem was not loaded yet
+    """
+    return manager.manager_class if isinstance(manager, GemManagerProxy) else manager.__class__
+
+
+def _read_gem_entry(gem_name: str, controller_path: str) -> Optional[dict]:
+    """
+    Reads the gem manager declaration from its 'controller' source code without importing it.
+    :return: the manifest entry or None if no manager declaration was found
+    """
+    with open(controller_path) as f:
+        tree = ast.parse(f.read(), filename=controller_path)
+
+    imported = {}  # name -> module
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                imported[alias.asname or alias.name] = node.module
+
+    module = 'bauh.gems.{}.controller'.format(gem_name)
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and any(isinstance(b, ast.Name) and b.id == 'SoftwareManager' for b in node.bases):
+            entry = {'name': gem_name,
+                     'manager': '{}.{}'.format(module, node.name),
+                     'types': None,
+                     'default_enabled': None,
+                     'icon_path': '{r}/{n}/resources/img/{n}.svg'.format(r=GEMS_DIR, n=gem_name)}
+
+            for method in node.body:
+                if not isinstance(method, ast.FunctionDef) or len(method.body) != 1 or not isinstance(method.body[0], ast.Return):
+                    continue
+
+                value = method.body[0].value
+
+                if method.name == 'get_managed_types' and isinstance(value, ast.Set):
+                    names = [e.id for e in value.elts if isinstance(e, ast.Name)]
+
+                    if len(names) == len(value.elts):
+                        entry['types'] = ['{}.{}'.format(imported.get(n, module), n) for n in names]
+
+                elif method.name == 'is_default_enabled' and isinstance(value, BOOL_NODES) and isinstance(value.value, bool):
+                    entry['default_enabled'] = value.value
+
+            return entry
+
+
+def _gen_signature() -> Dict[str, int]:
+    signature = {}
+    for f in os.scandir(GEMS_DIR):
         if f.is_dir() and f.name != '__pycache__':
-            loader = pkgutil.find_loader('bauh.gems.{}.controller'.format(f.name))
+            controller_path = '{}/controller.py'.format(f.path)
+            signature[f.name] = os.stat(controller_path).st_mtime_ns if os.path.isfile(controller_path) else 0
+
+    return signature
+
+
+def read_manifest(logger: Optional[logging.Logger] = None, file_path: str = MANIFEST_FILE) -> List[dict]:
+    """
+    Returns the available gems declarations. They are cached on the disk and only read again
+    when bauh is updated or a gem 'controller' module changes.
+    :param logger:
+    :param file_path: the manifest cache file
+    :return:
+    """
+    signature = _gen_signature()
+
+    if os.path.isfile(file_path):
+        try:
+            with open(file_path) as f:
+                cached = json.loads(f.read())
+
+            if cached.get('version') == __version__ and cached.get('signature') == signature:
+                return cached['gems']
+        except (OSError, ValueError, AttributeError):
+            if logger:
+                logger.warning("Could not read the gems manifest file '{}'".format(file_path))
+
+    gems = []
+    for gem_name in sorted(signature):
+        if signature[gem_name]:
+            try:
+                entry = _read_gem_entry(gem_name, '{}/{}/controller.py'.format(GEMS_DIR, gem_name))
+            except (OSError, SyntaxError):
+                if logger:
+                    logger.error("Could not read the gem '{}' declaration".format(gem_name))
+                    traceback.print_exc()
+                continue
+
+            if entry:
+                gems.append(entry)
+
+    try:
+        Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+
+        with open(file_path, 'w+') as f:
+            f.write(json.dumps({'version': __version__, 'signature': signature, 'gems': gems}))
+    except OSError:
+        if logger:
+            logger.warning("Could not write the gems manifest file '{}'".format(file_path))
+
+    return gems
+
+
+def _import_attr(path: str):
+    module, name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module), name)
 
-            if loader:
-                module = loader.load_module()
 
-                manager_class = find_manager(module)
+class GemManagerProxy:
+    """
+    Stands for a gem manager declared in the manifest. The gem module is only imported
+    (and the manager instantiated) when something beyond its enabled state is required.
+    """
 
-                if manager_class:
-                    if locale:
-                        locale_path = '{}/resources/locale'.format(f.path)
+    def __init__(self, entry: dict, context: ApplicationContext, locale: Optional[str], default_locale: Optional[str]):
+        self._manager = None
+        self.gem_name = entry['name']
+        self.icon_path = entry['icon_path']
+        self._entry = entry
+        self._context = context
+        self._locale = locale
+        self._default_locale = default_locale
+        self._enabled = True
+        self._types = None
+        self._lock = RLock()
 
-                        if os.path.exists(locale_path):
-                            context.i18n.current.update(translation.get_locale_keys(locale, locale_path)[1])
+    @property
+    def manager_class(self) -> Type[SoftwareManager]:
+        """
+        :return: the class of the gem manager. It is imported, but not instantiated, if the gem was not loaded yet.
+        """
+        return self._manager.__class__ if self._manager is not None else _import_attr(self._entry['manager'])
 
-                            if default_locale and context.i18n.default:
-                                context.i18n.default.update(translation.get_locale_keys(default_locale, locale_path)[1])
+    def is_loaded(self) -> bool:
+        return self._manager is not None
 
-                    man = manager_class(context=context)
+    def unwrap(self) -> SoftwareManager:
+        """
+        :return: the gem manager (loaded if needed)
+        """
+        return self.load()
 
-                    if config['gems'] is None:
-                        man.set_enabled(man.is_default_enabled())
-                    else:
-                        man.set_enabled(f.name in config['gems'])
+    def load(self) -> SoftwareManager:
+        if self._manager is None:
+            with self._lock:
+                if self._manager is None:
+                    self._load_locale()
+                    manager = _import_attr(self._entry['manager'])(context=self._context)
+                    manager.set_enabled(self._enabled)
+                    self._manager = manager
 
-                    managers.append(man)
+        return self._manager
 
-    return managers
+    def _load_locale(self):
+        if self._locale:
+            locale_path = '{}/{}/resources/locale'.format(GEMS_DIR, self.gem_name)
+
+            if locale_path not in self._context.i18n.loaded_dirs and os.path.exists(locale_path):  # already merged if read from the catalog
+                current = translation.get_locale_keys(self._locale, locale_path)[1]
+                default = None
+
+                if self._default_locale and self._context.i18n.default:
+                    default = translation.get_locale_keys(self._default_locale, locale_path)[1]
+
+                self._context.i18n.add_keys(current, default, locale_path)
+
+    def is_enabled(self) -> bool:
+        return self._manager.is_enabled() if self._manager is not None else self._enabled
+
+    def set_enabled(self, enabled: bool):
+        self._enabled = enabled
 
+        if self._manager is not None:
+            self._manager.set_enabled(enabled)
+
+    def is_default_enabled(self) -> bool:
+        if self._entry.get('default_enabled') is not None:
+            return self._entry['default_enabled']
+
+        return self.load().is_default_enabled()
+
+    def get_managed_types(self) -> Set[Type[SoftwarePackage]]:
+        if self._manager is not None:
+            return self._manager.get_managed_types()
+
+        if self._types is None:
+            if self._entry.get('types') is None:
+                return self.load().get_managed_types()
+
+            self._types = {_import_attr(t) for t in self._entry['types']}
+
+        return self._types
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        attr = getattr(self.load(), name)
+
+        if trace.is_enabled() and not name.startswith('_') and callable(attr):
+            return trace.wrap(attr, '{}.{}'.format(self.gem_name, name), 'gem')
+
+        return attr
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(GemManagerProxy.__name__, self.gem_name)
+
+
+def load_managers(locale: str, context: ApplicationContext, config: dict, default_locale: str) -> List[SoftwareManager]:
+    managers = []
+
+    for entry in read_manifest(context.logger, MANIFEST_FILE):
+        man = GemManagerProxy(entry=entry, context=context, locale=locale, default_locale=default_locale)
+
+        if config['gems'] is None:
+            man.set_enabled(man.is_default_enabled())
+        else:
+            man.set_enabled(entry['name'] in config['gems'])
+
+        managers.append(man)
+
+    return managers
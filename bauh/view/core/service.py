@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import socket
+import time
+from pathlib import Path
+from socketserver import ThreadingUnixStreamServer, StreamRequestHandler
+from threading import Lock
+from typing import Optional, List, Callable, Any, Tuple
+
+from bauh.api.abstract.controller import SoftwareManager
+from bauh.api.abstract.model import PackageUpdate
+from bauh.api.constants import CACHE_PATH
+from bauh.commons import internet
+from bauh.view.core.gems import get_gem_name
+
+SOCKET_FILE = '{}/service.sock'.format(CACHE_PATH)
+DEFAULT_TTL = 300  # seconds a gem cached data is served before being read again
+CONNECT_TIMEOUT = 1
+REQUEST_TIMEOUT = 300  # reading the updates from all gems can take a while when nothing is cached
+
+
+class UpdatesService:
+    """
+    Keeps the managers warm and caches the updates and installed packages of each gem.
+    The cached data is invalidated after 'ttl' seconds or through the 'refresh' command.
+    """
+
+    def __init__(self, manager: SoftwareManager, logger: logging.Logger, ttl: int = DEFAULT_TTL):
+        """
+        :param manager: the GenericSoftwareManager
+        :param logger:
+        :param ttl: seconds
+        """
+        self.manager = manager
+        self.logger = logger
+        self.ttl = ttl
+        self._caches = {'updates': {}, 'installed': {}}  # type -> gem -> (expiration, data)
+        self._generation = 0  # incremented every refresh so data read before it is not cached
+        self._cache_lock = Lock()
+        self._load_lock = Lock()
+        self._commands = {'updates': self.list_updates, 'installed': self.list_installed, 'refresh': self.refresh}
+
+    def _read_updates(self, man: SoftwareManager, internet_available: bool) -> List[dict]:
+        updates = man.list_updates(internet_available=internet_available)
+        return [u.__dict__ for u in updates] if updates else []
+
+    def _read_installed(self, man: SoftwareManager, internet_available: bool) -> List[dict]:
+        res = man.read_installed(disk_loader=None, limit=-1, only_apps=False, pkg_types=None,
+                                 internet_available=internet_available)
+        return [{'id': p.id, 'name': p.name, 'version': p.version, 'latest_version': p.latest_version,
+                 'type': p.get_type(), 'update': p.update} for p in res.installed] if res and res.installed else []
+
+    def _get(self, data_type: str, reader: Callable[[SoftwareManager, bool], List[dict]]) -> List[dict]:
+        res, internet_available = [], None
+
+        with self._load_lock:  # concurrent requests wait for the same data instead of reading it again
+            for man in self.manager.get_working_managers():
+                gem = get_gem_name(man)
+
+                with self._cache_lock:
+                    cached, generation = self._caches[data_type].get(gem), self._generation
+
+                if cached and cached[0] > time.time():
+                    res.extend(cached[1])
+                    continue
+
+                if internet_available is None:
+                    internet_available = internet.is_available()
+
+                try:
+                    data = reader(man, internet_available)
+                except:
+                    self.logger.exception("Could not read the '{}' data of gem '{}'".format(data_type, gem))
+                    continue
+
+                with self._cache_lock:
+                    if generation == self._generation:
+                        self._caches[data_type][gem] = (time.time() + self.ttl, data)
+
+                res.extend(data)
+
+        return res
+
+    def list_updates(self) -> List[dict]:
+        return self._get('updates', self._read_updates)
+
+    def list_installed(self) -> List[dict]:
+        return self._get('installed', self._read_installed)
+
+    def refresh(self, gems: Optional[List[str]] = None) -> bool:
+        """
+        :param gems: the gems which cached data must be discarded. All if not defined.
+        """
+        with self._cache_lock:
+            self._generation += 1
+
+            for cache in self._caches.values():
+                if gems:
+                    for gem in gems:
+                        cache.pop(gem, None)
+                else:
+                    cache.clear()
+
+        self.manager.reset_cache()
+        return True
+
+    def handle(self, request: dict) -> dict:
+        command = self._commands.get(request.get('command')) if isinstance(request, dict) else None
+
+        if not command:
+            return {'error': 'unknown command'}
+
+        try:
+            return {'data': command(**request.get('params', {}))}
+        except Exception as e:
+            self.logger.exception("Error handling the service command '{}'".format(request['command']))
+            return {'error': str(e)}
+
+
+class ServiceRequestHandler(StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+
+        if not line:  # e.g: availability probes
+            return
+
+        try:
+            request = json.loads(line.decode())
+        except ValueError:
+            request = None
+
+        self.wfile.write((json.dumps(self.server.service.handle(request)) + '\n').encode())
+
+
+class UpdatesServer(ThreadingUnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, service: UpdatesService, socket_file: str = SOCKET_FILE):
+        self.service = service
+        self.socket_file = socket_file
+        super(UpdatesServer, self).__init__(socket_file, ServiceRequestHandler)
+        os.chmod(socket_file, 0o600)
+
+    def server_close(self):
+        super(UpdatesServer, self).server_close()
+
+        try:
+            os.remove(self.socket_file)
+        except OSError:
+            pass
+
+
+def is_running(socket_file: str = SOCKET_FILE) -> bool:
+    if not os.path.exists(socket_file):
+        return False
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_file)
+            return True
+    except OSError:
+        return False
+
+
+def serve(service: UpdatesService, logger: logging.Logger, socket_file: str = SOCKET_FILE) -> bool:
+    """
+    Serves the service commands until the process is interrupted.
+    :return: False if there is another service instance running
+    """
+    if is_running(socket_file):
+        logger.warning("There is a service already listening on '{}'".format(socket_file))
+        return False
+
+    Path(os.path.dirname(socket_file)).mkdir(parents=True, exist_ok=True)
+
+    if os.path.exists(socket_file):  # left by a service that has not stopped properly
+        os.remove(socket_file)
+
+    with UpdatesServer(service, socket_file) as server:
+        logger.info("Service listening on '{}'".format(socket_file))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+    return True
+
+
+def request(command: str, socket_file: str = SOCKET_FILE, timeout: float = REQUEST_TIMEOUT,
+            logger: Optional[logging.Logger] = None, **params) -> Tuple[bool, Any]:
+    """
+    Sends a command to the running service.
+    :return: if the service answered and the command response data
+    """
+    if not os.path.exists(socket_file):
+        return False, None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_file)
+            sock.settimeout(timeout)
+            sock.sendall((json.dumps({'command': command, 'params': params}) + '\n').encode())
+
+            with sock.makefile('rb') as stream:
+                response = json.loads(stream.readline().decode())
+    except (OSError, ValueError):
+        if logger:
+            logger.warning("Could not send the command '{}' to the service".format(command))
+        return False, None
+
+    if response.get('error'):
+        if logger:
+            logger.warning("The service could not handle the command '{}': {}".format(command, response['error']))
+        return False, None
+
+    return True, response.get('data')
+
+
+def list_updates(logger: Optional[logging.Logger] = None) -> Optional[List[PackageUpdate]]:
+    """
+    :return: the updates available or None if the service is not running
+    """
+    answered, data = request('updates', logger=logger)
+
+    if answered:
+        return [PackageUpdate(pkg_id=u['id'], name=u['name'], version=u['version'], pkg_type=u['type']) for u in data]
+
+
+def list_installed(logger: Optional[logging.Logger] = None) -> Optional[List[dict]]:
+    """
+    :return: the installed packages or None if the service is not running
+    """
+    answered, data = request('installed', logger=logger)
+
+    if answered:
+        return data
+
+
+def refresh(gems: Optional[List[str]] = None, logger: Optional[logging.Logger] = None) -> bool:
+    """
+    Asks the service (if running) to discard its cached data
+    :return: if the service answered
+    """
+    return request('refresh', timeout=CONNECT_TIMEOUT, logger=logger, gems=gems)[0]
@@ -4,8 +4,6 @@ import traceback
 from math import floor
 from typing import List, Tuple
 
-from PyQt5.QtWidgets import QApplication, QStyleFactory
-
 from bauh import ROOT_DIR
 from bauh.api.abstract.controller import SoftwareManager
 from bauh.api.abstract.download import FileDownloader
@@ -16,6 +14,7 @@ from bauh.commons.view_utils import new_select
 from bauh.view.core import config, timeshift
 from bauh.view.core.config import read_config
 from bauh.view.core.downloader import AdaptableFileDownloader
+from bauh.view.core.gems import get_gem_name
 from bauh.view.util import translation
 from bauh.view.util.translation import I18n
 
@@ -38,7 +37,7 @@ class GenericSettingsManager:
         for man in self.managers:
             if man.can_work():
                 man_comp = man.get_settings(screen_width, screen_height)
-                modname = man.__module__.split('.')[-2]
+                modname = get_gem_name(man)
                 icon_path = "{r}/gems/{n}/resources/img/{n}.svg".format(r=ROOT_DIR, n=modname)
 
                 if man_comp:
@@ -116,6 +115,12 @@ class GenericSettingsManager:
                                                     max_width=default_width,
                                                     id_='dep_check')
 
+        select_cache_store = self._gen_bool_component(label=self.i18n['core.config.disk.cache_store'],
+                                                      tooltip=self.i18n['core.config.disk.cache_store.tip'],
+                                                      value=bool(core_config['disk']['cache_store']),
+                                                      max_width=default_width,
+                                                      id_='cache_store')
+
         select_dmthread = self._gen_bool_component(label=self.i18n['core.config.download.multithreaded'],
                                                    tooltip=self.i18n['core.config.download.multithreaded.tip'],
                                                    id_="down_mthread",
@@ -124,7 +129,7 @@ class GenericSettingsManager:
 
         select_mthread_client = self._gen_multithread_client_select(core_config, default_width)
 
-        sub_comps = [FormComponent([select_dmthread, select_mthread_client, select_trim_up, select_dep_check, input_data_exp, input_icon_exp], spaces=False)]
+        sub_comps = [FormComponent([select_dmthread, select_mthread_client, select_trim_up, select_dep_check, select_cache_store, input_data_exp, input_icon_exp], spaces=False)]
         return TabComponent(self.i18n['core.config.tab.advanced'].capitalize(), PanelComponent(sub_comps), None, 'core.adv')
 
     def _gen_multithread_client_select(self, core_config: dict, default_width: int) -> SingleSelectComponent:
@@ -178,6 +183,8 @@ class GenericSettingsManager:
         return TabComponent(self.i18n['core.config.tab.tray'].capitalize(), PanelComponent(sub_comps), None, 'core.tray')
 
     def _gen_ui_settings(self, core_config: dict, screen_width: int, screen_height: int) -> TabComponent:
+        from PyQt5.QtWidgets import QApplication, QStyleFactory  # only required by the graphical interface
+
         default_width = floor(0.11 * screen_width)
 
         select_hdpi = self._gen_bool_component(label=self.i18n['core.config.ui.hdpi'],
@@ -365,6 +372,7 @@ class GenericSettingsManager:
         core_config['memory_cache']['icon_expiration'] = icon_exp
 
         core_config['disk']['trim']['after_upgrade'] = adv_form.get_component('trim_after_upgrade').get_selected()
+        core_config['disk']['cache_store'] = adv_form.get_component('cache_store').get_selected()
 
         # backup
         if backup:
@@ -407,6 +415,7 @@ class GenericSettingsManager:
 
         style = ui_form.get_component('style').get_selected()
 
+        from PyQt5.QtWidgets import QApplication  # only required by the graphical interface
         cur_style = core_config['ui']['style'] if core_config['ui']['style'] else QApplication.instance().style().objectName().lower()
         if style != cur_style:
             core_config['ui']['style'] = style
@@ -415,7 +424,7 @@ class GenericSettingsManager:
         checked_gems = gems_panel.components[1].get_component('gems').get_selected_values()
 
         for man in self.managers:
-            modname = man.__module__.split('.')[-2]
+            modname = get_gem_name(man)
             enabled = modname in checked_gems
             man.set_enabled(enabled)
 
@@ -447,11 +456,11 @@ class GenericSettingsManager:
 
         for man in self.managers:
             if man:
-                modname = man.__module__.split('.')[-2]
+                modname = get_gem_name(man)
                 tab = component.get_tab(modname)
 
                 if not tab:
-                    self.logger.warning("Tab for {} was not found".format(man.__class__.__name__))
+                    self.logger.warning("Tab for {} was not found".format(modname))
                 else:
                     res = man.save_settings(tab.content)
 
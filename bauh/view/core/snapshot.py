@@ -0,0 +1,146 @@
+import gzip
+import importlib
+import json
+import logging
+import os
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Set
+
+from bauh import __version__
+from bauh.api.abstract.model import SoftwarePackage
+from bauh.api.constants import CACHE_PATH
+from bauh.view.util.translation import I18n
+
+SNAPSHOT_FILE = '{}/installed.snapshot.gz'.format(CACHE_PATH)  # last known installed packages
+
+
+def _encode_value(value):
+    """
+    :return: the value in a JSON compatible format or a KeyError if it cannot be encoded (e.g: i18n, custom actions)
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    elif isinstance(value, Enum):
+        return {'__enum__': '{}.{}'.format(value.__class__.__module__, value.__class__.__name__), 'name': value.name}
+    elif type(value) in (list, tuple, set):
+        return [_encode_value(v) for v in value]
+    elif type(value) == dict and all(isinstance(k, str) for k in value):  # subclasses (e.g: I18n) are not encoded
+        return {k: _encode_value(v) for k, v in value.items()}
+
+    raise KeyError(value.__class__.__name__)
+
+
+def _decode_value(value):
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    elif isinstance(value, dict):
+        if '__enum__' in value:
+            return getattr(_import_attr(value['__enum__']), value['name'])
+
+        return {k: _decode_value(v) for k, v in value.items()}
+
+    return value
+
+
+def _import_attr(path: str):
+    module, name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module), name)
+
+
+def encode(pkg: SoftwarePackage) -> dict:
+    """
+    :return: the package class and the attributes that can be persisted. The others (e.g: i18n) are listed in 'none'.
+    """
+    data, none = {}, []
+
+    for attr, value in pkg.__dict__.items():
+        try:
+            data[attr] = _encode_value(value)
+        except KeyError:
+            none.append(attr)
+
+    return {'type': '{}.{}'.format(pkg.__class__.__module__, pkg.__class__.__name__), 'data': data, 'none': none}
+
+
+def decode(entry: dict, i18n: I18n) -> SoftwarePackage:
+    pkg_class = _import_attr(entry['type'])
+    pkg = pkg_class.__new__(pkg_class)  # the attributes are restored as they were, so the constructor is not called
+
+    for attr in entry['none']:
+        setattr(pkg, attr, i18n if attr == 'i18n' else None)
+
+    for attr, value in entry['data'].items():
+        setattr(pkg, attr, _decode_value(value))
+
+    return pkg
+
+
+def save(pkgs: List[SoftwarePackage], logger: logging.Logger, file_path: str = SNAPSHOT_FILE):
+    try:
+        content = json.dumps({'version': __version__, 'pkgs': [encode(p) for p in pkgs]})
+    except:
+        logger.exception('Could not encode the installed packages snapshot')
+        return
+
+    try:
+        Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+        temp_path = file_path + '.tmp'
+
+        with gzip.open(temp_path, 'wt') as f:
+            f.write(content)
+
+        os.replace(temp_path, file_path)  # so a snapshot being read is never partially written
+    except OSError:
+        logger.warning("Could not write the installed packages snapshot '{}'".format(file_path))
+
+
+def read(i18n: I18n, logger: logging.Logger, gems: Optional[Set[str]] = None,
+         file_path: str = SNAPSHOT_FILE) -> Optional[List[SoftwarePackage]]:
+    """
+    :param gems: only packages from these gems are returned (the others are not even imported). All if not defined.
+    :return: the last known installed packages or None if there is no valid snapshot
+    (snapshots from other bauh versions are discarded, since the packages models may have changed)
+    """
+    if not os.path.isfile(file_path):
+        return
+
+    try:
+        with gzip.open(file_path, 'rt') as f:
+            content = json.loads(f.read())
+    except (OSError, ValueError):
+        logger.warning("Could not read the installed packages snapshot '{}'".format(file_path))
+        return
+
+    if not isinstance(content, dict) or content.get('version') != __version__:
+        logger.info("Discarding the installed packages snapshot '{}' saved by another bauh version".format(file_path))
+        return
+
+    pkgs = []
+    for entry in content['pkgs']:
+        if gems is None or entry['type'].split('.')[2] in gems:
+            try:
+                pkgs.append(decode(entry, i18n))
+            except (ImportError, AttributeError, KeyError, TypeError):
+                logger.warning("Could not restore a '{}' package from the snapshot".format(entry.get('type')))
+
+    return pkgs
+
+
+def diff(old: List[SoftwarePackage], new: List[SoftwarePackage]) -> Optional[List[int]]:
+    """
+    Compares the packages from a snapshot with the fresh ones.
+    :return: the indexes of the packages that have changed or None if packages were added, removed or reordered
+    """
+    if len(old) != len(new):
+        return
+
+    changed = []
+    for idx, pkgs in enumerate(zip(old, new)):
+        if pkgs[0].__class__ != pkgs[1].__class__ or pkgs[0] != pkgs[1]:
+            return
+
+        if encode(pkgs[0])['data'] != encode(pkgs[1])['data']:
+            changed.append(idx)
+
+    return changed
@@ -1,8 +1,9 @@
-from bauh.commons.system import run_cmd, SimpleProcess
+from bauh.commons import capability
+from bauh.commons.system import SimpleProcess
 
 
 def is_available() -> bool:
-    return bool(run_cmd('which timeshift', print_error=False))
+    return capability.is_available('timeshift')
 
 
 def delete_all_snapshots(root_password: str) -> SimpleProcess:
@@ -1,11 +1,14 @@
 from pathlib import Path
 
 from bauh.api.constants import CACHE_PATH
+from bauh.view.core import service
 
 TRAY_CHECK_FILE = '{}/notify_tray'.format(CACHE_PATH)  # it is a file that signals to the tray icon it should recheck for updates
 
 
 def notify_tray():
+    service.refresh()  # the installed software has changed, so the service cached data is discarded
+
     Path(CACHE_PATH).mkdir(exist_ok=True, parents=True)
 
     with open(TRAY_CHECK_FILE, 'w+') as f:
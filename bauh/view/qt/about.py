@@ -5,7 +5,7 @@ from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QVBoxLayout, QDialog, QLabel, QWidget, QHBoxLayout
 
 from bauh import __version__, __app_name__, ROOT_DIR
-from bauh.context import generate_i18n
+from bauh.view.util.translation import generate_i18n
 from bauh.view.util import resource
 
 PROJECT_URL = 'https://github.com/vinifmor/' + __app_name__
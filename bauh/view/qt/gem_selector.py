@@ -6,6 +6,7 @@ from bauh import ROOT_DIR
 from bauh.api.abstract.view import MultipleSelectComponent, InputOption
 from bauh.view.core.config import save
 from bauh.view.core.controller import GenericSoftwareManager
+from bauh.view.core.gems import get_gem_name
 from bauh.view.util import resource
 from bauh.view.qt import qt_utils, css
 from bauh.view.qt.components import MultipleSelectQt, CheckboxQt, new_spacer
@@ -41,11 +42,11 @@ class GemSelectorPanel(QWidget):
         default = set()
 
         managers = [*manager.managers]
-        managers.sort(key=lambda c: c.__class__.__name__)
+        managers.sort(key=get_gem_name)
 
         for m in managers:
             if m.can_work():
-                modname = m.__module__.split('.')[-2]
+                modname = get_gem_name(m)
                 op = InputOption(label=i18n.get('gem.{}.label'.format(modname), modname.capitalize()),
                                  tooltip=i18n.get('gem.{}.info'.format(modname)),
                                  value=modname,
@@ -1,5 +1,6 @@
 import datetime
 import operator
+import time
 from functools import reduce
 from typing import Tuple
 
@@ -253,6 +254,10 @@ class PreparePanel(QWidget, TaskManager):
         self.resize(self.get_table_width() * 1.05, self.sizeHint().height())
 
     def show(self):
+        if self.manage_window.load_snapshot():  # the last known installed packages are displayed while the preparation runs
+            self.manage_window.setEnabled(False)  # no actions until the environment is ready
+            self.manage_window.show()
+
         super(PreparePanel, self).show()
         self.prepare_thread.start()
         centralize(self)
@@ -273,6 +278,10 @@ class PreparePanel(QWidget, TaskManager):
 
     def register_task(self, id_: str, label: str, icon_path: str):
         self.added_tasks += 1
+
+        if self.check_thread.isRunning():  # registered after the preparation started
+            self.check_thread.total = self.added_tasks
+
         self.table.setRowCount(self.added_tasks)
         task_row = self.added_tasks - 1
 
@@ -339,7 +348,8 @@ class PreparePanel(QWidget, TaskManager):
                            'lb_prog': lb_progress,
                            'progress': 0,
                            'lb_sub': lb_sub,
-                           'finished': False}
+                           'finished': False,
+                           'started': time.time()}
 
     def update_progress(self, task_id: str, progress: float, substatus: str):
         task = self.tasks[task_id]
@@ -373,7 +383,7 @@ class PreparePanel(QWidget, TaskManager):
 
     def finish_task(self, task_id: str):
         task = self.tasks[task_id]
-        task['lb_sub'].setText('')
+        task['lb_sub'].setText('({0:.2f}s)'.format(time.time() - task['started']))  # how long the task took
 
         for key in ('lb_prog', 'lb_status'):
             task[key].setStyleSheet('QLabel { color: %s; text-decoration: line-through; }' % GREEN)
@@ -389,6 +399,7 @@ class PreparePanel(QWidget, TaskManager):
 
     def finish(self):
         if self.isVisible():
+            self.manage_window.setEnabled(True)
             self.manage_window.begin_refresh_packages()
             self.manage_window.show()
             self.self_close = True
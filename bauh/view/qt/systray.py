@@ -15,15 +15,15 @@ from PyQt5.QtWidgets import QSystemTrayIcon, QMenu
 from bauh import __app_name__, ROOT_DIR
 from bauh.api.abstract.model import PackageUpdate
 from bauh.api.http import HttpClient
-from bauh.commons import system
+from bauh.commons import capability
 from bauh.commons.system import run_cmd
-from bauh.context import generate_i18n
+from bauh.view.core import service
 from bauh.view.core.tray_client import TRAY_CHECK_FILE
 from bauh.view.core.update import check_for_update
 from bauh.view.qt.about import AboutDialog
 from bauh.view.qt.qt_utils import load_resource_icon
 from bauh.view.util import util, resource
-from bauh.view.util.translation import I18n
+from bauh.view.util.translation import I18n, generate_i18n
 
 
 def get_cli_path() -> str:
@@ -40,13 +40,15 @@ def get_cli_path() -> str:
         if os.path.exists(cli_path):
             return cli_path
     else:
-        cli_path = system.run_cmd('which bauh-cli', print_error=False)
-    
-        if cli_path:
-            return cli_path.strip()
+        return capability.which('bauh-cli')
 
 
 def list_updates(logger: logging.Logger) -> List[PackageUpdate]:
+    updates = service.list_updates(logger)
+
+    if updates is not None:
+        return updates
+
     cli_path = get_cli_path()
     if cli_path:
         output = run_cmd('{} updates -f json'.format(cli_path))
@@ -4,6 +4,7 @@ import operator
 import time
 import traceback
 from pathlib import Path
+from threading import Thread
 from typing import List, Type, Set, Tuple
 
 from PyQt5.QtCore import QEvent, Qt, QSize, pyqtSignal
@@ -21,6 +22,8 @@ from bauh.api.abstract.view import MessageType
 from bauh.api.http import HttpClient
 from bauh.commons import user
 from bauh.commons.html import bold
+from bauh.view.core import snapshot
+from bauh.view.core.gems import get_gem_name
 from bauh.view.core.tray_client import notify_tray
 from bauh.view.qt import dialog, commons, qt_utils, root, styles
 from bauh.view.qt.about import AboutDialog
@@ -114,6 +117,7 @@ class ManageWindow(QWidget):
         self.pkgs = []  # packages current loaded in the table
         self.pkgs_available = []  # all packages loaded in memory
         self.pkgs_installed = []  # cached installed packages
+        self.snapshot_displayed = False  # if the installed packages displayed were restored from the last known snapshot
         self.display_limit = config['ui']['table']['max_displayed']
         self.icon_cache = icon_cache
         self.screen_size = screen_size
@@ -678,6 +682,58 @@ class ManageWindow(QWidget):
         self.check_console.setChecked(False)
         self.textarea_output.hide()
 
+    def load_snapshot(self) -> bool:
+        """
+        Displays the last known installed packages, so they are available before the first refresh finishes.
+        :return: if the snapshot packages are displayed
+        """
+        enabled_gems = {get_gem_name(m) for m in self.manager.managers if m.is_enabled()}
+        pkgs = snapshot.read(i18n=self.i18n, logger=self.logger, gems=enabled_gems)
+
+        if pkgs and any(p.is_application() for p in pkgs):
+            try:
+                self.update_pkgs(pkgs, as_installed=True)
+                self.snapshot_displayed = True
+            except:
+                self.logger.exception('Could not display the installed packages snapshot')
+                self.pkgs_installed = []
+
+        return self.snapshot_displayed
+
+    def _save_snapshot(self, wait: bool = False):
+        if self.pkgs_installed and not self.snapshot_displayed:
+            pkgs = [p.model for p in self.pkgs_installed]
+
+            if wait:
+                snapshot.save(pkgs, self.logger)
+            else:
+                Thread(target=snapshot.save, args=(pkgs, self.logger), daemon=True).start()
+
+    def _reconcile_snapshot(self, installed: List[SoftwarePackage]) -> bool:
+        """
+        Replaces the packages restored from the snapshot by the fresh ones, only updating the rows that have changed.
+        :return: False if packages were added, removed or had their update state changed. So the table must be rebuilt.
+        """
+        changed = snapshot.diff([p.model for p in self.pkgs_installed], installed)
+
+        if changed is None or any(self.pkgs_installed[idx].model.update != installed[idx].update for idx in changed):
+            return False
+
+        changed, displayed = set(changed), {id(p) for p in self.pkgs}
+
+        for idx, pkgv in enumerate(self.pkgs_installed):
+            pkgv.update_model(installed[idx])
+
+            if idx in changed and id(pkgv) in displayed:
+                self.table_apps.update_package(pkgv, change_update_col=True)
+
+        self.update_bt_upgrade()
+        return True
+
+    def closeEvent(self, event):
+        self._save_snapshot(wait=True)
+        super(ManageWindow, self).closeEvent(event)
+
     def begin_refresh_packages(self, pkg_types: Set[Type[SoftwarePackage]] = None):
         self.inp_search.clear()
 
@@ -701,11 +757,17 @@ class ManageWindow(QWidget):
         else:
             self.comp_manager.set_group_visible(GROUP_VIEW_INSTALLED, True)
 
-        if self.update_pkgs(res['installed'], as_installed=as_installed, types=res['types']):
+        reconciled = self.snapshot_displayed and as_installed and not res['types'] and self._reconcile_snapshot(res['installed'])
+        self.snapshot_displayed = False
+
+        if reconciled or self.update_pkgs(res['installed'], as_installed=as_installed, types=res['types']):
             self._hide_filters_no_packages()
             self._update_bts_installed_and_suggestions()
             self._reorganize()
 
+        if as_installed:
+            self._save_snapshot()
+
         self.load_suggestions = False
         self.types_changed = False
 
@@ -1,27 +1,161 @@
+import glob
 import json
 import logging
 import os
-import time
+import sqlite3
+from concurrent.futures.thread import ThreadPoolExecutor
+from pathlib import Path
+from queue import Queue, Empty
 from threading import Thread, Lock
-from typing import Type, Dict
+from typing import Type, Dict, List, Optional, Tuple, Set
 
 import yaml
 
 from bauh.api.abstract.cache import MemoryCache
-from bauh.api.abstract.disk import DiskCacheLoader, DiskCacheLoaderFactory
+from bauh.api.abstract.disk import DiskCacheLoader, DiskCacheLoaderFactory, DiskCacheStore, DiskCacheStoreFactory
 from bauh.api.abstract.model import SoftwarePackage
 
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_SIZE = 50
+COMPACT_FREE_RATIO = 0.25  # the store is compacted when opened if at least this ratio of its pages are free
+
+
+class SQLiteDiskCacheStore(DiskCacheStore):
+
+    def __init__(self, file_path: str, logger: logging.Logger):
+        self.file_path = file_path
+        self.logger = logger
+        self.lock = Lock()
+        self._connection = None
+
+    def open(self, legacy_dir: Optional[str] = None):
+        Path(os.path.dirname(self.file_path)).mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.file_path, check_same_thread=False)
+
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS packages (key TEXT PRIMARY KEY, data TEXT NOT NULL)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)')
+
+        if legacy_dir:
+            self._migrate(legacy_dir)
+
+        page_count = self._connection.execute('PRAGMA page_count').fetchone()[0]
+        free_pages = self._connection.execute('PRAGMA freelist_count').fetchone()[0]
+
+        if page_count and free_pages / page_count >= COMPACT_FREE_RATIO:
+            self.compact()
+
+    def _migrate(self, legacy_dir: str):
+        with self.lock:
+            if self._connection.execute("SELECT 1 FROM metadata WHERE key = 'migrated'").fetchone():
+                return
+
+            migrated = {}
+            for data_path in glob.glob('{}/*/data.json'.format(legacy_dir)):
+                try:
+                    with open(data_path) as f:
+                        migrated[data_path] = json.loads(f.read())
+                except (OSError, ValueError):
+                    self.logger.warning("Could not migrate the cached data file '{}'".format(data_path))
+
+            with self._connection:
+                self._connection.executemany('INSERT OR REPLACE INTO packages (key, data) VALUES (?, ?)',
+                                             ((path.split('/')[-2], json.dumps(data)) for path, data in migrated.items() if data))
+                self._connection.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('migrated', '1')")
+
+        for data_path in migrated:
+            try:
+                os.remove(data_path)
+                pkg_dir = os.path.dirname(data_path)
+
+                if not os.listdir(pkg_dir):
+                    os.rmdir(pkg_dir)
+            except OSError:
+                self.logger.warning("Could not remove the migrated cached data file '{}'".format(data_path))
+
+        if migrated:
+            self.logger.info("{} cached data files migrated from '{}' to '{}'".format(len(migrated), legacy_dir, self.file_path))
+
+    def load(self) -> Dict[str, dict]:
+        with self.lock:
+            rows = self._connection.execute('SELECT key, data FROM packages').fetchall()
+
+        return {key: json.loads(data) for key, data in rows}
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            row = self._connection.execute('SELECT data FROM packages WHERE key = ?', (key,)).fetchone()
+
+        if row:
+            return json.loads(row[0])
+
+    def keys(self) -> Set[str]:
+        with self.lock:
+            return {r[0] for r in self._connection.execute('SELECT key FROM packages')}
+
+    def put(self, key: str, data: dict):
+        self.put_several({key: data})
+
+    def put_several(self, data: Dict[str, dict]):
+        if data:
+            with self.lock:
+                with self._connection:
+                    self._connection.executemany('INSERT OR REPLACE INTO packages (key, data) VALUES (?, ?)',
+                                                 ((k, json.dumps(v)) for k, v in data.items()))
+
+    def delete(self, *keys: str):
+        if keys:
+            with self.lock:
+                with self._connection:
+                    self._connection.executemany('DELETE FROM packages WHERE key = ?', ((k,) for k in keys))
+
+    def compact(self):
+        with self.lock:
+            self._connection.execute('VACUUM')
+
+
+class DefaultDiskCacheStoreFactory(DiskCacheStoreFactory):
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.lock = Lock()
+        self._stores = {}
+
+    def get(self, file_path: str, legacy_dir: Optional[str] = None) -> SQLiteDiskCacheStore:
+        with self.lock:
+            store = self._stores.get(file_path)
+
+            if not store:
+                store = SQLiteDiskCacheStore(file_path=file_path, logger=self.logger)
+                store.open(legacy_dir)
+                self._stores[file_path] = store
+
+            return store
+
+    def for_package(self, pkg: SoftwarePackage) -> Optional[SQLiteDiskCacheStore]:
+        store_path = pkg.get_disk_cache_store_path()
+
+        if store_path:
+            cache_path = pkg.get_disk_cache_path()
+            return self.get(store_path, os.path.dirname(cache_path.rstrip('/')) if cache_path else None)
+
 
 class AsyncDiskCacheLoader(Thread, DiskCacheLoader):
 
-    def __init__(self, cache_map: Dict[Type[SoftwarePackage], MemoryCache], logger: logging.Logger):
+    def __init__(self, cache_map: Dict[Type[SoftwarePackage], MemoryCache], logger: logging.Logger,
+                 workers: int = DEFAULT_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE,
+                 store_factory: Optional[DiskCacheStoreFactory] = None):
         super(AsyncDiskCacheLoader, self).__init__(daemon=True)
-        self.pkgs = []
-        self._work = True
-        self.lock = Lock()
+        self._queue = Queue()
+        self._stop_signal = object()
         self.cache_map = cache_map
         self.logger = logger
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
         self.processed = 0
+        self.store_factory = store_factory
+        self._stores_data = {}  # the stores content is read only once
+        self._stores_lock = Lock()
 
     def fill(self, pkg: SoftwarePackage):
         """
@@ -30,56 +164,113 @@ class AsyncDiskCacheLoader(Thread, DiskCacheLoader):
         :return:
         """
         if pkg and pkg.supports_disk_cache():
-            self.pkgs.append(pkg)
+            self._queue.put(pkg)
 
     def stop_working(self):
-        self._work = False
+        """
+        Signals the loader to stop after all packages already queued are processed.
+        """
+        self._queue.put(self._stop_signal)
 
-    def run(self):
-        last = 0
+    def _next_batch(self) -> Tuple[List[SoftwarePackage], bool]:
+        """
+        Blocks until at least one package is available, then drains the queue up to 'batch_size' packages.
+        :return: the packages batch and if the stop signal was received
+        """
+        batch, stop = [], False
+
+        pkg = self._queue.get()
 
         while True:
-            time.sleep(0.00001)
-            if len(self.pkgs) > self.processed:
-                pkg = self.pkgs[last]
-
-                self._fill_cached_data(pkg)
-                self.processed += 1
-                last += 1
-            elif not self._work:
+            if pkg is self._stop_signal:
+                stop = True
                 break
 
-    def _fill_cached_data(self, pkg: SoftwarePackage) -> bool:
-        if os.path.exists(pkg.get_disk_data_path()):
-            disk_path = pkg.get_disk_data_path()
-            ext = disk_path.split('.')[-1]
+            batch.append(pkg)
 
-            with open(disk_path) as f:
-                if ext == 'json':
-                    cached_data = json.loads(f.read())
-                elif ext in {'yml', 'yaml'}:
-                    cached_data = yaml.load(f.read())
-                else:
-                    raise Exception('The cached data file {} has an unsupported format'.format(disk_path))
+            if len(batch) >= self.batch_size:
+                break
+
+            try:
+                pkg = self._queue.get_nowait()
+            except Empty:
+                break
+
+        return batch, stop
 
-            if cached_data:
-                pkg.fill_cached_data(cached_data)
-                cache = self.cache_map.get(pkg.__class__)
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                batch, stop = self._next_batch()
+
+                if batch:
+                    # the files are read concurrently, but the packages are filled in the order they arrived
+                    for pkg, cached_data in zip(batch, pool.map(self._read_cached_data, batch)):
+                        if cached_data:
+                            self._fill(pkg, cached_data)
+
+                        self.processed += 1
+
+                if stop:
+                    break
+
+    def _read_from_store(self, pkg: SoftwarePackage, store: DiskCacheStore) -> Optional[dict]:
+        with self._stores_lock:
+            store_data = self._stores_data.get(store)
+
+            if store_data is None:
+                store_data = store.load()
+                self._stores_data[store] = store_data
+
+        return store_data.get(DiskCacheStoreFactory.get_key(pkg))
+
+    def _read_cached_data(self, pkg: SoftwarePackage) -> Optional[dict]:
+        if self.store_factory:
+            store = self.store_factory.for_package(pkg)
 
-                if cache:
-                    cache.add_non_existing(str(pkg.id), cached_data)
+            if store:
+                return self._read_from_store(pkg, store)
 
-                return True
+        disk_path = pkg.get_disk_data_path()
 
-        return False
+        if not disk_path:
+            return
+
+        ext = disk_path.split('.')[-1]
+
+        if ext not in {'json', 'yml', 'yaml'}:
+            self.logger.warning('The cached data file {} has an unsupported format'.format(disk_path))
+            return
+
+        try:
+            with open(disk_path) as f:
+                content = f.read()
+        except FileNotFoundError:
+            return
+        except OSError:
+            self.logger.warning('Could not read the cached data file {}'.format(disk_path))
+            return
+
+        try:
+            return json.loads(content) if ext == 'json' else yaml.safe_load(content)
+        except (ValueError, yaml.YAMLError):
+            self.logger.warning('The cached data file {} is corrupted'.format(disk_path))
+
+    def _fill(self, pkg: SoftwarePackage, cached_data: dict):
+        pkg.fill_cached_data(cached_data)
+        cache = self.cache_map.get(pkg.__class__)
+
+        if cache:
+            cache.add_non_existing(str(pkg.id), cached_data)
 
 
 class DefaultDiskCacheLoaderFactory(DiskCacheLoaderFactory):
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, store_factory: Optional[DiskCacheStoreFactory] = None):
         super(DefaultDiskCacheLoaderFactory, self).__init__()
         self.logger = logger
         self.cache_map = {}
+        self.store_factory = store_factory
 
     def map(self, pkg_type: Type[SoftwarePackage], cache: MemoryCache):
         if pkg_type:
@@ -87,4 +278,4 @@ class DefaultDiskCacheLoaderFactory(DiskCacheLoaderFactory):
                 self.cache_map[pkg_type] = cache
 
     def new(self) -> AsyncDiskCacheLoader:
-        return AsyncDiskCacheLoader(cache_map=self.cache_map, logger=self.logger)
+        return AsyncDiskCacheLoader(cache_map=self.cache_map, logger=self.logger, store_factory=self.store_factory)
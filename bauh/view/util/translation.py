@@ -1,42 +1,59 @@
 import glob
+import hashlib
 import locale
+import marshal
 import os
-from typing import Tuple, Set
+from pathlib import Path
+from typing import Tuple, Set, Optional, List, Dict
 
+from bauh import ROOT_DIR, __version__
+from bauh.api.constants import CACHE_PATH
 from bauh.view.util import resource
 
+DEFAULT_I18N_KEY = 'en'
+CATALOG_DIR = '{}/i18n'.format(CACHE_PATH)
+
 
 class I18n(dict):
+    """
+    The current locale keys merged with the default locale ones, so a lookup is a single dict access.
+    A missing key is returned as its own translation.
+    """
 
-    def __init__(self, current_key: str, current_locale: dict, default_key: str, default_locale: dict):
+    def __init__(self, current_key: str, current_locale: dict, default_key: str, default_locale: dict,
+                 loaded_dirs: Optional[Set[str]] = None):
         super(I18n, self).__init__()
         self.current_key = current_key
         self.current = current_locale
         self.default_key = default_key
         self.default = default_locale
+        self.loaded_dirs = loaded_dirs if loaded_dirs else set()  # locale dirs whose keys are already merged
 
-    def __getitem__(self, item):
-        try:
-            return self.current.__getitem__(item)
-        except KeyError:
-            if self.default:
-                try:
-                    return self.default.__getitem__(item)
-                except KeyError:
-                    return item
-            else:
-                return item
+        if default_locale:
+            super(I18n, self).update(default_locale)
+
+        super(I18n, self).update(current_locale)
+
+    def __missing__(self, key):
+        return key
+
+    def add_keys(self, current_locale: dict, default_locale: Optional[dict] = None, locale_dir: Optional[str] = None):
+        """
+        Merges new keys (e.g: from a gem)
+        :param current_locale: keys of the current locale
+        :param default_locale: keys of the default locale. Ignored if the current locale is the default one.
+        :param locale_dir: the dir the keys were read from
+        """
+        self.current.update(current_locale)
 
-    def get(self, *args, **kwargs):
-        res = self.current.get(args[0])
+        if default_locale and self.default:
+            self.default.update(default_locale)
+            super(I18n, self).update({k: v for k, v in default_locale.items() if k not in self.current})
 
-        if res is None:
-            if self.default:
-                return self.default.get(*args, **kwargs)
-            else:
-                return self.current.get(*args, **kwargs)
+        super(I18n, self).update(current_locale)
 
-        return res
+        if locale_dir:
+            self.loaded_dirs.add(locale_dir)
 
 
 def get_available_keys() -> Set[str]:
@@ -44,10 +61,7 @@ def get_available_keys() -> Set[str]:
     return {file.split('/')[-1] for file in glob.glob(locale_dir + '/*') if os.path.isfile(file)}
 
 
-def get_locale_keys(key: str = None, locale_dir: str = resource.get_path('locale')) -> Tuple[str, dict]:
-
-    locale_path = None
-
+def _get_system_locale(key: Optional[str]) -> Optional[str]:
     if key is None:
         try:
             current_locale = locale.getdefaultlocale()
@@ -61,14 +75,21 @@ def get_locale_keys(key: str = None, locale_dir: str = resource.get_path('locale
         current_locale = [key.strip().lower()]
 
     if current_locale:
-        current_locale = current_locale[0]
+        return current_locale[0]
 
+
+def _find_locale_file(current_locale: Optional[str], locale_dir: str) -> Optional[str]:
+    if current_locale:
         for locale_file in glob.glob(locale_dir + '/*'):
             name = locale_file.split('/')[-1]
 
             if current_locale == name or current_locale.startswith(name + '_'):
-                locale_path = locale_file
-                break
+                return locale_file
+
+
+def get_locale_keys(key: str = None, locale_dir: str = resource.get_path('locale')) -> Tuple[str, dict]:
+    current_locale = _get_system_locale(key)
+    locale_path = _find_locale_file(current_locale, locale_dir)
 
     if not locale_path:
         return current_locale if current_locale else key, {}
@@ -87,3 +108,94 @@ def get_locale_keys(key: str = None, locale_dir: str = resource.get_path('locale
                 print("Error decoding i18n line '{}'".format(line))
 
     return locale_path.split('/')[-1], locale_obj
+
+
+def get_gems_locale_dirs() -> List[str]:
+    gems_dir = '{}/gems'.format(ROOT_DIR)
+    return sorted('{}/{}/resources/locale'.format(gems_dir, f.name) for f in os.scandir(gems_dir)
+                  if f.is_dir() and os.path.isdir('{}/resources/locale'.format(f.path)))
+
+
+def _gen_catalog_signature(locale_dirs: List[str]) -> Dict[str, int]:
+    signature = {}
+    for locale_dir in locale_dirs:
+        if os.path.isdir(locale_dir):
+            for f in os.scandir(locale_dir):
+                if f.is_file():
+                    signature[f.path] = f.stat().st_mtime_ns
+
+    return signature
+
+
+def _gen_catalog(current_locale: Optional[str], locale_dirs: List[str]) -> Tuple[str, dict, dict]:
+    current_key, current, default = None, {}, {}
+
+    for locale_dir in locale_dirs:
+        key, keys = get_locale_keys(current_locale if current_key is None else current_key, locale_dir)
+        current_key = key if current_key is None else current_key
+        current.update(keys)
+
+        if current_key != DEFAULT_I18N_KEY:
+            default.update(get_locale_keys(DEFAULT_I18N_KEY, locale_dir)[1])
+
+    return current_key, current, default
+
+
+def read_catalog(key: Optional[str], locale_dirs: List[str], cache_dir: str = CATALOG_DIR) -> Tuple[str, dict, dict]:
+    """
+    Merges the locale files of several dirs (e.g: core + gems). The result is cached in a binary file that is
+    only generated again when bauh is updated or a locale file changes.
+    :param key: the locale key. If not defined, the system locale is used.
+    :param locale_dirs: the first dir defines the current locale key
+    :param cache_dir:
+    :return: the current locale key, its keys and the default locale keys (empty if the current locale is the default)
+    """
+    current_locale = _get_system_locale(key)
+    signature = _gen_catalog_signature(locale_dirs)
+    cache_id = hashlib.sha1('{}:{}'.format(current_locale, ':'.join(locale_dirs)).encode()).hexdigest()
+    cache_file = '{}/{}.bin'.format(cache_dir, cache_id)
+
+    if os.path.isfile(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = marshal.loads(f.read())
+
+            if cached['version'] == __version__ and cached['signature'] == signature:
+                return cached['key'], cached['current'], cached['default']
+        except (OSError, EOFError, ValueError, TypeError, KeyError):
+            pass  # generated again
+
+    current_key, current, default = _gen_catalog(current_locale, locale_dirs)
+
+    try:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        temp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+
+        with open(temp_file, 'wb') as f:
+            f.write(marshal.dumps({'version': __version__, 'signature': signature, 'key': current_key,
+                                   'current': current, 'default': default}))
+
+        os.replace(temp_file, cache_file)
+    except OSError:
+        print("Could not write the locale catalog cache '{}'".format(cache_file))
+
+    return current_key, current, default
+
+
+def generate_i18n(app_config: dict, locale_dir: str, gems: bool = False) -> I18n:
+    """
+    :param app_config:
+    :param locale_dir:
+    :param gems: if the keys of all gems should be merged as well
+    :return:
+    """
+    locale_dirs = [locale_dir, *get_gems_locale_dirs()] if gems else [locale_dir]
+    current_key, current, default = read_catalog(app_config['locale'], locale_dirs)
+    return I18n(current_key, current, DEFAULT_I18N_KEY, default, loaded_dirs=set(locale_dirs))
+
+
+def update_i18n(app_config, locale_dir: str, i18n: I18n) -> I18n:
+    cur_key, cur_dict = get_locale_keys(app_config['locale'], locale_dir=locale_dir)
+    def_dict = get_locale_keys(DEFAULT_I18N_KEY, locale_dir=locale_dir)[1] if cur_key != DEFAULT_I18N_KEY else {}
+    i18n.add_keys(cur_dict if i18n.current_key == cur_key else {}, def_dict, locale_dir)
+    return i18n
@@ -3,10 +3,8 @@ import shutil
 import subprocess
 import sys
 import traceback
-from typing import List, Tuple
+from typing import List, Tuple, Any
 
-from PyQt5.QtCore import QCoreApplication
-from PyQt5.QtGui import QIcon
 from colorama import Fore
 
 from bauh import __app_name__
@@ -25,7 +23,12 @@ def notify_user(msg: str, icon_path: str = None):
     os.system("notify-send -a {} {} '{}'".format(__app_name__, "-i {}".format(icon_id) if icon_id else '', msg))
 
 
-def get_default_icon(system: bool = True) -> Tuple[str, QIcon]:
+def get_default_icon(system: bool = True) -> Tuple[str, Any]:
+    """
+    :return: the icon path and its QIcon
+    """
+    from PyQt5.QtGui import QIcon  # not imported by the headless (cli) interface
+
     if system:
         system_icon = QIcon.fromTheme(__app_name__)
         if not system_icon.isNull():
@@ -40,6 +43,8 @@ def restart_app():
     :param show_panel: if the panel should be displayed after the app restart
     :return:
     """
+    from PyQt5.QtCore import QCoreApplication  # not imported by the headless (cli) interface
+
     restart_cmd = [sys.executable, *sys.argv]
     subprocess.Popen(restart_cmd)
     QCoreApplication.exit()
@@ -50,7 +55,9 @@ def get_distro():
         return 'arch'
 
     if os.path.exists('/proc/version'):
-        if 'ubuntu' in run_cmd('cat /proc/version').lower():
+        version = run_cmd('cat /proc/version')
+
+        if version and 'ubuntu' in version.lower():
             return 'ubuntu'
 
     return 'unknown'
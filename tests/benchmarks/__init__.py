@@ -0,0 +1,105 @@
+"""
+Micro-benchmarks for the code paths sensitive to the number of packages (parsers, sorting, ...).
+They are skipped by default. To run them:
+    BAUH_BENCHMARK=results.json python -m pytest tests/benchmarks
+
+The results are merged into the JSON file defined by 'BAUH_BENCHMARK'. Two result files can be compared with:
+    python -m tests.benchmarks old.json new.json
+"""
+import json
+import os
+import platform
+import statistics
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple, Optional
+from unittest import TestCase, skipUnless
+
+from bauh import __version__
+
+OUTPUT_ENV = 'BAUH_BENCHMARK'
+SIZES_ENV = 'BAUH_BENCHMARK_SIZES'
+DEFAULT_SIZES = (2000, 20000)
+DEFAULT_REPEAT = 5
+REGRESSION_THRESHOLD = 0.1  # 10% slower
+
+
+def get_output_file() -> Optional[str]:
+    return os.getenv(OUTPUT_ENV)
+
+
+def get_sizes() -> Tuple[int, ...]:
+    """
+    :return: the number of packages to benchmark with. They can be changed through 'BAUH_BENCHMARK_SIZES' (e.g: 500,2000)
+    """
+    sizes = os.getenv(SIZES_ENV)
+    return tuple(int(s) for s in sizes.split(',') if s.strip()) if sizes else DEFAULT_SIZES
+
+
+def read_results(file_path: str) -> dict:
+    if os.path.isfile(file_path):
+        with open(file_path) as f:
+            return json.load(f)
+
+    return {}
+
+
+def save_results(file_path: str, benchmarks: Dict[str, dict]):
+    results = read_results(file_path)
+    results.update({'bauh': __version__,
+                    'python': platform.python_version(),
+                    'date': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    results.setdefault('benchmarks', {}).update(benchmarks)
+
+    with open(file_path, 'w+') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare(old: dict, new: dict, threshold: float = REGRESSION_THRESHOLD) -> List[Tuple[str, float, float, bool]]:
+    """
+    Compares the median time of the benchmarks present in both results
+    :return: a list of tuples: (name, old median, new median, if it is a regression)
+    """
+    res = []
+    old_benchmarks, new_benchmarks = old.get('benchmarks', {}), new.get('benchmarks', {})
+
+    for name in sorted(set(old_benchmarks).intersection(new_benchmarks)):
+        old_median, new_median = old_benchmarks[name]['median'], new_benchmarks[name]['median']
+        res.append((name, old_median, new_median, new_median > old_median * (1 + threshold)))
+
+    return res
+
+
+@skipUnless(get_output_file(), "benchmarks disabled. Set '{}' to the results file to run them".format(OUTPUT_ENV))
+class BenchmarkCase(TestCase):
+    """
+    Base class for the benchmarks. The results of a class are saved when all its benchmarks finish.
+    """
+
+    results = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.results:
+            save_results(get_output_file(), cls.results)
+
+    def bench(self, name: str, func: Callable[[], object], repeat: int = DEFAULT_REPEAT) -> object:
+        """
+        Measures 'func' 'repeat' times (after a first call used as warm up)
+        :return: the value returned by the first call
+        """
+        ti = time.perf_counter()
+        value = func()
+        first = time.perf_counter() - ti
+
+        timings = timeit.Timer(func).repeat(repeat=repeat, number=1)
+        self.results[name] = {'first': first,
+                              'min': min(timings),
+                              'median': statistics.median(timings),
+                              'max': max(timings),
+                              'repeat': repeat}
+        return value
@@ -0,0 +1,29 @@
+import argparse
+import sys
+
+from tests.benchmarks import read_results, compare, REGRESSION_THRESHOLD
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares two benchmark result files')
+    parser.add_argument('old', help='results of the previous version')
+    parser.add_argument('new', help='results of the current version')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='how much slower (ratio) a benchmark can be before being reported as a regression. Default: %(default)s')
+    args = parser.parse_args()
+
+    old, new = read_results(args.old), read_results(args.new)
+    print('{} ({}) -> {} ({})'.format(old.get('bauh'), args.old, new.get('bauh'), args.new))
+
+    regressions = 0
+    for name, old_median, new_median, regression in compare(old, new, args.threshold):
+        regressions += regression
+        print('{:<50} {:>10.4f}s {:>10.4f}s {:>+8.1%}{}'.format(name, old_median, new_median,
+                                                              new_median / old_median - 1 if old_median else 0,
+                                                              '  REGRESSION' if regression else ''))
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Inputs generated from real pacman, AUR and .SRCINFO outputs recorded at 'resources' (and 'tests/gems/arch/resources').
+The recorded packages are replicated under new names, so any number of packages can be benchmarked.
+"""
+import os
+from typing import Dict, List, Tuple, Optional
+
+from bauh.gems.arch.worker import RE_CLEAR_REPLACE
+
+FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOURCES_DIR = '{}/resources'.format(FILE_DIR)
+TESTS_RESOURCES_DIR = '{}/gems/arch/resources'.format(os.path.dirname(os.path.dirname(os.path.dirname(FILE_DIR))))
+
+
+def read_resource(name: str, resources_dir: str = RESOURCES_DIR) -> str:
+    with open('{}/{}'.format(resources_dir, name)) as f:
+        return f.read()
+
+
+def _parse_blocks(output: str) -> List[List[Tuple[str, List[str]]]]:
+    blocks, block = [], []
+
+    for line in output.split('\n'):
+        if not line:
+            if block:
+                blocks.append(block)
+                block = []
+        elif line[0] == ' ':
+            block[-1][1].append(line.strip())
+        else:
+            field, val = line.split(':', 1)
+            block.append((field.strip(), [val.strip()]))
+
+    if block:
+        blocks.append(block)
+
+    return blocks
+
+
+def _render_block(fields: List[Tuple[str, List[str]]]) -> str:
+    lines = []
+    for field, values in fields:
+        lines.append('{:<16}: {}'.format(field, values[0]))
+        lines.extend(' ' * 18 + v for v in values[1:])
+
+    return '\n'.join(lines) + '\n\n'
+
+
+def _gen_name(fields: List[Tuple[str, List[str]]], idx: int) -> str:
+    return '{}-{}'.format(next(v[0] for f, v in fields if f == 'Name'), idx)
+
+
+def gen_pacman_output(recorded: str, size: int) -> Dict[str, str]:
+    """
+    Expands a recorded 'pacman -Qi' / 'pacman -Si' output to 'size' packages. The package 'i' is a copy of the
+    recorded package 'i % n' named '{name}-{i}' that also depends on the package 'i // 2'
+    (so there are dependency chains to sort).
+    :return: the output block of every package by name (in the order pacman would print them)
+    """
+    recorded_pkgs = _parse_blocks(recorded)
+    res = {}
+
+    for idx in range(size):
+        fields = recorded_pkgs[idx % len(recorded_pkgs)]
+        dep = _gen_name(recorded_pkgs[(idx // 2) % len(recorded_pkgs)], idx // 2) if idx else None
+
+        pkg_fields = []
+        for field, values in fields:
+            if field == 'Name':
+                values = [_gen_name(fields, idx)]
+            elif field == 'Depends On' and dep:
+                values = [dep] if values[0] == 'None' else [*values[:-1], '{}  {}'.format(values[-1], dep)]
+
+            pkg_fields.append((field, values))
+
+        res[_gen_name(fields, idx)] = _render_block(pkg_fields)
+
+    return res
+
+
+class PacmanFixture:
+    """
+    Answers the pacman commands executed through 'run_cmd' with the generated outputs
+    """
+
+    def __init__(self, size: int):
+        self.installed = gen_pacman_output(read_resource('pacman_qi'), size)
+        self.remote = gen_pacman_output(read_resource('pacman_si'), size)
+
+    def run_cmd(self, cmd: str, *args, **kwargs) -> Optional[str]:
+        words = [w for w in cmd.split(' ') if w]
+        flag, names = words[1], [w for w in words[2:] if not w.startswith('-')]
+
+        if flag == '-Qq':
+            return ''.join('{}\n'.format(n) for n in self.installed)
+
+        if 'i' not in flag:
+            return None
+
+        source = self.installed if flag.startswith('-Q') else self.remote
+        return ''.join(source[n] for n in names if n in source) if names else ''.join(source.values())
+
+
+def gen_split_srcinfo(pkgs: int) -> str:
+    """
+    :return: a .SRCINFO (based on the recorded 'mangohud' one) declaring 'pkgs' split packages
+    """
+    base, *recorded_pkgs = read_resource('mangohud_srcinfo', TESTS_RESOURCES_DIR).strip().split('\n\n')
+    sections = [base]
+
+    for idx in range(pkgs):
+        section = recorded_pkgs[idx % len(recorded_pkgs)].split('\n')
+        sections.append('\n'.join(('{}-{}'.format(section[0], idx), *section[1:])))
+
+    return '\n\n'.join(sections) + '\n'
+
+
+def gen_aur_names(size: int) -> List[str]:
+    recorded = [n for n in read_resource('aur_packages').split('\n') if n and not n.startswith('#')]
+    return ['{}-{}'.format(recorded[idx % len(recorded)], idx) for idx in range(size)]
+
+
+def gen_aur_index_response(size: int) -> str:
+    """
+    :return: the generated names in the format of the index available at the AUR (packages.gz)
+    """
+    return '# AUR package list, generated on Mon, 18 Jan 2021 12:00:03 GMT\n' + ''.join('{}\n'.format(n) for n in gen_aur_names(size))
+
+
+def gen_aur_index_file(size: int) -> str:
+    """
+    :return: the generated names in the format of the index file written by bauh
+    """
+    return ''.join('{}={}\n'.format(RE_CLEAR_REPLACE.sub('', n), n) for n in gen_aur_names(size))
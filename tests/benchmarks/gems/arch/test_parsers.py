@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, Mock
+
+from bauh.gems.arch import pacman, aur, sorting
+from bauh.gems.arch.aur import AURClient
+from bauh.gems.arch.model import ArchPackage
+from bauh.gems.arch.updates import UpdatesSummarizer
+from bauh.view.util.translation import I18n
+from tests.benchmarks import BenchmarkCase, get_sizes
+from tests.benchmarks.gems.arch import fixtures
+
+AUR_INDEX_SIZE = 80000  # about the number of packages available at the AUR
+SPLIT_SRCINFO_PKGS = (10, 500)
+
+
+class PacmanBenchmark(BenchmarkCase):
+
+    def _patch(self, fixture: fixtures.PacmanFixture):
+        run_cmd = patch.object(pacman, 'run_cmd', fixture.run_cmd)
+        ignored = patch.object(pacman, 'list_ignored_packages', return_value=set())
+
+        for p in (run_cmd, ignored):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_map_installed(self):
+        for size in get_sizes():
+            with self.subTest(size=size):
+                self._patch(fixtures.PacmanFixture(size))
+                res = self.bench('arch.pacman.map_installed[{}]'.format(size), pacman.map_installed)
+                self.assertEqual(size, len(res['signed']) + len(res['not_signed']))
+
+    def test_map_provided(self):
+        for size in get_sizes():
+            with self.subTest(size=size):
+                self._patch(fixtures.PacmanFixture(size))
+
+                for remote in (False, True):
+                    res = self.bench('arch.pacman.map_provided[{}{}]'.format('remote,' if remote else '', size),
+                                     lambda: pacman.map_provided(remote=remote))
+                    self.assertIn('sh', res)
+
+    def test_map_updates_data(self):
+        for size in get_sizes():
+            with self.subTest(size=size):
+                fixture = fixtures.PacmanFixture(size)
+                self._patch(fixture)
+                names = [*fixture.remote]
+
+                res = self.bench('arch.pacman.map_updates_data[{}]'.format(size), lambda: pacman.map_updates_data(names))
+                self.assertEqual(size, len(res))
+
+
+class SortingBenchmark(BenchmarkCase):
+
+    def test_sort(self):
+        for size in get_sizes():
+            with self.subTest(size=size):
+                fixture = fixtures.PacmanFixture(size)
+
+                with patch.object(pacman, 'run_cmd', fixture.run_cmd):
+                    pkgs_data = pacman.map_updates_data(fixture.remote)
+                    provided_map = pacman.map_provided(remote=True)
+
+                res = self.bench('arch.sorting.sort[{}]'.format(size), lambda: sorting.sort(pkgs_data.keys(), pkgs_data, provided_map))
+                self.assertEqual(size, len(res))
+
+                res = self.bench('arch.sorting.sort[no_provided,{}]'.format(size), lambda: sorting.sort(pkgs_data.keys(), pkgs_data))
+                self.assertEqual(size, len(res))
+
+
+class AURBenchmark(BenchmarkCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_bench_')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_map_srcinfo(self):
+        for pkgs in SPLIT_SRCINFO_PKGS:
+            srcinfo = fixtures.gen_split_srcinfo(pkgs)
+
+            res = self.bench('arch.aur.map_srcinfo[split={}]'.format(pkgs), lambda: aur.map_srcinfo(srcinfo, None))
+            self.assertEqual(pkgs, len(res['pkgname']))
+
+            res = self.bench('arch.aur.map_srcinfo[split={},pkgname]'.format(pkgs),
+                             lambda: aur.map_srcinfo(srcinfo, 'mangohud-0'))
+            self.assertEqual('mangohud-0', res['pkgname'])
+
+        srcinfos = [fixtures.read_resource(f, fixtures.TESTS_RESOURCES_DIR) for f in ('bauh_srcinfo', 'mangohud_srcinfo')]
+
+        for size in get_sizes():
+            res = self.bench('arch.aur.map_srcinfo[{}]'.format(size),
+                             lambda: [aur.map_srcinfo(srcinfos[idx % 2], None) for idx in range(size)])
+            self.assertEqual(size, len(res))
+
+    def test_read_index(self):
+        client = AURClient(http_client=Mock(), logger=Mock(), x86_64=True)
+        index_file = '{}/arch.txt'.format(self.temp_dir)
+
+        with open(index_file, 'w+') as f:
+            f.write(fixtures.gen_aur_index_file(AUR_INDEX_SIZE))
+
+        with patch.object(aur, 'AUR_INDEX_FILE', index_file):
+            res = self.bench('arch.aur.read_index[{}]'.format(AUR_INDEX_SIZE), lambda: set(client.read_index()))
+            self.assertEqual(AUR_INDEX_SIZE, len(res))
+
+        client.http_client.get.return_value = Mock(text=fixtures.gen_aur_index_response(AUR_INDEX_SIZE))
+        res = self.bench('arch.aur.download_names[{}]'.format(AUR_INDEX_SIZE), client.download_names)
+        self.assertEqual(AUR_INDEX_SIZE, len(res))
+
+
+class UpdatesSummarizerBenchmark(BenchmarkCase):
+
+    def test_summarize(self):
+        i18n = I18n('en', {}, 'en', {})
+        srcinfo = aur.map_srcinfo(fixtures.read_resource('bauh_srcinfo', fixtures.TESTS_RESOURCES_DIR), 'bauh')
+        arch_config = {'aur': True, 'automatch_providers': True, 'check_dependency_breakage': True}
+
+        for size in get_sizes():
+            with self.subTest(size=size):
+                fixture = fixtures.PacmanFixture(size)
+                aur_client = AURClient(http_client=Mock(), logger=Mock(), x86_64=True)
+                aur_client.get_src_info = Mock(return_value=srcinfo)
+                aur_client.read_index = Mock(return_value=fixtures.gen_aur_names(AUR_INDEX_SIZE))
+                deps_analyser = Mock(**{'map_missing_deps.return_value': [], 'map_all_required_by.return_value': set()})
+
+                # the installed packages also available in the repositories are updated. The not signed ones are from the AUR.
+                pkgs = []
+                for name, output in fixture.installed.items():
+                    if 'Validated By    : None' in output:
+                        pkgs.append(ArchPackage(name=name, version='1.0.0-1', latest_version='1.0.1-1', repository='aur', i18n=i18n))
+                    elif name in fixture.remote:
+                        pkgs.append(ArchPackage(name=name, version='1.0.0-1', latest_version='1.0.1-1', repository='extra', i18n=i18n))
+
+                summarizer = UpdatesSummarizer(aur_client=aur_client, i18n=i18n, logger=Mock(), deps_analyser=deps_analyser,
+                                               watcher=Mock())
+
+                with patch.object(pacman, 'run_cmd', fixture.run_cmd):
+                    res = self.bench('arch.updates.summarize[{}]'.format(len(pkgs)),
+                                     lambda: summarizer.summarize(pkgs, None, arch_config), repeat=3)
+
+                self.assertEqual(len(pkgs), len(res.to_upgrade))
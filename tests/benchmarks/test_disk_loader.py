@@ -0,0 +1,63 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from bauh.gems.arch.model import ArchPackage
+from bauh.view.util.cache import DefaultMemoryCache
+from bauh.view.util.disk import AsyncDiskCacheLoader
+from tests.benchmarks import BenchmarkCase, get_sizes
+
+
+class AsyncDiskCacheLoaderBenchmark(BenchmarkCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='bauh_bench_')
+        self.cache_path_patch = patch('bauh.gems.arch.model.ARCH_CACHE_PATH', self.cache_dir)
+        self.cache_path_patch.start()
+
+    def tearDown(self):
+        self.cache_path_patch.stop()
+        shutil.rmtree(self.cache_dir)
+
+    def _gen_cache_entries(self, size: int):
+        for idx in range(size):
+            pkg_dir = '{}/installed/pkg-{}'.format(self.cache_dir, idx)
+
+            if not os.path.exists(pkg_dir):
+                os.makedirs(pkg_dir)
+
+                with open(pkg_dir + '/data.json', 'w+') as f:
+                    f.write(json.dumps({'command': 'pkg-{}'.format(idx),
+                                        'icon_path': '/usr/share/icons/pkg-{}.png'.format(idx),
+                                        'repository': 'extra',
+                                        'desktop_entry': '/usr/share/applications/pkg-{}.desktop'.format(idx),
+                                        'categories': ['utility']}))
+
+    @staticmethod
+    def _load(size: int):
+        pkgs = [ArchPackage(name='pkg-{}'.format(idx), installed=True) for idx in range(size)]
+        loader = AsyncDiskCacheLoader(cache_map={ArchPackage: DefaultMemoryCache(expiration_time=-1)},
+                                      logger=logging.getLogger(__name__))
+        loader.start()
+
+        for pkg in pkgs:
+            loader.fill(pkg)
+
+        loader.stop_working()
+        loader.join()
+        return loader, pkgs
+
+    def test_read_arch_cache_entries(self):
+        for size in get_sizes():
+            with self.subTest(size=size):
+                self._gen_cache_entries(size)
+                loader, pkgs = self.bench('core.disk_loader.fill[arch,{}]'.format(size), lambda: self._load(size))
+
+                self.assertEqual(size, loader.processed)
+
+                for idx, pkg in enumerate(pkgs):
+                    self.assertEqual('pkg-{}'.format(idx), pkg.command)
+                    self.assertEqual('extra', pkg.repository)
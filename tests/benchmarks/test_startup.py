@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+from unittest import TestCase
+
+from bauh import ROOT_DIR
+
+ENTRY_POINTS = {'bauh': 'bauh.manage', 'bauh-tray': 'bauh.tray', 'bauh-cli': 'bauh.cli.app'}
+
+STARTUP_SCRIPT = """
+import json, logging, sys, time
+from unittest.mock import Mock
+
+wall_start, cpu_start = time.perf_counter(), time.process_time()
+import {module}
+from bauh.view.core import gems
+from bauh.view.util.translation import I18n
+
+context = Mock(logger=logging.getLogger(), i18n=I18n('en', {{}}, 'en', {{}}))
+gems.load_managers(locale='en', context=context, config={{'gems': ['flatpak']}}, default_locale='en')
+print(json.dumps({{'wall': time.perf_counter() - wall_start,
+                  'cpu': time.process_time() - cpu_start,
+                  'qt': any(m.split('.')[0] == 'PyQt5' for m in sys.modules),
+                  'gems': sorted(m for m in sys.modules if m.startswith('bauh.gems.') and m.endswith('.controller'))}}))
+"""
+
+
+class StartupBenchmark(TestCase):
+
+    def test_import_entry_points(self):
+        for command, module in ENTRY_POINTS.items():
+            with self.subTest(command=command):
+                proc = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT.format(module=module)],
+                                      cwd=ROOT_DIR + '/..', stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+                if proc.returncode != 0:
+                    if b'PyQt5' in proc.stderr:
+                        self.skipTest('PyQt5 is not available')
+
+                    self.fail(proc.stderr.decode())
+
+                res = json.loads(proc.stdout.decode().strip().split('\n')[-1])
+                print('\n[benchmark] {} startup: wall: {:.4f}s | cpu: {:.4f}s'.format(command, res['wall'], res['cpu']))
+                self.assertEqual([], res['gems'])
+
+                if command == 'bauh-cli':
+                    self.assertFalse(res['qt'])
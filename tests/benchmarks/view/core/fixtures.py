@@ -0,0 +1,110 @@
+"""
+Generates the synthetic fixtures replayed by the controller benchmarks at 'resources/replay': the outputs of the
+commands and HTTP requests (see 'bauh.commons.replay') of a machine with some Flatpak apps installed, and the
+directories of its Flatpak installations. To generate them again:
+    python -m tests.benchmarks.view.core.fixtures
+"""
+import base64
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from bauh.commons.replay import FixtureStore, PROCESS, TOOL, HTTP
+from tests.gems.flatpak.test_summary import build_summary
+
+FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = '{}/resources/replay'.format(FILE_DIR)
+GEMS = ('flatpak',)  # gems recorded
+SEARCH = 'firefox'
+REMOTE_URL = 'https://dl.flathub.org/repo'
+API_URL = 'https://flathub.org/api/v1/apps'
+
+# installation -> (kind, id, branch, name, version, latest version)
+INSTALLED = {'system': (('app', 'org.gnome.gedit', 'stable', 'gedit', '3.36.2', '3.38.0'),
+                        ('app', 'org.gimp.GIMP', 'stable', 'GNU Image Manipulation Program', '2.10.20', '2.10.20'),
+                        ('runtime', 'org.gnome.Platform', '3.36', None, None, None),
+                        ('runtime', 'org.freedesktop.Platform', '20.08', None, None, None)),
+             'user': (('app', 'org.videolan.VLC', 'stable', 'VLC', '3.0.11', '3.0.11.1'),)}
+
+
+def gen_commit(*values: str) -> str:
+    return hashlib.sha256('/'.join(values).encode()).hexdigest()
+
+
+def _write(file_path: str, content: bytes):
+    Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+
+    with open(file_path, 'wb+') as f:
+        f.write(content)
+
+
+def _gen_installation(install_dir: str, refs: tuple):
+    _write('{}/repo/config'.format(install_dir),
+           '[core]\nrepo_version=1\n\n[remote "flathub"]\nurl={}/\n'.format(REMOTE_URL).encode())
+
+    for kind, id_, branch, name, version, _ in refs:
+        commit = gen_commit(id_, version or branch)
+        branch_dir = '{}/{}/{}/x86_64/{}'.format(install_dir, kind, id_, branch)
+        deploy_dir = '{}/{}'.format(branch_dir, commit)
+
+        _write('{}/metadata'.format(deploy_dir), '[{}]\nname={}\n'.format('Application' if kind == 'app' else 'Runtime', id_).encode())
+        _write('{}/deploy'.format(deploy_dir), b'flathub\0' + commit.encode() + b'\0')
+
+        if kind == 'app':
+            _write('{}/files/share/metainfo/{}.appdata.xml'.format(deploy_dir, id_),
+                   ('<?xml version="1.0" encoding="UTF-8"?>\n<component type="desktop"><id>{}</id><name>{}</name>'
+                    '<summary>{} summary</summary><releases><release version="{}"/></releases>'
+                    '</component>\n'.format(id_, name, name, version)).encode())
+
+        os.symlink(commit, '{}/active'.format(branch_dir))
+
+
+def generate(fixtures_dir: str = FIXTURES_DIR):
+    if os.path.exists(fixtures_dir):
+        shutil.rmtree(fixtures_dir)
+
+    store = FixtureStore(fixtures_dir)
+
+    def process(cmd, stdout: str, code: int = 0):
+        store.add(PROCESS, {'cmd': cmd, 'cwd': '.', 'env': {'LANG': 'en'}}, {'code': code, 'stdout': stdout, 'stderr': None})
+
+    def http(url: str, method: str = 'GET', status: int = 200, text: str = None, content: bytes = None):
+        body = {'text': text if text is not None else ''} if content is None else {'base64': base64.b64encode(content).decode()}
+        store.add(HTTP, {'method': method, 'url': url, 'headers': {'Accept': '*/*'}},
+                  {'status': status, 'reason': 'OK' if status == 200 else 'Not Found', 'headers': {}, **body})
+
+    store.add(TOOL, {'tool': 'flatpak'}, {'path': '/usr/bin/flatpak'})
+    process('cat /proc/version', 'Linux version 5.8.10-arch1-1 (linux@archlinux) (gcc (GCC) 10.2.0) #1 SMP PREEMPT\n')
+    process('flatpak --version', 'Flatpak 1.8.2\n')
+    process('flatpak remotes', 'flathub\tsystem\nflathub\tuser\n')
+    http('http://www.google.com/', method='HEAD')
+
+    latest = {}
+    for installation, refs in INSTALLED.items():
+        _gen_installation('{}/flatpak/{}'.format(fixtures_dir, installation), refs)
+
+        for kind, id_, branch, name, version, latest_version in refs:
+            latest['{}/{}/x86_64/{}'.format(kind, id_, branch)] = (gen_commit(id_, latest_version or version or branch), 1024 * 1024)
+
+            if kind == 'app':
+                http('{}/{}'.format(API_URL, id_), text=json.dumps({'flatpakAppId': id_, 'name': name, 'summary': '{} summary'.format(name),
+                                                                     'currentReleaseVersion': latest_version,
+                                                                     'categories': [{'name': 'Utility'}]}))
+
+    http('{}/summary.idx'.format(REMOTE_URL), status=404)
+    http('{}/summary'.format(REMOTE_URL), content=build_summary(latest))
+
+    for installation in INSTALLED:
+        process('flatpak search {} --{}'.format(SEARCH, installation),
+                'Firefox\tFast, Private & Safe Web Browser\torg.mozilla.firefox\t81.0\tstable\tflathub\n')
+
+    http('{}/org.mozilla.firefox'.format(API_URL), text=json.dumps({'flatpakAppId': 'org.mozilla.firefox', 'name': 'Firefox',
+                                                                    'summary': 'Fast, Private & Safe Web Browser',
+                                                                    'currentReleaseVersion': '81.0',
+                                                                    'categories': [{'name': 'Network'}]}))
+
+
+if __name__ == '__main__':
+    generate()
@@ -0,0 +1,128 @@
+import importlib
+import inspect
+import logging
+import os
+import sys
+import tempfile
+from unittest.mock import Mock, patch
+
+from bauh.api import constants
+from bauh.api.exception import NoInternetException
+from bauh.cli.app import new_manager
+from bauh.commons import replay
+from bauh.gems.flatpak import INSTALLATION_PATHS
+from bauh.view.core import config, gems
+from tests.benchmarks import BenchmarkCase
+from tests.benchmarks.view.core import fixtures
+
+FIXTURES_ENV = 'BAUH_BENCHMARK_FIXTURES'  # dir with the recorded processes and HTTP responses. Default: the synthetic ones at 'fixtures.FIXTURES_DIR'
+RECORD_ENV = 'BAUH_BENCHMARK_RECORD'  # if defined, the fixtures are recorded (requires the tools and network)
+LATENCY_ENV = 'BAUH_BENCHMARK_LATENCY'  # seconds each replayed process / request takes. Default: 0
+SEARCH_ENV = 'BAUH_BENCHMARK_SEARCH'  # words to search for. Default: firefox
+KEY_ENV_VARS = ('LC_ALL', 'LANGUAGE')  # part of the recorded requests (see 'replay.KEY_ENV_VARS'), but not set by the synthetic fixtures
+
+
+def _isolate_paths(home: str) -> list:
+    """
+    The bauh cache and config paths are defined when the modules are imported, so the ones already defined
+    (including the functions default arguments) are patched to point to 'home' as well.
+    :return: the patches (not started)
+    """
+    for gem in sorted(os.listdir(gems.GEMS_DIR)):  # so the gems paths are patched (and restored) as well
+        if os.path.isfile('{}/{}/controller.py'.format(gems.GEMS_DIR, gem)):
+            importlib.import_module('bauh.gems.{}.controller'.format(gem))
+
+    paths = {constants.CACHE_PATH: '{}/.cache/bauh'.format(home), constants.CONFIG_PATH: '{}/.config/bauh'.format(home)}
+
+    def replace(value):
+        if isinstance(value, str):
+            for path, new_path in paths.items():
+                if value == path or value.startswith(path + '/'):
+                    return new_path + value[len(path):]
+
+        return value
+
+    patches = [patch.dict(os.environ, {'HOME': home})]
+
+    for name, module in [*sys.modules.items()]:
+        if module and (name == 'bauh' or name.startswith('bauh.')):
+            for attr, value in [*vars(module).items()]:
+                if replace(value) != value:
+                    patches.append(patch.object(module, attr, replace(value)))
+                elif getattr(value, '__module__', None) == name and (inspect.isfunction(value) or inspect.isclass(value)):
+                    funcs = [value] if inspect.isfunction(value) else [f for f in vars(value).values() if inspect.isfunction(f)]
+
+                    for func in funcs:
+                        if func.__defaults__ and any(replace(d) != d for d in func.__defaults__):
+                            patches.append(patch.object(func, '__defaults__', tuple(replace(d) for d in func.__defaults__)))
+
+    return patches
+
+
+class GenericSoftwareManagerBenchmark(BenchmarkCase):
+    """
+    Drives the enabled gems end-to-end through the recorded processes and HTTP responses
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(GenericSoftwareManagerBenchmark, cls).setUpClass()
+        cls.home = tempfile.TemporaryDirectory(prefix='bauh_benchmark_')  # nothing is written to the user cache and config dirs
+        cls.patches = _isolate_paths(cls.home.name)
+
+        for p in cls.patches:
+            p.start()
+
+        cls.patches.reverse()  # stopped in the reverse order
+        fixtures_dir = os.getenv(FIXTURES_ENV)
+        app_config = config.read_config()  # the default one, since the temporary config dir is empty
+
+        if os.getenv(RECORD_ENV) and fixtures_dir:
+            replay.enable(replay.RECORD, fixtures_dir)
+        else:
+            if not fixtures_dir:  # the Flatpak installations are read from the fixtures as well
+                fixtures_dir = fixtures.FIXTURES_DIR
+                app_config['gems'] = [*fixtures.GEMS]
+                installations = patch.dict(INSTALLATION_PATHS, {i: '{}/flatpak/{}'.format(fixtures_dir, i) for i in fixtures.INSTALLED})
+                installations.start()
+                cls.patches.insert(0, installations)
+
+                for var in KEY_ENV_VARS:  # 'os.environ' is restored when finished
+                    os.environ.pop(var, None)
+
+            replay.enable(replay.REPLAY, fixtures_dir, latency=float(os.getenv(LATENCY_ENV, 0)))
+
+        cls.manager = new_manager(app_config, logging.getLogger('bauh_benchmark'))
+
+    @classmethod
+    def tearDownClass(cls):
+        for p in cls.patches:
+            p.stop()
+
+        cls.home.cleanup()
+        replay.disable()
+        super(GenericSoftwareManagerBenchmark, cls).tearDownClass()
+
+    def test_read_installed(self):
+        res = self.bench('core.read_installed', lambda: self.manager.read_installed(), repeat=3)
+        self.assertIsNotNone(res)
+
+    def test_search(self):
+        words = os.getenv(SEARCH_ENV, fixtures.SEARCH)
+
+        try:
+            res = self.bench('core.search[{}]'.format(words), lambda: self.manager.search(words), repeat=3)
+        except NoInternetException:
+            self.skipTest('no internet connection recorded')
+
+        self.assertIsNotNone(res)
+
+    def test_get_upgrade_requirements(self):
+        updates = [p for p in self.manager.read_installed().installed if p.update and not p.is_update_ignored()]
+
+        if not updates:
+            self.skipTest('no updates recorded')
+
+        res = self.bench('core.get_upgrade_requirements[{}]'.format(len(updates)),
+                         lambda: self.manager.get_upgrade_requirements(updates, None, Mock()), repeat=3)
+        self.assertIsNotNone(res)
@@ -0,0 +1,52 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+from bauh import ROOT_DIR
+
+# any attempt to import PyQt5 is recorded and refused
+CLI_SCRIPT = """
+import json, sys
+
+class QtBlocker:
+
+    def __init__(self):
+        self.attempts = []
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname.split('.')[0] == 'PyQt5':
+            self.attempts.append(fullname)
+            raise ImportError(fullname)
+
+blocker = QtBlocker()
+sys.meta_path.insert(0, blocker)
+sys.argv = ['bauh-cli', 'updates', '-f', 'json']
+
+from bauh.cli import app
+app.main()
+print(json.dumps({'attempts': blocker.attempts, 'modules': [m for m in sys.modules if m.split('.')[0] == 'PyQt5']}))
+"""
+
+
+class MainTest(TestCase):
+
+    def setUp(self):
+        self.home_dir = tempfile.mkdtemp(prefix='bauh_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.home_dir)
+
+    def test__must_not_import_pyqt5(self):
+        proc = subprocess.run([sys.executable, '-c', CLI_SCRIPT], cwd=ROOT_DIR + '/..',
+                              env={**os.environ, 'HOME': self.home_dir},
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        self.assertEqual(0, proc.returncode, proc.stderr.decode())
+
+        res = json.loads(proc.stdout.decode().strip().split('\n')[-1])
+        self.assertEqual([], res['attempts'])
+        self.assertEqual([], res['modules'])
@@ -0,0 +1,79 @@
+import io
+import json
+from threading import Event
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from bauh.api.abstract.controller import SearchResult
+from bauh.api.abstract.model import PackageUpdate
+from bauh.cli.controller import CLIManager
+from bauh.gems.flatpak.model import FlatpakApplication
+from bauh.gems.snap.model import SnapApplication
+
+
+@patch('bauh.commons.internet.is_available', return_value=True)
+class CLIManagerTest(TestCase):
+
+    def setUp(self):
+        self.flatpak = Mock(gem_name='flatpak')
+        self.snap = Mock(gem_name='snap')
+        self.manager = Mock(get_working_managers=Mock(return_value=[self.flatpak, self.snap]))
+        self.cli = CLIManager(self.manager)
+
+    def _run(self, method, *args, **kwargs) -> str:
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            getattr(self.cli, method)(*args, **kwargs)
+            return stdout.getvalue()
+
+    def test_list_updates__ndjson_must_print_each_gem_updates_as_soon_as_they_are_read(self, *args):
+        snap_printed = Event()
+
+        def list_flatpak_updates(internet_available: bool):
+            snap_printed.wait(5)  # the slowest gem must not hold the others output
+            return [PackageUpdate(pkg_id='org.gimp.GIMP', name='gimp', version='2.10', pkg_type='flatpak')]
+
+        def list_snap_updates(internet_available: bool):
+            return [PackageUpdate(pkg_id='vlc', name='vlc', version='3.0', pkg_type='snap')]
+
+        self.flatpak.list_updates.side_effect = list_flatpak_updates
+        self.snap.list_updates.side_effect = list_snap_updates
+
+        print_ndjson = self.cli._print_ndjson
+
+        def _print_ndjson(objs):
+            print_ndjson(objs)
+            snap_printed.set()
+
+        self.cli._print_ndjson = _print_ndjson
+        output = self._run('list_updates', 'ndjson', jobs=2)
+
+        self.assertEqual([{'id': 'vlc', 'name': 'vlc', 'version': '3.0', 'type': 'snap'},
+                          {'id': 'org.gimp.GIMP', 'name': 'gimp', 'version': '2.10', 'type': 'flatpak'}],
+                         [json.loads(line) for line in output.strip().split('\n')])
+
+    def test_list_installed__must_only_read_from_the_informed_gems(self, *args):
+        self.snap.read_installed.return_value = SearchResult([SnapApplication(id='vlc', name='vlc', version='3.0', installed=True)], None, 1)
+
+        output = json.loads(self._run('list_installed', 'json', gems={'snap'}))
+
+        self.assertEqual(1, len(output))
+        self.assertEqual('vlc', output[0]['name'])
+        self.assertEqual('snap', output[0]['gem'])
+        self.flatpak.read_installed.assert_not_called()
+
+    def test_search__json_must_follow_the_managers_order(self, *args):
+        self.flatpak.search.return_value = SearchResult([], [FlatpakApplication(id='org.mozilla.firefox', name='firefox', version='80')], 1)
+        self.snap.search.return_value = SearchResult([], [SnapApplication(id='firefox', name='firefox', version='81')], 1)
+
+        output = json.loads(self._run('search', ' Firefox', 'json'))
+
+        self.assertEqual(['flatpak', 'snap'], [p['gem'] for p in output])
+        self.snap.search.assert_called_once_with(words='firefox', disk_loader=None, limit=-1, is_url=False)
+
+    def test_search__must_not_search_without_internet(self, is_available: Mock):
+        is_available.return_value = False
+
+        with patch('sys.stdout', new_callable=io.StringIO):
+            self.assertFalse(self.cli.search('firefox', 'json'))
+
+        self.flatpak.search.assert_not_called()
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock
+
+from bauh.commons.capability import CapabilitySnapshot
+
+
+class CapabilitySnapshotTest(TestCase):
+
+    def setUp(self):
+        self.bin_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.snapshot = CapabilitySnapshot(path=self.bin_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.bin_dir)
+
+    def _create_binary(self, name: str, content: str = '#!/bin/sh'):
+        bin_path = '{}/{}'.format(self.bin_dir, name)
+
+        with open(bin_path, 'w+') as f:
+            f.write(content)
+
+        os.chmod(bin_path, 0o755)
+        return bin_path
+
+    def test_which__must_return_the_binary_path(self):
+        bin_path = self._create_binary('flatpak')
+        self.assertEqual(bin_path, self.snapshot.which('flatpak'))
+        self.assertIsNone(self.snapshot.which('snap'))
+
+    def test_is_available__must_be_invalidated_when_a_binary_is_added_or_removed(self):
+        self.assertFalse(self.snapshot.is_available('pacman'))
+
+        bin_path = self._create_binary('pacman')
+        self.assertTrue(self.snapshot.is_available('pacman'))
+
+        os.remove(bin_path)
+        self.assertFalse(self.snapshot.is_available('pacman'))
+
+    def test_get_tool_data__must_cache_the_data_while_the_binary_does_not_change(self):
+        self._create_binary('flatpak')
+        loader = Mock(return_value='1.8.2')
+
+        self.assertEqual('1.8.2', self.snapshot.get_tool_data('flatpak', 'version', loader))
+        self.assertEqual('1.8.2', self.snapshot.get_tool_data('flatpak', 'version', loader))
+        loader.assert_called_once()
+
+        self._create_binary('flatpak', content='#!/bin/sh\necho 1.9.0')
+        loader.return_value = '1.9.0'
+        self.assertEqual('1.9.0', self.snapshot.get_tool_data('flatpak', 'version', loader))
+        self.assertEqual(2, loader.call_count)
+
+    def test_get_tool_data__must_return_none_when_the_tool_is_not_available(self):
+        loader = Mock(return_value='1.8.2')
+        self.assertIsNone(self.snapshot.get_tool_data('flatpak', 'version', loader))
+        loader.assert_not_called()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+from unittest import TestCase
+from unittest.mock import Mock
+
+from bauh.commons import system
+from bauh.commons.prepare import PrepareGraph, PrepareTask, is_file_fresh
+
+
+class PrepareGraphTest(TestCase):
+
+    def setUp(self):
+        self.pool = ThreadPoolExecutor(max_workers=4)
+        self.graph = PrepareGraph(Mock(), self.pool)
+        self.executed = []
+        self._lock = Lock()
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def _task(self, id_: str, duration: float = 0, **kwargs) -> PrepareTask:
+        def run():
+            time.sleep(duration)
+
+            with self._lock:
+                self.executed.append(id_)
+
+        return PrepareTask(id_, run, **kwargs)
+
+    def test_start__must_run_the_tasks_after_their_dependencies(self):
+        self.graph.add(self._task('sync_databases', depends_on={'mirrors'}))
+        self.graph.add(self._task('mirrors', duration=0.05))
+        self.graph.add(self._task('categories', duration=0.01))
+
+        self.assertEqual({'sync_databases', 'mirrors', 'categories'}, self.graph.start())
+        self.assertTrue(self.graph.wait(timeout=5))
+        self.assertEqual(['categories', 'mirrors', 'sync_databases'], self.executed)
+        self.assertEqual({'sync_databases', 'mirrors', 'categories'}, set(self.graph.get_timings()))
+
+    def test_start__must_run_independent_tasks_at_the_same_time(self):
+        started, release = [Event(), Event()], Event()
+
+        def run(idx: int):
+            started[idx].set()
+            release.wait(5)
+
+        self.graph.add(PrepareTask('a', lambda: run(0)))
+        self.graph.add(PrepareTask('b', lambda: run(1)))
+        self.graph.start()
+
+        self.assertTrue(started[0].wait(1) and started[1].wait(1))
+        release.set()
+        self.assertTrue(self.graph.wait(timeout=5))
+
+    def test_start__must_skip_fresh_tasks_without_holding_their_dependents(self):
+        self.graph.add(self._task('aur_index', is_fresh=lambda: True))
+        self.graph.add(self._task('disk_cache', depends_on={'aur_index'}, is_fresh=lambda: False))
+        self.graph.add(self._task('mirrors', is_fresh=lambda: True))
+        self.graph.add(self._task('sync_databases', depends_on={'mirrors'},
+                                  is_fresh=lambda: not self.graph.will_run('mirrors')))
+
+        self.assertEqual({'disk_cache'}, self.graph.start())
+        self.assertTrue(self.graph.wait(timeout=5))
+        self.assertEqual(['disk_cache'], self.executed)
+        self.assertEqual({'aur_index', 'mirrors', 'sync_databases'}, self.graph.get_skipped())
+        self.assertFalse(self.graph.is_running('aur_index'))
+
+    def test_start__must_register_the_tasks_that_will_run_before_queueing_any(self):
+        registered = []
+
+        def register(id_: str):
+            with self._lock:
+                registered.append((id_, [*self.executed]))
+
+        graph = PrepareGraph(Mock(), ThreadPoolExecutor(max_workers=1))  # the other tasks wait for a worker
+        graph.add(self._task('categories', duration=0.05, register=lambda: register('categories')))
+        graph.add(self._task('aur_index', is_fresh=lambda: True, register=lambda: register('aur_index')))
+        graph.add(self._task('mirrors', register=lambda: register('mirrors')))
+        graph.add(self._task('sync_databases', depends_on={'mirrors'}, register=lambda: register('sync_databases')))
+        graph.start()
+
+        self.assertEqual([('categories', []), ('mirrors', []), ('sync_databases', [])], registered)
+        self.assertTrue(graph.wait(timeout=5))
+        graph.pool.shutdown()
+
+    def test_start__must_run_the_tasks_that_could_not_be_registered(self):
+        self.graph.add(self._task('mirrors', register=lambda: 1 / 0))
+        self.graph.start()
+
+        self.assertTrue(self.graph.wait(timeout=5))
+        self.assertEqual(['mirrors'], self.executed)
+
+    def test_start__must_ignore_dependencies_not_added(self):
+        self.graph.add(self._task('sync_databases', depends_on={'mirrors'}))
+        self.graph.start()
+        self.assertTrue(self.graph.wait('sync_databases', timeout=5))
+
+    def test_start__must_keep_running_the_dependents_of_failed_tasks(self):
+        self.graph.add(PrepareTask('mirrors', lambda: 1 / 0))
+        self.graph.add(self._task('sync_databases', depends_on={'mirrors'}))
+        self.graph.start()
+
+        self.assertTrue(self.graph.wait(timeout=5))
+        self.assertEqual(['sync_databases'], self.executed)
+        self.graph.logger.exception.assert_called_once()
+
+    def test_start__must_raise_an_error_for_cyclic_dependencies(self):
+        self.graph.add(self._task('a', depends_on={'b'}))
+        self.graph.add(self._task('b', depends_on={'a'}))
+
+        with self.assertRaises(ValueError):
+            self.graph.start()
+
+    def test_run__must_start_processes_in_the_background_lane(self):
+        lanes = []
+        self.graph.add(PrepareTask('a', lambda: lanes.append(system.get_process_lane())))
+        self.graph.start()
+        self.graph.wait(timeout=5)
+        self.assertEqual([system.BACKGROUND], lanes)
+
+    def test_is_file_fresh(self):
+        self.assertFalse(is_file_fresh('/a/b/c/missing', 60))
+
+        with tempfile.NamedTemporaryFile() as f:
+            self.assertTrue(is_file_fresh(f.name, 60))
+
+            old = time.time() - 120
+            os.utime(f.name, (old, old))
+            self.assertFalse(is_file_fresh(f.name, 60))
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import Mock
+
+import requests
+
+from bauh.api.http import HttpClient
+from bauh.commons import replay, system, capability
+from bauh.commons.replay import FixtureNotFoundError
+from bauh.commons.system import ProcessHandler, SimpleProcess
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = 'path: {}'.format(self.path).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayTest(TestCase):
+
+    def setUp(self):
+        self.fixtures_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.file_path = '{}/counter'.format(self.fixtures_dir)
+
+    def tearDown(self):
+        replay.disable()
+        shutil.rmtree(self.fixtures_dir)
+
+    def _read_fixtures(self) -> str:
+        content = []
+        for root, _, files in os.walk(self.fixtures_dir):
+            for f in files:
+                with open(os.path.join(root, f)) as fp:
+                    content.append(fp.read())
+
+        return '\n'.join(content)
+
+    def test_replay__must_serve_the_recorded_process_outputs_in_order(self):
+        cmd = 'n=$(( $(cat {0} 2>/dev/null || echo 0) + 1 )); echo $n > {0}; echo $n'.format(self.file_path)
+
+        replay.enable(replay.RECORD, self.fixtures_dir)
+        self.assertEqual('1\n', system.run_cmd(cmd))
+        self.assertEqual('2\n', system.run_cmd(cmd))
+        self.assertEqual((False, ''), system.run(['ls', '{}/missing'.format(self.fixtures_dir)]))
+        self.assertEqual(b'out\n', system.new_subprocess(['sh', '-c', 'echo out; echo err >&2']).stdout.read())
+        self.assertTrue(ProcessHandler().handle_simple(SimpleProcess(['printf', 'a\nb\n']))[0])
+
+        os.remove(self.file_path)
+        replay.enable(replay.REPLAY, self.fixtures_dir)
+        self.assertEqual('1\n', system.run_cmd(cmd))
+        self.assertEqual('2\n', system.run_cmd(cmd))
+        self.assertEqual('2\n', system.run_cmd(cmd))  # the last output is repeated
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual((False, ''), system.run(['ls', '{}/missing'.format(self.fixtures_dir)]))
+
+        proc = system.new_subprocess(['sh', '-c', 'echo out; echo err >&2'])
+        self.assertEqual((b'out\n', b'err\n'), (proc.stdout.read(), proc.stderr.read()))
+        self.assertEqual((True, 'a\nb\n'), ProcessHandler().handle_simple(SimpleProcess(['printf', 'a\nb\n'])))
+
+    def test_replay__must_fail_the_processes_not_recorded(self):
+        store = replay.enable(replay.REPLAY, self.fixtures_dir)
+        self.assertIsNone(system.run_cmd('echo not recorded'))
+        self.assertEqual(1, len(store.misses))
+
+        replay.enable(replay.REPLAY, self.fixtures_dir, strict=True)
+        with self.assertRaises(FixtureNotFoundError):
+            system.run_cmd('echo not recorded')
+
+    def test_replay__must_resolve_the_recorded_tools(self):
+        replay.enable(replay.RECORD, self.fixtures_dir)
+        self.assertTrue(capability.is_available('sh'))
+        self.assertFalse(capability.is_available('bauh-missing-tool'))
+
+        replay.enable(replay.REPLAY, self.fixtures_dir)
+        self.assertTrue(capability.is_available('sh'))
+        self.assertFalse(capability.is_available('bauh-missing-tool'))
+        self.assertFalse(capability.is_available('bash-not-recorded'))
+
+    def test_record__must_not_record_the_root_password(self):
+        replay.enable(replay.RECORD, self.fixtures_dir)
+        self.assertEqual(b'secret\n', system.new_subprocess(['echo', 'secret']).stdout.read())
+        self.assertTrue(system.run_cmd('true') is not None)
+        self.assertNotIn('secret', self._read_fixtures())
+
+    def test_replay__must_wait_the_latency(self):
+        replay.enable(replay.RECORD, self.fixtures_dir)
+        system.run_cmd('true')
+
+        replay.enable(replay.REPLAY, self.fixtures_dir, latency=0.1)
+        ti = time.time()
+        system.run_cmd('true')
+        self.assertGreaterEqual(time.time() - ti, 0.1)
+
+    def test_replay__must_serve_the_recorded_http_responses(self):
+        server = HTTPServer(('127.0.0.1', 0), _Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        url = 'http://127.0.0.1:{}/index'.format(server.server_port)
+
+        try:
+            replay.enable(replay.RECORD, self.fixtures_dir)
+            client = HttpClient(Mock())
+            self.assertEqual('path: /index?page=1', client.get(url, params={'page': 1}).text)
+            self.assertEqual('path: /index', client.get(url, session=False).text)
+            self.assertEqual(12, client.get_content_length_in_bytes(url))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        replay.enable(replay.REPLAY, self.fixtures_dir)
+        client = HttpClient(Mock(), sleep=0)
+        res = client.get(url, params={'page': 1})
+        self.assertEqual((200, 'path: /index?page=1'), (res.status_code, res.text))
+        self.assertEqual('path: /index', client.get(url, session=False).text)
+        self.assertEqual(12, client.get_content_length_in_bytes(url))
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get(url + '/not_recorded')
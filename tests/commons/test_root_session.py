@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from bauh.commons import system
+from bauh.commons.root_session import RootSession
+from bauh.commons.system import ProcessHandler
+
+# fake authentication: it only succeeds when the line read is the expected password
+FAKE_AUTH = ['sh', '-c', 'read pwd; [ "$pwd" = "secret" ]']
+FAKE_HELPER = ['sh']
+
+
+class RootSessionTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_open__must_return_true_when_the_helper_authenticates(self):
+        with RootSession('secret', helper_cmd=FAKE_HELPER, auth_cmd=FAKE_AUTH) as session:
+            self.assertTrue(session.is_open())
+
+        self.assertFalse(session.is_open())
+
+    def test_open__must_return_false_when_the_password_is_wrong(self):
+        session = RootSession('wrong', helper_cmd=FAKE_HELPER, auth_cmd=FAKE_AUTH)
+        self.assertFalse(session.open())
+        self.assertFalse(session.is_open())
+        self.assertEqual((None, ''), session.run(['true']))
+
+    def test_open__must_return_false_when_the_helper_does_not_answer(self):
+        session = RootSession('secret', helper_cmd=['sleep', '10'], auth_cmd=FAKE_AUTH, auth_timeout=0.2)
+        self.assertFalse(session.open())
+
+    def test_open__must_return_false_when_the_helper_cannot_start_the_shell(self):
+        session = RootSession('secret', helper_cmd=['sh', '-c', 'exit 1'], auth_cmd=FAKE_AUTH)
+        self.assertFalse(session.open())
+
+    @patch('bauh.commons.root_session.system.get_backend')
+    def test_open__must_reset_the_sudo_credentials_before_validating_the_password(self, get_backend: Mock):
+        backend = Mock()
+        backend.run.return_value = Mock(returncode=0)
+        backend.popen.side_effect = lambda args, **kwargs: system.ProcessBackend().popen(['sh'], **kwargs)
+        get_backend.return_value = backend
+
+        with RootSession('secret') as session:
+            self.assertTrue(session.is_open())
+
+        self.assertEqual([['sudo', '-k'], ['sudo', '-S', '-p', '', '-v']], [c[0][0] for c in backend.run.call_args_list])
+        self.assertNotIn('input', backend.run.call_args_list[0][1])
+        self.assertEqual(b'secret\n', backend.run.call_args_list[1][1]['input'])
+        self.assertEqual(['sudo', '-n', 'sh'], backend.popen.call_args[0][0])
+        self.assertNotIn('input', backend.popen.call_args[1])
+
+    def test_open__must_not_send_the_password_to_the_helper(self):
+        input_file = '{}/input.txt'.format(self.temp_dir)
+        recorder = ['sh', '-c', 'read -r line; echo "$line" > {}; eval "$line"; exec sh'.format(input_file)]
+
+        with RootSession('secret', helper_cmd=recorder, auth_cmd=FAKE_AUTH) as session:
+            self.assertTrue(session.is_open())
+
+        with open(input_file) as f:
+            self.assertNotIn('secret', f.read())
+
+    def test_open__must_not_wait_the_timeout_when_the_password_is_wrong(self):
+        retrying_auth = ['sh', '-c', 'while read pwd; do [ "$pwd" = "secret" ] && exit 0; done; exit 1']  # like sudo
+        session = RootSession('wrong', helper_cmd=FAKE_HELPER, auth_cmd=retrying_auth, auth_timeout=5)
+        started_at = time.monotonic()
+        self.assertFalse(session.open())
+        self.assertLess(time.monotonic() - started_at, 2)
+
+    def test_run__must_execute_several_commands_through_the_same_helper(self):
+        file_path = '{}/test.txt'.format(self.temp_dir)
+
+        with RootSession('secret', helper_cmd=FAKE_HELPER, auth_cmd=FAKE_AUTH) as session:
+            helper_pid = session._proc.pid
+            self.assertEqual((0, ''), session.run(['touch', file_path]))
+            self.assertEqual((0, 'test.txt\n'), session.run(['ls'], cwd=self.temp_dir))
+            self.assertEqual((0, 'no line break'), session.run(['printf', 'no line break']))
+            self.assertEqual((0, '\n\n'), session.run(['printf', '\n\n']))
+            self.assertEqual(helper_pid, session._proc.pid)
+
+        self.assertTrue(os.path.exists(file_path))
+
+    def test_run__must_return_the_exit_code_and_error_output(self):
+        with RootSession('secret', helper_cmd=FAKE_HELPER, auth_cmd=FAKE_AUTH) as session:
+            code, output = session.run(['ls', '{}/missing'.format(self.temp_dir)])
+            self.assertNotEqual(0, code)
+            self.assertIn('missing', output)
+
+            self.assertNotEqual(0, session.run(['true'], cwd='{}/missing'.format(self.temp_dir))[0])
+
+    def test_run__must_not_let_the_commands_read_the_session_pipe(self):
+        with RootSession('secret', helper_cmd=FAKE_HELPER, auth_cmd=FAKE_AUTH) as session:
+            self.assertEqual((0, ''), session.run(['cat']))
+            self.assertEqual((0, 'ok\n'), session.run(['echo', 'ok']))
+
+    def test_run__must_not_interpret_the_command_arguments(self):
+        with RootSession('secret', helper_cmd=FAKE_HELPER, auth_cmd=FAKE_AUTH) as session:
+            self.assertEqual((0, '$HOME; exit 1\n'), session.run(['echo', '$HOME; exit 1']))
+
+    def test_handle_session__must_notify_the_watcher(self):
+        watcher = Mock()
+
+        with RootSession('secret', helper_cmd=FAKE_HELPER, auth_cmd=FAKE_AUTH) as session:
+            success, output = ProcessHandler(watcher).handle_session(session, ['printf', 'a\nb\n'])
+
+        self.assertTrue(success)
+        self.assertEqual('a\nb\n', output)
+        printed = [c[0][0] for c in watcher.print.call_args_list]
+        self.assertEqual('printf a\nb\n\n', printed[0])
+        self.assertEqual(['a', 'b'], '\n'.join(printed[1:]).split('\n'))
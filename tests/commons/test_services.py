@@ -0,0 +1,74 @@
+import os
+import shutil
+import socket
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from bauh.commons import services
+from bauh.commons.services import ServiceTracker
+
+
+class ServiceTrackerTest(TestCase):
+
+    def setUp(self):
+        self.now = 100
+        self.tracker = ServiceTracker(ttl=30, clock=lambda: self.now)
+
+    @patch('bauh.commons.services.system.check_active_services', side_effect=lambda *names: {n: True for n in names})
+    def test_is_active__must_only_run_systemctl_again_after_the_ttl(self, check_active_services: Mock):
+        self.assertEqual({'snapd.service': True, 'snapd.socket': True}, self.tracker.is_active('snapd.service', 'snapd.socket'))
+        check_active_services.assert_called_once_with('snapd.service', 'snapd.socket')
+
+        self.now = 129
+        self.tracker.is_active('snapd.service')
+        self.assertEqual(1, check_active_services.call_count)
+
+        self.now = 131
+        self.tracker.is_active('snapd.service')
+        self.assertEqual(2, check_active_services.call_count)
+
+    @patch('bauh.commons.services.system.check_active_services', side_effect=lambda *names: {n: False for n in names})
+    def test_is_active__must_use_the_probes_and_only_run_systemctl_for_the_unknown_states(self, check_active_services: Mock):
+        self.tracker.register_probe('snapd.socket', Mock(return_value=True))
+        self.tracker.register_probe('docker.socket', Mock(return_value=None))
+
+        res = self.tracker.is_active('snapd.socket', 'docker.socket', 'snapd.service')
+
+        self.assertEqual({'snapd.socket': True, 'docker.socket': False, 'snapd.service': False}, res)
+        check_active_services.assert_called_once_with('docker.socket', 'snapd.service')
+
+    @patch('bauh.commons.services.system.check_enabled_services', side_effect=lambda *names: {n: True for n in names})
+    def test_invalidate__must_read_the_states_of_the_units_again(self, check_enabled_services: Mock):
+        self.tracker.is_enabled('snapd.service', 'snapd.socket')
+        self.tracker.invalidate('snapd.socket')
+        self.tracker.is_enabled('snapd.service', 'snapd.socket')
+
+        self.assertEqual([(('snapd.service', 'snapd.socket'),), (('snapd.socket',),)],
+                         [c[0:1] for c in check_enabled_services.call_args_list])
+
+
+class ProbeUnixSocketTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.socket_path = '{}/test.socket'.format(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_probe__must_tell_if_the_socket_accepts_connections(self):
+        probe = services.probe_unix_socket(self.socket_path)
+        self.assertFalse(probe())
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen(1)
+
+        try:
+            self.assertTrue(probe())
+        finally:
+            server.close()
+
+        self.assertTrue(os.path.exists(self.socket_path))
+        self.assertFalse(probe())  # not listening anymore
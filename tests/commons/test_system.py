@@ -0,0 +1,218 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from threading import Thread, Event, Lock
+from unittest import TestCase
+from unittest.mock import Mock, call
+
+from bauh.commons import system
+from bauh.commons.system import ProcessExecutor, INTERACTIVE, BACKGROUND, OutputBuffer, ProcessHandler, \
+    SimpleProcess
+
+
+class ProcessExecutorTest(TestCase):
+
+    def test_run__must_not_exceed_the_max_running_processes(self):
+        executor = ProcessExecutor(max_running=2)
+        lock, running, peak = Lock(), [0], [0]
+
+        def task():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+
+            time.sleep(0.05)
+
+            with lock:
+                running[0] -= 1
+
+        threads = [Thread(target=executor.run, args=(task,)) for _ in range(6)]
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
+
+        self.assertEqual(2, peak[0])
+        self.assertEqual(2, executor.get_metrics()['peak'])
+        self.assertEqual(6, executor.get_metrics()['started']['interactive'])
+
+    def test_run__must_start_interactive_processes_before_background_ones(self):
+        executor = ProcessExecutor(max_running=1)
+        release, started, order = Event(), Event(), []
+
+        def blocker():
+            started.set()
+            release.wait()
+
+        blocking = Thread(target=executor.run, args=(blocker,))
+        blocking.start()
+        started.wait()
+
+        background = Thread(target=executor.run, args=(lambda: order.append('background'),), kwargs={'lane': BACKGROUND})
+        background.start()
+        time.sleep(0.05)
+
+        interactive = Thread(target=executor.run, args=(lambda: order.append('interactive'),), kwargs={'lane': INTERACTIVE})
+        interactive.start()
+        time.sleep(0.05)
+
+        release.set()
+        for t in (blocking, background, interactive):
+            t.join()
+
+        self.assertEqual(['interactive', 'background'], order)
+
+    def test_run__must_share_the_result_of_identical_commands_running_at_the_same_time(self):
+        executor = ProcessExecutor(max_running=4)
+        release, calls, results = Event(), [], []
+
+        def task():
+            calls.append(1)
+            release.wait()
+            return 'output'
+
+        threads = [Thread(target=lambda: results.append(executor.run(task, key='pacman -Qq'))) for _ in range(3)]
+        for t in threads:
+            t.start()
+
+        time.sleep(0.05)
+        release.set()
+
+        for t in threads:
+            t.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(['output'] * 3, results)
+        self.assertEqual(2, executor.get_metrics()['deduplicated'])
+
+        self.assertEqual('output', executor.run(task, key='pacman -Qq'))  # finished commands are executed again
+        self.assertEqual(2, len(calls))
+
+    def test_run__must_start_the_process_anyway_after_max_wait(self):
+        executor = ProcessExecutor(max_running=1, max_wait=0.05)
+        release, started = Event(), Event()
+
+        blocking = Thread(target=executor.run, args=(lambda: started.set() or release.wait(),))
+        blocking.start()
+        started.wait()
+
+        self.assertEqual(1, executor.run(lambda: 1))
+        self.assertEqual(1, executor.get_metrics()['overflowed'])
+
+        release.set()
+        blocking.join()
+
+    def test_spawn__must_release_the_slot_when_the_process_finishes(self):
+        executor = ProcessExecutor(max_running=1, max_wait=5)
+        proc = executor.spawn(lambda: subprocess.Popen(['sleep', '0.2']))
+        self.assertEqual(1, executor.get_metrics()['running'])
+
+        proc.wait()
+        executor.run(lambda: None)  # would wait 'max_wait' seconds if the slot were not released
+        metrics = executor.get_metrics()
+        self.assertEqual(0, metrics['running'])
+        self.assertEqual(0, metrics['overflowed'])
+
+    def test_process_lane__must_define_the_lane_of_the_current_thread(self):
+        self.assertEqual(INTERACTIVE, system.get_process_lane())
+
+        @system.process_lane(BACKGROUND)
+        def read_lane() -> int:
+            return system.get_process_lane()
+
+        self.assertEqual(BACKGROUND, read_lane())
+        self.assertEqual(INTERACTIVE, system.get_process_lane())
+
+    def test_run_cmd__must_go_through_the_executor(self):
+        started = system.EXECUTOR.get_metrics()['started']['interactive']
+        self.assertEqual('bauh\n', system.run_cmd('echo bauh', dedup=True))
+        self.assertEqual(started + 1, system.EXECUTOR.get_metrics()['started']['interactive'])
+
+
+class OutputBufferTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_getvalue__must_return_the_whole_output_when_it_fits_in_memory(self):
+        output = OutputBuffer(max_size=100, temp_dir=self.temp_dir)
+        output.write('line 1\n')
+        output.write('line 2\n')
+        output.close()
+
+        self.assertFalse(output.is_truncated())
+        self.assertIsNone(output.file_path)
+        self.assertEqual('line 1\nline 2\n', output.getvalue())
+
+    def test_write__must_keep_only_the_last_lines_and_spill_the_full_output_to_a_file(self):
+        output = OutputBuffer(max_size=21, temp_dir=self.temp_dir)
+
+        for i in range(10):
+            output.write('line {}\n'.format(i))
+
+        output.close()
+
+        self.assertTrue(output.is_truncated())
+        self.assertEqual('line 7\nline 8\nline 9\n', output.getvalue())
+
+        with open(output.file_path) as f:
+            self.assertEqual(''.join('line {}\n'.format(i) for i in range(10)), f.read())
+
+    def test_write__must_keep_only_the_latest_spilled_files(self):
+        paths = []
+        for i in range(4):
+            output = OutputBuffer(max_size=5, temp_dir=self.temp_dir, max_files=2)
+            output.write('output {}\n'.format(i))
+            output.close()
+            os.utime(output.file_path, (i, i))  # different modification times
+            paths.append(output.file_path)
+
+        self.assertEqual(sorted(paths[2:]), sorted(os.path.join(self.temp_dir, f) for f in os.listdir(self.temp_dir)))
+
+
+class ProcessHandlerTest(TestCase):
+
+    def test_handle_simple__must_send_the_output_lines_in_batches(self):
+        watcher = Mock()
+        handler = ProcessHandler(watcher, notify_interval=60)
+        success, output = handler.handle_simple(SimpleProcess(['seq', '1', '1000']))
+
+        self.assertTrue(success)
+        self.assertEqual(''.join('{}\n'.format(i) for i in range(1, 1001)), output)
+
+        printed = [c[0][0] for c in watcher.print.call_args_list]
+        self.assertLess(len(printed), 5)
+        self.assertEqual([str(i) for i in range(1, 1001)], '\n'.join(printed[1:]).split('\n'))
+
+    def test_notify_output__must_send_the_pending_lines_when_the_process_goes_quiet(self):
+        watcher = Mock()
+        handler = ProcessHandler(watcher, notify_interval=0.05)
+        handler._notify_output('line 1')  # sent right away: nothing was sent before
+        handler._notify_output('line 2')
+        handler._notify_output('line 3')
+
+        self.assertEqual([call('line 1')], watcher.print.call_args_list)
+
+        time.sleep(0.3)
+        self.assertEqual([call('line 1'), call('line 2\nline 3')], watcher.print.call_args_list)
+        self.assertIsNone(handler._flush_timer)
+
+    def test_handle_simple__must_match_the_phrases_line_by_line(self):
+        proc = SimpleProcess(['printf', 'downloading\nerror: target not found\n'],
+                             error_phrases={'error: target not found'})
+        self.assertFalse(ProcessHandler().handle_simple(proc)[0])
+
+        proc = SimpleProcess(['sh', '-c', 'echo Changes complete.; exit 1'], success_phrases={'Changes complete.'})
+        self.assertTrue(ProcessHandler().handle_simple(proc)[0])
+
+        proc = SimpleProcess(['sh', '-c', 'echo Warning: old runtime; exit 1'], wrong_error_phrases={'Warning'})
+        self.assertTrue(ProcessHandler().handle_simple(proc)[0])
+
+        proc = SimpleProcess(['sh', '-c', 'echo failed; exit 1'], success_phrases={'Changes complete.'})
+        self.assertFalse(ProcessHandler().handle_simple(proc)[0])
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from threading import Thread
+from unittest import TestCase
+
+from bauh.commons import trace, system
+
+
+class TraceTest(TestCase):
+
+    def tearDown(self):
+        trace.disable()
+
+    def test_span__must_do_nothing_when_tracing_is_disabled(self):
+        with trace.span('test') as span:
+            span.set('key', 'value')
+
+        self.assertIs(trace.DISABLED_SPAN, span)
+        self.assertFalse(trace.save('/dev/null'))
+
+    def test_span__must_record_nested_spans_and_their_attributes(self):
+        tracer = trace.enable()
+
+        with trace.span('parent', 'core', words='firefox') as parent:
+            with trace.span('child', 'process'):
+                pass
+
+            parent.set('results', 2)
+
+        events = {e['name']: e for e in tracer.get_events() if e['ph'] == 'X'}
+        self.assertEqual({'parent', 'child'}, set(events))
+        self.assertEqual({'words': 'firefox', 'results': 2}, events['parent']['args'])
+        self.assertEqual('process', events['child']['cat'])
+        self.assertGreaterEqual(events['child']['ts'], events['parent']['ts'])
+        self.assertLessEqual(events['child']['ts'] + events['child']['dur'],
+                             events['parent']['ts'] + events['parent']['dur'])
+
+    def test_span__must_record_the_error_raised(self):
+        tracer = trace.enable()
+
+        with self.assertRaises(ValueError):
+            with trace.span('test'):
+                raise ValueError()
+
+        self.assertEqual('ValueError', tracer.get_events()[-1]['args']['error'])
+
+    def test_traced__must_record_calls_from_different_threads(self):
+        @trace.traced('core.test', 'core')
+        def test() -> int:
+            return 1
+
+        self.assertEqual(1, test())  # disabled: nothing is recorded
+
+        tracer = trace.enable()
+        thread = Thread(target=test, name='worker')
+        thread.start()
+        thread.join()
+        test()
+
+        events = tracer.get_events()
+        self.assertEqual(2, len([e for e in events if e['ph'] == 'X' and e['name'] == 'core.test']))
+        self.assertIn('worker', {e['args']['name'] for e in events if e['ph'] == 'M'})
+
+    def test_save__must_write_a_chrome_trace_file(self):
+        trace.enable()
+
+        with trace.span('test', obj=object()):  # not JSON serializable attributes are written as strings
+            pass
+
+        file_path = tempfile.mktemp(prefix='bauh_test_', suffix='.json')
+
+        try:
+            self.assertTrue(trace.save(file_path))
+
+            with open(file_path) as f:
+                content = json.loads(f.read())
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+        self.assertEqual('ms', content['displayTimeUnit'])
+        self.assertEqual(['test'], [e['name'] for e in content['traceEvents'] if e['ph'] == 'X'])
+
+    def test_new_subprocess__must_not_record_the_root_password_piped_through_echo(self):
+        tracer = trace.enable()
+        system.new_subprocess(['echo', 'secret']).wait()
+
+        events = json.dumps(tracer.get_events())
+        self.assertIn('spawn', events)
+        self.assertNotIn('secret', events)
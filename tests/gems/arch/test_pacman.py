@@ -1,5 +1,6 @@
 import os
 from unittest import TestCase
+from unittest.mock import patch, Mock
 
 from bauh.gems.arch import pacman
 
@@ -21,3 +22,13 @@ class PacmanTest(TestCase):
 
         self.assertIsNotNone(ignored)
         self.assertEqual(0, len(ignored))
+
+    @patch('bauh.gems.arch.pacman.run_cmd', return_value='snapd\n')
+    def test_is_snapd_installed(self, run_cmd: Mock):
+        self.assertTrue(pacman.is_snapd_installed())
+        run_cmd.assert_called_once_with('pacman -Qq snapd', print_error=False, dedup=True)
+
+    @patch('bauh.gems.arch.pacman.run_cmd', return_value=None)
+    def test_is_available_in_repositories(self, run_cmd: Mock):
+        self.assertFalse(pacman.is_available_in_repositories('bauh'))
+        run_cmd.assert_called_once_with('pacman -Ss bauh', dedup=True)
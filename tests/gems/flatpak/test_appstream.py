@@ -0,0 +1,135 @@
+import gzip
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import Mock
+
+from bauh.gems.flatpak import appstream
+from bauh.gems.flatpak.appstream import AppstreamIndex
+
+FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_resource(name: str) -> bytes:
+    with open('{}/resources/{}'.format(FILE_DIR, name), 'rb') as f:
+        return f.read()
+
+
+class ReadComponentsTest(TestCase):
+
+    def test_read_components__must_return_only_the_untranslated_data_of_flatpak_bundles(self):
+        res = {c['id']: c for c in appstream.read_components('{}/resources/appstream.xml'.format(FILE_DIR))}
+        self.assertEqual({'org.gimp.GIMP', 'com.spotify.Client', 'org.freedesktop.Platform'}, set(res.keys()))
+
+        gimp = res['org.gimp.GIMP']
+        self.assertEqual('GNU Image Manipulation Program', gimp['name'])
+        self.assertEqual('Create images and edit photographs', gimp['summary'])
+        self.assertEqual('<p>GIMP is an acronym for GNU Image Manipulation Program.</p>'
+                         '<ul>\n        <li>Photo retouching</li>\n        <li>Image composition</li>\n      </ul>', gimp['description'])
+        self.assertEqual('2.10.22', gimp['version'])
+        self.assertEqual('https://dl.flathub.org/repo/appstream/x86_64/icons/128x128/org.gimp.GIMP.png', gimp['icon_url'])
+        self.assertEqual(['Graphics', '2DGraphics'], gimp['categories'])
+        self.assertEqual(['image', 'photo'], gimp['keywords'])
+        self.assertEqual('stable', gimp['branch'])
+        self.assertEqual('https://www.gimp.org/', gimp['homepage'])
+        self.assertFalse(gimp['runtime'])
+
+        spotify = res['com.spotify.Client']
+        self.assertEqual('file://{}/resources/icons/64x64/com.spotify.Client.png'.format(FILE_DIR), spotify['icon_url'])
+        self.assertIsNone(spotify['version'])
+        self.assertIsNone(spotify['description'])
+
+        self.assertTrue(res['org.freedesktop.Platform']['runtime'])
+
+
+class AppstreamIndexTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.installations = {'system': '{}/system'.format(self.temp_dir), 'user': '{}/user'.format(self.temp_dir)}
+        self.index = AppstreamIndex('{}/cache/appstream.db'.format(self.temp_dir), Mock(), self.installations)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _write_appstream(self, installation: str, remote: str, content: bytes) -> str:
+        active_dir = '{}/appstream/{}/x86_64/active'.format(self.installations[installation], remote)
+        Path(active_dir).mkdir(parents=True, exist_ok=True)
+        file_path = '{}/appstream.xml.gz'.format(active_dir)
+
+        with gzip.open(file_path, 'wb') as f:
+            f.write(content)
+
+        return file_path
+
+    def test_refresh__must_only_index_the_new_or_changed_files(self):
+        self._write_appstream('system', 'flathub', read_resource('appstream.xml'))
+        self.assertTrue(self.index.refresh())
+        self.assertEqual('Spotify', self.index.get('com.spotify.Client')['name'])
+        self.assertFalse(self.index.refresh())
+
+        file_path = self._write_appstream('system', 'flathub', read_resource('appstream.xml').replace(b'2.10.22', b'2.10.24'))
+        os.utime(file_path, ns=(1, 1))  # a different modification time
+        self.assertTrue(self.index.refresh())
+        self.assertEqual('2.10.24', self.index.get('org.gimp.GIMP')['version'])
+
+    def test_refresh__must_remove_the_data_of_the_remotes_removed(self):
+        self._write_appstream('user', 'flathub', read_resource('appstream.xml'))
+        self.index.refresh()
+        self.assertIsNotNone(self.index.get('org.gimp.GIMP'))
+
+        shutil.rmtree('{}/appstream/flathub'.format(self.installations['user']))
+        self.assertTrue(self.index.refresh())
+        self.assertIsNone(self.index.get('org.gimp.GIMP'))
+
+    def test_refresh__must_keep_the_other_files_when_one_is_invalid(self):
+        self._write_appstream('system', 'flathub', read_resource('appstream.xml'))
+        self._write_appstream('user', 'broken', b'<components><component>')
+        self.index.refresh()
+        self.assertIsNotNone(self.index.get('org.gimp.GIMP'))
+
+    def test_get__must_prefer_the_data_of_the_remote_informed(self):
+        self._write_appstream('system', 'flathub', read_resource('appstream.xml'))
+        self._write_appstream('user', 'flathub-beta', read_resource('appstream.xml').replace(b'2.10.22', b'2.99.2'))
+        self.index.refresh()
+
+        self.assertEqual('2.99.2', self.index.get('org.gimp.GIMP', 'flathub-beta')['version'])
+        self.assertEqual('2.10.22', self.index.get('org.gimp.GIMP', 'flathub')['version'])
+        self.assertIsNone(self.index.get('org.gimp.NotIndexed'))
+
+    def test_search__must_match_every_word_by_prefix_and_rank_the_exact_matches_first(self):
+        self._write_appstream('system', 'flathub', read_resource('appstream.xml'))
+        self.index.refresh()
+
+        self.assertEqual(['org.gimp.GIMP'], [d['id'] for d in self.index.search('gnu ima')])
+        self.assertEqual(['org.gimp.GIMP'], [d['id'] for d in self.index.search('PHOTO')])  # keyword
+        self.assertEqual([], self.index.search('gimp spotify'))
+        self.assertEqual([], self.index.search(' - '))
+
+        res = self.index.search('org.gimp.GIMP')
+        self.assertEqual(('org.gimp.GIMP', 'flathub', 'x86_64'), (res[0]['id'], res[0]['remote'], res[0]['arch']))
+
+        self.assertEqual(['org.freedesktop.Platform'], [d['id'] for d in self.index.search('runtime platform')])
+
+    def test_search__must_only_return_the_applications_of_the_installation_informed(self):
+        self._write_appstream('user', 'flathub', read_resource('appstream.xml'))
+        self.index.refresh()
+
+        self.assertTrue(self.index.has_data())
+        self.assertTrue(self.index.has_data('user'))
+        self.assertFalse(self.index.has_data('system'))
+        self.assertEqual(1, len(self.index.search('gimp', 'user')))
+        self.assertEqual([], self.index.search('gimp', 'system'))
+
+    def test_search__must_rank_the_names_before_the_summaries(self):
+        content = read_resource('appstream.xml').replace(b'<summary>Online music streaming service</summary>',
+                                                         b'<summary>Listen to music and edit images</summary>')
+        self._write_appstream('system', 'flathub', content)
+        self.index.refresh()
+
+        self.assertEqual(['org.gimp.GIMP', 'com.spotify.Client'], [d['id'] for d in self.index.search('image')])
+        self.assertEqual(['org.gimp.GIMP', 'com.spotify.Client'], [d['id'] for d in self.index.search('ima', limit=5)])
+        self.assertEqual(['org.gimp.GIMP'], [d['id'] for d in self.index.search('ima', limit=1)])
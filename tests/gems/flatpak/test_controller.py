@@ -1,6 +1,7 @@
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch, call, MagicMock
 
+from bauh.api.abstract.controller import UpgradeRequirements, UpgradeRequirement, SearchResult
 from bauh.gems.flatpak.controller import FlatpakManager
 from bauh.gems.flatpak.model import FlatpakApplication
 
@@ -119,3 +120,204 @@ class FlatpakManagerSortUpdateOrderTest(TestCase):
         self.assertEqual(platform_default.id, sorted_list[3].id)
         self.assertEqual('org.gnome.gedit', sorted_list[4].id)
         self.assertEqual('com.spotify.Client', sorted_list[5].id)
+
+
+class FlatpakManagerUpgradeTest(TestCase):
+
+    def setUp(self):
+        self.manager = FlatpakManager(MagicMock())
+        self.manager._make_exports_dir = Mock(return_value=True)
+
+    def _gen_requirements(self, *pkgs: FlatpakApplication) -> UpgradeRequirements:
+        return UpgradeRequirements(to_install=[], to_remove=[], to_upgrade=[UpgradeRequirement(p) for p in pkgs],
+                                   cannot_upgrade=[])
+
+    @patch('bauh.gems.flatpak.controller.ProcessHandler')
+    @patch('bauh.gems.flatpak.controller.flatpak.update')
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    def test_upgrade__must_upgrade_the_refs_of_each_installation_in_a_single_transaction(self, *mocks):
+        update, handler = mocks[1], mocks[2]
+        handler.return_value.handle_simple.return_value = (True, '')
+
+        gedit = FlatpakApplication(id='org.gnome.gedit', ref='org.gnome.gedit/x86_64/stable', installation='system')
+        platform = FlatpakApplication(id='org.gnome.Platform', ref='org.gnome.Platform/x86_64/3.36', installation='system')
+        locale = FlatpakApplication(id='org.gnome.Platform.Locale', ref='org.gnome.Platform.Locale/x86_64/3.36',
+                                    installation='system', partial=True)
+        spotify = FlatpakApplication(id='com.spotify.Client', ref='com.spotify.Client/x86_64/stable', installation='user')
+
+        self.assertTrue(self.manager.upgrade(self._gen_requirements(platform, locale, spotify, gedit), None, Mock()))
+
+        update.assert_has_calls([call(app_refs=[platform.ref, locale.ref, gedit.ref], installation='system', related=False, deps=False),
+                                 call(app_refs=[spotify.ref], installation='user', related=False, deps=False)])
+        self.assertEqual(2, update.call_count)
+
+    @patch('bauh.gems.flatpak.controller.ProcessHandler')
+    @patch('bauh.gems.flatpak.controller.flatpak.update')
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.4.2')
+    def test_upgrade__must_upgrade_partial_refs_one_by_one_through_their_base_refs_for_versions_older_than_1_5(self, *mocks):
+        update, handler = mocks[1], mocks[2]
+        handler.return_value.handle_simple.return_value = (True, '')
+
+        platform = FlatpakApplication(id='org.gnome.Platform', ref='org.gnome.Platform/x86_64/3.36', installation='system')
+        locale = FlatpakApplication(id='org.gnome.Platform.Locale', ref='org.gnome.Platform.Locale/x86_64/3.36',
+                                    installation='system', partial=True)
+        locale.base_ref = platform.ref
+        gedit = FlatpakApplication(id='org.gnome.gedit', ref='org.gnome.gedit/x86_64/stable', installation='system')
+
+        self.assertTrue(self.manager.upgrade(self._gen_requirements(platform, locale, gedit), None, Mock()))
+
+        self.assertEqual([call(app_refs=[platform.ref, gedit.ref], installation='system', related=False, deps=False),
+                          call(app_refs=[platform.ref], installation='system', related=True, deps=True)],
+                         update.call_args_list)
+
+    @patch('bauh.gems.flatpak.controller.ProcessHandler')
+    @patch('bauh.gems.flatpak.controller.flatpak.update')
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    def test_upgrade__must_stop_when_a_transaction_fails(self, *mocks):
+        update, handler = mocks[1], mocks[2]
+        handler.return_value.handle_simple.return_value = (False, '')
+
+        system_pkg = FlatpakApplication(id='org.gnome.gedit', ref='org.gnome.gedit/x86_64/stable', installation='system')
+        user_pkg = FlatpakApplication(id='com.spotify.Client', ref='com.spotify.Client/x86_64/stable', installation='user')
+
+        self.assertFalse(self.manager.upgrade(self._gen_requirements(system_pkg, user_pkg), None, Mock()))
+        update.assert_called_once()
+
+
+class FlatpakManagerSearchTest(TestCase):
+
+    def setUp(self):
+        self.manager = FlatpakManager(MagicMock())
+        self.manager.appstream = Mock()
+        self.manager.api_cache = Mock(**{'get.return_value': None})
+        self.manager._get_search_remote = Mock(return_value='system')
+        self.manager.read_installed = Mock(return_value=SearchResult([], None, 0))
+
+    @patch('bauh.gems.flatpak.controller.flatpak.search')
+    def test_search__must_search_the_appstream_index(self, search: Mock):
+        self.manager.appstream.has_data.return_value = True
+        gimp = {'id': 'org.gimp.GIMP', 'name': 'GIMP', 'summary': 'Create images', 'version': '2.10.22', 'branch': 'stable',
+                'remote': 'flathub', 'arch': 'x86_64', 'runtime': False}
+        self.manager.appstream.search.return_value = [gimp]
+        self.manager.appstream.get.return_value = gimp
+
+        res = self.manager.search('gimp', disk_loader=None)
+
+        search.assert_not_called()
+        self.manager.appstream.search.assert_called_once_with('gimp', 'system', -1)
+        self.assertEqual(1, res.total)
+        self.assertEqual(('org.gimp.GIMP', 'GIMP', 'flathub', 'stable', '2.10.22'),
+                         (res.new[0].id, res.new[0].name, res.new[0].origin, res.new[0].branch, res.new[0].latest_version))
+
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    @patch('bauh.gems.flatpak.controller.flatpak.search', return_value=[])
+    def test_search__must_run_flatpak_search_when_there_is_no_appstream_data(self, search: Mock, *mocks):
+        self.manager.appstream.has_data.return_value = False
+
+        self.manager.search('gimp', disk_loader=None)
+
+        search.assert_called_once_with('1.8.2', 'gimp', 'system')
+        self.manager.appstream.search.assert_not_called()
+
+
+class FlatpakManagerReadInstalledTest(TestCase):
+
+    def setUp(self):
+        self.manager = FlatpakManager(MagicMock())
+        self.manager.appstream = Mock(**{'get.return_value': None})
+        self.manager.summaries = Mock()
+        self.manager.api_cache = Mock(**{'get.return_value': None})
+        self.manager._read_ignored_updates = Mock(return_value=set())
+        self.installed = [{'id': 'org.gimp.GIMP', 'name': 'GIMP', 'ref': 'org.gimp.GIMP/x86_64/stable', 'arch': 'x86_64',
+                           'branch': 'stable', 'description': None, 'origin': 'flathub', 'runtime': False,
+                           'installation': 'system', 'version': '2.10.22', 'commit': 'a1b2'},
+                          {'id': 'org.gnome.Platform', 'name': 'Platform', 'ref': 'org.gnome.Platform/x86_64/3.38', 'arch': 'x86_64',
+                           'branch': '3.38', 'description': None, 'origin': 'flathub', 'runtime': True,
+                           'installation': 'user', 'version': '3.38', 'commit': 'c3d4'}]
+        self.manager._list_installed = Mock(return_value=self.installed)
+
+    @patch('bauh.gems.flatpak.controller.flatpak.list_updates_as_str')
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    def test_read_installed__must_detect_the_updates_from_the_remotes_summaries(self, get_version: Mock, list_updates: Mock):
+        self.manager.summaries.map_updates.return_value = {'user/org.gnome.Platform/x86_64/3.38'}
+
+        res = self.manager.read_installed(disk_loader=None, internet_available=True)
+
+        list_updates.assert_not_called()
+        self.manager.summaries.refresh_all.assert_called_once_with(self.installed)
+        self.assertEqual([False, True], [p.update for p in res.installed])
+
+    @patch('bauh.gems.flatpak.controller.flatpak.list_updates_as_str')
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    def test_read_installed__must_use_the_cached_summaries_when_offline(self, get_version: Mock, list_updates: Mock):
+        self.manager.summaries.map_updates.return_value = {'system/org.gimp.GIMP/x86_64/stable'}
+
+        res = self.manager.read_installed(disk_loader=None, internet_available=False)
+
+        list_updates.assert_not_called()
+        self.manager.summaries.refresh_all.assert_not_called()
+        self.assertEqual([True, False], [p.update for p in res.installed])
+
+    @patch('bauh.gems.flatpak.controller.flatpak.list_updates_as_str',
+           return_value={'full': {'org.gimp.GIMP/stable/system'}, 'partial': set()})
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    def test_read_installed__must_read_the_updates_from_flatpak_when_the_summaries_are_not_available(self, get_version: Mock, list_updates: Mock):
+        self.manager.summaries.refresh_all.return_value = False
+
+        res = self.manager.read_installed(disk_loader=None, internet_available=True)
+
+        list_updates.assert_called_once_with('1.8.2')
+        self.manager.summaries.map_updates.assert_not_called()
+        self.assertEqual([True, None], [p.update for p in res.installed])
+
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    def test_read_installed__must_keep_the_installed_version_of_the_apps_with_updates(self, *mocks):
+        self.installed[0]['version'] = '2.10.20'
+        self.manager.appstream.get.return_value = {'id': 'org.gimp.GIMP', 'name': 'GIMP', 'summary': 'Create images',
+                                                   'version': '2.10.22', 'remote': 'flathub'}
+        self.manager.summaries.map_updates.return_value = {'system/org.gimp.GIMP/x86_64/stable'}
+
+        gimp = self.manager.read_installed(disk_loader=None, internet_available=True).installed[0]
+
+        self.assertTrue(gimp.update)
+        self.assertEqual(('2.10.20', '2.10.22'), (gimp.version, gimp.latest_version))
+        self.assertEqual(('2.10.20', '2.10.22'), (self.manager.api_cache.add.call_args[0][1]['version'],
+                                                  self.manager.api_cache.add.call_args[0][1]['latest_version']))
+
+
+class FlatpakManagerHistoryTest(TestCase):
+
+    def setUp(self):
+        self.manager = FlatpakManager(MagicMock())
+        self.manager.summaries = Mock(**{'get_latest.return_value': ('c2', 1024)})
+        self.manager.history = Mock(**{'get_commits.return_value': [{'commit': 'c2'}, {'commit': 'c1'}]})
+        self.pkg = FlatpakApplication(id='org.gimp.GIMP', ref='org.gimp.GIMP/x86_64/stable', branch='stable', arch='x86_64',
+                                      origin='flathub', installation='system')
+
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    @patch('bauh.gems.flatpak.controller.flatpak.get_app_info_fields', return_value={'commit': 'c1', 'version': '2.10.20'})
+    def test_get_history__must_read_the_cached_history_up_to_the_latest_commit(self, get_app_info_fields: Mock, *mocks):
+        res = self.manager.get_history(self.pkg)
+
+        self.manager.history.get_commits.assert_called_once_with('system', 'flathub', 'org.gimp.GIMP/x86_64/stable', 'c2')
+        self.assertEqual(1, res.pkg_status_idx)
+        self.assertEqual('c1', self.pkg.commit)
+
+        self.pkg.installed = True
+        self.assertEqual('2.10.20', self.manager.get_info(self.pkg)['version'])
+        get_app_info_fields.assert_called_once_with('org.gimp.GIMP', 'stable', 'system')  # answered from memory
+
+    @patch('bauh.gems.flatpak.controller.flatpak.get_version', return_value='1.8.2')
+    @patch('bauh.gems.flatpak.controller.flatpak.get_app_info_fields', return_value={'version': '2.10.20'})
+    def test_get_info__must_read_the_installed_info_again_after_an_upgrade(self, get_app_info_fields: Mock, *mocks):
+        self.pkg.installed = True
+        self.manager.get_info(self.pkg)
+        self.manager.get_info(self.pkg)
+        self.assertEqual(1, get_app_info_fields.call_count)
+
+        self.manager._upgrade_transaction = Mock(return_value=True)
+        self.manager._make_exports_dir = Mock(return_value=True)
+        self.manager.upgrade(UpgradeRequirements(None, None, [UpgradeRequirement(self.pkg)], []), None, Mock())
+
+        self.manager.get_info(self.pkg)
+        self.assertEqual(2, get_app_info_fields.call_count)
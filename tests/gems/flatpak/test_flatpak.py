@@ -0,0 +1,81 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import Mock, call, patch
+
+from bauh.gems.flatpak import flatpak
+
+
+class UpdateTest(TestCase):
+
+    @patch('bauh.gems.flatpak.flatpak.SimpleProcess')
+    def test_update__must_upgrade_all_refs_in_a_single_process(self, simple_process: Mock):
+        flatpak.update(['org.gnome.gedit/x86_64/stable', 'org.gnome.Platform/x86_64/3.36'], 'user')
+
+        simple_process.assert_called_once_with(cmd=['flatpak', 'update', '-y', 'org.gnome.gedit/x86_64/stable',
+                                                    'org.gnome.Platform/x86_64/3.36', '--user', '--no-related', '--no-deps'],
+                                               extra_paths={flatpak.EXPORTS_PATH}, shell=True)
+
+
+class TransactionOutputParserTest(TestCase):
+
+    def test_handle__must_notify_the_refs_from_the_transaction_table(self):
+        on_ref, on_percent = Mock(), Mock()
+        parser = flatpak.TransactionOutputParser(on_ref, on_percent)
+
+        for line in ('Looking for updates…',
+                     'ID                                   Branch    Op   Remote    Download',
+                     '1.     org.gnome.Platform                  3.36      u    flathub   < 50.3 MB',
+                     '2.     org.gnome.gedit                     stable    u    flathub   < 10.1 MB (partial)',
+                     'Updating 1/2… ████                  20%  1.2 MB/s',
+                     'Updating 1/2… ████████████          60%  1.2 MB/s',
+                     'Updating 2/2… ██                    10%  800.0 kB/s',
+                     'Updating 2/2… ████████████████████ 100%  800.0 kB/s',
+                     'Updates complete.'):
+            parser.handle(line)
+
+        self.assertEqual([call('org.gnome.Platform', 1, 2), call('org.gnome.gedit', 2, 2)], on_ref.call_args_list)
+        self.assertEqual([call(20), call(60), call(10), call(100)], on_percent.call_args_list)
+
+    def test_handle__must_notify_the_refs_from_the_old_versions_output(self):
+        on_ref = Mock()
+        parser = flatpak.TransactionOutputParser(on_ref)
+
+        for line in ('Updating: org.gnome.Platform/x86_64/3.36 from flathub',
+                     '[####################] 10 delta parts, 61 loose fetched; 51234 KiB transferred in 12 seconds',
+                     'Updating: app/org.gnome.gedit/x86_64/stable from flathub',
+                     'Updating: app/org.gnome.gedit/x86_64/stable from flathub'):
+            parser.handle(line)
+
+        self.assertEqual([call('org.gnome.Platform', 1, 0), call('org.gnome.gedit', 2, 0)], on_ref.call_args_list)
+
+
+class MapCommitsTest(TestCase):
+
+    LOG = """GNU Image Manipulation Program - Create images and edit photographs
+
+          ID: org.gimp.GIMP
+         Ref: app/org.gimp.GIMP/x86_64/stable
+        Arch: x86_64
+      Branch: stable
+      Commit: c3
+      Parent: c2
+     Subject: Update to 2.10.22
+        Date: 2020-10-17 12:00:00 +0000
+     History:
+
+      Commit: c2
+     Subject: Update to 2.10.20
+        Date: 2020-07-08 10:30:00 +0000
+
+      Commit: c1
+     Subject: Initial release
+        Date: 2020-01-01 08:00:00 +0000
+"""
+
+    def test_map_commits__must_return_every_commit_from_the_newest(self):
+        res = list(flatpak.map_commits(self.LOG.split('\n')))
+        self.assertEqual(['c3', 'c2', 'c1'], [c['commit'] for c in res])
+        self.assertEqual({'commit': 'c3', 'subject': 'Update to 2.10.22', 'date': datetime(2020, 10, 17, 12)}, res[0])
+
+    def test_map_commits__must_stop_at_the_commit_informed(self):
+        self.assertEqual(['c3', 'c2'], [c['commit'] for c in flatpak.map_commits(self.LOG.split('\n'), stop_at='c2')])
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from bauh.gems.flatpak import gvariant
+from bauh.gems.flatpak.gvariant import Reader
+
+
+class ParseTypeTest(TestCase):
+
+    def test_parse_type__must_return_the_type_tree_of_the_first_complete_type(self):
+        self.assertEqual((('a', ('{', ['s', 'v'])), 5), gvariant.parse_type('a{sv}i'))
+        self.assertEqual((('(', ['t', ('a', 'y')]), 5), gvariant.parse_type('(tay)'))
+
+    def test_parse_type__must_raise_an_error_for_maybe_types(self):
+        with self.assertRaises(ValueError):
+            gvariant.parse_type('ms')
+
+
+class ReaderTest(TestCase):
+    """
+    Examples from the GVariant serialization specification
+    """
+
+    def test_read__array_of_strings(self):
+        data = bytes.fromhex('6900 63616e00 68617300 737472696e67733f00 02060a13')
+        self.assertEqual(['i', 'can', 'has', 'strings?'], Reader().read('as', data))
+
+    def test_read__tuple(self):
+        self.assertEqual(('foo', -1), Reader().read('(si)', bytes.fromhex('666f6f00 ffffffff 04')))
+
+    def test_read__dictionary_entry(self):
+        self.assertEqual(['a key', 514], Reader().read('{si}', bytes.fromhex('61206b657900 0000 02020000 06')))
+
+    def test_read__array_of_dictionary_entries_as_dict(self):
+        data = bytes.fromhex('6100 0000 01000000 02 000000 6200 0000 02000000 02 0915')
+        self.assertEqual({'a': 1, 'b': 2}, Reader().read('a{si}', data))
+
+    def test_read__array_of_bytes(self):
+        self.assertEqual(b'\x01\x02\x03', Reader().read('ay', b'\x01\x02\x03'))
+
+    def test_read__variant(self):
+        self.assertEqual(4, Reader().read('v', bytes.fromhex('04000000 00 69')))
+
+    def test_read__big_endian_numbers(self):
+        self.assertEqual(256, Reader(byteorder='big').read('t', bytes.fromhex('0000000000000100')))
+        self.assertEqual((1, 2), Reader(byteorder='big').read('(qq)', bytes.fromhex('0001 0002')))
+
+    def test_read__empty_array(self):
+        self.assertEqual([], Reader().read('as', b''))
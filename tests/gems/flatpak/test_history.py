@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from bauh.api.exception import NoInternetException
+from bauh.gems.flatpak.history import HistoryCache
+
+REF = 'org.gimp.GIMP/x86_64/stable'
+
+
+def commit(id_: str, day: int) -> dict:
+    return {'commit': id_, 'subject': 'Build {}'.format(id_), 'date': datetime(2020, 10, day, 12)}
+
+
+class HistoryCacheTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.cache = HistoryCache(Mock(), self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @patch('bauh.gems.flatpak.history.flatpak.read_app_commits')
+    def test_get_commits__must_only_fetch_the_commits_newer_than_the_cached_head(self, read_app_commits: Mock):
+        read_app_commits.return_value = [commit('c2', 2), commit('c1', 1)]
+        self.assertEqual([commit('c2', 2), commit('c1', 1)], self.cache.get_commits('system', 'flathub', REF))
+        read_app_commits.assert_called_once_with(REF, 'flathub', 'system', stop_at=None)
+
+        read_app_commits.reset_mock()
+        read_app_commits.return_value = [commit('c3', 3), commit('c2', 2)]
+        self.assertEqual([commit('c3', 3), commit('c2', 2), commit('c1', 1)], self.cache.get_commits('system', 'flathub', REF))
+        read_app_commits.assert_called_once_with(REF, 'flathub', 'system', stop_at='c2')
+        self.assertEqual([commit('c3', 3), commit('c2', 2), commit('c1', 1)], self.cache.read('system', 'flathub', REF))
+
+    @patch('bauh.gems.flatpak.history.flatpak.read_app_commits')
+    def test_get_commits__must_not_fetch_the_log_when_the_latest_commit_is_the_cached_head(self, read_app_commits: Mock):
+        self.cache.write('system', 'flathub', REF, [commit('c2', 2), commit('c1', 1)])
+
+        self.assertEqual([commit('c2', 2), commit('c1', 1)], self.cache.get_commits('system', 'flathub', REF, latest_commit='c2'))
+        read_app_commits.assert_not_called()
+
+    @patch('bauh.gems.flatpak.history.flatpak.read_app_commits')
+    def test_get_commits__must_replace_the_cached_commits_when_the_head_is_not_found(self, read_app_commits: Mock):
+        self.cache.write('system', 'flathub', REF, [commit('c2', 2), commit('c1', 1)])
+        read_app_commits.return_value = [commit('x2', 4), commit('x1', 3)]  # history rewritten
+
+        self.assertEqual([commit('x2', 4), commit('x1', 3)], self.cache.get_commits('system', 'flathub', REF))
+
+    @patch('bauh.gems.flatpak.history.flatpak.read_app_commits', return_value=None)
+    def test_get_commits__must_return_the_cached_commits_when_the_log_cannot_be_read(self, *mocks):
+        self.cache.write('user', 'flathub', REF, [commit('c1', 1)])
+        self.assertEqual([commit('c1', 1)], self.cache.get_commits('user', 'flathub', REF))
+
+        with self.assertRaises(NoInternetException):
+            self.cache.get_commits('system', 'flathub', REF)
@@ -0,0 +1,92 @@
+import gzip
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+from unittest import TestCase
+
+from bauh.gems.flatpak import installation
+
+APPDATA = """<?xml version="1.0" encoding="UTF-8"?>
+<components version="0.8">
+  <component type="desktop">
+    <id>org.gimp.GIMP</id>
+    <name>GNU Image Manipulation Program</name>
+    <name xml:lang="pt_BR">Programa de Manipulação de Imagens GNU</name>
+    <summary>Create images and edit photographs</summary>
+    <releases>
+      <release timestamp="1602892800" version="2.10.22"/>
+      <release timestamp="1594166400" version="2.10.20"/>
+    </releases>
+  </component>
+</components>
+"""
+
+METAINFO = """<?xml version="1.0" encoding="UTF-8"?>
+<component type="runtime">
+  <id>org.freedesktop.Platform</id>
+  <name>Freedesktop Platform</name>
+  <summary>Runtime platform for applications</summary>
+  <releases>
+    <release version="20.08.15"/>
+  </releases>
+</component>
+"""
+
+
+class ListInstalledTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.installations = {'system': '{}/system'.format(self.temp_dir), 'user': '{}/user'.format(self.temp_dir)}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _deploy(self, installation_: str, kind: str, ref: str, origin: str, commit: str,
+                appdata: Optional[str] = None, appdata_file: Optional[str] = None):
+        id_, arch, branch = ref.split('/')
+        branch_dir = '{}/{}/{}/{}/{}'.format(self.installations[installation_], kind, id_, arch, branch)
+        commit_dir = '{}/{}'.format(branch_dir, commit)
+        Path(commit_dir).mkdir(parents=True)
+        os.symlink(commit, '{}/active'.format(branch_dir))
+
+        with open('{}/metadata'.format(commit_dir), 'w+') as f:
+            f.write('[{}]\nname={}\n'.format('Application' if kind == 'app' else 'Runtime', id_))
+
+        with open('{}/deploy'.format(commit_dir), 'wb+') as f:
+            f.write(origin.encode() + b'\0' + commit.encode() + b'\0\x00\x00\x00\x10\x2a')
+
+        if appdata:
+            file_path = '{}/{}'.format(commit_dir, appdata_file.format(id=id_))
+            Path(os.path.dirname(file_path)).mkdir(parents=True)
+
+            with (gzip.open(file_path, 'wt') if file_path.endswith('.gz') else open(file_path, 'w+')) as f:
+                f.write(appdata)
+
+    def test_list_installed__must_return_the_deployed_refs_of_every_installation(self):
+        self._deploy('system', 'app', 'org.gimp.GIMP/x86_64/stable', 'flathub', 'a1b2c3',
+                     APPDATA, installation.APPDATA_FILES[0])
+        self._deploy('system', 'runtime', 'org.freedesktop.Platform/x86_64/20.08', 'flathub', 'd4e5f6',
+                     METAINFO, installation.APPDATA_FILES[1])
+        self._deploy('user', 'runtime', 'org.gnome.Platform.Locale/x86_64/3.38', 'gnome-nightly', '0a0b0c')
+        os.symlink('x86_64/stable', '{}/app/org.gimp.GIMP/current'.format(self.installations['system']))
+        Path('{}/app/org.gimp.GIMP/x86_64/beta'.format(self.installations['system'])).mkdir()  # not deployed
+
+        res = installation.list_installed(self.installations)
+
+        self.assertEqual([{'id': 'org.gimp.GIMP', 'name': 'GNU Image Manipulation Program', 'ref': 'org.gimp.GIMP/x86_64/stable',
+                           'arch': 'x86_64', 'branch': 'stable', 'description': 'Create images and edit photographs',
+                           'origin': 'flathub', 'runtime': False, 'installation': 'system', 'version': '2.10.22',
+                           'commit': 'a1b2c3'},
+                          {'id': 'org.freedesktop.Platform', 'name': 'Freedesktop Platform', 'ref': 'org.freedesktop.Platform/x86_64/20.08',
+                           'arch': 'x86_64', 'branch': '20.08', 'description': 'Runtime platform for applications',
+                           'origin': 'flathub', 'runtime': True, 'installation': 'system', 'version': '20.08.15',
+                           'commit': 'd4e5f6'},
+                          {'id': 'org.gnome.Platform.Locale', 'name': 'Locale', 'ref': 'org.gnome.Platform.Locale/x86_64/3.38',
+                           'arch': 'x86_64', 'branch': '3.38', 'description': None, 'origin': 'gnome-nightly',
+                           'runtime': True, 'installation': 'user', 'version': '3.38', 'commit': '0a0b0c'}], res)
+
+    def test_list_installed__must_return_nothing_when_there_are_no_installations(self):
+        self.assertEqual([], installation.list_installed(self.installations))
@@ -0,0 +1,168 @@
+import gzip
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import Mock
+
+from bauh.gems.flatpak import gvariant, summary
+from bauh.gems.flatpak.summary import SummaryCache
+
+
+def _frame(parts: list, offsets: list, reverse: bool) -> bytes:
+    body = b''.join(parts)
+    for size in (1, 2, 4, 8):
+        if len(body) + len(offsets) * size < 256 ** size:
+            return body + b''.join(o.to_bytes(size, 'little') for o in (reversed(offsets) if reverse else offsets))
+
+
+def serialize(type_, value) -> bytes:
+    """
+    Serializes the value as big-endian GVariant (like OSTree does). Variants are informed as (signature, value).
+    """
+    if isinstance(type_, str) and len(type_) > 1:
+        type_ = gvariant.parse_type(type_)[0]
+
+    if isinstance(type_, str):
+        if type_ in gvariant.STRINGS:
+            return value.encode() + b'\0'
+
+        if type_ == 'v':
+            return serialize(value[0], value[1]) + b'\0' + value[0].encode()
+
+        return value.to_bytes(gvariant.FIXED_SIZES[type_], 'big', signed=type_ in gvariant.SIGNED)
+
+    if type_[0] == 'a':
+        if type_[1] == 'y':
+            return bytes(value)
+
+        items = value.items() if isinstance(value, dict) else value
+        parts, offsets, pos = [], [], 0
+        for item in items:
+            padding = gvariant._align(pos, gvariant._alignment(type_[1])) - pos
+            parts.append(b'\0' * padding + serialize(type_[1], item))
+            pos += len(parts[-1])
+            offsets.append(pos)
+
+        return _frame(parts, offsets if gvariant._fixed_size(type_[1]) is None else [], reverse=False)
+
+    parts, offsets, pos = [], [], 0
+    for idx, (member, member_value) in enumerate(zip(type_[1], value)):
+        padding = gvariant._align(pos, gvariant._alignment(member)) - pos
+        parts.append(b'\0' * padding + serialize(member, member_value))
+        pos += len(parts[-1])
+
+        if gvariant._fixed_size(member) is None and idx < len(type_[1]) - 1:
+            offsets.append(pos)
+
+    return _frame(parts, offsets, reverse=True)
+
+
+def build_summary(refs: dict, cache: dict = None) -> bytes:
+    """
+    :param refs: ref -> (commit, download size published in 'xa.data' or None)
+    :param cache: ref -> download size published in 'xa.cache'
+    """
+    ref_list = []
+    for ref, (commit, size) in sorted(refs.items()):
+        metadata = {'xa.data': ('(tts)', (1024, size, ''))} if size is not None else {}
+        ref_list.append((ref, (0, bytes.fromhex(commit), metadata)))
+
+    metadata = {'xa.cache': ('a{s(tts)}', {r: (1024, s, '') for r, s in cache.items()})} if cache else {}
+    return serialize(summary.SUMMARY_TYPE, (ref_list, metadata))
+
+
+def build_index(subsummaries: dict) -> bytes:
+    return serialize(summary.SUMMARY_INDEX_TYPE, ({arch: (bytes.fromhex(checksum), [], {})
+                                                   for arch, checksum in subsummaries.items()}, {}))
+
+
+def response(status_code: int, content: bytes = b'', headers: dict = None) -> Mock:
+    return Mock(status_code=status_code, content=content, headers=headers or {})
+
+
+class ParseSummaryTest(TestCase):
+
+    def test_parse_summary__must_return_the_commit_and_download_size_of_each_ref(self):
+        data = build_summary({'app/org.gimp.GIMP/x86_64/stable': ('a1b2', 2048),
+                              'runtime/org.gnome.Platform/x86_64/3.38': ('c3d4', None),
+                              'runtime/org.freedesktop.Platform/x86_64/20.08': ('e5f6', None)},
+                             cache={'runtime/org.gnome.Platform/x86_64/3.38': 4096})
+
+        self.assertEqual({'app/org.gimp.GIMP/x86_64/stable': ('a1b2', 2048),
+                          'runtime/org.gnome.Platform/x86_64/3.38': ('c3d4', 4096),
+                          'runtime/org.freedesktop.Platform/x86_64/20.08': ('e5f6', None)},
+                         summary.parse_summary(data))
+
+    def test_parse_summary_index__must_return_the_subsummary_checksum_of_each_arch(self):
+        self.assertEqual({'x86_64': 'aabb', 'aarch64': 'ccdd'},
+                         summary.parse_summary_index(build_index({'x86_64': 'aabb', 'aarch64': 'ccdd'})))
+
+
+class SummaryCacheTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.installations = {'system': '{}/system'.format(self.temp_dir)}
+        Path('{}/system/repo'.format(self.temp_dir)).mkdir(parents=True)
+
+        with open('{}/system/repo/config'.format(self.temp_dir), 'w+') as f:
+            f.write('[core]\nrepo_version=1\n\n'
+                    '[remote "flathub"]\nurl=https://dl.flathub.org/repo/\n\n'
+                    '[remote "disabled"]\nurl=https://disabled.org/repo\nxa.disable=true\n')
+
+        self.http_client = Mock()
+        self.cache = SummaryCache(self.http_client, Mock(), '{}/cache'.format(self.temp_dir), self.installations)
+        self.installed = [{'installation': 'system', 'origin': 'flathub', 'arch': 'x86_64', 'runtime': False,
+                           'ref': 'org.gimp.GIMP/x86_64/stable', 'commit': 'a1b2'},
+                          {'installation': 'system', 'origin': 'flathub', 'arch': 'x86_64', 'runtime': True,
+                           'ref': 'org.gnome.Platform/x86_64/3.38', 'commit': 'c3d4'}]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_read_remotes__must_only_return_the_enabled_remotes(self):
+        self.assertEqual({'flathub': 'https://dl.flathub.org/repo'}, summary.read_remotes(self.installations['system']))
+
+    def test_map_updates__must_return_the_refs_whose_latest_commit_differs_from_the_deployed(self):
+        subsummary = build_summary({'app/org.gimp.GIMP/x86_64/stable': ('a1b2', 1),
+                                    'runtime/org.gnome.Platform/x86_64/3.38': ('ffff', 5000)})
+        self.http_client.get.side_effect = [response(200, build_index({'x86_64': '0102'}), {'ETag': '"v1"'}),
+                                            response(200, gzip.compress(subsummary))]
+
+        self.assertTrue(self.cache.refresh_all(self.installed))
+        self.assertEqual({'system/org.gnome.Platform/x86_64/3.38'}, self.cache.map_updates(self.installed))
+        self.assertEqual(('ffff', 5000), self.cache.get_latest(self.installed[1]))
+
+        self.http_client.get.assert_any_call('https://dl.flathub.org/repo/summary.idx', headers={}, single_call=True)
+        self.http_client.get.assert_any_call('https://dl.flathub.org/repo/summaries/0102.gz', headers={}, single_call=True)
+
+    def test_refresh__must_only_download_the_files_changed(self):
+        self.http_client.get.side_effect = [response(200, build_index({'x86_64': '0102'}), {'ETag': '"v1"'}),
+                                            response(200, gzip.compress(build_summary({})))]
+        self.assertTrue(self.cache.refresh('system', 'flathub', 'https://dl.flathub.org/repo', {'x86_64'}))
+
+        self.http_client.get.reset_mock(side_effect=True)
+        self.http_client.get.return_value = response(304)
+        self.assertTrue(self.cache.refresh('system', 'flathub', 'https://dl.flathub.org/repo', {'x86_64'}))
+        self.http_client.get.assert_called_once_with('https://dl.flathub.org/repo/summary.idx',
+                                                     headers={'If-None-Match': '"v1"'}, single_call=True)
+
+    def test_refresh__must_download_the_single_summary_when_the_remote_is_not_indexed(self):
+        data = build_summary({'app/org.gimp.GIMP/x86_64/stable': ('0000', None)})
+        self.http_client.get.side_effect = [response(404), response(200, data)]
+
+        self.assertTrue(self.cache.refresh_all(self.installed))
+        self.assertEqual({'system/org.gimp.GIMP/x86_64/stable'}, self.cache.map_updates(self.installed))
+
+    def test_map_updates__must_use_the_cached_summaries_when_offline(self):
+        self.http_client.get.side_effect = [response(404), response(200, build_summary({}))]
+        self.cache.refresh_all(self.installed)
+
+        offline_cache = SummaryCache(Mock(), Mock(), self.cache.cache_dir, self.installations)
+        self.assertEqual(set(), offline_cache.map_updates(self.installed))
+
+    def test_map_updates__must_return_none_when_the_summaries_are_unknown(self):
+        self.http_client.get.return_value = None  # no connection
+        self.assertFalse(self.cache.refresh_all(self.installed))
+        self.assertIsNone(self.cache.map_updates(self.installed))
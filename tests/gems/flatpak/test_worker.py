@@ -1,6 +1,8 @@
 from unittest import TestCase
+from unittest.mock import Mock
 
-from bauh.gems.flatpak.worker import FlatpakAsyncDataLoader
+from bauh.gems.flatpak.model import FlatpakApplication
+from bauh.gems.flatpak.worker import FlatpakAsyncDataLoader, map_api_data
 
 
 class FlatpakAsyncDataLoaderTest(TestCase):
@@ -18,3 +20,25 @@ class FlatpakAsyncDataLoaderTest(TestCase):
         self.assertEqual('3d graphics', FlatpakAsyncDataLoader.format_category('3DGraphics'))
         self.assertEqual('32d graphics', FlatpakAsyncDataLoader.format_category('32DGraphics'))
         self.assertEqual('d32 graphics', FlatpakAsyncDataLoader.format_category('D32Graphics'))
+
+    def test_fill__must_fill_the_app_with_the_appstream_data(self):
+        app = FlatpakApplication(id='org.gimp.GIMP', version='2.10.20')
+        app.installed = True
+        category_cache = Mock(**{'get.return_value': None})
+
+        FlatpakAsyncDataLoader.fill(app, {'name': 'GIMP', 'summary': 'Create images', 'description': None, 'version': '2.10.22',
+                                          'icon_url': 'https://dl.flathub.org/gimp.png', 'categories': ['2DGraphics']},
+                                    category_cache)
+
+        self.assertEqual('Create images', app.description)
+        self.assertEqual('2.10.22', app.latest_version)
+        self.assertEqual('https://dl.flathub.org/gimp.png', app.icon_url)
+        self.assertEqual(['2d graphics'], app.categories)
+        category_cache.add_non_existing.assert_called_once_with('2DGraphics', '2d graphics')
+
+    def test_map_api_data(self):
+        data = map_api_data({'name': 'GIMP', 'summary': 'Create images', 'description': '<p>GIMP</p>',
+                             'currentReleaseVersion': '2.10.22', 'iconMobileUrl': '/repo/icons/gimp.png',
+                             'categories': [{'name': 'Graphics'}]})
+        self.assertEqual({'name': 'GIMP', 'summary': 'Create images', 'description': '<p>GIMP</p>', 'version': '2.10.22',
+                          'icon_url': 'https://flathub.org/repo/icons/gimp.png', 'categories': ['Graphics']}, data)
@@ -0,0 +1,27 @@
+from unittest import TestCase
+from unittest.mock import Mock, MagicMock, patch
+
+from bauh.gems.snap.controller import SnapManager
+
+
+def snap_json(name: str) -> dict:
+    return {'id': name, 'name': name, 'publisher': {'username': 'dev'}, 'type': 'app'}
+
+
+class SnapManagerSuggestionsTest(TestCase):
+
+    def setUp(self):
+        self.manager = SnapManager(MagicMock())
+        self.manager.suggestions_cache = Mock(**{'get.return_value': None})
+        self.manager.snapd_client = Mock(**{'list_all_snaps.return_value': [{'name': 'vlc'}],
+                                            'find_by_name.side_effect': lambda name: [snap_json(name)]})
+        self.manager.suggestions = Mock(**{'read_suggestions.return_value': [(1, 'vlc'), (2, 'gimp'), (3, 'spotify')],
+                                           'get_data.return_value': {'gimp': snap_json('gimp')}})
+
+    @patch('bauh.gems.snap.controller.snapd.is_running', return_value=True)
+    def test_list_suggestions__must_only_look_up_the_snaps_not_cached(self, *mocks):
+        res = self.manager.list_suggestions(limit=-1, filter_installed=True)
+
+        self.assertEqual(['spotify', 'gimp'], [s.package.name for s in res])
+        self.manager.snapd_client.find_by_name.assert_called_once_with('spotify')
+        self.manager.suggestions.add_data.assert_called_once_with({'spotify': snap_json('spotify')})
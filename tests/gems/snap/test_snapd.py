@@ -0,0 +1,56 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from bauh.gems.snap.snapd import SnapdClient, SnapdAdapter, URL_BASE
+
+
+def response(result) -> Mock:
+    return Mock(status_code=200, **{'json.return_value': {'status-code': 200, 'result': result}})
+
+
+class SnapdAdapterTest(TestCase):
+
+    def test_get_connection__must_always_return_the_same_pool(self):
+        adapter = SnapdAdapter()
+        self.assertIs(adapter.get_connection('http://snapd/v2/snaps'), adapter.get_connection('http://snapd/v2/apps'))
+        self.assertIs(adapter.snapd_pool, adapter.get_connection_with_tls_context(Mock(), True))
+
+
+class SnapdClientTest(TestCase):
+
+    def setUp(self):
+        self.client = SnapdClient(Mock())
+        self.client.session = Mock()
+        self.changes = [{'id': '9', 'ready': True}, {'id': '10', 'ready': True}]
+        self.snaps, self.apps = [{'name': 'spotify'}], [{'snap': 'spotify', 'name': 'spotify'}]
+        self.client.session.get.side_effect = self._get
+
+    def _get(self, url: str, params: dict = None) -> Mock:
+        return response({'{}/changes'.format(URL_BASE): self.changes,
+                         '{}/snaps'.format(URL_BASE): self.snaps,
+                         '{}/apps'.format(URL_BASE): self.apps}[url])
+
+    def _count_calls(self, endpoint: str) -> int:
+        return len([c for c in self.client.session.get.call_args_list if c[0][0] == '{}/{}'.format(URL_BASE, endpoint)])
+
+    def test_list_snaps_and_apps__must_cache_the_results_until_a_new_change_is_registered(self):
+        self.assertEqual((self.snaps, self.apps), self.client.list_snaps_and_apps())
+        self.assertEqual((self.snaps, self.apps), self.client.list_snaps_and_apps())
+        self.assertEqual(self.snaps, self.client.list_all_snaps())
+        self.assertEqual((1, 1), (self._count_calls('snaps'), self._count_calls('apps')))
+
+        self.changes.append({'id': '11', 'ready': True})
+        self.client.list_snaps_and_apps()
+        self.assertEqual((2, 2), (self._count_calls('snaps'), self._count_calls('apps')))
+
+    def test_list_all_snaps__must_not_cache_while_a_change_is_in_progress(self):
+        self.changes.append({'id': '11', 'ready': False})
+        self.client.list_all_snaps()
+        self.client.list_all_snaps()
+        self.assertEqual(2, self._count_calls('snaps'))
+
+    def test_invalidate__must_clear_the_cached_results(self):
+        self.client.list_all_snaps()
+        self.client.invalidate()
+        self.client.list_all_snaps()
+        self.assertEqual(2, self._count_calls('snaps'))
@@ -0,0 +1,59 @@
+import json
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import Mock
+
+from requests import ConnectionError
+
+from bauh.gems.snap import suggestions, SUGGESTIONS_FILE
+from bauh.gems.snap.suggestions import SuggestionsCache
+
+
+class ParseSuggestionsTest(TestCase):
+
+    def test_parse_suggestions__must_return_the_priority_and_name_of_the_valid_lines(self):
+        self.assertEqual([(4, 'spotify'), (1, 'vlc')], suggestions.parse_suggestions('4=spotify\n\ninvalid\n1=vlc\n'))
+
+
+class SuggestionsCacheTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.http_client = Mock()
+        self.cache = SuggestionsCache(self.http_client, Mock(), self.temp_dir, ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_read_suggestions__must_only_download_the_file_when_it_changes(self):
+        self.http_client.get.return_value = Mock(status_code=200, content=b'4=spotify\n', headers={'ETag': '"v1"'})
+        self.assertEqual([(4, 'spotify')], self.cache.read_suggestions())
+
+        self.http_client.get.return_value = Mock(status_code=304)
+        self.assertEqual([(4, 'spotify')], self.cache.read_suggestions())
+        self.http_client.get.assert_called_with(SUGGESTIONS_FILE, headers={'If-None-Match': '"v1"'}, single_call=True)
+
+    def test_read_suggestions__must_read_the_cached_file_when_offline(self):
+        self.http_client.get.return_value = Mock(status_code=200, content=b'4=spotify\n', headers={})
+        self.cache.read_suggestions()
+
+        self.http_client.get.side_effect = ConnectionError()
+        self.assertEqual([(4, 'spotify')], self.cache.read_suggestions())
+
+    def test_read_suggestions__must_return_none_when_no_file_is_available(self):
+        self.http_client.get.return_value = None
+        self.assertIsNone(self.cache.read_suggestions())
+
+    def test_get_data__must_only_return_the_data_cached_before_the_ttl(self):
+        self.cache.add_data({'spotify': {'name': 'spotify'}, 'vlc': {'name': 'vlc'}})
+        self.assertEqual({'spotify': {'name': 'spotify'}}, self.cache.get_data(['spotify', 'gimp']))
+
+        cached = self.cache._read_data()
+        cached['spotify']['cached_at'] = time.time() - 61
+        with open(self.cache.data_path, 'w') as f:
+            f.write(json.dumps(cached))
+
+        self.assertEqual({}, self.cache.get_data(['spotify']))
+        self.assertEqual({'vlc': {'name': 'vlc'}}, self.cache.get_data(['vlc']))
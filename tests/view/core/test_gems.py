@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from bauh import __version__
+from bauh.gems.snap.controller import SnapManager
+from bauh.gems.snap.model import SnapApplication
+from bauh.view.core import gems
+from bauh.view.util.translation import I18n
+
+
+class ReadManifestTest(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.manifest_file = self.cache_dir + '/gems.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test__must_declare_the_gems_without_importing_them(self):
+        manifest = gems.read_manifest(file_path=self.manifest_file)
+
+        snap = [g for g in manifest if g['name'] == 'snap']
+        self.assertEqual(1, len(snap))
+        self.assertEqual('bauh.gems.snap.controller.SnapManager', snap[0]['manager'])
+        self.assertEqual(['bauh.gems.snap.model.SnapApplication'], snap[0]['types'])
+        self.assertTrue(snap[0]['default_enabled'])
+        self.assertTrue(os.path.exists(self.manifest_file))
+
+    def test__must_return_the_cached_manifest_when_nothing_changed(self):
+        gems.read_manifest(file_path=self.manifest_file)
+
+        with patch('bauh.view.core.gems._read_gem_entry') as read_entry:
+            gems.read_manifest(file_path=self.manifest_file)
+            read_entry.assert_not_called()
+
+    def test__must_be_rebuilt_when_bauh_version_changes(self):
+        with open(self.manifest_file, 'w+') as f:
+            f.write(json.dumps({'version': '0.0.1', 'signature': gems._gen_signature(), 'gems': []}))
+
+        self.assertTrue(gems.read_manifest(file_path=self.manifest_file))
+
+        with open(self.manifest_file) as f:
+            self.assertEqual(__version__, json.loads(f.read())['version'])
+
+
+class LoadManagersTest(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.manifest_patch = patch('bauh.view.core.gems.MANIFEST_FILE', self.cache_dir + '/gems.json')
+        self.manifest_patch.start()
+        self.context = Mock(logger=logging.getLogger(__name__), i18n=I18n('en', {}, 'en', {}))
+        self.context.get_view_path.return_value = self.cache_dir
+
+    def tearDown(self):
+        self.manifest_patch.stop()
+        shutil.rmtree(self.cache_dir)
+
+    def _load(self, config_gems):
+        managers = gems.load_managers(locale='en', context=self.context, config={'gems': config_gems}, default_locale='en')
+        return {gems.get_gem_name(m): m for m in managers}
+
+    def test__must_not_load_any_gem_before_it_is_used(self):
+        managers = self._load(['snap'])
+
+        self.assertTrue(managers['snap'].is_enabled())
+        self.assertFalse(managers['arch'].is_enabled())
+        self.assertEqual({SnapApplication}, managers['snap'].get_managed_types())
+        self.assertFalse(any(m.is_loaded() for m in managers.values()))
+
+    def test__must_load_the_gem_and_its_locale_on_first_use(self):
+        snap = self._load(['snap'])['snap']
+
+        self.assertTrue(callable(snap.install))
+        self.assertTrue(snap.is_loaded())
+        self.assertIs(SnapManager, snap.manager_class)
+        self.assertIsInstance(snap.unwrap(), SnapManager)
+        self.assertTrue(snap.is_enabled())
+        self.assertIn('gem.snap.info', self.context.i18n.current)
+
+    def test_manager_class__must_not_load_the_gem(self):
+        snap = self._load(['snap'])['snap']
+
+        self.assertIs(SnapManager, gems.get_manager_class(snap))
+        self.assertFalse(snap.is_loaded())
+
+    @patch('bauh.gems.snap.controller.SnapManager.can_work', side_effect=[True, False])
+    def test_can_work__must_be_checked_again_on_every_session(self, can_work: Mock):
+        self.assertTrue(self._load(['snap'])['snap'].can_work())
+        self.assertFalse(self._load(['snap'])['snap'].can_work())  # snapd was uninstalled meanwhile
+        self.assertEqual(2, can_work.call_count)
+
+    def test__must_enable_the_default_enabled_gems_when_there_is_no_config(self):
+        managers = self._load(None)
+        self.assertTrue(all(m.is_enabled() for m in managers.values()))
@@ -0,0 +1,79 @@
+import logging
+import shutil
+import tempfile
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from bauh.api.abstract.model import PackageUpdate
+from bauh.view.core import service
+
+
+def new_manager(gem_name: str, updates: list) -> Mock:
+    return Mock(gem_name=gem_name, list_updates=Mock(return_value=updates))
+
+
+@patch('bauh.commons.internet.is_available', return_value=True)
+class UpdatesServiceTest(TestCase):
+
+    def setUp(self):
+        self.flatpak = new_manager('flatpak', [PackageUpdate(pkg_id='org.gimp.GIMP', name='gimp', version='2.10', pkg_type='flatpak')])
+        self.snap = new_manager('snap', [])
+        self.manager = Mock(get_working_managers=Mock(return_value=[self.flatpak, self.snap]))
+        self.service = service.UpdatesService(manager=self.manager, logger=logging.getLogger(__name__), ttl=300)
+
+    def test_list_updates__must_cache_the_updates_of_each_gem(self, is_available: Mock):
+        expected = [{'id': 'org.gimp.GIMP', 'name': 'gimp', 'version': '2.10', 'type': 'flatpak'}]
+        self.assertEqual(expected, self.service.list_updates())
+        self.assertEqual(expected, self.service.list_updates())
+
+        self.flatpak.list_updates.assert_called_once_with(internet_available=True)
+        self.snap.list_updates.assert_called_once()
+        is_available.assert_called_once()
+
+    def test_list_updates__must_read_the_updates_again_when_expired(self, is_available: Mock):
+        self.service.ttl = -1
+        self.service.list_updates()
+        self.service.list_updates()
+
+        self.assertEqual(2, self.flatpak.list_updates.call_count)
+
+    def test_refresh__must_only_discard_the_data_of_the_informed_gems(self, is_available: Mock):
+        self.service.list_updates()
+        self.service.refresh(gems=['snap'])
+        self.service.list_updates()
+
+        self.flatpak.list_updates.assert_called_once()
+        self.assertEqual(2, self.snap.list_updates.call_count)
+        self.manager.reset_cache.assert_called_once()
+
+    def test_handle__must_return_an_error_for_unknown_commands(self, is_available: Mock):
+        self.assertIn('error', self.service.handle({'command': 'install'}))
+        self.assertIn('error', self.service.handle(None))
+
+
+class UpdatesServerTest(TestCase):
+
+    def setUp(self):
+        self.socket_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.socket_file = self.socket_dir + '/service.sock'
+
+    def tearDown(self):
+        shutil.rmtree(self.socket_dir)
+
+    def test_request__must_return_the_service_response(self):
+        service_mock = Mock(handle=Mock(return_value={'data': [{'id': 'firefox'}]}))
+
+        with service.UpdatesServer(service_mock, self.socket_file) as server:
+            Thread(target=server.serve_forever, daemon=True).start()
+
+            try:
+                self.assertTrue(service.is_running(self.socket_file))
+                self.assertEqual((True, [{'id': 'firefox'}]), service.request('updates', socket_file=self.socket_file))
+                service_mock.handle.assert_called_once_with({'command': 'updates', 'params': {}})
+            finally:
+                server.shutdown()
+
+    def test_request__must_not_be_answered_when_the_service_is_not_running(self):
+        self.assertFalse(service.is_running(self.socket_file))
+        self.assertEqual((False, None), service.request('updates', socket_file=self.socket_file))
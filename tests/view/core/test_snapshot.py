@@ -0,0 +1,74 @@
+import gzip
+import json
+import logging
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from bauh.api.abstract.model import PackageStatus
+from bauh.gems.arch.model import ArchPackage
+from bauh.gems.flatpak.model import FlatpakApplication
+from bauh.view.core import snapshot
+from bauh.view.util.translation import I18n
+
+
+class SnapshotTest(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.snapshot_file = self.cache_dir + '/installed.snapshot.gz'
+        self.i18n = I18n('en', {}, 'en', {})
+        self.logger = logging.getLogger(__name__)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_read__must_restore_the_saved_packages(self):
+        gimp = FlatpakApplication(id='org.gimp.GIMP', name='gimp', version='2.10', latest_version='2.10.1', branch='stable',
+                                  installation='system', i18n=self.i18n)
+        gimp.update = True
+        gimp.categories = ['graphics']
+        snapshot.save([gimp], self.logger, file_path=self.snapshot_file)
+
+        pkgs = snapshot.read(self.i18n, self.logger, file_path=self.snapshot_file)
+
+        self.assertEqual(1, len(pkgs))
+        self.assertIsInstance(pkgs[0], FlatpakApplication)
+        self.assertEqual(gimp, pkgs[0])
+        self.assertEqual(gimp.__dict__, pkgs[0].__dict__)
+        self.assertIs(self.i18n, pkgs[0].i18n)
+        self.assertEqual(PackageStatus.READY, pkgs[0].status)
+
+    def test_read__must_only_restore_packages_from_the_informed_gems(self):
+        snapshot.save([FlatpakApplication(id='org.gimp.GIMP', name='gimp'), ArchPackage(name='vim', repository='extra')],
+                      self.logger, file_path=self.snapshot_file)
+
+        pkgs = snapshot.read(self.i18n, self.logger, gems={'arch'}, file_path=self.snapshot_file)
+
+        self.assertEqual(['vim'], [p.name for p in pkgs])
+
+    def test_read__must_discard_snapshots_from_other_versions(self):
+        with patch('bauh.view.core.snapshot.__version__', '0.9.0'):
+            snapshot.save([ArchPackage(name='vim', repository='extra')], self.logger, file_path=self.snapshot_file)
+
+        self.assertIsNone(snapshot.read(self.i18n, self.logger, file_path=self.snapshot_file))
+
+        with gzip.open(self.snapshot_file, 'wt') as f:  # format without version
+            f.write(json.dumps([snapshot.encode(ArchPackage(name='vim', repository='extra'))]))
+
+        self.assertIsNone(snapshot.read(self.i18n, self.logger, file_path=self.snapshot_file))
+
+    def test_read__must_return_none_when_there_is_no_snapshot(self):
+        self.assertIsNone(snapshot.read(self.i18n, self.logger, file_path=self.snapshot_file))
+
+    def test_diff__must_return_the_changed_packages_indexes(self):
+        old = [ArchPackage(name='vim', version='8.2', repository='extra'), ArchPackage(name='git', version='2.28', repository='extra')]
+        new = [ArchPackage(name='vim', version='8.2', repository='extra'), ArchPackage(name='git', version='2.29', repository='extra')]
+
+        self.assertEqual([1], snapshot.diff(old, new))
+
+    def test_diff__must_return_none_when_packages_were_added_or_removed(self):
+        old = [ArchPackage(name='vim', repository='extra')]
+        self.assertIsNone(snapshot.diff(old, [*old, ArchPackage(name='git', repository='extra')]))
+        self.assertIsNone(snapshot.diff(old, [ArchPackage(name='git', repository='extra')]))
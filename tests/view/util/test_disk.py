@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from bauh.gems.arch.model import ArchPackage
+from bauh.view.util.disk import DefaultDiskCacheStoreFactory, AsyncDiskCacheLoader
+
+
+class DefaultDiskCacheStoreFactoryTest(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.legacy_dir = self.cache_dir + '/installed'
+        self.store_file = self.cache_dir + '/installed.db'
+        self.factory = DefaultDiskCacheStoreFactory(logging.getLogger(__name__))
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _write_legacy(self, name: str, data: dict, extra_file: str = None):
+        os.makedirs('{}/{}'.format(self.legacy_dir, name))
+
+        with open('{}/{}/data.json'.format(self.legacy_dir, name), 'w+') as f:
+            f.write(json.dumps(data))
+
+        if extra_file:
+            with open('{}/{}/{}'.format(self.legacy_dir, name, extra_file), 'w+') as f:
+                f.write('')
+
+    def test_get__must_migrate_the_legacy_directories(self):
+        self._write_legacy('firefox', {'command': 'firefox'})
+        self._write_legacy('yay', {'command': 'yay'}, extra_file='PKGBUILD')
+
+        store = self.factory.get(self.store_file, self.legacy_dir)
+
+        self.assertEqual({'firefox': {'command': 'firefox'}, 'yay': {'command': 'yay'}}, store.load())
+        self.assertFalse(os.path.exists(self.legacy_dir + '/firefox'))
+        self.assertFalse(os.path.exists(self.legacy_dir + '/yay/data.json'))
+        self.assertTrue(os.path.exists(self.legacy_dir + '/yay/PKGBUILD'))
+
+    def test_get__must_migrate_only_once(self):
+        self._write_legacy('firefox', {'command': 'firefox'})
+        self.factory.get(self.store_file, self.legacy_dir).delete('firefox')
+
+        self._write_legacy('vlc', {'command': 'vlc'})
+        store = DefaultDiskCacheStoreFactory(logging.getLogger(__name__)).get(self.store_file, self.legacy_dir)
+
+        self.assertEqual({}, store.load())
+
+    def test_get__must_return_the_same_instance_for_the_same_file(self):
+        self.assertIs(self.factory.get(self.store_file), self.factory.get(self.store_file))
+
+    def test_put_several__must_replace_existing_entries(self):
+        store = self.factory.get(self.store_file)
+        store.put('firefox', {'command': 'firefox'})
+        store.put_several({'firefox': {'command': 'firefox-esr'}, 'vlc': {'command': 'vlc'}})
+
+        self.assertEqual({'firefox', 'vlc'}, store.keys())
+        self.assertEqual({'command': 'firefox-esr'}, store.get('firefox'))
+
+    def test_delete(self):
+        store = self.factory.get(self.store_file)
+        store.put_several({'firefox': {'command': 'firefox'}, 'vlc': {'command': 'vlc'}})
+        store.delete('firefox')
+        store.compact()
+
+        self.assertIsNone(store.get('firefox'))
+        self.assertEqual({'vlc'}, store.keys())
+
+
+class AsyncDiskCacheLoaderStoreTest(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.cache_path_patch = patch('bauh.gems.arch.model.ARCH_CACHE_PATH', self.cache_dir)
+        self.store_path_patch = patch('bauh.gems.arch.model.ARCH_CACHE_STORE_FILE', self.cache_dir + '/installed.db')
+        self.cache_path_patch.start()
+        self.store_path_patch.start()
+
+    def tearDown(self):
+        self.cache_path_patch.stop()
+        self.store_path_patch.stop()
+        shutil.rmtree(self.cache_dir)
+
+    def test_fill__must_read_the_data_from_the_package_store(self):
+        store_factory = DefaultDiskCacheStoreFactory(logging.getLogger(__name__))
+        pkg = ArchPackage(name='firefox', installed=True)
+        store_factory.for_package(pkg).put('firefox', {'command': 'firefox', 'repository': 'extra'})
+
+        loader = AsyncDiskCacheLoader(cache_map={}, logger=logging.getLogger(__name__), store_factory=store_factory)
+        loader.start()
+        loader.fill(pkg)
+        loader.stop_working()
+        loader.join()
+
+        self.assertEqual('firefox', pkg.command)
+        self.assertEqual('extra', pkg.repository)
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from bauh.view.util import translation
+from bauh.view.util.translation import I18n, read_catalog
+
+
+class I18nTest(TestCase):
+
+    def test__must_fall_back_to_the_default_locale_and_then_to_the_key(self):
+        i18n = I18n('pt', {'yes': 'sim'}, 'en', {'yes': 'yes', 'no': 'no'})
+
+        self.assertEqual('sim', i18n['yes'])
+        self.assertEqual('no', i18n['no'])
+        self.assertEqual('missing', i18n['missing'])
+        self.assertIsNone(i18n.get('missing'))
+        self.assertEqual('x', i18n.get('missing', 'x'))
+
+    def test_add_keys__must_not_override_the_current_locale_with_the_default_one(self):
+        i18n = I18n('pt', {'yes': 'sim'}, 'en', {'yes': 'yes'})
+        i18n.add_keys({'snap': 'pacote'}, {'yes': 'yes', 'snap': 'snap', 'flatpak': 'flatpak'}, '/gems/snap/locale')
+
+        self.assertEqual('sim', i18n['yes'])
+        self.assertEqual('pacote', i18n['snap'])
+        self.assertEqual('flatpak', i18n['flatpak'])
+        self.assertIn('/gems/snap/locale', i18n.loaded_dirs)
+
+
+class ReadCatalogTest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='bauh_test_')
+        self.cache_dir = '{}/cache'.format(self.temp_dir)
+        self.core_dir, self.gem_dir = '{}/core'.format(self.temp_dir), '{}/gem'.format(self.temp_dir)
+        self._write(self.core_dir, 'en', 'yes=yes\nno=no\n')
+        self._write(self.core_dir, 'pt', 'yes=sim\n')
+        self._write(self.gem_dir, 'en', 'snap=snap\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @staticmethod
+    def _write(locale_dir: str, key: str, content: str):
+        os.makedirs(locale_dir, exist_ok=True)
+
+        with open('{}/{}'.format(locale_dir, key), 'w') as f:
+            f.write(content)
+
+    def test__must_merge_the_locale_dirs(self):
+        key, current, default = read_catalog('pt_BR', [self.core_dir, self.gem_dir], self.cache_dir)
+
+        self.assertEqual('pt', key)
+        self.assertEqual({'yes': 'sim'}, current)
+        self.assertEqual({'yes': 'yes', 'no': 'no', 'snap': 'snap'}, default)
+
+    def test__must_read_the_cache_while_the_locale_files_do_not_change(self):
+        expected = read_catalog('en', [self.core_dir, self.gem_dir], self.cache_dir)
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+        with patch.object(translation, 'get_locale_keys') as get_locale_keys:
+            self.assertEqual(expected, read_catalog('en', [self.core_dir, self.gem_dir], self.cache_dir))
+            get_locale_keys.assert_not_called()
+
+        self._write(self.gem_dir, 'en', 'snap=Snap\n')
+        os.utime('{}/en'.format(self.gem_dir), ns=(1, 1))
+        self.assertEqual('Snap', read_catalog('en', [self.core_dir, self.gem_dir], self.cache_dir)[1]['snap'])
+
+    def test__must_generate_the_catalog_again_when_the_cache_is_corrupted(self):
+        read_catalog('en', [self.core_dir], self.cache_dir)
+
+        for cache_file in os.listdir(self.cache_dir):
+            with open('{}/{}'.format(self.cache_dir, cache_file), 'wb') as f:
+                f.write(b'corrupted')
+
+        self.assertEqual(('en', {'yes': 'yes', 'no': 'no'}, {}), read_catalog('en', [self.core_dir], self.cache_dir))